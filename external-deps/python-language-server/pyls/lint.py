@@ -0,0 +1,151 @@
+# Copyright 2017 Palantir Technologies, Inc.
+"""Run the linters of documents concurrently and publish their diagnostics."""
+from concurrent.futures import ThreadPoolExecutor
+import logging
+import threading
+
+log = logging.getLogger(__name__)
+
+LINT_WORKERS = 4
+
+
+class _LintRun(object):
+    """The linters run for a version of a document."""
+
+    def __init__(self, names):
+        self.pending = set(names)
+        self.futures = []
+        self.published = False
+
+    def cancel(self):
+        for future in self.futures:
+            future.cancel()
+
+
+class LintScheduler(object):
+    """Run the pyls_lint hooks of documents in a thread pool.
+
+    The diagnostics of a document are published when a run finishes, and
+    before each time a linter finishes with different results, together with
+    the last ones of the other linters.
+    Results are kept for each linter, and reused while the source of the
+    document and the settings don't change. Runs of a document are superseded
+    by the next one: the linters that didn't start are cancelled and the
+    results of the others are not published.
+    """
+
+    def __init__(self, max_workers=LINT_WORKERS):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers)
+        self._lock = threading.Lock()
+        # Current run of each document
+        self._runs = {}
+        # Key and diagnostics of the last run of each linter of each document
+        self._results = {}
+        # Diagnostics of each linter last published for each document
+        self._published = {}
+
+    def lint(self, config, workspace, document, is_saved):
+        """Lint a document with the enabled pyls_lint hooks."""
+        # Same order as when calling the hook
+        hook_impls = [
+            hook_impl for hook_impl in reversed(config.plugin_manager.hook.pyls_lint.get_hookimpls())
+            if hook_impl.plugin not in config.disabled_plugins
+        ]
+        names = [hook_impl.plugin_name for hook_impl in hook_impls]
+        # Linters run while the document keeps changing, so they lint a copy
+        # with the source their results are cached for
+        document = document.snapshot()
+        kwargs = {'config': config, 'workspace': workspace, 'document': document, 'is_saved': is_saved}
+        # The whole source is part of the key because comparing it is cheaper
+        # than hashing it
+        source = document.source
+        settings = config.settings(document_path=document.path)
+        doc_uri = document.uri
+
+        with self._lock:
+            previous_run = self._runs.get(doc_uri)
+            if previous_run is not None:
+                previous_run.cancel()
+            run = _LintRun(names)
+            self._runs[doc_uri] = run
+            results = self._results.setdefault(doc_uri, {})
+            published = self._published.setdefault(doc_uri, {})
+            for name in list(published):
+                if name not in names:
+                    del published[name]
+
+            cached = []
+            for hook_impl in hook_impls:
+                name = hook_impl.plugin_name
+                if 'is_saved' in hook_impl.argnames and not is_saved:
+                    # Results may depend on the file saved on disk
+                    key = None
+                else:
+                    key = (source, settings)
+                result = results.get(name)
+                if key is not None and result is not None and result[0] == key:
+                    cached.append((name, result[1]))
+                    continue
+                run.futures.append(self._executor.submit(
+                    self._run_linter, run, workspace, doc_uri, names, hook_impl, kwargs, key))
+
+            for name, diagnostics in cached:
+                self._finish_linter(run, workspace, doc_uri, names, name, diagnostics)
+            if not names:
+                # Clear the diagnostics of disabled linters
+                self._finish_linter(run, workspace, doc_uri, names, None, None)
+
+    def _run_linter(self, run, workspace, doc_uri, names, hook_impl, kwargs, key):
+        name = hook_impl.plugin_name
+        try:
+            diagnostics = hook_impl.function(*[kwargs[arg] for arg in hook_impl.argnames]) or []
+        except Exception:  # pylint: disable=broad-except
+            log.exception("Failed to lint %s with %s", doc_uri, name)
+            diagnostics = None
+
+        with self._lock:
+            if diagnostics is not None and key is not None:
+                self._results.get(doc_uri, {})[name] = (key, diagnostics)
+            self._finish_linter(run, workspace, doc_uri, names, name, diagnostics)
+
+    def _finish_linter(self, run, workspace, doc_uri, names, name, diagnostics):
+        """Publish the diagnostics of the document if they changed.
+
+        Must be called with the lock held, so diagnostics are published in
+        order.
+        """
+        if self._runs.get(doc_uri) is not run:
+            # Superseded by another run
+            return
+        run.pending.discard(name)
+        published = self._published[doc_uri]
+        changed = diagnostics is not None and published.get(name, []) != diagnostics
+        if diagnostics is not None:
+            published[name] = diagnostics
+        if changed or (not run.pending and not run.published):
+            run.published = True
+            workspace.publish_diagnostics(
+                doc_uri, [diag for linter in names for diag in published.get(linter, [])])
+        if not run.pending:
+            del self._runs[doc_uri]
+
+    def forget(self, doc_uri):
+        """Cancel the linting of a document and forget its results."""
+        with self._lock:
+            run = self._runs.pop(doc_uri, None)
+            if run is not None:
+                run.cancel()
+            self._results.pop(doc_uri, None)
+            self._published.pop(doc_uri, None)
+
+    def clear_cache(self):
+        """Forget the results of all linters, e.g. when files they read change."""
+        with self._lock:
+            self._results.clear()
+
+    def shutdown(self):
+        with self._lock:
+            for run in self._runs.values():
+                run.cancel()
+            self._runs.clear()
+        self._executor.shutdown(wait=False)
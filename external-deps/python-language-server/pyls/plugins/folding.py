@@ -16,7 +16,12 @@
 def pyls_folding_range(document):
     program = document.source + '\n'
     lines = program.splitlines()
-    tree = parso.parse(program)
+    if program.endswith('\n\n'):
+        # The source folds the same without the extra newline, so the tree
+        # shared with other requests can be used
+        tree = document.parso_tree()
+    else:
+        tree = parso.parse(program)
     ranges = __compute_folding_ranges(tree, lines)
 
     results = []
@@ -110,12 +110,13 @@ def use_snippets(document, position):
     statement, `True` otherwise.
     """
     line = position['line']
-    lines = document.source.split('\n', line)
-    act_lines = [lines[line][:position['character']]]
+    lines = document.lines
+    current_line = lines[line] if line < len(lines) else ''
+    act_lines = [current_line[:position['character']].rstrip('\r\n')]
     line -= 1
     last_character = ''
     while line > -1:
-        act_line = lines[line]
+        act_line = lines[line].rstrip('\r\n')
         if (act_line.rstrip().endswith('\\') or
                 act_line.rstrip().endswith('(') or
                 act_line.rstrip().endswith(',')):
@@ -1,5 +1,9 @@
 # Copyright 2017 Palantir Technologies, Inc.
 import logging
+import threading
+
+import jedi
+
 from pyls import hookimpl
 
 log = logging.getLogger(__name__)
@@ -26,12 +30,33 @@ def pyls_settings():
 
 @hookimpl
 def pyls_initialize(config):
+    modules = []
     for mod_name in config.plugin_settings('preload').get('modules', []):
         try:
             __import__(mod_name)
+            modules.append(mod_name)
             log.debug("Preloaded module %s", mod_name)
         except Exception:  # pylint: disable=broad-except
             # Catch any exception since not only ImportError can be raised here
             # For example, old versions of NumPy can cause a ValueError.
             # See spyder-ide/spyder#13985
             pass
+
+    # Let Jedi parse the modules in the background, so that the first
+    # completions on them don't have to
+    thread = threading.Thread(target=_warm_up_jedi, args=(modules,))
+    thread.daemon = True
+    thread.start()
+
+
+def _warm_up_jedi(modules):
+    # Jedi subprocesses can't be shared with the requests of other threads,
+    # so the environment of this process is used
+    environment = jedi.InterpreterEnvironment()
+    for mod_name in modules:
+        code = 'import {0} as x; x.'.format(mod_name)
+        try:
+            jedi.Script(code, environment=environment).complete(1, len(code))
+        except Exception:  # pylint: disable=broad-except
+            log.debug("Failed to warm up Jedi for module %s", mod_name)
+    log.debug("Finished warming up Jedi")
@@ -35,8 +35,9 @@ def pyls_lint(workspace, document):
     kwargs = {k: v for k, v in opts.items() if v}
     styleguide = pycodestyle.StyleGuide(kwargs)
 
+    # The checker may modify the lines it's given
     c = pycodestyle.Checker(
-        filename=document.uri, lines=document.lines, options=styleguide.options,
+        filename=document.uri, lines=list(document.lines), options=styleguide.options,
         report=PyCodeStyleDiagnosticReport(styleguide.options)
     )
     c.check_all()
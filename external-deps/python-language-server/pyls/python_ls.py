@@ -11,6 +11,7 @@
 
 from . import lsp, _utils, uris
 from .config import config
+from .lint import LintScheduler
 from .workspace import Workspace
 
 log = logging.getLogger(__name__)
@@ -111,6 +112,7 @@ def __init__(self, rx, tx, check_parent_process=False):
         self._endpoint = Endpoint(self, self._jsonrpc_stream_writer.write, max_workers=MAX_WORKERS)
         self._dispatchers = []
         self._shutdown = False
+        self._lint_scheduler = LintScheduler()
 
     def start(self):
         """Entry point for the server."""
@@ -140,6 +142,7 @@ def m_shutdown(self, **_kwargs):
         return None
 
     def m_exit(self, **_kwargs):
+        self._lint_scheduler.shutdown()
         self._endpoint.shutdown()
         self._jsonrpc_stream_reader.close()
         self._jsonrpc_stream_writer.close()
@@ -269,10 +272,7 @@ def lint(self, doc_uri, is_saved):
         # Since we're debounced, the document may no longer be open
         workspace = self._match_uri_to_workspace(doc_uri)
         if doc_uri in workspace.documents:
-            workspace.publish_diagnostics(
-                doc_uri,
-                flatten(self._hook('pyls_lint', doc_uri, is_saved=is_saved))
-            )
+            self._lint_scheduler.lint(self.config, workspace, workspace.get_document(doc_uri), is_saved)
 
     def references(self, doc_uri, position, exclude_declaration):
         return flatten(self._hook(
@@ -292,6 +292,7 @@ def folding(self, doc_uri):
     def m_text_document__did_close(self, textDocument=None, **_kwargs):
         workspace = self._match_uri_to_workspace(textDocument['uri'])
         workspace.rm_document(textDocument['uri'])
+        self._lint_scheduler.forget(textDocument['uri'])
 
     def m_text_document__did_open(self, textDocument=None, **_kwargs):
         workspace = self._match_uri_to_workspace(textDocument['uri'])
@@ -356,6 +357,7 @@ def m_text_document__signature_help(self, textDocument=None, position=None, **_k
 
     def m_workspace__did_change_configuration(self, settings=None):
         self.config.update((settings or {}).get('pyls', {}))
+        self._lint_scheduler.clear_cache()
         for workspace_uri in self.workspaces:
             workspace = self.workspaces[workspace_uri]
             workspace.update_config(settings)
@@ -426,6 +428,9 @@ def m_workspace__did_change_watched_files(self, changes=None, **_kwargs):
             # Only externally changed python files and lint configs may result in changed diagnostics.
             return
 
+        # Linters may read these files
+        self._lint_scheduler.clear_cache()
+
         for workspace_uri in self.workspaces:
             workspace = self.workspaces[workspace_uri]
             for doc_uri in workspace.documents:
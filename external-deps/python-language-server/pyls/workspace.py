@@ -1,4 +1,5 @@
 # Copyright 2017 Palantir Technologies, Inc.
+import bisect
 import io
 import logging
 import os
@@ -26,6 +27,11 @@ def wrapper(self, *args, **kwargs):
     return wrapper
 
 
+def _ends_with_line_break(text):
+    """Return True if text ends with a line break of str.splitlines."""
+    return text[-1:].splitlines() == ['']
+
+
 class Workspace(object):
 
     M_PUBLISH_DIAGNOSTICS = 'textDocument/publishDiagnostics'
@@ -140,6 +146,14 @@ def __init__(self, uri, workspace, source=None, version=None, local=True, extra_
         self._workspace = workspace
         self._local = local
         self._source = source
+        # Lines of the source and offsets of their start, which are kept
+        # up to date by changes instead of being computed from the source
+        self._lines = None
+        self._line_offsets = [0]
+        # Jedi scripts and projects by the settings they were created with
+        self._jedi_scripts = {}
+        self._jedi_projects = {}
+        self._parso_tree = None
         self._extra_sys_path = extra_sys_path or []
         self._rope_project_builder = rope_project_builder
         self._lock = RLock()
@@ -154,28 +168,51 @@ def _rope_resource(self, rope_config):
     @property
     @lock
     def lines(self):
-        return self.source.splitlines(True)
+        """The lines of the document, which must not be modified."""
+        if self._lines is None:
+            if self._source is None:
+                # Not kept in memory, so the file may change
+                return self.source.splitlines(True)
+            self._lines = self._source.splitlines(True)
+        return self._lines
 
     @property
     @lock
     def source(self):
         if self._source is None:
-            with io.open(self.path, 'r', encoding='utf-8') as f:
-                return f.read()
+            if self._lines is None:
+                with io.open(self.path, 'r', encoding='utf-8') as f:
+                    return f.read()
+            self._source = ''.join(self._lines)
         return self._source
 
     def update_config(self, settings):
         self._config.update((settings or {}).get('pyls', {}))
 
+    @lock
+    def snapshot(self):
+        """Return a copy of the document that is not changed with it."""
+        return Document(
+            self.uri,
+            self._workspace,
+            source=self.source,
+            version=self.version,
+            local=self._local,
+            extra_sys_path=self._extra_sys_path,
+            rope_project_builder=self._rope_project_builder,
+        )
+
     @lock
     def apply_change(self, change):
         """Apply a change to the document."""
+        self._jedi_scripts = {}
+        self._parso_tree = None
         text = change['text']
         change_range = change.get('range')
 
         if not change_range:
             # The whole file has changed
-            self._source = text
+            self._set_source(text)
             return
 
         start_line = change_range['start']['line']
@@ -183,37 +220,76 @@ def apply_change(self, change):
         end_line = change_range['end']['line']
         end_col = change_range['end']['character']
 
-        # Check for an edit occuring at the very end of the file
-        if start_line == len(self.lines):
-            self._source = self.source + text
-            return
-
-        new = io.StringIO()
-
-        # Iterate over the existing document until we hit the edit range,
-        # at which point we write the new text, then loop until we hit
-        # the end of the range and continue writing.
-        for i, line in enumerate(self.lines):
-            if i < start_line:
-                new.write(line)
-                continue
-
-            if i > end_line:
-                new.write(line)
-                continue
+        lines = self.lines
 
-            if i == start_line:
-                new.write(line[:start_col])
-                new.write(text)
-
-            if i == end_line:
-                new.write(line[end_col:])
-
-        self._source = new.getvalue()
+        # Check for an edit occuring at the very end of the file
+        if start_line >= len(lines):
+            lines.append(u'')
+            start_line = end_line = len(lines) - 1
+            start_col = end_col = 0
+
+        # Only the lines in the edit range are split again, together with
+        # the previous and next ones if the edit joins them
+        first = start_line
+        if first > 0 and (lines[first - 1].endswith('\r') or
+                          not _ends_with_line_break(lines[first - 1])):
+            first -= 1
+        last = min(end_line, len(lines) - 1) + 1
+        edited = u''.join([
+            u''.join(lines[first:start_line]),
+            lines[start_line][:start_col],
+            text,
+            lines[end_line][end_col:] if end_line < len(lines) else u'',
+        ])
+        while last < len(lines) and (
+                not _ends_with_line_break(edited) or
+                (edited.endswith('\r') and lines[last].startswith('\n'))):
+            edited += lines[last]
+            last += 1
+
+        lines[first:last] = edited.splitlines(True)
+        self._lines = lines
+        self._source = None
+        del self._line_offsets[first + 1:]
+
+    def _set_source(self, source):
+        self._source = source
+        self._lines = None
+        self._line_offsets = [0]
 
+    @lock
     def offset_at_position(self, position):
         """Return the byte-offset pointed at by the given position."""
-        return position['character'] + len(''.join(self.lines[:position['line']]))
+        return position['character'] + self._line_offset(position['line'])
+
+    @lock
+    def position_at_offset(self, offset):
+        """Return the position of the given offset."""
+        line_offsets = self._get_line_offsets(self.lines)
+        line = max(bisect.bisect_right(line_offsets, offset) - 1, 0)
+        return {'line': line, 'character': offset - line_offsets[line]}
+
+    def _line_offset(self, line):
+        """Return the offset of the start of a line."""
+        lines = self.lines
+        line = min(line, len(lines))
+        return self._get_line_offsets(lines, line)[line]
+
+    def _get_line_offsets(self, lines, line=None):
+        """
+        Return the offsets of the start of the lines, and of the end of the
+        document, computed at least up to the given line.
+        """
+        if self._lines is None:
+            # Not kept in memory, so they can't be reused
+            line_offsets = [0]
+        else:
+            line_offsets = self._line_offsets
+        if line is None:
+            line = len(lines)
+        for i in range(len(line_offsets) - 1, line):
+            line_offsets.append(line_offsets[i] + len(lines[i]))
+        return line_offsets
 
     def word_at_position(self, position):
         """Get the word under the cursor returning the start and end positions."""
@@ -241,6 +317,51 @@ def jedi_names(self, use_document_path, all_scopes=False, definitions=True, refe
 
     @lock
     def jedi_script(self, position=None, use_document_path=False):
+        key, environment, project = self._jedi_project(use_document_path)
+        script = self._jedi_scripts.get(key)
+        if script is not None and not position:
+            return script
+
+        kwargs = {
+            'code': self.source,
+            'path': self.path,
+            'environment': environment,
+            'project': project,
+        }
+
+        if position:
+            # Deprecated by Jedi to use in Script() constructor
+            kwargs += _utils.position_to_jedi_linecolumn(self, position)
+            return jedi.Script(**kwargs)
+
+        script = jedi.Script(**kwargs)
+        if self._in_memory():
+            self._jedi_scripts[key] = script
+        return script
+
+    @lock
+    def parso_tree(self):
+        """Return the parso tree of the source.
+
+        It's parsed like Jedi does for the scripts of the document, so they
+        share the tree, and only the parts of the source changed since the
+        last parse are parsed again.
+        """
+        if self._parso_tree is not None:
+            return self._parso_tree
+        _, environment, project = self._jedi_project(use_document_path=False)
+        grammar = (environment or project.get_environment()).get_grammar()
+        tree = grammar.parse(self.source, path=os.path.abspath(self.path), diff_cache=True)
+        if self._in_memory():
+            self._parso_tree = tree
+        return tree
+
+    def _in_memory(self):
+        """Return True if the source is not read from disk, where it may change."""
+        return self._source is not None or self._lines is not None
+
+    def _jedi_project(self, use_document_path):
+        """Return the key of the Jedi settings, and the environment and project for them."""
         extra_paths = []
         environment_path = None
         env_vars = None
@@ -251,10 +372,21 @@ def jedi_script(self, position=None, use_document_path=False):
             extra_paths = jedi_settings.get('extra_paths') or []
             env_vars = jedi_settings.get('env_vars')
 
+        # Scripts are reused until the source changes, and projects until
+        # the settings they were created with change
+        key = (use_document_path, environment_path, tuple(extra_paths),
+               tuple(sorted(env_vars.items())) if env_vars else None)
+        if key not in self._jedi_projects:
+            self._jedi_projects[key] = self._create_jedi_project(
+                use_document_path, environment_path, extra_paths, env_vars)
+        environment, project = self._jedi_projects[key]
+        return key, environment, project
+
+    def _create_jedi_project(self, use_document_path, environment_path, extra_paths, env_vars):
+        """Return the Jedi environment and project for the given settings."""
         # Drop PYTHONPATH from env_vars before creating the environment because that makes
         # Jedi throw an error.
-        if env_vars is None:
-            env_vars = os.environ.copy()
+        env_vars = dict(os.environ if env_vars is None else env_vars)
         env_vars.pop('PYTHONPATH', None)
 
         environment = self.get_enviroment(environment_path, env_vars=env_vars) if environment_path else None
@@ -265,18 +397,7 @@ def jedi_script(self, position=None, use_document_path=False):
         if use_document_path:
             sys_path += [os.path.normpath(os.path.dirname(self.path))]
 
-        kwargs = {
-            'code': self.source,
-            'path': self.path,
-            'environment': environment,
-            'project': jedi.Project(path=project_path, sys_path=sys_path),
-        }
-
-        if position:
-            # Deprecated by Jedi to use in Script() constructor
-            kwargs += _utils.position_to_jedi_linecolumn(self, position)
-
-        return jedi.Script(**kwargs)
+        return environment, jedi.Project(path=project_path, sys_path=sys_path)
 
     def get_enviroment(self, environment_path=None, env_vars=None):
         # TODO(gatesn): #339 - make better use of jedi environments, they seem pretty powerful
@@ -1,4 +1,7 @@
 # Copyright 2017 Palantir Technologies, Inc.
+import random
+
+from pyls import uris
 from test.fixtures import DOC_URI, DOC
 from pyls.workspace import Document
 
@@ -97,3 +100,95 @@ def test_document_end_of_file_edit(workspace):
         "print 'b'\n",
         "o",
     ]
+
+
+def test_document_line_break_edits(workspace):
+    doc = Document('file:///uri', workspace, u'a\rb\nc')
+    # Joining '\r' and '\n' makes a single line break
+    doc.apply_change({'text': u'\n', 'range': {
+        'start': {'line': 1, 'character': 0},
+        'end': {'line': 1, 'character': 2}
+    }})
+    assert doc.lines == ['a\r\n', 'c']
+    # Removing a line break joins the lines
+    doc.apply_change({'text': u'', 'range': {
+        'start': {'line': 0, 'character': 1},
+        'end': {'line': 0, 'character': 3}
+    }})
+    assert doc.lines == ['ac']
+    assert doc.source == u'ac'
+
+
+def test_document_random_edits(workspace):
+    rand = random.Random(0)
+    source = u'import sys\n\ndef main():\n    print sys.stdin.read()\n'
+    doc = Document('file:///uri', workspace, source)
+    for _ in range(500):
+        # Including the line after the end of the file
+        lines = source.splitlines(True) + [u'']
+        start_line = rand.randint(0, len(lines) - 1)
+        end_line = rand.randint(start_line, min(start_line + 2, len(lines) - 1))
+        start_col = rand.randint(0, len(lines[start_line]))
+        end_col = rand.randint(0, len(lines[end_line]))
+        if start_line == end_line and end_col < start_col:
+            start_col, end_col = end_col, start_col
+        text = u''.join(rand.choice(u'ab\r\n') for _ in range(rand.randint(0, 4)))
+        offset = len(u''.join(lines[:start_line])) + start_col
+        assert doc.offset_at_position({'line': start_line, 'character': start_col}) == offset
+        doc.apply_change({'text': text, 'range': {
+            'start': {'line': start_line, 'character': start_col},
+            'end': {'line': end_line, 'character': end_col}
+        }})
+
+        source = source[:offset] + text + source[len(u''.join(lines[:end_line])) + end_col:]
+        assert doc.lines == source.splitlines(True)
+        if offset <= len(source):
+            position = doc.position_at_offset(offset)
+            assert doc.offset_at_position(position) == offset
+    assert doc.source == source
+
+
+def test_position_at_offset(doc):
+    assert doc.position_at_offset(8) == {'line': 0, 'character': 8}
+    assert doc.position_at_offset(12) == {'line': 2, 'character': 0}
+    assert doc.position_at_offset(16) == {'line': 2, 'character': 4}
+    assert doc.position_at_offset(51) == {'line': 4, 'character': 0}
+
+
+def test_jedi_script_cache(doc):
+    script = doc.jedi_script()
+    assert doc.jedi_script() is script
+    assert doc.jedi_script(use_document_path=True) is not script
+
+    # Scripts are created again for the new source, but not their projects
+    doc.apply_change({'text': u'import os\n'})
+    new_script = doc.jedi_script()
+    assert new_script is not script
+    assert new_script._inference_state.project is script._inference_state.project
+    assert [c.name for c in new_script.complete(1, 0)]
+
+
+def test_jedi_script_disk_document(tmpdir, workspace):
+    path = tmpdir.join('disk.py')
+    path.write('import sys\n')
+    doc = Document(uris.from_fs_path(str(path)), workspace)
+    # The file may change on disk
+    assert doc.jedi_script() is not doc.jedi_script()
+
+
+def test_parso_tree(workspace):
+    doc = Document(DOC_URI, workspace, u'import sys\n\ndef main():\n    pass\n')
+    tree = doc.parso_tree()
+    assert doc.parso_tree() is tree
+    # Jedi uses the same tree
+    assert doc.jedi_script()._module_node is tree
+
+    # Only the changed parts are parsed again
+    funcdef = tree.children[1]
+    doc.apply_change({'text': u'os', 'range': {
+        'start': {'line': 0, 'character': 7},
+        'end': {'line': 0, 'character': 10}
+    }})
+    new_tree = doc.parso_tree()
+    assert new_tree.get_code() == doc.source
+    assert funcdef in new_tree.children
@@ -0,0 +1,144 @@
+# Copyright 2017 Palantir Technologies, Inc.
+import threading
+import time
+
+from mock import Mock
+import pluggy
+import pytest
+
+from pyls import hookimpl, hookspecs, PYLS
+from pyls.lint import LintScheduler
+from pyls.workspace import Document
+
+DOC_URI = 'file:///lint.py'
+
+
+class Linter(object):
+    """A linter that reports the source of the document."""
+
+    def __init__(self, name):
+        self.name = name
+        self.calls = 0
+        self.event = threading.Event()
+        self.event.set()
+
+    @hookimpl
+    def pyls_lint(self, document):
+        self.calls += 1
+        assert self.event.wait(5)
+        source = document.source
+        return [{'source': self.name, 'message': source}]
+
+
+class SavedLinter(Linter):
+    """A linter that depends on the file saved on disk."""
+
+    @hookimpl
+    def pyls_lint(self, document, is_saved):  # pylint: disable=arguments-differ
+        return super(SavedLinter, self).pyls_lint(document)
+
+
+@pytest.fixture
+def linters(workspace):
+    plugin_manager = pluggy.PluginManager(PYLS)
+    plugin_manager.add_hookspecs(hookspecs)
+    linters = [Linter('fast'), Linter('slow'), SavedLinter('saved')]
+    for linter in linters:
+        plugin_manager.register(linter, name=linter.name)
+    config = Mock(plugin_manager=plugin_manager, disabled_plugins=[])
+    config.settings.return_value = {}
+    scheduler = LintScheduler()
+    yield scheduler, config, linters
+    scheduler.shutdown()
+
+
+def wait_for(condition):
+    for _ in range(100):
+        if condition():
+            return
+        time.sleep(0.05)
+    raise AssertionError('Timed out')
+
+
+def published(workspace):
+    """Return the sources and messages of the diagnostics published."""
+    return [
+        sorted((diag['source'], diag['message']) for diag in call[1]['params']['diagnostics'])
+        for call in workspace._endpoint.notify.call_args_list
+    ]
+
+
+def test_lint_publishes_each_linter(workspace, linters):
+    scheduler, config, (fast, slow, saved) = linters
+    doc = Document(DOC_URI, workspace, u'a')
+    slow.event.clear()
+    scheduler.lint(config, workspace, doc, is_saved=True)
+    wait_for(lambda: len(published(workspace)) == 2)
+    assert published(workspace)[-1] == [('fast', 'a'), ('saved', 'a')]
+
+    # Diagnostics of the slow linter are added when it finishes
+    slow.event.set()
+    wait_for(lambda: len(published(workspace)) == 3)
+    assert published(workspace)[-1] == [('fast', 'a'), ('saved', 'a'), ('slow', 'a')]
+
+
+def test_lint_cache(workspace, linters):
+    scheduler, config, (fast, slow, saved) = linters
+    doc = Document(DOC_URI, workspace, u'a')
+    scheduler.lint(config, workspace, doc, is_saved=False)
+    wait_for(lambda: len(published(workspace)) == 3)
+
+    # Only the linter that reads the saved file runs again
+    scheduler.lint(config, workspace, doc, is_saved=False)
+    wait_for(lambda: len(published(workspace)) == 4)
+    assert (fast.calls, slow.calls, saved.calls) == (1, 1, 2)
+    scheduler.lint(config, workspace, doc, is_saved=True)
+    wait_for(lambda: len(published(workspace)) == 5)
+    # Now all the results are cached
+    scheduler.lint(config, workspace, doc, is_saved=True)
+    assert (fast.calls, slow.calls, saved.calls) == (1, 1, 3)
+    # Nothing changed, so the diagnostics are published once per run
+    assert len(published(workspace)) == 6
+    assert all(diagnostics == [('fast', 'a'), ('saved', 'a'), ('slow', 'a')]
+               for diagnostics in published(workspace)[2:])
+
+    doc.apply_change({'text': u'b'})
+    scheduler.lint(config, workspace, doc, is_saved=True)
+    wait_for(lambda: published(workspace)[-1:] == [[('fast', 'b'), ('saved', 'b'), ('slow', 'b')]])
+    assert (fast.calls, slow.calls, saved.calls) == (2, 2, 4)
+
+    scheduler.clear_cache()
+    scheduler.lint(config, workspace, doc, is_saved=True)
+    wait_for(lambda: fast.calls == 3)
+
+
+def test_lint_superseded(workspace, linters):
+    scheduler, config, (fast, slow, saved) = linters
+    doc = Document(DOC_URI, workspace, u'a')
+    slow.event.clear()
+    scheduler.lint(config, workspace, doc, is_saved=True)
+    wait_for(lambda: slow.calls == 1)
+
+    doc.apply_change({'text': u'b'})
+    scheduler.lint(config, workspace, doc, is_saved=True)
+    slow.event.set()
+    wait_for(lambda: published(workspace)[-1:] == [[('fast', 'b'), ('saved', 'b'), ('slow', 'b')]])
+    # The results of the first run of the slow linter were never published
+    assert all(('slow', 'a') not in diagnostics for diagnostics in published(workspace))
+
+
+def test_lint_changed_document(workspace, linters):
+    scheduler, config, (fast, slow, saved) = linters
+    doc = Document(DOC_URI, workspace, u'a')
+    slow.event.clear()
+    scheduler.lint(config, workspace, doc, is_saved=True)
+    wait_for(lambda: slow.calls == 1)
+
+    # Linters lint the source the document had when linting started
+    doc.apply_change({'text': u'b'})
+    slow.event.set()
+    wait_for(lambda: published(workspace)[-1:] == [[('fast', 'a'), ('saved', 'a'), ('slow', 'a')]])
+
+    scheduler.lint(config, workspace, doc, is_saved=True)
+    wait_for(lambda: published(workspace)[-1:] == [[('fast', 'b'), ('saved', 'b'), ('slow', 'b')]])
+    assert (fast.calls, slow.calls, saved.calls) == (2, 2, 2)
@@ -8,7 +8,9 @@
 Class that handles communications between Spyder kernel and frontend.
 
 Comms transmit data in a list of buffers, and in a json-able dictionnary.
-Here, we only support a buffer list with a single element.
+Here, the first buffer is the pickled data and the other ones are the
+out-of-band buffers of its objects (e.g. NumPy arrays) when pickle protocol 5
+is used, so that they are sent without copying them.
 
 The messages exchanged have the following msg_dict:
 
@@ -21,6 +23,11 @@
 
 The buffer is generated by cloudpickle using `PICKLE_PROTOCOL = 2`.
 
+Messages with more than `CHUNK_SIZE` bytes of buffers are streamed in several
+messages. Each of them has a 'chunk' entry in its msg_dict with the id of the
+stream, the index of the message, the number of messages and the sizes of
+the buffers, and carries a single part of a buffer.
+
 To simplify the usage of messaging, we use a higher level function calling
 mechanism:
     - The `remote_call` method returns a RemoteCallHandler object
@@ -56,6 +63,7 @@
 import pickle
 import logging
 import sys
+import time
 import uuid
 import traceback
 
@@ -70,6 +78,21 @@
 # Max timeout (in secs) for blocking calls
 TIMEOUT = 3
 
+# Max size (in bytes) of the buffers sent in a single message. Larger data
+# is streamed in several messages.
+CHUNK_SIZE = 64 * 1024**2
+
+# Time (in secs) after which a message stream that stopped receiving parts
+# is dropped
+STREAM_TIMEOUT = 60
+
+# Check if cloudpickle can send buffers out-of-band (pickle protocol 5)
+try:
+    cloudpickle.dumps(None, protocol=5, buffer_callback=[].append)
+    OUT_OF_BAND_BUFFERS = True
+except (TypeError, ValueError):
+    OUT_OF_BAND_BUFFERS = False
+
 
 class CommError(RuntimeError):
     pass
@@ -149,6 +172,8 @@ def __init__(self):
         # Lists of reply numbers
         self._reply_inbox = {}
         self._reply_waitlist = {}
+        # Buffers of the messages being streamed, by stream id
+        self._streams = {}
 
         self._register_message_handler(
             'remote_call', self._handle_remote_call)
@@ -172,6 +197,8 @@ def close(self, comm_id=None):
         for comm_id in id_list:
             self._comms[comm_id]['comm'].close()
             del self._comms[comm_id]
+            self._drop_streams(
+                lambda stream, comm_id=comm_id: stream['comm_id'] == comm_id)
 
     def is_open(self, comm_id=None):
         """Check to see if the comm is open."""
@@ -227,7 +254,8 @@ def _send_message(self, spyder_msg_type, content=None, data=None,
             The (JSONable) content of the message
         data: any
             Any object that is serializable by cloudpickle (should be most
-            things). Will arrive as cloudpickled bytes in `.buffers[0]`.
+            things). Will arrive as cloudpickled bytes in `.buffers[0]`,
+            followed by its out-of-band buffers.
         comm_id: int
             the comm to send to. If None sends to all comms.
         """
@@ -235,15 +263,92 @@ def _send_message(self, spyder_msg_type, content=None, data=None,
             raise CommError("The comm is not connected.")
         id_list = self.get_comm_id_list(comm_id)
         for comm_id in id_list:
+            comm_dict = self._comms[comm_id]
             msg_dict = {
                 'spyder_msg_type': spyder_msg_type,
                 'content': content,
-                'pickle_protocol': self._comms[comm_id]['pickle_protocol'],
+                'pickle_protocol': comm_dict['pickle_protocol'],
                 'python_version': sys.version,
                 }
-            buffers = [cloudpickle.dumps(
-                data, protocol=self._comms[comm_id]['pickle_protocol'])]
-            self._comms[comm_id]['comm'].send(msg_dict, buffers=buffers)
+            streaming = comm_dict['streaming']
+            if (streaming and OUT_OF_BAND_BUFFERS and
+                    comm_dict['pickle_protocol'] >= 5):
+                out_of_band_buffers = []
+                buffers = [cloudpickle.dumps(
+                    data, protocol=comm_dict['pickle_protocol'],
+                    buffer_callback=out_of_band_buffers.append)]
+                buffers += [buf.raw() for buf in out_of_band_buffers]
+            else:
+                buffers = [cloudpickle.dumps(
+                    data, protocol=comm_dict['pickle_protocol'])]
+
+            sizes = [memoryview(buf).nbytes for buf in buffers]
+            if not (streaming and PY3 and sum(sizes) > CHUNK_SIZE):
+                comm_dict['comm'].send(msg_dict, buffers=buffers)
+                continue
+
+            # Stream the buffers in parts of at most CHUNK_SIZE bytes
+            parts = []
+            for buf in buffers:
+                view = memoryview(buf).cast('B')
+                parts += [view[start:start + CHUNK_SIZE]
+                          for start in range(0, len(view), CHUNK_SIZE)]
+            stream_id = uuid.uuid4().hex
+            for index, part in enumerate(parts):
+                chunk = {
+                    'id': stream_id,
+                    'index': index,
+                    'count': len(parts),
+                    'sizes': sizes,
+                    }
+                comm_dict['comm'].send(dict(msg_dict, chunk=chunk),
+                                       buffers=[part])
+
+    def _receive_chunk(self, chunk, part):
+        """
+        Add a part of a streamed message to its buffers.
+
+        Returns the buffers of the message once all its parts were received,
+        or None otherwise.
+        """
+        now = time.time()
+        if chunk['index'] == 0:
+            self._drop_streams(
+                lambda stream: now - stream['time'] > STREAM_TIMEOUT)
+            self._streams[chunk['id']] = {
+                'buffers': [bytearray(size) for size in chunk['sizes']],
+                'index': 0,
+                'offset': 0,
+                'comm_id': self.calling_comm_id,
+                'time': now,
+                }
+        stream = self._streams.get(chunk['id'])
+        if stream is None:
+            logger.debug("Got a part of an unknown message stream")
+            return
+        stream['time'] = now
+
+        # Parts never span several buffers, but empty buffers have no parts
+        buffers = stream['buffers']
+        while stream['offset'] == len(buffers[stream['index']]):
+            stream['index'] += 1
+            stream['offset'] = 0
+        offset = stream['offset']
+        part = memoryview(part).cast('B')
+        buffers[stream['index']][offset:offset + len(part)] = part
+        stream['offset'] += len(part)
+        self.on_incoming_chunk(chunk)
+
+        if chunk['index'] == chunk['count'] - 1:
+            del self._streams[chunk['id']]
+            return buffers
+
+    def _drop_streams(self, condition):
+        """Forget the message streams that satisfy `condition`."""
+        for stream_id, stream in list(self._streams.items()):
+            if condition(stream):
+                logger.debug("Dropping incomplete message stream")
+                del self._streams[stream_id]
 
     def _set_pickle_protocol(self, protocol):
         """Set the pickle protocol used to send data."""
@@ -288,12 +393,14 @@ def _register_comm(self, comm):
             'comm': comm,
             'pickle_protocol': DEFAULT_PICKLE_PROTOCOL,
             'status': 'opening',
+            'streaming': False,
             }
 
     def _comm_close(self, msg):
         """Close comm."""
         comm_id = msg['content']['comm_id']
         del self._comms[comm_id]
+        self._drop_streams(lambda stream: stream['comm_id'] == comm_id)
 
     def _comm_message(self, msg):
         """
@@ -304,17 +411,29 @@ def _comm_message(self, msg):
         # Get message dict
         msg_dict = msg['content']['data']
 
-        # Load the buffer. Only one is supported.
+        # Get the buffers of streamed messages once they are complete
+        buffers = msg['buffers']
+        if 'chunk' in msg_dict:
+            buffers = self._receive_chunk(msg_dict['chunk'], buffers[0])
+            if buffers is None:
+                return
+
+        # Load the buffer, with its out-of-band buffers if any.
         try:
             if PY3:
                 # https://docs.python.org/3/library/pickle.html#pickle.loads
                 # Using encoding='latin1' is required for unpickling
                 # NumPy arrays and instances of datetime, date and time
                 # pickled by Python 2.
-                buffer = cloudpickle.loads(msg['buffers'][0],
-                                           encoding='latin-1')
+                kwargs = {'encoding': 'latin-1'}
+                if len(buffers) > 1:
+                    # Read-only buffers would give read-only arrays
+                    kwargs['buffers'] = [
+                        bytearray(buf) if memoryview(buf).readonly else buf
+                        for buf in buffers[1:]]
+                buffer = cloudpickle.loads(buffers[0], **kwargs)
             else:
-                buffer = cloudpickle.loads(msg['buffers'][0])
+                buffer = cloudpickle.loads(buffers[0])
         except Exception as e:
             logger.debug(
                 "Exception in cloudpickle.loads : %s" % str(e))
@@ -394,12 +513,21 @@ def _register_call(self, call_dict, callback=None):
     def on_outgoing_call(self, call_dict):
         """A message is about to be sent"""
         call_dict["pickle_highest_protocol"] = pickle.HIGHEST_PROTOCOL
+        call_dict["streaming"] = True
         return call_dict
 
     def on_incoming_call(self, call_dict):
         """A call was received"""
         if "pickle_highest_protocol" in call_dict:
             self._set_pickle_protocol(call_dict["pickle_highest_protocol"])
+        if call_dict.get("streaming"):
+            # The other side can receive streamed messages and out-of-band
+            # buffers
+            self._comms[self.calling_comm_id]['streaming'] = True
+
+    def on_incoming_chunk(self, chunk):
+        """A part of a streamed message was received"""
+        pass
 
     def _get_call_return_value(self, call_dict, call_data, comm_id):
         """
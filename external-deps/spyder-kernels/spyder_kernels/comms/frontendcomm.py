@@ -211,7 +211,8 @@ def _comm_close(self, msg):
         comm = self._comms[comm_id]['comm']
         # Pretend it is already closed to avoid problems when closing
         comm._closed = True
-        del self._comms[comm_id]
+        super(FrontendComm, self)._comm_close(msg)
+        self.kernel._forget_namespace_view(comm_id)
 
     def _async_error(self, error_wrapper):
         """
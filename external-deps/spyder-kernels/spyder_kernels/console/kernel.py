@@ -13,8 +13,10 @@
 # Standard library imports
 from distutils.version import LooseVersion
 import os
+import os.path as osp
 import sys
 import threading
+import time
 
 # Third-party imports
 import ipykernel
@@ -80,6 +82,13 @@ def __init__(self, *args, **kwargs):
             'set_value': self.set_value,
             'remove_value': self.remove_value,
             'copy_value': self.copy_value,
+            'open_data_view': self.open_data_view,
+            'get_data_view_block': self.get_data_view_block,
+            'get_data_view_minmax': self.get_data_view_minmax,
+            'sort_data_view': self.sort_data_view,
+            'set_data_view_value': self.set_data_view_value,
+            'commit_data_view': self.commit_data_view,
+            'close_data_view': self.close_data_view,
             'set_cwd': self.set_cwd,
             'get_cwd': self.get_cwd,
             'get_syspath': self.get_syspath,
@@ -89,6 +98,7 @@ def __init__(self, *args, **kwargs):
             'get_namespace_view': self.get_namespace_view,
             'set_namespace_view_settings': self.set_namespace_view_settings,
             'get_var_properties': self.get_var_properties,
+            'get_namespace_view_diff': self.get_namespace_view_diff,
             'set_sympy_forecolor': self.set_sympy_forecolor,
             'update_syspath': self.update_syspath,
             'is_special_kernel_valid': self.is_special_kernel_valid,
@@ -101,6 +111,10 @@ def __init__(self, *args, **kwargs):
                 call_id, handlers[call_id])
 
         self.namespace_view_settings = {}
+        self._namespace_view_snapshots = {}
+        self._save_progress_time = 0
+        self._data_views = {}
+        self._data_view_count = 0
         self._pdb_obj = None
         self._pdb_step = None
         self._do_publish_pdb_state = True
@@ -128,6 +142,7 @@ def frontend_call(self, blocking=False, broadcast=True,
     def set_namespace_view_settings(self, settings):
         """Set namespace_view_settings."""
         self.namespace_view_settings = settings
+        self._namespace_view_snapshots = {}
 
     def get_namespace_view(self):
         """
@@ -168,23 +183,98 @@ def get_var_properties(self):
 
             properties = {}
             for name, value in list(data.items()):
-                properties[name] = {
-                    'is_list':  isinstance(value, (tuple, list)),
-                    'is_dict':  isinstance(value, dict),
-                    'is_set': isinstance(value, set),
-                    'len': self._get_len(value),
-                    'is_array': self._is_array(value),
-                    'is_image': self._is_image(value),
-                    'is_data_frame': self._is_data_frame(value),
-                    'is_series': self._is_series(value),
-                    'array_shape': self._get_array_shape(value),
-                    'array_ndim': self._get_array_ndim(value)
-                }
+                properties[name] = self._get_var_properties(value)
 
             return properties
         else:
             return None
 
+    def get_namespace_view_diff(self, generation=None):
+        """
+        Return the changes in the namespace view and the properties of
+        its variables since the last call made through the same comm.
+
+        This is a dictionary with the following structure
+
+        {'generation': 2,
+         'full': False,
+         'added': {'a': {'view': {...}, 'properties': {...}}},
+         'changed': {'b': {'view': {...}, 'properties': {...}}},
+         'removed': ['c']}
+
+        Here:
+        * 'view' and 'properties' are the values that get_namespace_view
+          and get_var_properties return for each variable.
+        * 'generation' has to be passed to the next call to get the changes
+          since this one.
+        * 'full' is True if `generation` is not the one returned by the last
+          call. In that case 'added' contains all variables.
+
+        The entries of immutable variables whose view key (see
+        `spyder_kernels.utils.nsview.get_view_key`) didn't change are not
+        computed again. The views of mutable variables are always computed,
+        because they can change in place, but not their properties if their
+        key didn't change.
+        """
+        from spyder_kernels.utils.nsview import (
+            get_remote_data, get_view_key, is_immutable, is_same_view_key,
+            make_remote_view_entry)
+
+        settings = self.namespace_view_settings
+        if not settings:
+            return None
+
+        comm_id = self.frontend_comm.calling_comm_id
+        snapshot = self._namespace_view_snapshots.get(comm_id)
+        full = snapshot is None or snapshot['generation'] != generation
+        old_entries = {} if full else snapshot['entries']
+
+        ns = self._get_current_namespace()
+        data = get_remote_data(ns, settings, mode='editable',
+                               more_excluded_names=EXCLUDED_NAMES)
+
+        # Entries are (view key, view) tuples. Keys don't keep the values
+        # alive.
+        entries = {}
+        added = {}
+        changed = {}
+        for name, value in list(data.items()):
+            old_entry = old_entries.get(name)
+            if (old_entry is not None
+                    and is_same_view_key(old_entry[0], value)):
+                if is_immutable(value):
+                    entries[name] = old_entry
+                    continue
+                properties = old_entry[1]['properties']
+            else:
+                properties = self._get_var_properties(value)
+
+            view = {
+                'view': make_remote_view_entry(value, settings),
+                'properties': properties
+            }
+            entries[name] = (get_view_key(value), view)
+            if old_entry is None:
+                added[name] = view
+            elif old_entry[1] != view:
+                changed[name] = view
+
+        removed = [name for name in old_entries if name not in entries]
+
+        generation = 1 if snapshot is None else snapshot['generation'] + 1
+        self._namespace_view_snapshots[comm_id] = {
+            'generation': generation,
+            'entries': entries
+        }
+
+        return {
+            'generation': generation,
+            'full': full,
+            'added': added,
+            'changed': changed,
+            'removed': removed
+        }
+
     def get_value(self, name):
         """Get the value of a variable"""
         ns = self._get_current_namespace()
@@ -207,6 +297,55 @@ def copy_value(self, orig_name, new_name):
         ns = self._get_reference_namespace(orig_name)
         ns[new_name] = ns[orig_name]
 
+    def open_data_view(self, name):
+        """
+        Open a view of a variable to show it in an editor.
+
+        Return the id of the view and the information needed to show the
+        variable, or None if it's not supported or small enough to be
+        sent whole.
+        """
+        from spyder_kernels.utils.dataview import (DataView,
+                                                   is_data_view_supported)
+
+        ns = self._get_current_namespace()
+        value = ns[name]
+        if not is_data_view_supported(value):
+            return None
+
+        self._data_view_count += 1
+        view_id = self._data_view_count
+        view = DataView(value)
+        self._data_views[view_id] = (name, view)
+        info = view.get_info()
+        info['id'] = view_id
+        return info
+
+    def get_data_view_block(self, view_id, rows, columns):
+        """Get a window of rows and columns of a data view."""
+        return self._data_views[view_id][1].get_block(rows, columns)
+
+    def get_data_view_minmax(self, view_id, columns):
+        """Get the max and min of columns of a data view."""
+        return self._data_views[view_id][1].get_minmax(columns)
+
+    def sort_data_view(self, view_id, column, ascending):
+        """Sort a data view by column."""
+        return self._data_views[view_id][1].sort(column, ascending)
+
+    def set_data_view_value(self, view_id, row, column, value):
+        """Change a value of a data view."""
+        self._data_views[view_id][1].set_value(row, column, value)
+
+    def commit_data_view(self, view_id):
+        """Set the variable of a data view to its edited value."""
+        name, view = self._data_views[view_id]
+        self.set_value(name, view.get_value())
+
+    def close_data_view(self, view_id):
+        """Close a data view."""
+        self._data_views.pop(view_id, None)
+
     def load_data(self, filename, ext, overwrite=False):
         """
         Load data from filename.
@@ -248,13 +387,29 @@ def load_data(self, filename, ext, overwrite=False):
     def save_namespace(self, filename):
         """Save namespace into filename"""
         from spyder_kernels.utils.nsview import get_remote_data
-        from spyder_kernels.utils.iofuncs import iofunctions
+        from spyder_kernels.utils.iofuncs import iofunctions, save_dictionary
 
         ns = self._get_current_namespace()
         settings = self.namespace_view_settings
         data = get_remote_data(ns, settings, mode='picklable',
                                more_excluded_names=EXCLUDED_NAMES).copy()
-        return iofunctions.save(data, filename)
+        if osp.splitext(filename)[1].lower() != '.spydata':
+            return iofunctions.save(data, filename)
+
+        # Variables can change while they are saved, because this runs in the
+        # comm thread, so take a snapshot of the mutable ones first
+        self._save_progress_time = 0
+        return save_dictionary(data, filename, snapshot=True,
+                               progress_callback=self._send_save_progress)
+
+    def _send_save_progress(self, saved, total):
+        """Report the progress of save_namespace to the frontend."""
+        now = time.time()
+        if saved < total and now - self._save_progress_time < 0.2:
+            return
+        self._save_progress_time = now
+        self.frontend_call(blocking=False, broadcast=False).set_save_progress(
+            saved, total)
 
     # --- For Pdb
     def is_debugging(self):
@@ -576,6 +731,10 @@ def _get_current_namespace(self, with_magics=False):
 
         return ns
 
+    def _forget_namespace_view(self, comm_id):
+        """Forget the namespace view snapshot of a closed comm."""
+        self._namespace_view_snapshots.pop(comm_id, None)
+
     def _get_reference_namespace(self, name):
         """
         Return namespace where reference name is defined
@@ -599,6 +758,21 @@ def _mglobals(self):
         else:
             return self.shell.user_ns
 
+    def _get_var_properties(self, value):
+        """Return the properties of a variable"""
+        return {
+            'is_list':  isinstance(value, (tuple, list)),
+            'is_dict':  isinstance(value, dict),
+            'is_set': isinstance(value, set),
+            'len': self._get_len(value),
+            'is_array': self._is_array(value),
+            'is_image': self._is_image(value),
+            'is_data_frame': self._is_data_frame(value),
+            'is_series': self._is_series(value),
+            'array_shape': self._get_array_shape(value),
+            'array_ndim': self._get_array_ndim(value)
+        }
+
     def _get_len(self, var):
         """Return sequence length"""
         try:
@@ -212,6 +212,54 @@ def test_get_var_properties(kernel):
     assert "'array_ndim': None" in var_properties
 
 
+def test_get_namespace_view_diff(kernel):
+    """
+    Test the changes in the namespace view sent to the frontend.
+    """
+    kernel.do_execute('a = 1; b = [1]; c = "c"', True)
+    diff = kernel.get_namespace_view_diff()
+    assert diff['full']
+    assert sorted(diff['added']) == ['a', 'b', 'c']
+    assert diff['added']['a']['view']['view'] == '1'
+    assert diff['added']['b']['properties']['is_list']
+
+    # Only the changed variables are sent
+    kernel.do_execute('a = 2; b.append(2); del c; d = 3', True)
+    diff = kernel.get_namespace_view_diff(diff['generation'])
+    assert not diff['full']
+    assert list(diff['added']) == ['d']
+    assert sorted(diff['changed']) == ['a', 'b']
+    assert diff['changed']['b']['properties']['len'] == 2
+    assert diff['removed'] == ['c']
+
+    diff = kernel.get_namespace_view_diff(diff['generation'])
+    assert not (diff['added'] or diff['changed'] or diff['removed'])
+
+    # An outdated generation gives the full view
+    diff = kernel.get_namespace_view_diff(diff['generation'] - 1)
+    assert diff['full']
+    assert sorted(diff['added']) == ['a', 'b', 'd']
+
+    # Arrays changed in place are sent again
+    kernel.do_execute('import numpy as np; e = np.arange(5)', True)
+    diff = kernel.get_namespace_view_diff(diff['generation'])
+    assert list(diff['added']) == ['e']
+    kernel.do_execute('e += 100; b.append(3)', True)
+    diff = kernel.get_namespace_view_diff(diff['generation'])
+    assert sorted(diff['changed']) == ['b', 'e']
+    assert '100' in diff['changed']['e']['view']['view']
+    diff = kernel.get_namespace_view_diff(diff['generation'])
+    assert not diff['changed']
+    kernel.do_execute('e = np.zeros(4)', True)
+    diff = kernel.get_namespace_view_diff(diff['generation'])
+    assert list(diff['changed']) == ['e']
+    assert diff['changed']['e']['properties']['array_shape'] == (4,)
+
+    # Snapshots are forgotten when their comm is closed
+    kernel._forget_namespace_view(kernel.frontend_comm.calling_comm_id)
+    assert not kernel._namespace_view_snapshots
+
+
 def test_get_value(kernel):
     """Test getting the value of a variable."""
     name = 'a'
@@ -288,6 +336,31 @@ def test_copy_value(kernel):
     assert "'array_ndim': None" in var_properties
 
 
+def test_data_view(kernel, monkeypatch):
+    """Test editing a variable through a data view."""
+    from spyder_kernels.utils import dataview
+    kernel.do_execute('import numpy as np; a = np.arange(4.); b = [1]', True)
+
+    # Small variables are sent whole
+    assert kernel.open_data_view('a') is None
+
+    monkeypatch.setattr(dataview, 'DATA_VIEW_MIN_SIZE', 1)
+    assert kernel.open_data_view('b') is None
+    info = kernel.open_data_view('a')
+    view_id = info['id']
+    assert info['shape'] == (4, 1)
+
+    assert kernel.get_data_view_block(view_id, (1, 3), (0, 1)).tolist() == [
+        [1.], [2.]]
+    kernel.set_data_view_value(view_id, 3, 0, 10.)
+    assert kernel.get_value('a')[3] == 3.
+    kernel.commit_data_view(view_id)
+    assert kernel.get_value('a').tolist() == [0., 1., 2., 10.]
+
+    kernel.close_data_view(view_id)
+    assert not kernel._data_views
+
+
 @pytest.mark.parametrize(
     "load", [(True, "val1 = 0", {"val1": np.array(1)}),
              (False, "val1 = 0", {"val1": 0, "val1_000": np.array(1)})])
@@ -0,0 +1,299 @@
+# -*- coding: utf-8 -*-
+# -----------------------------------------------------------------------------
+# Copyright (c) 2009- Spyder Kernels Contributors
+#
+# Licensed under the terms of the MIT License
+# (see spyder_kernels/__init__.py for details)
+# -----------------------------------------------------------------------------
+
+"""
+Data views
+
+Views of DataFrames, Series and arrays kept in the kernel, which serve the
+parts of them shown by the Variable Explorer editors. This way, the editors
+don't need a copy of the whole object.
+"""
+
+# Objects with fewer elements than this are sent whole to the editors
+DATA_VIEW_MIN_SIZE = 5 * 10**5
+
+# Numeric types whose min and max are used to color DataFrame cells.
+# These are the same used by the DataFrameEditor.
+try:
+    import numpy as np
+    REAL_NUMBER_TYPES = (float, int, np.int64, np.int32)
+    COMPLEX_NUMBER_TYPES = (complex, np.complex64, np.complex128)
+except ImportError:
+    np = None
+
+
+def get_data_view_kind(value):
+    """
+    Return the kind of view to use for value ('dataframe', 'series' or
+    'array'), or None if value is not supported.
+    """
+    if np is None:
+        return None
+    try:
+        from pandas import DataFrame, Series
+        if isinstance(value, DataFrame):
+            return 'dataframe'
+        elif isinstance(value, Series):
+            return 'series'
+    except Exception:
+        pass
+    # Masked arrays, matrices and record arrays need special handling by
+    # the ArrayEditor, so they are not supported
+    if (type(value) in (np.ndarray, np.memmap) and value.ndim in (1, 2)
+            and value.dtype.names is None):
+        return 'array'
+    return None
+
+
+def is_data_view_supported(value):
+    """Return True if value is large enough to be shown with a DataView."""
+    if get_data_view_kind(value) is None:
+        return False
+    try:
+        return value.size >= DATA_VIEW_MIN_SIZE
+    except Exception:
+        return False
+
+
+class DataView(object):
+    """
+    View of a DataFrame, Series or array.
+
+    Serves windows of its value in the current sort order, and the min and
+    max of its columns. Changes are saved in the view until get_value is
+    called, so the value is not modified while it is being edited.
+
+    Rows are positional, so that sorting doesn't depend on the index, and
+    changes are saved by the position of their row in the value.
+    """
+
+    def __init__(self, value):
+        self.value = value
+        self.kind = get_data_view_kind(value)
+        self.order = None
+        self.changes = {}
+        self._rank = None
+        self._minmax = {}
+
+    @property
+    def shape(self):
+        """Shape of the view, which is always two dimensional."""
+        if self.kind == 'series' or self.value.ndim == 1:
+            return (self.value.shape[0], 1)
+        return self.value.shape
+
+    def get_info(self):
+        """Return what editors need to know about the value to show it."""
+        info = {
+            'kind': self.kind,
+            'type': type(self.value).__name__,
+            'shape': self.shape,
+        }
+        if self.kind == 'array':
+            info.update(self._get_array_info())
+        else:
+            axes = [self._get_frame(slice(0, 0)).columns, self.value.index]
+            info['header_shape'] = tuple(
+                len(ax.levels) if hasattr(ax, 'levels') else 1
+                for ax in axes)
+            info['names'] = [
+                list(ax.names) if hasattr(ax, 'levels') else [ax.name]
+                for ax in axes]
+        return info
+
+    def _get_array_info(self):
+        """Return the information needed to show an array."""
+        value = self.value
+        info = {'dtype': value.dtype, 'writeable': value.flags.writeable}
+
+        # For complex numbers, shading will be based on absolute value
+        # but for all other types it will be the real part.
+        # This is computed here to not send the array to the frontend.
+        if value.dtype in (np.complex64, np.complex128):
+            color_func = np.abs
+        else:
+            color_func = np.real
+        try:
+            vmin = np.nanmin(color_func(value))
+            vmax = np.nanmax(color_func(value))
+            if vmax == vmin:
+                vmin -= 1
+            info['minmax'] = (vmin, vmax)
+        except (AttributeError, TypeError, ValueError):
+            info['minmax'] = None
+        info['has_inf'] = False
+        if value.dtype.kind in ['f', 'c']:
+            info['has_inf'] = bool(np.any(np.isinf(value)))
+        return info
+
+    def _get_rows(self, start, stop):
+        """Return the positions in value of rows start to stop."""
+        if self.order is None:
+            return slice(start, stop)
+        return self.order[start:stop]
+
+    def _get_frame(self, rows, columns=slice(None)):
+        """Return rows and columns of the value as a DataFrame."""
+        if self.kind == 'series':
+            return self.value.iloc[rows].to_frame().iloc[:, columns]
+        return self.value.iloc[rows, columns]
+
+    def _get_row_position(self, row):
+        """Return the position in the view of the row at position row."""
+        if self.order is None:
+            return row
+        if self._rank is None:
+            self._rank = np.empty_like(self.order)
+            self._rank[self.order] = np.arange(len(self.order))
+        return self._rank[row]
+
+    def get_block(self, rows, columns):
+        """
+        Return the window of rows (start, stop) and columns (start, stop).
+
+        The window of DataFrames and Series is a DataFrame with the labels
+        of its rows and columns, and that of arrays a two dimensional array.
+        """
+        row_start, row_stop = rows
+        column_start, column_stop = columns
+        positions = self._get_rows(row_start, row_stop)
+        if self.kind == 'array':
+            block = self.value[positions]
+            if block.ndim == 1:
+                block = block.reshape(-1, 1)
+            block = np.array(block[:, column_start:column_stop])
+        else:
+            block = self._get_frame(positions,
+                                    slice(column_start, column_stop))
+
+        # Apply the changes inside the window
+        changed = False
+        for (row, column), value in self.changes.items():
+            row = self._get_row_position(row)
+            if (row_start <= row < row_stop
+                    and column_start <= column < column_stop):
+                if not changed and self.kind != 'array':
+                    # Windows of DataFrames can be views of their data
+                    block = block.copy()
+                changed = True
+                if self.kind == 'array':
+                    block[row - row_start, column - column_start] = value
+                else:
+                    block.iloc[row - row_start,
+                               column - column_start] = value
+        return block
+
+    def _get_column(self, column):
+        """Return a column of the value, with its changes, as a Series."""
+        if self.kind == 'series':
+            values = self.value
+        else:
+            values = self.value.iloc[:, column]
+        changes = [(row, value) for (row, col), value in self.changes.items()
+                   if col == column]
+        if changes:
+            values = values.copy()
+            for row, value in changes:
+                values.iloc[row] = value
+        return values
+
+    def sort(self, column, ascending=True):
+        """
+        Sort the rows by column, or by the index if column is -1.
+
+        The sort is stable, so sorting by several columns one after the
+        other works as expected. Return an error message if the rows can't
+        be sorted, and None otherwise.
+        """
+        from pandas import Series
+        try:
+            if column >= 0:
+                key = self._get_column(column)
+                if self.order is not None:
+                    key = key.iloc[self.order]
+                key = key.reset_index(drop=True)
+                positions = key.sort_values(ascending=ascending,
+                                            kind='mergesort').index.values
+            else:
+                index = self.value.index
+                if self.order is not None:
+                    index = index[self.order]
+                positions = Series(np.arange(len(index)), index=index)
+                positions = positions.sort_index(ascending=ascending,
+                                                 kind='mergesort').values
+        except (TypeError, ValueError, SystemError) as error:
+            return "%s: %s" % (type(error).__name__, error)
+
+        if self.order is None:
+            self.order = positions
+        else:
+            self.order = self.order[positions]
+        self._rank = None
+        return None
+
+    def get_minmax(self, columns):
+        """
+        Return the max and min of the values of a list of columns.
+
+        For each column, the result is [vmax, vmin], ignoring NaNs, or None
+        if it is not numeric. For complex numbers, the max and min of their
+        absolute values are used. If vmax equals vmin, vmin is decreased by
+        one.
+        """
+        result = []
+        for column in columns:
+            if column not in self._minmax:
+                self._minmax[column] = self._compute_minmax(column)
+            result.append(self._minmax[column])
+        return result
+
+    def _compute_minmax(self, column):
+        """Compute the max and min of a column."""
+        values = self._get_column(column)
+        if values.dtype in REAL_NUMBER_TYPES:
+            vmax = values.max(skipna=True)
+            vmin = values.min(skipna=True)
+        elif values.dtype in COMPLEX_NUMBER_TYPES:
+            vmax = values.abs().max(skipna=True)
+            vmin = values.abs().min(skipna=True)
+        else:
+            return None
+        if vmax != vmin:
+            return [vmax, vmin]
+        return [vmax, vmin - 1]
+
+    def set_value(self, row, column, value):
+        """Change the value in row and column of the view."""
+        if self.order is not None:
+            row = self.order[row]
+        self.changes[(int(row), column)] = value
+        self._minmax.pop(column, None)
+
+    def get_value(self):
+        """Return a new value with the changes and order of the view."""
+        value = self.value
+        if self.order is not None:
+            if self.kind == 'array':
+                value = value[self.order]
+            else:
+                value = value.iloc[self.order]
+        elif self.changes:
+            value = value.copy()
+
+        for (row, column), new_value in self.changes.items():
+            row = self._get_row_position(row)
+            if self.kind == 'array':
+                if value.ndim == 1:
+                    value[row] = new_value
+                else:
+                    value[row, column] = new_value
+            elif self.kind == 'series':
+                value.iloc[row] = new_value
+            else:
+                value.iloc[row, column] = new_value
+        return value
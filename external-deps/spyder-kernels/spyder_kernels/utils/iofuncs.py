@@ -27,8 +27,17 @@
 import json
 import inspect
 import dis
-import copy
 import glob
+import io
+import uuid
+import copy
+from collections import deque
+
+try:
+    from concurrent.futures import ThreadPoolExecutor
+except ImportError:
+    # Python 2
+    ThreadPoolExecutor = None
 
 # Third party imports
 # - If pandas fails to import here (for any reason), Spyder
@@ -40,8 +49,14 @@
 except:
     pd = None            #analysis:ignore
 
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
 # Local imports
 from spyder_kernels.py3compat import getcwd, pickle, PY2, to_text_string
+from spyder_kernels.utils.nsview import is_immutable
 
 
 class MatlabStruct(dict):
@@ -110,8 +125,6 @@ def get_matlab_value(val):
     From the oct2py project, see
     https://pythonhosted.org/oct2py/conversions.html
     """
-    import numpy as np
-
     # Extract each item of a list.
     if isinstance(val, list):
         return [get_matlab_value(v) for v in val]
@@ -156,8 +169,8 @@ def get_matlab_value(val):
     return val
 
 
-try:
-    import numpy as np
+spio = None
+if np is not None:
     try:
         with warnings.catch_warnings():
             warnings.simplefilter("ignore")
@@ -168,33 +181,28 @@ def get_matlab_value(val):
     except:
         spio = None
 
-    if spio is None:
-        load_matlab = None
-        save_matlab = None
-    else:
-        def load_matlab(filename):
-            try:
-                out = spio.loadmat(filename, struct_as_record=True)
-                data = dict()
-                for (key, value) in out.items():
-                    data[key] = get_matlab_value(value)
-                return data, None
-            except Exception as error:
-                return None, str(error)
-
-        def save_matlab(data, filename):
-            try:
-                spio.savemat(filename, data, oned_as='row')
-            except Exception as error:
-                return str(error)
-except:
+if spio is None:
     load_matlab = None
     save_matlab = None
+else:
+    def load_matlab(filename):
+        try:
+            out = spio.loadmat(filename, struct_as_record=True)
+            data = dict()
+            for (key, value) in out.items():
+                data[key] = get_matlab_value(value)
+            return data, None
+        except Exception as error:
+            return None, str(error)
 
+    def save_matlab(data, filename):
+        try:
+            spio.savemat(filename, data, oned_as='row')
+        except Exception as error:
+            return str(error)
 
-try:
-    import numpy as np  # analysis:ignore
 
+if np is not None:
     def load_array(filename):
         try:
             name = osp.splitext(osp.basename(filename))[0]
@@ -207,13 +215,7 @@ def load_array(filename):
                 return {name: data}, None
         except Exception as error:
             return None, str(error)
-
-    def __save_array(data, basename, index):
-        """Save numpy array"""
-        fname = basename + '_%04d.npy' % index
-        np.save(fname, data)
-        return fname
-except:
+else:
     load_array = None
 
 
@@ -286,100 +288,235 @@ def load_json(filename):
         return None, str(err)
 
 
-def save_dictionary(data, filename):
-    """Save dictionary in a single file .spydata file"""
+# Version of the .spydata format written by save_dictionary
+SPYDATA_VERSION = 2
+
+# Name of the manifest of version 2 .spydata files
+SPYDATA_MANIFEST = 'spydata.json'
+
+# Pickle protocol used in version 2 .spydata files. Protocol 5 allows to save
+# the buffers of objects like NumPy arrays out-of-band.
+if sys.version_info >= (3, 8):
+    SPYDATA_PICKLE_PROTOCOL = 5
+else:
+    SPYDATA_PICKLE_PROTOCOL = 2
+
+# Whether load_dictionary maps arrays and buffers in memory by default.
+# Windows doesn't allow to replace a file that is mapped in memory, so
+# variables loaded that way couldn't be saved back to the same file there.
+SPYDATA_MMAP = os.name != 'nt'
+
+# Number of threads used by save_dictionary to serialize variables
+if ThreadPoolExecutor is not None:
+    SPYDATA_SAVE_WORKERS = min(4, os.cpu_count() or 1)
+else:
+    SPYDATA_SAVE_WORKERS = 1
+
+
+class BuffersReader(object):
+    """File-like object to read a list of buffers without copying them."""
+
+    def __init__(self, buffers):
+        self._views = [memoryview(buf) for buf in buffers]
+        self._index = 0
+        self._pos = 0
+
+    def read(self, size):
+        """Read up to size bytes."""
+        parts = []
+        while size > 0 and self._index < len(self._views):
+            view = self._views[self._index]
+            part = view[self._pos:self._pos + size]
+            parts.append(part)
+            size -= len(part)
+            self._pos += len(part)
+            if self._pos == len(view):
+                self._index += 1
+                self._pos = 0
+        if len(parts) == 1:
+            return parts[0]
+        return b''.join(parts)
+
+
+def __add_tar_member(tar, name, buffers):
+    """Add a member with the contents of buffers to tar"""
+    info = tarfile.TarInfo(name)
+    info.size = sum(memoryview(buf).nbytes for buf in buffers)
+    tar.addfile(info, BuffersReader(buffers))
+
+
+def __dump_variable(value, basename):
+    """
+    Serialize value for a version 2 .spydata file.
+
+    Return its entry in the manifest and a list of (member name, buffers)
+    pairs to add to the file.
+    """
+    if (load_array is not None and type(value) in (np.ndarray, np.memmap)
+            and not value.dtype.hasobject):
+        # Save arrays as .npy files
+        if not (value.flags.c_contiguous or value.flags.f_contiguous):
+            value = np.ascontiguousarray(value)
+        header = io.BytesIO()
+        header_data = np.lib.format.header_data_from_array_1_0(value)
+        try:
+            np.lib.format.write_array_header_1_0(header, header_data)
+        except ValueError:
+            header = io.BytesIO()
+            np.lib.format.write_array_header_2_0(header, header_data)
+        raw = value.reshape(-1, order='A').view(np.uint8)
+        member = basename + '.npy'
+        return {'array': member}, [(member, [header.getvalue(), raw])]
+
+    if SPYDATA_PICKLE_PROTOCOL >= 5:
+        pickle_buffers = []
+        pickled = pickle.dumps(value, protocol=SPYDATA_PICKLE_PROTOCOL,
+                               buffer_callback=pickle_buffers.append)
+        raws = [buf.raw() for buf in pickle_buffers]
+    else:
+        pickled = pickle.dumps(value, protocol=SPYDATA_PICKLE_PROTOCOL)
+        raws = []
+    member = basename + '.pickle'
+    buffer_members = ['%s_%d.buffer' % (basename, i) for i in range(len(raws))]
+    members = [(member, [pickled])]
+    members += [(name, [raw]) for name, raw in zip(buffer_members, raws)]
+    return {'pickle': member, 'buffers': buffer_members}, members
+
+
+def __snapshot_value(value):
+    """
+    Return a deep copy of value, unless it is immutable or an array.
+
+    Arrays are not copied and pandas objects are copied without their data,
+    to not double the memory needed to save them.
+    Values that can't be copied are returned as they are.
+    """
+    if is_immutable(value):
+        return value
+    if load_array is not None and isinstance(value, np.ndarray):
+        return value
+    if pd is not None and isinstance(value, (pd.DataFrame, pd.Series)):
+        return value.copy(deep=False)
+    try:
+        return copy.deepcopy(value)
+    except Exception:
+        return value
+
+
+def __dump_variables(items, max_workers):
+    """
+    Serialize the values of a list of (name, value, basename) items.
+
+    Yield (name, entry, members) in the order of items, with entry set to
+    None if the value can't be serialized. Values are serialized by a pool
+    of max_workers threads, at most 2 * max_workers ahead of the one being
+    yielded so that the memory used by pending pickles is bounded.
+    """
+    def dump(item):
+        name, value, basename = item
+        try:
+            entry, members = __dump_variable(value, basename)
+        except Exception:
+            return name, None, []
+        return name, entry, members
+
+    if ThreadPoolExecutor is None or max_workers <= 1:
+        for item in items:
+            yield dump(item)
+        return
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        pending = deque()
+        for item in items:
+            pending.append(executor.submit(dump, item))
+            if len(pending) > 2 * max_workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def save_dictionary(data, filename, progress_callback=None, snapshot=False,
+                    max_workers=None):
+    """
+    Save dictionary in a single file .spydata file
+
+    .spydata files are uncompressed tarballs. Each variable is saved in its
+    own members, so it can be loaded without reading the others:
+        * NumPy arrays are saved as .npy files.
+        * Other variables are pickled, and the out-of-band buffers of their
+          pickles (e.g. the data of NumPy arrays or pandas DataFrames) are
+          saved in .buffer files.
+    The manifest, spydata.json, maps each variable name to its members.
+
+    Member data is aligned in tarballs, so arrays and buffers can be mapped
+    in memory when loading them instead of being read (see load_dictionary).
+
+    Variables are serialized concurrently by max_workers threads (by default
+    SPYDATA_SAVE_WORKERS) and written to the file as soon as they are ready.
+    If snapshot is True, mutable values other than arrays are copied first,
+    so that changes made to them while saving are not saved. The data of
+    DataFrames and Series is not copied, only their structure.
+    progress_callback(saved, total) is called after each variable is saved.
+    """
+    if max_workers is None:
+        max_workers = SPYDATA_SAVE_WORKERS
     filename = osp.abspath(filename)
-    old_cwd = getcwd()
-    os.chdir(osp.dirname(filename))
     error_message = None
     skipped_keys = []
-    data_copy = {}
+    manifest = {'version': SPYDATA_VERSION, 'variables': {}}
 
-    try:
-        # Copy dictionary before modifying it to fix #6689
-        for obj_name, obj_value in data.items():
-            # Skip modules, since they can't be pickled, users virtually never
-            # would want them to be and so they don't show up in the skip list.
-            # Skip callables, since they are only pickled by reference and thus
-            # must already be present in the user's environment anyway.
-            if not (callable(obj_value) or isinstance(obj_value,
-                                                      types.ModuleType)):
-                # If an object cannot be deepcopied, then it cannot be pickled.
-                # Ergo, we skip it and list it later.
-                try:
-                    data_copy[obj_name] = copy.deepcopy(obj_value)
-                except Exception:
-                    skipped_keys.append(obj_name)
-        data = data_copy
-        if not data:
-            raise RuntimeError('No supported objects to save')
-
-        saved_arrays = {}
-        if load_array is not None:
-            # Saving numpy arrays with np.save
-            arr_fname = osp.splitext(filename)[0]
-            for name in list(data.keys()):
-                try:
-                    if isinstance(data[name],
-                                  np.ndarray) and data[name].size > 0:
-                        # Save arrays at data root
-                        fname = __save_array(data[name], arr_fname,
-                                             len(saved_arrays))
-                        saved_arrays[(name, None)] = osp.basename(fname)
-                        data.pop(name)
-                    elif isinstance(data[name], (list, dict)):
-                        # Save arrays nested in lists or dictionaries
-                        if isinstance(data[name], list):
-                            iterator = enumerate(data[name])
-                        else:
-                            iterator = iter(list(data[name].items()))
-                        to_remove = []
-                        for index, value in iterator:
-                            if isinstance(value,
-                                          np.ndarray) and value.size > 0:
-                                fname = __save_array(value, arr_fname,
-                                                     len(saved_arrays))
-                                saved_arrays[(name, index)] = (
-                                    osp.basename(fname))
-                                to_remove.append(index)
-                        for index in sorted(to_remove, reverse=True):
-                            data[name].pop(index)
-                except (RuntimeError, pickle.PicklingError, TypeError,
-                        AttributeError, IndexError):
-                    # If an array can't be saved with numpy for some reason,
-                    # leave the object intact and try to save it normally.
-                    pass
-            if saved_arrays:
-                data['__saved_arrays__'] = saved_arrays
-
-        pickle_filename = osp.splitext(filename)[0] + '.pickle'
-        # Attempt to pickle everything.
-        # If pickling fails, iterate through to eliminate problem objs & retry.
-        with open(pickle_filename, 'w+b') as fdesc:
-            try:
-                pickle.dump(data, fdesc, protocol=2)
-            except (pickle.PicklingError, AttributeError, TypeError,
-                    ImportError, IndexError, RuntimeError):
-                data_filtered = {}
-                for obj_name, obj_value in data.items():
-                    try:
-                        pickle.dumps(obj_value, protocol=2)
-                    except Exception:
-                        skipped_keys.append(obj_name)
-                    else:
-                        data_filtered[obj_name] = obj_value
-                if not data_filtered:
-                    raise RuntimeError('No supported objects to save')
-                pickle.dump(data_filtered, fdesc, protocol=2)
+    # Write to a temporary file so that the previous file, which may be
+    # mapped in memory, is left untouched until the new one is complete
+    tmp_filename = osp.join(
+        osp.dirname(filename),
+        '.{}.{}.tmp'.format(osp.basename(filename), uuid.uuid4().hex[:8]))
 
+    try:
         # Use PAX (POSIX.1-2001) format instead of default GNU.
         # This improves interoperability and UTF-8/long variable name support.
-        with tarfile.open(filename, "w", format=tarfile.PAX_FORMAT) as tar:
-            for fname in ([pickle_filename]
-                          + [fn for fn in list(saved_arrays.values())]):
-                tar.add(osp.basename(fname))
-                os.remove(fname)
-    except (RuntimeError, pickle.PicklingError, TypeError) as error:
+        with tarfile.open(tmp_filename, "w",
+                          format=tarfile.PAX_FORMAT) as tar:
+            tar.copybufsize = 1024**2
+            items = []
+            for index, (obj_name, obj_value) in enumerate(data.items()):
+                # Skip modules, since they can't be pickled, users virtually
+                # never would want them to be and so they don't show up in
+                # the skip list.
+                # Skip callables, since they are only pickled by reference
+                # and thus must already be present in the user's environment
+                # anyway.
+                if (callable(obj_value) or
+                        isinstance(obj_value, types.ModuleType)):
+                    continue
+                if snapshot:
+                    obj_value = __snapshot_value(obj_value)
+                items.append((obj_name, obj_value, 'var_%04d' % index))
+
+            dumped = __dump_variables(items, max_workers)
+            for saved, (obj_name, entry, members) in enumerate(dumped, 1):
+                # If an object cannot be pickled, we skip it and list it
+                # later.
+                if entry is None:
+                    skipped_keys.append(obj_name)
+                else:
+                    for member_name, buffers in members:
+                        __add_tar_member(tar, member_name, buffers)
+                    manifest['variables'][obj_name] = entry
+                if progress_callback is not None:
+                    progress_callback(saved, len(items))
+
+            if not manifest['variables']:
+                raise RuntimeError('No supported objects to save')
+            __add_tar_member(tar, SPYDATA_MANIFEST,
+                             [json.dumps(manifest).encode('utf-8')])
+
+        if PY2:
+            if os.name == 'nt' and osp.isfile(filename):
+                os.remove(filename)
+            os.rename(tmp_filename, filename)
+        else:
+            os.replace(tmp_filename, filename)
+    except (RuntimeError, pickle.PicklingError, TypeError, OSError) as error:
         error_message = to_text_string(error)
     else:
         if skipped_keys:
@@ -387,12 +524,110 @@ def save_dictionary(data, filename):
             error_message = ('Some objects could not be saved: '
                              + ', '.join(skipped_keys))
     finally:
-        os.chdir(old_cwd)
+        if osp.isfile(tmp_filename):
+            os.remove(tmp_filename)
     return error_message
 
 
-def load_dictionary(filename):
-    """Load dictionary from .spydata file"""
+def __map_tar_member(filename, member, mmap):
+    """
+    Map the data of a tar member in memory, or read it if mmap is False.
+
+    Pages are copied on write, so the file is never modified.
+    """
+    if load_array is None or member.size == 0 or not mmap:
+        with open(filename, 'rb') as fdesc:
+            fdesc.seek(member.offset_data)
+            return bytearray(fdesc.read(member.size))
+    return np.memmap(filename, dtype=np.uint8, mode='c',
+                     offset=member.offset_data, shape=(member.size,))
+
+
+def __load_npy_member(filename, member, mmap):
+    """
+    Map an array saved as a .npy tar member in memory, or read it if mmap
+    is False.
+    """
+    with open(filename, 'rb') as fdesc:
+        fdesc.seek(member.offset_data)
+        version = np.lib.format.read_magic(fdesc)
+        if version == (1, 0):
+            header = np.lib.format.read_array_header_1_0(fdesc)
+        else:
+            header = np.lib.format.read_array_header_2_0(fdesc)
+        offset = fdesc.tell()
+        shape, fortran_order, dtype = header
+        order = 'F' if fortran_order else 'C'
+        if dtype.itemsize == 0 or 0 in shape:
+            return np.empty(shape, dtype=dtype, order=order)
+        if not mmap:
+            count = int(np.prod(shape))
+            array = np.fromfile(fdesc, dtype=dtype, count=count)
+            return array.reshape(shape, order=order)
+    array = np.memmap(filename, dtype=dtype, mode='c', offset=offset,
+                      shape=shape, order=order)
+    return array.view(np.ndarray)
+
+
+def load_dictionary(filename, names=None, mmap=None):
+    """
+    Load dictionary from .spydata file
+
+    If names is not None, only the variables in it are loaded.
+    If mmap is True, the arrays and buffers of version 2 files are mapped in
+    memory instead of being read. It is SPYDATA_MMAP by default.
+    """
+    if mmap is None:
+        mmap = SPYDATA_MMAP
+    filename = osp.abspath(filename)
+    data = None
+    error_message = None
+    try:
+        with tarfile.open(filename, "r") as tar:
+            members = dict((member.name, member)
+                           for member in tar.getmembers())
+            if SPYDATA_MANIFEST not in members:
+                # Version 1 files have a pickle of all variables and the
+                # arrays in them as .npy files
+                version = 1
+            else:
+                version = 2
+                manifest = json.loads(tar.extractfile(
+                    members[SPYDATA_MANIFEST]).read().decode('utf-8'))
+                if manifest['version'] > SPYDATA_VERSION:
+                    raise ValueError('This file was saved by a newer version '
+                                     'of Spyder')
+
+                data = {}
+                for name, entry in manifest['variables'].items():
+                    if names is not None and name not in names:
+                        continue
+                    if 'array' in entry:
+                        data[name] = __load_npy_member(
+                            filename, members[entry['array']], mmap)
+                        continue
+                    pickled = tar.extractfile(members[entry['pickle']]).read()
+                    if entry['buffers']:
+                        buffers = [
+                            __map_tar_member(filename, members[member], mmap)
+                            for member in entry['buffers']]
+                        data[name] = pickle.loads(pickled, buffers=buffers)
+                    else:
+                        data[name] = pickle.loads(pickled)
+    # Except AttributeError from e.g. trying to load function no longer present
+    except (AttributeError, EOFError, ValueError) as error:
+        return None, to_text_string(error)
+
+    if version == 1:
+        data, error_message = _load_dictionary_v1(filename)
+        if data is not None and names is not None:
+            data = dict((name, value) for name, value in data.items()
+                        if name in names)
+    return data, error_message
+
+
+def _load_dictionary_v1(filename):
+    """Load dictionary from a version 1 .spydata file"""
     filename = osp.abspath(filename)
     old_cwd = getcwd()
     tmp_folder = tempfile.mkdtemp()
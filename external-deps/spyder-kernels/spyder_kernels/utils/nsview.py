@@ -12,9 +12,12 @@
 
 from __future__ import print_function
 
+from functools import reduce
 from itertools import islice
 import inspect
+import operator
 import re
+import weakref
 
 # Local imports
 from spyder_kernels.py3compat import (NUMERIC_TYPES, INT_TYPES, TEXT_TYPES,
@@ -310,6 +313,44 @@ def default_display(value, with_module=True):
         return type_str[1:-1]
 
 
+# Max number of elements of an array used to compute its min and max. The
+# ones of larger arrays are computed from a sample of their elements.
+ARRAY_MINMAX_MAX_SIZE = 10**6
+
+
+def array_sample(value, max_size):
+    """
+    Return a strided view of *value* with at most *max_size* elements,
+    taken evenly along its longest axes.
+    """
+    shape = value.shape
+    lengths = list(shape)
+    steps = [1] * len(shape)
+    size = reduce(operator.mul, lengths, 1)
+    while size > max_size:
+        axis = lengths.index(max(lengths))
+        ratio = min(-(-size // max_size), lengths[axis])
+        steps[axis] *= ratio
+        lengths[axis] = -(-shape[axis] // steps[axis])
+        size = reduce(operator.mul, lengths, 1)
+    return value[tuple(slice(None, None, step) for step in steps)]
+
+
+def array_minmax(value):
+    """
+    Return the min and max of the array *value* and whether they are
+    approximate.
+
+    The min and max of arrays larger than ARRAY_MINMAX_MAX_SIZE are computed
+    from a sample of their elements.
+    """
+    if value.size <= ARRAY_MINMAX_MAX_SIZE:
+        return value.min(), value.max(), False
+
+    sample = array_sample(value, ARRAY_MINMAX_MAX_SIZE)
+    return sample.min(), sample.max(), True
+
+
 def collections_display(value, level):
     """Display for collections (i.e. list, set, tuple and dict)."""
     is_dict = isinstance(value, dict)
@@ -358,6 +399,10 @@ def collections_display(value, level):
     return display
 
 
+# Max length of the display of a value
+DISPLAY_MAX_LENGTH = 70
+
+
 def value_to_display(value, minmax=False, level=0):
     """Convert value for display purpose"""
     # To save current Numpy printoptions
@@ -372,7 +417,8 @@ def value_to_display(value, minmax=False, level=0):
             set_printoptions(threshold=10)
         if isinstance(value, recarray):
             if level == 0:
-                fields = value.names
+                # More names than the display length can't be shown
+                fields = value.names[:DISPLAY_MAX_LENGTH]
                 display = 'Field names: ' + ', '.join(fields)
             else:
                 display = 'Recarray'
@@ -382,7 +428,12 @@ def value_to_display(value, minmax=False, level=0):
             if level == 0:
                 if minmax:
                     try:
-                        display = 'Min: %r\nMax: %r' % (value.min(), value.max())
+                        vmin, vmax, approximate = array_minmax(value)
+                        if approximate:
+                            # Mark values computed from a sample
+                            display = 'Min: ~%r\nMax: ~%r' % (vmin, vmax)
+                        else:
+                            display = 'Min: %r\nMax: %r' % (vmin, vmax)
                     except (TypeError, ValueError):
                         if value.dtype.type in NUMERIC_NUMPY_TYPES:
                             display = str(value)
@@ -403,7 +454,8 @@ def value_to_display(value, minmax=False, level=0):
                 display = 'Image'
         elif isinstance(value, DataFrame):
             if level == 0:
-                cols = value.columns
+                # More names than the display length can't be shown
+                cols = value.columns[:DISPLAY_MAX_LENGTH]
                 if PY2 and len(cols) > 0:
                     # Get rid of possible BOM utf-8 data present at the
                     # beginning of a file, which gets attached to the first
@@ -473,12 +525,12 @@ def value_to_display(value, minmax=False, level=0):
 
     # Truncate display at 70 chars to avoid freezing Spyder
     # because of large displays
-    if len(display) > 70:
+    if len(display) > DISPLAY_MAX_LENGTH:
         if is_binary_string(display):
             ellipses = b' ...'
         else:
             ellipses = u' ...'
-        display = display[:70].rstrip() + ellipses
+        display = display[:DISPLAY_MAX_LENGTH].rstrip() + ellipses
 
     # Restore Numpy printoptions
     if np_printoptions is not FakeObject:
@@ -718,9 +770,88 @@ def make_remote_view(data, settings, more_excluded_names=None):
                            more_excluded_names=more_excluded_names)
     remote = {}
     for key, value in list(data.items()):
-        view = value_to_display(value, minmax=settings['minmax'])
-        remote[key] = {'type':  get_human_readable_type(value),
-                       'size':  get_size(value),
-                       'color': get_color_name(value),
-                       'view':  view}
-    return remote
\ No newline at end of file
+        remote[key] = make_remote_view_entry(value, settings)
+    return remote
+
+
+def make_remote_view_entry(value, settings):
+    """
+    Make the remote view of a single *value*
+    -> globals explorer
+    """
+    view = value_to_display(value, minmax=settings['minmax'])
+    return {'type':  get_human_readable_type(value),
+            'size':  get_size(value),
+            'color': get_color_name(value),
+            'view':  view}
+
+
+#==============================================================================
+# Immutable values: their view can't change while they are the same object
+#==============================================================================
+IMMUTABLE_TYPES = (tuple([bool, float, complex, type(None), bytes,
+                          datetime.date, datetime.datetime, datetime.time,
+                          datetime.timedelta]) +
+                   INT_TYPES + TEXT_TYPES + NUMERIC_NUMPY_TYPES)
+
+
+def is_immutable(value):
+    """
+    Return True if *value* can't change without being replaced by another
+    object.
+
+    Subclasses of immutable types are not taken into account because they
+    can have mutable attributes.
+    """
+    if type(value) in IMMUTABLE_TYPES:
+        return True
+    elif type(value) in (tuple, frozenset):
+        return all(is_immutable(item) for item in value)
+    return False
+
+
+def get_view_key(value):
+    """
+    Return a cheap key of *value*, or None if there isn't one.
+
+    Immutable values are identified by their id and hash, so their key
+    changes when their view may change. Other values are identified by a
+    weak reference, so that the key doesn't keep them alive, and by their
+    shape or length and dtype. Their key only changes when their properties
+    may change, because changes made in place that keep those are not
+    detected.
+    """
+    if is_immutable(value):
+        try:
+            return (id(value), type(value), hash(value))
+        except TypeError:
+            return None
+
+    try:
+        ref = weakref.ref(value)
+    except TypeError:
+        return None
+
+    try:
+        shape = getattr(value, 'shape', None)
+        if not isinstance(shape, tuple):
+            shape = len(value)
+        dtype = getattr(value, 'dtype', None)
+        if dtype is not None:
+            dtype = str(dtype)
+    except Exception:
+        return None
+    return (ref, type(value), shape, dtype)
+
+
+def is_same_view_key(key, value):
+    """Return True if *key* is still the view key of *value*."""
+    if key is None:
+        return False
+    new_key = get_view_key(value)
+    if new_key is None:
+        return False
+    if isinstance(key[0], weakref.ref):
+        # Comparing the references would compare their objects
+        return key[0]() is value and key[1:] == new_key[1:]
+    return key == new_key
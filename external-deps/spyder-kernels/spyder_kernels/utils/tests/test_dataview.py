@@ -0,0 +1,123 @@
+# -*- coding: utf-8 -*-
+# -----------------------------------------------------------------------------
+# Copyright (c) 2009- Spyder Kernels Contributors
+#
+# Licensed under the terms of the MIT License
+# (see spyder_kernels/__init__.py for details)
+# -----------------------------------------------------------------------------
+
+"""
+Tests for dataview.py
+"""
+
+# Third party imports
+import numpy as np
+import pandas as pd
+import pytest
+
+# Local imports
+from spyder_kernels.utils import dataview
+from spyder_kernels.utils.dataview import DataView, is_data_view_supported
+
+
+def test_is_data_view_supported(monkeypatch):
+    """Test that only large DataFrames, Series and arrays are supported."""
+    df = pd.DataFrame({'a': [1, 2, 3]})
+    assert not is_data_view_supported(df)
+
+    monkeypatch.setattr(dataview, 'DATA_VIEW_MIN_SIZE', 3)
+    assert is_data_view_supported(df)
+    assert is_data_view_supported(df['a'])
+    assert is_data_view_supported(np.arange(3))
+    assert not is_data_view_supported(np.ma.array([1, 2, 3]))
+    assert not is_data_view_supported(np.zeros((1, 1, 3)))
+    assert not is_data_view_supported(
+        np.zeros(3, dtype=[('x', int), ('y', float)]))
+    assert not is_data_view_supported([1, 2, 3])
+
+
+def test_dataframe_view():
+    """Test getting blocks, sorting and editing a DataFrame view."""
+    df = pd.DataFrame({'a': [3, 1, 2, 1], 'b': list('wxyz')},
+                      index=list('pqrs'))
+    view = DataView(df)
+    info = view.get_info()
+    assert info['kind'] == 'dataframe'
+    assert info['shape'] == (4, 2)
+    assert info['header_shape'] == (1, 1)
+
+    block = view.get_block((1, 3), (0, 1))
+    assert list(block.index) == ['q', 'r']
+    assert list(block['a']) == [1, 2]
+
+    # Stable sort composed with the previous one
+    assert view.sort(1, ascending=False) is None
+    assert view.sort(0) is None
+    assert list(view.get_block((0, 4), (0, 2)).index) == list('sqrp')
+
+    # Changes are saved by row position, so they follow the sort order
+    view.set_value(0, 0, 10)
+    assert view.get_block((0, 1), (0, 1)).iat[0, 0] == 10
+    assert df.at['s', 'a'] == 1
+    assert view.get_minmax([0, 1]) == [[10, 1], None]
+
+    assert view.sort(-1) is None
+    new_df = view.get_value()
+    assert list(new_df.index) == list('pqrs')
+    assert list(new_df['a']) == [3, 1, 2, 10]
+    assert list(df['a']) == [3, 1, 2, 1]
+
+
+def test_series_view():
+    """Test a Series view is shown as a single column."""
+    series = pd.Series([2., np.nan, 1.], name='x')
+    view = DataView(series)
+    info = view.get_info()
+    assert info['kind'] == 'series'
+    assert info['shape'] == (3, 1)
+    assert list(view.get_block((0, 1), (0, 1)).columns) == ['x']
+    assert view.get_minmax([0]) == [[2., 1.]]
+
+    assert view.sort(0) is None
+    view.set_value(2, 0, 5.)
+    assert list(view.get_block((0, 2), (0, 1)).index) == [2, 0]
+    new_series = view.get_value()
+    assert list(new_series.index) == [2, 0, 1]
+    assert new_series.iloc[2] == 5.
+
+
+def test_array_view():
+    """Test getting blocks and editing an array view."""
+    array = np.arange(12.).reshape(4, 3)
+    view = DataView(array)
+    info = view.get_info()
+    assert info['kind'] == 'array'
+    assert info['minmax'] == (0., 11.)
+    assert not info['has_inf']
+
+    block = view.get_block((1, 3), (1, 5))
+    assert block.tolist() == [[4., 5.], [7., 8.]]
+    block[0, 0] = -1
+    assert array[1, 1] == 4.
+
+    view.set_value(1, 1, -1.)
+    assert view.get_block((1, 2), (1, 2))[0, 0] == -1.
+    assert array[1, 1] == 4.
+    new_array = view.get_value()
+    assert new_array[1, 1] == -1.
+
+    # Arrays are reordered by position
+    view.order = np.array([3, 2, 1, 0])
+    new_array = view.get_value()
+    assert new_array[:, 0].tolist() == [9., 6., 3., 0.]
+    assert new_array[2, 1] == -1.
+    assert array[1, 1] == 4.
+
+    view = DataView(np.array([1., np.inf]))
+    assert view.shape == (2, 1)
+    assert view.get_info()['has_inf']
+    assert view.get_block((0, 2), (0, 1)).shape == (2, 1)
+
+
+if __name__ == "__main__":
+    pytest.main()
@@ -18,10 +18,11 @@
 # Third party imports
 import pytest
 import numpy as np
+import pandas as pd
 
 # Local imports
 import spyder_kernels.utils.iofuncs as iofuncs
-from spyder_kernels.py3compat import is_text_string
+from spyder_kernels.py3compat import is_text_string, to_text_string
 
 
 # Full path to this file's parent directory for loading data
@@ -339,5 +340,98 @@ def test_spydata_export(input_namespace, expected_namespace,
                 pass
 
 
+def test_spydata_load_variables(tmpdir):
+    """
+    Test that variables can be loaded separately and that arrays are
+    mapped in memory instead of being read.
+    """
+    path = to_text_string(tmpdir.join('variables.spydata'))
+    namespace = {'a': np.arange(12.).reshape(3, 4),
+                 'f': np.asfortranarray(np.eye(3)),
+                 'l': [np.eye(2), 'spam'],
+                 'x': 42}
+    assert iofuncs.save_dictionary(namespace, path) is None
+
+    data, error = iofuncs.load_dictionary(path, names=['a', 'l'], mmap=True)
+    assert error is None
+    assert sorted(data) == ['a', 'l']
+    assert isinstance(data['a'].base, np.memmap)
+
+    # Changes to the loaded arrays don't change the file
+    data['a'][0, 0] = 100
+    data, error = iofuncs.load_dictionary(path)
+    assert error is None
+    assert are_namespaces_equal(data, namespace)
+    assert data['f'].flags.f_contiguous
+
+
+@pytest.mark.parametrize('mmap', [
+    False,
+    pytest.param(True, marks=pytest.mark.skipif(
+        os.name == 'nt', reason="Mapped files can't be replaced on Windows"))
+])
+def test_spydata_save_loaded(tmpdir, mmap):
+    """
+    Test that variables loaded from a file can be saved back to it, and that
+    errors writing the file are reported.
+    """
+    path = to_text_string(tmpdir.join('loaded.spydata'))
+    namespace = {'a': np.arange(12.).reshape(3, 4), 'l': [np.eye(2), 'spam']}
+    assert iofuncs.save_dictionary(namespace, path) is None
+
+    data, error = iofuncs.load_dictionary(path, mmap=mmap)
+    assert error is None
+    assert isinstance(data['a'].base, np.memmap) == mmap
+    data['a'][0, 0] = 100
+    assert iofuncs.save_dictionary(data, path) is None
+    namespace['a'][0, 0] = 100
+    data, error = iofuncs.load_dictionary(path, mmap=mmap)
+    assert error is None
+    assert are_namespaces_equal(data, namespace)
+
+    path = to_text_string(tmpdir.join('missing', 'loaded.spydata'))
+    assert iofuncs.save_dictionary(data, path) is not None
+
+
+@pytest.mark.parametrize('max_workers', [1, 4])
+def test_spydata_save_progress(tmpdir, max_workers):
+    """
+    Test that variables are saved in order by several workers, with
+    progress reports, and that snapshots are saved when asked.
+    """
+    path = to_text_string(tmpdir.join('progress.spydata'))
+    namespace = {'var_%d' % i: [i, np.arange(i + 1)] for i in range(20)}
+    progress = []
+
+    def progress_callback(saved, total):
+        progress.append((saved, total))
+        # Changes made while saving are not saved
+        namespace['var_19'][0] = -1
+
+    assert iofuncs.save_dictionary(
+        namespace, path, progress_callback=progress_callback,
+        snapshot=True, max_workers=max_workers) is None
+    assert progress == [(i, 20) for i in range(1, 21)]
+
+    data, error = iofuncs.load_dictionary(path)
+    assert error is None
+    assert data['var_19'][0] == 19
+    namespace['var_19'][0] = 19
+    assert are_namespaces_equal(data, namespace)
+
+
+def test_spydata_snapshot_dataframe():
+    """
+    Test that the data of DataFrames is not copied in snapshots, but changes
+    to their structure don't change the snapshots.
+    """
+    df = pd.DataFrame({'a': np.arange(5), 'b': np.ones(5)})
+    snapshot = getattr(iofuncs, '__snapshot_value')(df)
+    assert snapshot is not df
+    assert np.shares_memory(snapshot['a'].values, df['a'].values)
+    df['c'] = 0
+    assert list(snapshot.columns) == ['a', 'b']
+
+
 if __name__ == "__main__":
     pytest.main()
@@ -12,6 +12,7 @@
 
 from collections import defaultdict
 import datetime
+import weakref
 
 # Third party imports
 import numpy as np
@@ -24,7 +25,10 @@
 from spyder_kernels.py3compat import PY2
 from spyder_kernels.utils.nsview import (sort_against, is_supported,
                                          value_to_display, get_size,
-                                         get_supported_types, Image)
+                                         get_supported_types, Image,
+                                         is_immutable, array_sample,
+                                         get_view_key, is_same_view_key,
+                                         ARRAY_MINMAX_MAX_SIZE)
 
 def generate_complex_object():
     """Taken from issue #4221."""
@@ -299,5 +303,68 @@ def test_ellipses(tmpdir):
     assert b' ...' in value_to_display(buffer)
 
 
+def test_array_sample():
+    """Test that array samples are strided views within the size budget."""
+    for shape in [(10**7,), (10**8, 3), (3000, 3000), (0, 10**7)]:
+        value = np.lib.stride_tricks.as_strided(
+            np.zeros(1), shape=shape, strides=(0,) * len(shape))
+        sample = array_sample(value, 10**6)
+        assert sample.size <= 10**6
+        assert sample.base is not None
+
+
+def test_large_array_minmax_display():
+    """
+    Test that the min and max of large arrays are computed from a sample
+    and marked as approximate.
+    """
+    value = np.arange(2 * ARRAY_MINMAX_MAX_SIZE)
+    display = value_to_display(value, minmax=True)
+    assert display.startswith('Min: ~0')
+
+    # Changes in the array are taken into account
+    value[0] = -5
+    assert value_to_display(value, minmax=True).startswith('Min: ~-5')
+
+    # Small arrays give exact values
+    assert value_to_display(np.arange(10), minmax=True) == 'Min: 0\nMax: 9'
+
+
+def test_is_immutable():
+    """Test the values whose view can be reused while they don't change."""
+    assert is_immutable(1)
+    assert is_immutable(u'a')
+    assert is_immutable(None)
+    assert is_immutable(datetime.date(2020, 1, 1))
+    assert is_immutable(np.float64(1.0))
+    assert is_immutable((1, (u'a', b'b')))
+    assert not is_immutable((1, [2]))
+    assert not is_immutable([1])
+    assert not is_immutable(np.array([1]))
+    assert not is_immutable(DF)
+
+
+def test_view_key():
+    """Test the keys used to know if the view of a value can have changed."""
+    arr = np.zeros(3)
+    key = get_view_key(arr)
+    assert is_same_view_key(key, arr)
+    assert not is_same_view_key(key, np.zeros(3))
+    arr.shape = (3, 1)
+    assert not is_same_view_key(key, arr)
+
+    # Keys don't keep values alive
+    ref = weakref.ref(arr)
+    del arr
+    assert ref() is None
+
+    df = DF.copy()
+    assert is_same_view_key(get_view_key(df), df)
+    assert is_same_view_key(get_view_key(u'a'), u'a')
+    assert not is_same_view_key(get_view_key(1.5), 2.5)
+    assert get_view_key([1]) is None
+    assert not is_same_view_key(None, 1)
+
+
 if __name__ == "__main__":
     pytest.main()
\ No newline at end of file
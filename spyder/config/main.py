@@ -306,6 +306,8 @@
               'more_options': False,
               'case_sensitive': False,
               'max_results': 1000,
+              'search_index': False,
+              'use_ignore_files': True,
               }),
             ('breakpoints',
              {
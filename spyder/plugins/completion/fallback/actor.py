@@ -21,11 +21,11 @@
 
 # Other imports
 from pygments.lexers import get_lexer_by_name
-from diff_match_patch import diff_match_patch
 
 # Local imports
 from spyder.plugins.completion.manager.api import CompletionItemKind
 from spyder.plugins.completion.manager.api import LSPRequestTypes
+from spyder.utils.textchanges import apply_text_changes
 from spyder.plugins.completion.fallback.utils import (
     get_keywords, get_words, is_prefix_valid)
 
@@ -47,7 +47,6 @@ def __init__(self, parent):
         self.daemon = True
         self.mutex = QMutex()
         self.file_tokens = {}
-        self.diff_patch = diff_match_patch()
         self.thread = QThread()
         self.moveToThread(self.thread)
 
@@ -135,12 +134,9 @@ def handle_msg(self, message):
                     'offset': msg['offset'],
                     'language': msg['language'],
                 }
-            diff = msg['diff']
             text = self.file_tokens[file]
             text['offset'] = msg['offset']
-            text, _ = self.diff_patch.patch_apply(
-                diff, text['text'])
-            self.file_tokens[file]['text'] = text
+            text['text'] = apply_text_changes(text['text'], msg['changes'])
         elif msg_type == LSPRequestTypes.DOCUMENT_DID_CLOSE:
             self.file_tokens.pop(file, {})
         elif msg_type == LSPRequestTypes.DOCUMENT_COMPLETION:
@@ -8,7 +8,6 @@
 import os.path as osp
 
 import pytest
-from diff_match_patch import diff_match_patch
 from spyder.plugins.completion.manager.api import LSPRequestTypes
 from spyder.plugins.completion.fallback.utils import get_words
 
@@ -58,13 +57,12 @@ def file_fixture(tokens_fixture, request):
 @pytest.fixture(scope="module")
 def fallback_fixture(fallback_completions, qtbot_module, request):
     fallback, completions = fallback_completions
-    diff_match = diff_match_patch()
-    return fallback, completions, diff_match
+    return fallback, completions
 
 
 @pytest.mark.slow
 def test_file_open_close(qtbot_module, fallback_fixture):
-    fallback, completions, diff_match = fallback_fixture
+    fallback, completions = fallback_fixture
 
     open_request = {
         'file': 'test.py',
@@ -97,8 +95,7 @@ def test_tokenize(qtbot_module, fallback_fixture, file_fixture):
     filename, expected_tokens, contents = file_fixture
     _, ext = osp.splitext(filename)
     language = extension_map[ext[1:]]
-    fallback, completions, diff_match = fallback_fixture
-    # diff = diff_match.patch_make('', contents)
+    fallback, completions = fallback_fixture
     open_request = {
         'file': filename,
         'text': contents,
@@ -123,9 +120,8 @@ def test_tokenize(qtbot_module, fallback_fixture, file_fixture):
 
 @pytest.mark.slow
 def test_token_update(qtbot_module, fallback_fixture):
-    fallback, completions, diff_match = fallback_fixture
+    fallback, completions = fallback_fixture
 
-    # diff = diff_match.patch_make('', TEST_FILE)
     open_request = {
         'file': 'test.py',
         'text': TEST_FILE,
@@ -147,11 +143,15 @@ def test_token_update(qtbot_module, fallback_fixture):
     initial_tokens = {token['insertText'] for token in initial_tokens}
     assert 'args' not in initial_tokens
 
-    diff = diff_match.patch_make(TEST_FILE, TEST_FILE_UPDATE)
+    position = {'line': len(TEST_FILE.splitlines()), 'character': 0}
+    changes = [{
+        'range': {'start': position, 'end': position},
+        'text': TEST_FILE_UPDATE[len(TEST_FILE):],
+    }]
     update_request = {
         'file': 'test.py',
-        'diff': diff,
-        'offset': len(diff),
+        'changes': changes,
+        'offset': len(TEST_FILE_UPDATE),
     }
     fallback.send_request(
         'python', LSPRequestTypes.DOCUMENT_DID_CHANGE, update_request)
@@ -17,6 +17,7 @@
 from spyder.plugins.completion.kite.decorators import send_request, handles
 from spyder.plugins.completion.manager.api import (
     LSPRequestTypes, CompletionItemKind)
+from spyder.utils.textchanges import apply_text_changes
 
 
 # Kite can return e.g. "int | str", so we make the default hint VALUE.
@@ -86,10 +87,19 @@ def document_did_open(self, params):
 
     @send_request(method=LSPRequestTypes.DOCUMENT_DID_CHANGE)
     def document_did_change(self, params):
+        with QMutexLocker(self.mutex):
+            if 'changes' in params:
+                # Kite needs the whole text
+                text = apply_text_changes(
+                    self.opened_files.get(params['file'], ''),
+                    params['changes'])
+            else:
+                text = params['text']
+            self.opened_files[params['file']] = text
         request = {
             'source': 'spyder',
             'filename': osp.realpath(params['file']),
-            'text': params['text'],
+            'text': text,
             'action': 'edit',
             'selections': [{
                 'start': params['selection_start'],
@@ -97,8 +107,6 @@ def document_did_change(self, params):
                 'encoding': 'utf-16',
             }],
         }
-        with QMutexLocker(self.mutex):
-            self.opened_files[params['file']] = params['text']
         return request
 
     @send_request(method=LSPRequestTypes.DOCUMENT_CURSOR_EVENT)
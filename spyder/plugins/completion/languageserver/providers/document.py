@@ -46,14 +46,15 @@ def process_document_diagnostics(self, response, *args):
 
     @send_notification(method=LSPRequestTypes.DOCUMENT_DID_CHANGE)
     def document_changed(self, params):
+        changes = params.get('changes')
+        if changes is None:
+            changes = [{'text': params['text']}]
         params = {
             'textDocument': {
                 'uri': path_as_uri(params['file']),
                 'version': params['version']
             },
-            'contentChanges': [{
-                'text': params['text']
-            }]
+            'contentChanges': changes
         }
         return params
 
@@ -14,7 +14,6 @@
 # Third party imports
 from qtpy.QtGui import QTextCursor, QColor
 from qtpy.QtCore import Qt, QMutex, QMutexLocker
-from diff_match_patch import diff_match_patch
 
 try:
     from rtree import index
@@ -29,7 +28,6 @@
 
 
 MERGE_ALLOWED = {'int', 'name', 'whitespace'}
-VALID_UPDATES = {diff_match_patch.DIFF_DELETE, diff_match_patch.DIFF_INSERT}
 
 
 def no_undo(f):
@@ -140,11 +138,8 @@ def _undo(self):
             self.reset()
         if self.is_snippet_active:
             num_pops = 0
-            patch = self.editor.patch
-            for diffs in patch:
-                for (op, data) in diffs.diffs:
-                    if op in VALID_UPDATES:
-                        num_pops += len(data)
+            for change in self.editor.text_changes:
+                num_pops += change.get('rangeLength', 0) + len(change['text'])
             if len(self.undo_stack) > 0:
                 for _ in range(num_pops):
                     if len(self.undo_stack) == 0:
@@ -164,11 +159,8 @@ def _undo(self):
     def _redo(self):
         if self.is_snippet_active:
             num_pops = 0
-            patch = self.editor.patch
-            for diffs in patch:
-                for (op, data) in diffs.diffs:
-                    if op in VALID_UPDATES:
-                        num_pops += len(data)
+            for change in self.editor.text_changes:
+                num_pops += change.get('rangeLength', 0) + len(change['text'])
             if len(self.redo_stack) > 0:
                 for _ in range(num_pops):
                     if len(self.redo_stack) == 0:
@@ -76,12 +76,22 @@ def remove(self, decoration):
         """
         Removes a text decoration from the editor.
 
-        :param decoration: Text decoration to remove
+        :param decoration: Text decoration to remove (could be a list)
         :type decoration: spyder.api.TextDecoration
         update: Bool: should the decorations be updated immediately?
             Set to False to avoid updating several times while removing
             several decorations
         """
+        if isinstance(decoration, list):
+            removed = set(decoration)
+            decorations = [deco for deco in self._decorations
+                           if deco not in removed]
+            if len(decorations) == len(self._decorations):
+                return False
+            self._decorations = decorations
+            self.update()
+            return True
+
         try:
             self._decorations.remove(decoration)
             self.update()
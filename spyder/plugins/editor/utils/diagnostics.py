@@ -0,0 +1,117 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright © Spyder Project Contributors
+# Licensed under the terms of the MIT License
+# (see spyder/__init__.py for details)
+
+"""
+Contains the utilities to process code analysis diagnostics.
+
+Diagnostics are indexed by the block number (line) where they start, so
+new results can be compared with the previous ones and editors only need
+to update the blocks that changed.
+"""
+
+# Standard library imports
+from collections import OrderedDict
+import logging
+import threading
+
+# Local imports
+from spyder.plugins.completion.manager.api import DiagnosticSeverity
+
+
+logger = logging.getLogger(__name__)
+
+
+def index_diagnostics(diagnostics, ignore_get_ipython=False):
+    """
+    Return a dict with the diagnostics of each line.
+
+    Values are tuples of (source, code, severity, message, start, end)
+    in the order they were given, where start and end are the positions of
+    the diagnostic range.
+    """
+    index = {}
+    for diagnostic in diagnostics:
+        message = diagnostic['message']
+        if (ignore_get_ipython and
+                message == "undefined name 'get_ipython'"):
+            # get_ipython is defined in IPython files
+            continue
+        msg_range = diagnostic['range']
+        start = msg_range['start']
+        entry = (diagnostic.get('source', ''),
+                 diagnostic.get('code', 'E'),
+                 diagnostic.get('severity', DiagnosticSeverity.ERROR),
+                 message,
+                 start,
+                 msg_range['end'])
+        index.setdefault(start['line'], []).append(entry)
+    return {line: tuple(entries) for line, entries in index.items()}
+
+
+def diff_diagnostics(old_index, new_index):
+    """Return the set of lines whose diagnostics differ in two indexes."""
+    changed = set(old_index).symmetric_difference(new_index)
+    for line, entries in new_index.items():
+        if line not in changed and old_index[line] != entries:
+            changed.add(line)
+    return changed
+
+
+class DiagnosticsWorker(object):
+    """
+    Persistent thread that indexes diagnostics and diffs them against the
+    previous ones.
+
+    Requests of the same editor that were not processed yet are replaced by
+    the last one, since only the latest diagnostics are shown.
+    """
+
+    def __init__(self):
+        self._condition = threading.Condition()
+        self._requests = OrderedDict()
+        self._thread = None
+
+    def process(self, key, diagnostics, previous_index, callback,
+                ignore_get_ipython=False):
+        """
+        Index diagnostics and diff them against previous_index.
+
+        callback is called from the worker thread with previous_index, the
+        new index and the set of lines that changed. It should emit a Qt
+        signal to get the results in the main thread.
+        """
+        with self._condition:
+            self._requests.pop(key, None)
+            self._requests[key] = (diagnostics, previous_index, callback,
+                                   ignore_get_ipython)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run)
+                self._thread.daemon = True
+                self._thread.start()
+            self._condition.notify()
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while not self._requests:
+                    self._condition.wait()
+                __, request = self._requests.popitem(last=False)
+            diagnostics, previous_index, callback, ignore_get_ipython = (
+                request)
+            try:
+                index = index_diagnostics(diagnostics, ignore_get_ipython)
+                changed = diff_diagnostics(previous_index, index)
+            except Exception:
+                logger.exception("Error processing diagnostics")
+                continue
+            try:
+                callback(previous_index, index, changed)
+            except RuntimeError:
+                # The editor was deleted while processing
+                pass
+
+
+DIAGNOSTICS_WORKER = DiagnosticsWorker()
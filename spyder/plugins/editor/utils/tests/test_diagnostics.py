@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright © Spyder Project Contributors
+# Licensed under the terms of the MIT License
+#
+"""Tests for diagnostics.py"""
+
+# Standard library imports
+import threading
+
+# Third party imports
+import pytest
+
+# Local imports
+from spyder.plugins.editor.utils.diagnostics import (diff_diagnostics,
+                                                     DiagnosticsWorker,
+                                                     index_diagnostics)
+
+
+def diagnostic(line, message, severity=1):
+    return {'source': 'pyflakes',
+            'range': {'start': {'line': line, 'character': 0},
+                      'end': {'line': line, 'character': 4}},
+            'message': message, 'severity': severity}
+
+
+def test_index_diagnostics():
+    """Test that diagnostics are indexed by line in their order."""
+    diagnostics = [diagnostic(3, 'spam'), diagnostic(1, 'eggs'),
+                   diagnostic(3, "undefined name 'get_ipython'")]
+    index = index_diagnostics(diagnostics)
+    assert sorted(index) == [1, 3]
+    assert [entry[3] for entry in index[3]] == [
+        'spam', "undefined name 'get_ipython'"]
+    assert index[1][0][:4] == ('pyflakes', 'E', 1, 'eggs')
+    assert index[1][0][4] == {'line': 1, 'character': 0}
+
+    index = index_diagnostics(diagnostics, ignore_get_ipython=True)
+    assert [entry[3] for entry in index[3]] == ['spam']
+
+
+def test_diff_diagnostics():
+    """Test that only added, removed and modified lines are changed."""
+    old = index_diagnostics([diagnostic(1, 'spam'), diagnostic(2, 'eggs'),
+                             diagnostic(3, 'ham')])
+    new = index_diagnostics([diagnostic(1, 'spam'), diagnostic(2, 'bacon'),
+                             diagnostic(4, 'ham')])
+    assert diff_diagnostics(old, new) == {2, 3, 4}
+    assert diff_diagnostics(new, new) == set()
+    assert diff_diagnostics({}, new) == {1, 2, 4}
+
+
+def test_worker_keeps_last_request():
+    """Test that pending requests of an editor are replaced by new ones."""
+    worker = DiagnosticsWorker()
+    results = []
+    done = threading.Event()
+    blocked = threading.Event()
+
+    def block(previous_index, index, changed):
+        blocked.wait(5)
+
+    def callback(previous_index, index, changed):
+        results.append((previous_index, index, changed))
+        done.set()
+
+    worker.process('other', [], {}, block)
+    worker.process('editor', [diagnostic(1, 'spam')], {}, callback)
+    previous = index_diagnostics([diagnostic(1, 'spam')])
+    worker.process('editor', [diagnostic(2, 'eggs')], previous, callback)
+    blocked.set()
+    assert done.wait(5)
+    assert len(results) == 1
+    previous_index, index, changed = results[0]
+    assert previous_index is previous
+    assert sorted(index) == [2]
+    assert changed == {1, 2}
+
+
+if __name__ == "__main__":
+    pytest.main()
@@ -207,8 +207,7 @@ def clear_extra_selections(self, key):
         Args:
             key (str) name of the extra selections group.
         """
-        for decoration in self.extra_selections_dict.get(key, []):
-            self.decorations.remove(decoration)
+        self.decorations.remove(self.extra_selections_dict.get(key, []))
         self.extra_selections_dict[key] = []
         self.update()
 
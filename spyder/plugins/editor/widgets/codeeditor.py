@@ -20,6 +20,7 @@
 # Standard library imports
 from __future__ import division, print_function
 
+from itertools import islice
 from unicodedata import category
 import logging
 import os.path as osp
@@ -30,11 +31,10 @@
 import time
 
 # Third party imports
-from diff_match_patch import diff_match_patch
 from IPython.core.inputtransformer2 import TransformerManager
 from qtpy.compat import to_qvariant
-from qtpy.QtCore import (QEvent, QPoint, QRegExp, Qt, QTimer, QThread, QUrl,
-                         Signal, Slot)
+from qtpy.QtCore import (QEvent, QPoint, QRegExp, Qt, QTimer, QUrl, Signal,
+                         Slot)
 from qtpy.QtGui import (QColor, QCursor, QFont, QIntValidator,
                         QKeySequence, QPaintEvent, QPainter, QMouseEvent,
                         QTextCharFormat, QTextCursor, QDesktopServices,
@@ -74,6 +74,9 @@
                                           ScrollFlagArea)
 from spyder.plugins.editor.utils.editor import (TextHelper, BlockUserData)
 from spyder.plugins.editor.utils.debugger import DebuggerManager
+from spyder.plugins.editor.utils.diagnostics import (DIAGNOSTICS_WORKER,
+                                                     diff_diagnostics,
+                                                     index_diagnostics)
 # from spyder.plugins.editor.utils.folding import IndentFoldDetector, FoldScope
 from spyder.plugins.editor.utils.kill_ring import QtKillRing
 from spyder.plugins.editor.utils.languages import ALL_LANGUAGES, CELL_LANGUAGES
@@ -91,6 +94,7 @@
                                     mimedata2url, start_file)
 from spyder.utils.vcs import get_git_remotes, remote_to_url
 from spyder.utils.qstringhelpers import qstring_length
+from spyder.utils.textchanges import TextChangesTracker
 from spyder.widgets.helperwidgets import MessageCheckBox
 
 
@@ -107,6 +111,10 @@
 # the up/down arrow keys.
 UPDATE_DECORATIONS_TIMEOUT = 500  # miliseconds
 
+# Number of lines whose code analysis results are set in the editor blocks
+# at once, after the visible ones.
+DIAGNOSTICS_BATCH_SIZE = 500
+
 # %% This line is for cell execution testing
 def is_letter_or_number(char):
     """Returns whether the specified unicode character is a letter or a number.
@@ -336,6 +344,10 @@ class CodeEditor(TextEditBaseWidget):
     #: Signal emmited when processing code analysis warnings is finished
     sig_process_code_analysis = Signal()
 
+    #: Signal emitted by the diagnostics worker with the previous index,
+    #: the new one and the lines that changed
+    sig_diagnostics_indexed = Signal(object, object, object)
+
     # Used for testing. When the mouse moves with Ctrl/Cmd pressed and
     # a URI is found, this signal is emmited
     sig_uri_found = Signal(str)
@@ -657,18 +669,36 @@ def __init__(self, parent=None):
         self.operation_in_progress = False
         self._diagnostics = []
 
+        # Code analysis results by line, user data of the blocks where they
+        # were set and lines whose blocks are pending to be updated
+        self._diagnostics_index = {}
+        self._diagnostics_block_data = {}
+        self._diagnostics_pending = set()
+        # Underline selections by line
+        self._diagnostics_selections = {}
+        # Blocks added or removed since results were set, which moves or
+        # loses their data
+        self._diagnostics_blocks_moved = False
+        self._diagnostics_flags_changed = False
+        self._block_count = self.blockCount()
+        self.document().contentsChange.connect(self._track_moved_blocks)
+        self.sig_diagnostics_indexed.connect(self._apply_diagnostics)
+        self._diagnostics_timer = QTimer(self)
+        self._diagnostics_timer.setSingleShot(True)
+        self._diagnostics_timer.setInterval(0)
+        self._diagnostics_timer.timeout.connect(
+            self._apply_diagnostics_batch)
+
         # Editor Extensions
         self.editor_extensions = EditorExtensionsManager(self)
         self.editor_extensions.add(CloseQuotesExtension())
         self.editor_extensions.add(SnippetsExtension())
         self.editor_extensions.add(CloseBracketsExtension())
 
-        # Text diffs across versions
-        self.differ = diff_match_patch()
-        self.previous_text = ''
+        # Text changes across versions
+        self.text_changes_tracker = TextChangesTracker(self.document())
         self.word_tokens = []
-        self.patch = []
-        self.text_diff = ([], '')
+        self.text_changes = []
         self.leading_whitespaces = {}
 
         # re-use parent of completion_widget (usually the main window)
@@ -835,6 +865,8 @@ def get_document_id(self):
     def set_as_clone(self, editor):
         """Set as clone editor"""
         self.setDocument(editor.document())
+        self.document().contentsChange.connect(self._track_moved_blocks)
+        self.text_changes_tracker = editor.text_changes_tracker
         self.document_id = editor.get_document_id()
         self.highlighter = editor.highlighter
         self.eol_chars = editor.eol_chars
@@ -1034,7 +1066,7 @@ def setup_editor(self,
             self.setFont(font) # this is required for line numbers area
             # Needed to show indent guides for splited editor panels
             # See spyder-ide/spyder#10900
-            self.patch = cloned_from.patch
+            self.text_changes = cloned_from.text_changes
             self.is_cloned = True
         self.toggle_line_numbers(linenumbers, markers)
 
@@ -1209,6 +1241,8 @@ def document_did_open(self):
         """Send textDocument/didOpen request to the server."""
         cursor = self.textCursor()
         text = self.toPlainText()
+        # Changes are sent from this text on
+        self.text_changes_tracker.reset(text)
         if self.is_ipython():
             # Send valid python text to LSP as it doesn't support IPython
             text = ipython_to_python(text)
@@ -1257,18 +1291,21 @@ def process_symbols(self, params):
     def document_did_change(self, text=None):
         """Send textDocument/didChange request to the server."""
         self.text_version += 1
-        text = self.toPlainText()
-        if self.is_ipython():
-            # Send valid python text to LSP
-            text = ipython_to_python(text)
-        self.patch = self.differ.patch_make(self.previous_text, text)
-        self.previous_text = text
+        self.text_changes = self.text_changes_tracker.take_changes()
+        if (self.sync_mode == TextDocumentSyncKind.INCREMENTAL
+                and not self.is_ipython()):
+            changes = self.text_changes
+        else:
+            text = self.toPlainText()
+            if self.is_ipython():
+                # Send valid python text to LSP
+                text = ipython_to_python(text)
+            changes = [{'text': text}]
         cursor = self.textCursor()
         params = {
             'file': self.filename,
             'version': self.text_version,
-            'text': text,
-            'diff': self.patch,
+            'changes': changes,
             'offset': cursor.position(),
             'selection_start': cursor.selectionStart(),
             'selection_end': cursor.selectionEnd(),
@@ -1796,9 +1833,6 @@ def handle_folding_range(self, response):
             folding_panel = self.panels.get(FoldingPanel)
 
             # Update folding
-            text = self.toPlainText()
-            self.text_diff = (self.differ.diff_main(self.previous_text, text),
-                              self.previous_text)
             extended_ranges = []
             for start, end in ranges:
                 text_region = self.get_text_region(start, end)
@@ -1807,7 +1841,7 @@ def handle_folding_range(self, response):
             folding_panel.update_folding(extended_ranges)
 
             # Update indent guides, which depend on folding
-            if self.indent_guides._enabled and len(self.patch) > 0:
+            if self.indent_guides._enabled and len(self.text_changes) > 0:
                 line, column = self.get_cursor_line_column()
                 self.update_whitespace_count(line, column)
         except RuntimeError:
@@ -2761,6 +2795,13 @@ def cleanup_code_analysis(self):
         self.clear_extra_selections('code_analysis_underline')
         for data in self.blockuserdata_list():
             data.code_analysis = []
+        self._diagnostics_index = {}
+        self._diagnostics_block_data = {}
+        self._diagnostics_pending = set()
+        self._diagnostics_selections = {}
+        self._diagnostics_blocks_moved = False
+        self._diagnostics_flags_changed = False
+        self._diagnostics_timer.stop()
 
         self.setUpdatesEnabled(True)
         # When the new code analysis results are empty, it is necessary
@@ -2769,87 +2810,151 @@ def cleanup_code_analysis(self):
         self.sig_flags_changed.emit()
         self.linenumberarea.update()
 
-    def _process_code_analysis(self, underline):
+    def _track_moved_blocks(self, position, chars_removed, chars_added):
         """
-        Process all code analysis results.
-
-        Parameters
-        ----------
-        underline: bool
-            Determines if errors and warnings are going to be set in
-            the line number area or underlined. It's better to separate
-            these two processes for perfomance reasons. That's because
-            setting errors can be done in a thread whereas underlining
-            them can't.
+        Take note of added and removed blocks because the code analysis
+        results of the blocks after them move, and those of removed blocks
+        are lost, so they have to be set again.
         """
+        block_count = self.blockCount()
+        if block_count != self._block_count:
+            self._diagnostics_blocks_moved = True
+        # Blocks can also be replaced by the same number of them. Changes of
+        # only the format of the text, e.g. by the syntax highlighter, report
+        # the same number of characters removed and added.
+        elif chars_removed and chars_removed != chars_added:
+            document = self.document()
+            end = min(position + chars_added, document.characterCount() - 1)
+            added = (document.findBlock(end).blockNumber() -
+                     document.findBlock(position).blockNumber())
+            if self._block_count + added > block_count:
+                self._diagnostics_blocks_moved = True
+        self._block_count = block_count
+
+    def _get_diagnostic_selection(self, entry):
+        """Return the underline selection of a code analysis result."""
+        __, __, severity, __, start, end = entry
         document = self.document()
-        for diagnostic in self._diagnostics:
-            if self.is_ipython() and (
-                    diagnostic["message"] == "undefined name 'get_ipython'"):
-                # get_ipython is defined in IPython files
-                continue
-            source = diagnostic.get('source', '')
-            msg_range = diagnostic['range']
-            start = msg_range['start']
-            end = msg_range['end']
-            code = diagnostic.get('code', 'E')
-            message = diagnostic['message']
-            severity = diagnostic.get(
-                'severity', DiagnosticSeverity.ERROR)
-
-            block = document.findBlockByNumber(start['line'])
-            data = block.userData()
-            if not data:
-                data = BlockUserData(self)
-
-            if underline:
-                block_nb = block.blockNumber()
-                first, last = self.get_buffer_block_numbers()
-
-                if (self.underline_errors_enabled and
-                        first <= block_nb <= last):
-                    error = severity == DiagnosticSeverity.ERROR
-                    color = self.error_color if error else self.warning_color
-                    color = QColor(color)
-                    color.setAlpha(255)
-                    block.color = color
-
-                    data.selection_start = start
-                    data.selection_end = end
-
-                    self.highlight_selection('code_analysis_underline',
-                                             data._selection(),
-                                             underline_color=block.color)
+        cursor = self.textCursor()
+        block = document.findBlockByNumber(start['line'])
+        cursor.setPosition(block.position())
+        cursor.movePosition(QTextCursor.NextCharacter,
+                            n=start['character'])
+        block2 = document.findBlockByNumber(end['line'])
+        cursor.setPosition(block2.position(), QTextCursor.KeepAnchor)
+        cursor.movePosition(QTextCursor.NextCharacter, n=end['character'],
+                            mode=QTextCursor.KeepAnchor)
+        error = severity == DiagnosticSeverity.ERROR
+        color = QColor(self.error_color if error else self.warning_color)
+        color.setAlpha(255)
+        return self.get_selection(QTextCursor(cursor), underline_color=color)
+
+    def _set_block_code_analysis(self, line):
+        """Set the code analysis results of line in its block."""
+        entries = self._diagnostics_index.get(line)
+        if not entries:
+            return
+        block = self.document().findBlockByNumber(line)
+        if not block.isValid():
+            return
+        data = block.userData()
+        if not data:
+            data = BlockUserData(self)
+        data.code_analysis = [entry[:4] for entry in entries]
+        data.selection_start = entries[-1][4]
+        data.selection_end = entries[-1][5]
+        block.setUserData(data)
+        self._diagnostics_block_data[line] = data
+
+    def _apply_diagnostics(self, previous_index, index, changed):
+        """Set indexed code analysis results in the blocks that changed."""
+        if (previous_index is not self._diagnostics_index or
+                self._diagnostics_blocks_moved):
+            # Results processed in the meantime or moved by some blocks
+            if self._diagnostics_blocks_moved:
+                changed = set(self._diagnostics_block_data).union(index)
             else:
-                data.code_analysis.append((source, code, severity, message))
-                block.setUserData(data)
+                changed = diff_diagnostics(self._diagnostics_index, index)
+            self._diagnostics_blocks_moved = False
+        self._diagnostics_index = index
+        for line in changed:
+            data = self._diagnostics_block_data.pop(line, None)
+            if data is not None:
+                # The block could have moved since results were set
+                data.code_analysis = []
+            self._diagnostics_selections.pop(line, None)
+        self._diagnostics_pending.update(changed)
+        self._diagnostics_flags_changed = (
+            self._diagnostics_flags_changed or bool(changed))
+        self._apply_diagnostics_batch()
+
+    def _apply_diagnostics_batch(self):
+        """
+        Update the blocks of the visible lines that have pending results
+        and a batch of the others.
+        """
+        pending = self._diagnostics_pending
+        first, last = self.get_buffer_block_numbers()
+        lines = [line for line in pending if first <= line <= last]
+        others = (line for line in pending if not first <= line <= last)
+        lines.extend(islice(others, DIAGNOSTICS_BATCH_SIZE))
+        for line in lines:
+            self._set_block_code_analysis(line)
+        pending.difference_update(lines)
+        self.linenumberarea.update()
+
+        if pending:
+            self.underline_errors()
+            self._diagnostics_timer.start()
+        else:
+            self.finish_code_analysis()
 
     def set_errors(self):
         """Set errors and warnings in the line number area."""
-        self._process_code_analysis(underline=False)
+        index = index_diagnostics(self._diagnostics, self.is_ipython())
+        self._diagnostics_flags_changed = True
+        self._apply_diagnostics(None, index, None)
 
     def underline_errors(self):
-        """Underline errors and warnings."""
-        self._process_code_analysis(underline=True)
+        """Underline the errors and warnings of the visible lines."""
+        if not self.underline_errors_enabled:
+            return
+        index = self._diagnostics_index
+        cache = self._diagnostics_selections
+        first, last = self.get_buffer_block_numbers()
+        selections = []
+        for line in range(first, last + 1):
+            entries = index.get(line)
+            if not entries:
+                continue
+            line_selections = cache.get(line)
+            if line_selections is None:
+                line_selections = cache[line] = [
+                    self._get_diagnostic_selection(entry)
+                    for entry in entries]
+            selections.extend(line_selections)
+        if selections != self.get_extra_selections('code_analysis_underline'):
+            self.set_extra_selections('code_analysis_underline', selections)
+            self.update_extra_selections()
 
     def finish_code_analysis(self):
         """Finish processing code analysis results."""
         self.linenumberarea.update()
         self.underline_errors()
-        self.update_extra_selections()
         self.sig_process_code_analysis.emit()
-        self.sig_flags_changed.emit()
+        if self._diagnostics_flags_changed:
+            self._diagnostics_flags_changed = False
+            self.sig_flags_changed.emit()
 
     def process_code_analysis(self, diagnostics):
         """Process all code analysis results."""
-        self.cleanup_code_analysis()
         self._diagnostics = diagnostics
 
-        # Process diagnostics in a thread to improve performance.
-        self.update_diagnostics = QThread()
-        self.update_diagnostics.run = self.set_errors
-        self.update_diagnostics.finished.connect(self.finish_code_analysis)
-        self.update_diagnostics.start()
+        # Index and compare results in a thread to improve performance.
+        DIAGNOSTICS_WORKER.process(
+            self, diagnostics, self._diagnostics_index,
+            self.sig_diagnostics_indexed.emit,
+            ignore_get_ipython=self.is_ipython())
 
     def hide_tooltip(self):
         """
@@ -2894,9 +2999,7 @@ def update_decorations(self):
         """Update decorations on the visible portion of the screen."""
         if self.underline_errors_enabled:
             self.underline_errors()
-            self.update_extra_selections()
-        else:
-            self.decorations.update()
+        self.decorations.update()
 
     def show_code_analysis_results(self, line_number, block_data):
         """Show warning/error messages."""
@@ -264,5 +264,95 @@ def test_undo_return(editorbot):
     assert editor.toPlainText() == text
 
 
+def diagnostic(line, message, severity=2):
+    """Return a code analysis result for a whole line."""
+    return {'source': 'pycodestyle', 'code': 'E',
+            'range': {'start': {'line': line, 'character': 0},
+                      'end': {'line': line, 'character': 1}},
+            'message': message, 'severity': severity}
+
+
+def get_code_analysis(editor):
+    """Return the line number and messages of the code analysis results."""
+    results = []
+    block = editor.document().firstBlock()
+    while block.isValid():
+        data = block.userData()
+        if data and data.code_analysis:
+            results.append((block.blockNumber(),
+                            [result[-1] for result in data.code_analysis]))
+        block = block.next()
+    return results
+
+
+def test_code_analysis_changed_lines(editorbot):
+    """Test that only the blocks whose code analysis changed are updated."""
+    qtbot, editor = editorbot
+    editor.set_text('\n'.join('a = {}'.format(i) for i in range(2000)))
+    diagnostics = [diagnostic(line, 'W{}'.format(line))
+                   for line in range(0, 2000, 2)]
+    with qtbot.waitSignal(editor.sig_process_code_analysis):
+        editor.process_code_analysis(diagnostics)
+    assert len(get_code_analysis(editor)) == 1000
+    assert editor.get_extra_selections('code_analysis_underline') == []
+
+    updated = []
+    set_block_code_analysis = editor._set_block_code_analysis
+
+    def spy(line):
+        updated.append(line)
+        set_block_code_analysis(line)
+
+    editor._set_block_code_analysis = spy
+    diagnostics[1] = diagnostic(2, 'E2', severity=1)
+    diagnostics.append(diagnostic(1, 'W1'))
+    with qtbot.waitSignal(editor.sig_process_code_analysis):
+        editor.process_code_analysis(diagnostics)
+    assert sorted(updated) == [1, 2]
+    assert get_code_analysis(editor)[:3] == [(0, ['W0']), (1, ['W1']),
+                                             (2, ['E2'])]
+
+    # Removing lines loses the results of their blocks, so they are set again
+    cursor = editor.textCursor()
+    cursor.setPosition(0)
+    cursor.movePosition(QTextCursor.Down, QTextCursor.KeepAnchor, 2)
+    cursor.removeSelectedText()
+    cursor.insertText('a = 0\na = 1\n')
+    del updated[:]
+    with qtbot.waitSignal(editor.sig_process_code_analysis):
+        editor.process_code_analysis(diagnostics)
+    assert len(updated) == 1001
+    assert len(get_code_analysis(editor)) == 1001
+    assert get_code_analysis(editor)[:3] == [(0, ['W0']), (1, ['W1']),
+                                             (2, ['E2'])]
+
+    # Only the results of the visible lines are underlined
+    editor.underline_errors_enabled = True
+    editor.underline_errors()
+    first, last = editor.get_buffer_block_numbers()
+    underlined = editor.get_extra_selections('code_analysis_underline')
+    assert 0 < len(underlined) < 1001
+    assert len(underlined) == len(
+        [line for line in editor._diagnostics_index if first <= line <= last])
+
+
+def test_code_analysis_inserted_lines(editorbot):
+    """Test that results are set again when lines are inserted before them."""
+    qtbot, editor = editorbot
+    editor.set_text('\n'.join('a = {}'.format(i) for i in range(20)))
+    with qtbot.waitSignal(editor.sig_process_code_analysis):
+        editor.process_code_analysis([diagnostic(10, 'W291'),
+                                      diagnostic(11, 'W291')])
+    assert get_code_analysis(editor) == [(10, ['W291']), (11, ['W291'])]
+
+    cursor = editor.textCursor()
+    cursor.setPosition(0)
+    cursor.insertText('a = -1\n')
+    with qtbot.waitSignal(editor.sig_process_code_analysis):
+        editor.process_code_analysis([diagnostic(11, 'W291'),
+                                      diagnostic(12, 'W291')])
+    assert get_code_analysis(editor) == [(11, ['W291']), (12, ['W291'])]
+
+
 if __name__ == '__main__':
     pytest.main(['test_codeeditor.py'])
@@ -25,9 +25,11 @@
 
 # Local imports
 from spyder.config.base import get_conf_path
+from spyder.plugins.completion.manager.api import TextDocumentSyncKind
 from spyder.plugins.editor.widgets.editor import EditorStack
 from spyder.widgets.findreplace import FindReplace
 from spyder.py3compat import PY2
+from spyder.utils.textchanges import apply_text_changes
 
 
 HERE = osp.abspath(osp.dirname(__file__))
@@ -867,7 +869,7 @@ def test_ipython_files(base_editor_bot, qtbot):
         editor.document_did_change()
 
     params = blocker.args[2]
-    assert 'get_ipython' in params['text']
+    assert 'get_ipython' in params['changes'][0]['text']
 
     # Mock linting results for this file. This is actually what's returned by
     # Pyflakes.
@@ -906,5 +908,41 @@ def test_ipython_files(base_editor_bot, qtbot):
     assert blocks_with_data == 1
 
 
+def test_incremental_document_changes(editor_bot, qtbot):
+    """Test that only the changed text is sent to incremental servers."""
+    editor_stack, editor = editor_bot
+    editor.completions_available = True
+    editor.sync_mode = TextDocumentSyncKind.INCREMENTAL
+    text = editor.toPlainText()
+    editor.document_did_open()
+
+    changes = []
+    editor.sig_perform_completion_request.connect(
+        lambda language, method, params: changes.extend(
+            params.get('changes', [])))
+    cursor = editor.textCursor()
+    cursor.movePosition(QTextCursor.Start)
+    cursor.movePosition(QTextCursor.Down)
+    editor.setTextCursor(cursor)
+    qtbot.keyClicks(editor, 'b = 2')
+    qtbot.keyClick(editor, Qt.Key_Return)
+    qtbot.keyClick(editor, Qt.Key_Backspace)
+    editor.document_did_change()
+
+    assert all('range' in change for change in changes)
+    assert changes[0] == {
+        'range': {'start': {'line': 1, 'character': 0},
+                  'end': {'line': 1, 'character': 0}},
+        'rangeLength': 0,
+        'text': 'b',
+    }
+    assert apply_text_changes(text, changes) == editor.toPlainText()
+
+    # Changes are sent only once
+    with qtbot.waitSignal(editor.sig_perform_completion_request) as blocker:
+        editor.document_did_change()
+    assert blocker.args[2]['changes'] == []
+
+
 if __name__ == "__main__":
     pytest.main(['test_editor.py'])
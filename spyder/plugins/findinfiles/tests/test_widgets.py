@@ -37,7 +37,7 @@ def process_search_results(results):
     test framework comparison representation.
     """
     matches = {}
-    for result in results.values():
+    for result in results:
         file, line, col = result
         filename = osp.basename(file)
         if filename not in matches:
@@ -128,10 +128,63 @@ def test_find_in_files_search(findinfiles, qtbot):
     findinfiles.find()
     blocker = qtbot.waitSignal(findinfiles.sig_finished)
     blocker.wait()
-    matches = process_search_results(findinfiles.result_browser.data)
+    matches = process_search_results(findinfiles.result_browser.get_results())
     assert expected_results() == matches
 
 
+def test_find_in_files_parallel_search(findinfiles, qtbot, mocker):
+    """
+    Test that searching files in a pool of processes gives the same results
+    as searching them in the search thread.
+    """
+    mocker.patch('spyder.plugins.findinfiles.widgets.PARALLEL_THRESHOLD', 0)
+    mocker.patch('spyder.plugins.findinfiles.widgets.CHUNK_SIZE', 1)
+    mocker.patch('spyder.plugins.findinfiles.widgets.get_search_processes',
+                 return_value=2)
+    findinfiles.set_search_text("spam")
+    findinfiles.set_directory(osp.join(LOCATION, "data"))
+    findinfiles.find()
+    blocker = qtbot.waitSignal(findinfiles.sig_finished, timeout=30000)
+    blocker.wait()
+    matches = process_search_results(findinfiles.result_browser.get_results())
+    assert expected_results() == matches
+
+
+@pytest.mark.parametrize('findinfiles', [{'search_index': True}],
+                         indirect=True)
+def test_find_in_files_search_index(findinfiles, qtbot, tmpdir):
+    """
+    Test that searches in the project directory use and update the search
+    index.
+    """
+    project = tmpdir.mkdir('project')
+    project.join('spam.txt').write('spam\nham\n')
+    project.join('ham.txt').write('ham\n')
+    findinfiles.set_project_path(str(project))
+    findinfiles.path_selection_combo.setCurrentIndex(PROJECT)
+
+    for __ in range(2):
+        findinfiles.set_search_text("spam")
+        findinfiles.find()
+        blocker = qtbot.waitSignal(findinfiles.sig_finished)
+        blocker.wait()
+        matches = process_search_results(
+            findinfiles.result_browser.get_results())
+        assert matches == {'spam.txt': [(1, 0)]}
+
+    index = findinfiles.search_index
+    assert len(index.files) == 2
+    assert osp.isfile(index.path)
+
+    # Changed files are searched and indexed again
+    project.join('ham.txt').write('ham and spam\n')
+    findinfiles.find()
+    blocker = qtbot.waitSignal(findinfiles.sig_finished)
+    blocker.wait()
+    matches = process_search_results(findinfiles.result_browser.get_results())
+    assert matches == {'spam.txt': [(1, 0)], 'ham.txt': [(1, 8)]}
+
+
 @pytest.mark.parametrize('findinfiles',
                          [{'exclude': r"\.py$", 'exclude_regexp': True}],
                          indirect=True)
@@ -141,7 +194,7 @@ def test_exclude_extension_regex(findinfiles, qtbot):
     findinfiles.find()
     blocker = qtbot.waitSignal(findinfiles.sig_finished)
     blocker.wait()
-    matches = process_search_results(findinfiles.result_browser.data)
+    matches = process_search_results(findinfiles.result_browser.get_results())
     files_filtered = True
     for file in matches:
         filename, ext = osp.splitext(file)
@@ -160,7 +213,7 @@ def test_exclude_extension_string(findinfiles, qtbot):
     findinfiles.find()
     blocker = qtbot.waitSignal(findinfiles.sig_finished)
     blocker.wait()
-    matches = process_search_results(findinfiles.result_browser.data)
+    matches = process_search_results(findinfiles.result_browser.get_results())
     files_filtered = True
     for file in matches:
         filename, ext = osp.splitext(file)
@@ -179,7 +232,7 @@ def test_exclude_extension_empty_regex(findinfiles, qtbot):
     findinfiles.find()
     blocker = qtbot.waitSignal(findinfiles.sig_finished)
     blocker.wait()
-    matches = process_search_results(findinfiles.result_browser.data)
+    matches = process_search_results(findinfiles.result_browser.get_results())
     assert expected_results() == matches
 
 
@@ -192,7 +245,7 @@ def test_exclude_extension_string_no_regexp(findinfiles, qtbot):
     findinfiles.find()
     blocker = qtbot.waitSignal(findinfiles.sig_finished)
     blocker.wait()
-    matches = process_search_results(findinfiles.result_browser.data)
+    matches = process_search_results(findinfiles.result_browser.get_results())
     assert expected_results() == matches
 
 
@@ -205,7 +258,7 @@ def test_exclude_extension_multiple_string(findinfiles, qtbot):
     findinfiles.find()
     blocker = qtbot.waitSignal(findinfiles.sig_finished)
     blocker.wait()
-    matches = process_search_results(findinfiles.result_browser.data)
+    matches = process_search_results(findinfiles.result_browser.get_results())
     files_filtered = True
     for file in matches:
         filename, ext = osp.splitext(file)
@@ -249,7 +302,7 @@ def test_case_unsensitive_search(findinfiles, qtbot):
     findinfiles.find()
     blocker = qtbot.waitSignal(findinfiles.sig_finished)
     blocker.wait()
-    matches = process_search_results(findinfiles.result_browser.data)
+    matches = process_search_results(findinfiles.result_browser.get_results())
     print(matches)
     assert expected_case_unsensitive_results() == matches
 
@@ -263,7 +316,7 @@ def test_case_sensitive_search(findinfiles, qtbot):
     findinfiles.find()
     blocker = qtbot.waitSignal(findinfiles.sig_finished)
     blocker.wait()
-    matches = process_search_results(findinfiles.result_browser.data)
+    matches = process_search_results(findinfiles.result_browser.get_results())
     print(matches)
     assert matches == {'ham.txt': [(9, 0)]}
 
@@ -290,6 +343,55 @@ def test_exclude_regexp_error(findinfiles, qtbot):
     assert findinfiles.REGEX_ERROR in tooltip
 
 
+def test_results_browser_model(findinfiles, qtbot):
+    """
+    Test that the results model holds many matches and renders and opens
+    them on demand.
+    """
+    browser = findinfiles.result_browser
+    browser.set_max_results(200000)
+    browser.clear_title('spam')
+    filenames = [osp.join(LOCATION, 'file{}.py'.format(i)) for i in range(10)]
+    for filename in filenames:
+        browser.append_file_result(filename)
+
+    items = [(filename, lineno, 4, 8, 'bla spam bla\n')
+             for filename in filenames for lineno in range(1, 10001)]
+    browser.append_result(items, 'title')
+    model = browser.results_model
+    assert browser.num_results == len(items)
+    assert model.rowCount() == len(filenames)
+
+    file_index = model.index(3, 0)
+    assert model.rowCount(file_index) == 10000
+    assert model.data(file_index, Qt.ToolTipRole) == filenames[3]
+    match_index = model.index(41, 0, file_index)
+    assert model.parent(match_index) == file_index
+    text = model.data(match_index)
+    assert '<b>42</b> (4)' in text
+    assert '<b>spam</b>' in text
+
+    with qtbot.waitSignal(browser.sig_edit_goto_requested) as blocker:
+        browser.activated_index(match_index)
+    assert blocker.args == [filenames[3], 42, 'spam']
+
+    # Results beyond the maximum are not added
+    browser.set_max_results(len(items) + 5)
+    browser.append_result(items[:10], 'title')
+    assert browser.num_results == len(items) + 5
+
+    # Sort files by name keeping their matches and expanded state
+    browser.collapseAll()
+    browser.expand(model.index(2, 0))
+    model.sort(0, Qt.DescendingOrder)
+    assert model.data(model.index(0, 0), Qt.ToolTipRole) == filenames[9]
+    file_index = model.index(7, 0)
+    assert model.data(file_index, Qt.ToolTipRole) == filenames[2]
+    assert browser.isExpanded(file_index)
+    assert not browser.isExpanded(model.index(2, 0))
+    browser.set_max_results(1000)
+
+
 # ---- Tests for SearchInComboBox
 
 def test_add_external_paths(searchin_combobox, mocker):
@@ -578,8 +680,8 @@ def test_max_results(findinfiles, qtbot):
     blocker = qtbot.waitSignal(findinfiles.sig_max_results_reached)
     blocker.wait()
 
-    print(len(findinfiles.result_browser.data), value)
-    assert len(findinfiles.result_browser.data) == value
+    print(len(findinfiles.result_browser.get_results()), value)
+    assert len(findinfiles.result_browser.get_results()) == value
 
     # Restore defaults
     findinfiles.set_max_results(1000)
@@ -9,33 +9,42 @@
 """
 
 # Standard library imports
+from concurrent.futures import FIRST_COMPLETED, wait as futures_wait
+from array import array
 import fnmatch
+import hashlib
 import math
-import os
 import os.path as osp
 import re
 import traceback
 
 # Third party imports
-from qtpy.compat import getexistingdirectory
-from qtpy.QtCore import (QEvent, QMutex, QMutexLocker, QSize, Qt, QThread,
-                         Signal, Slot)
+from qtpy.compat import getexistingdirectory, to_qvariant
+from qtpy.QtCore import (QAbstractItemModel, QEvent, QModelIndex, QMutex,
+                         QMutexLocker, QSize, Qt, QThread, Signal, Slot)
 from qtpy.QtGui import QAbstractTextDocumentLayout, QTextDocument
 from qtpy.QtWidgets import (QApplication, QComboBox, QHBoxLayout,
                             QInputDialog, QLabel, QMessageBox, QSizePolicy,
                             QStyle, QStyledItemDelegate, QStyleOptionViewItem,
-                            QTreeWidgetItem)
+                            QTreeView)
 
 # Local imports
 from spyder.api.translations import get_translation
 from spyder.api.widgets import PluginMainWidget
+from spyder.api.widgets.mixins import SpyderWidgetMixin
+from spyder.config.base import get_conf_path
 from spyder.config.gui import get_font, is_dark_interface
 from spyder.config.main import EXCLUDE_PATTERNS  # This could be more general?
 from spyder.utils.encoding import is_text_file, to_unicode_from_fs
 from spyder.utils.misc import regexp_error_msg
+from spyder.utils.searchindex import get_query_trigrams, TrigramIndex
+from spyder.utils.textsearch import (CHUNK_SIZE, PARALLEL_THRESHOLD,
+                                     create_search_executor,
+                                     get_search_processes, search_files)
+from spyder.utils.walker import walk_files
 from spyder.widgets.comboboxes import PatternComboBox
-# TODO: Use SpyderWidgetMixin on OneColumnTree
-from spyder.widgets.onecolumntree import OneColumnTree
+from spyder.widgets.onecolumntree import (OneColumnTreeActions,
+                                          OneColumnTreeContextMenuSections)
 
 # Localization
 _ = get_translation('spyder')
@@ -67,6 +76,8 @@ class FindInFilesWidgetActions:
     # Triggers
     Find = 'find_action'
     MaxResults = 'max_results_action'
+    ToggleSearchIndex = 'toggle_search_index_action'
+    ToggleIgnoreFiles = 'toggle_ignore_files_action'
 
     # Toggles
     ToggleCase = 'toggle_case_action'
@@ -103,6 +114,79 @@ def truncate_path(text):
     return left_text + ellipsis + right_text
 
 
+def truncate_result(line, start, end, text_color=None):
+    """
+    Shorten text on line to display the match within `max_line_length`.
+    """
+    ellipsis = '...'
+    max_line_length = 80
+    max_num_char_fragment = 40
+
+    html_escape_table = {
+        "&": "&amp;",
+        '"': "&quot;",
+        "'": "&apos;",
+        ">": "&gt;",
+        "<": "&lt;",
+    }
+
+    def html_escape(text):
+        """Produce entities within text."""
+        return "".join(html_escape_table.get(c, c) for c in text)
+
+    line = str(line)
+    left, match, right = line[:start], line[start:end], line[end:]
+
+    if len(line) > max_line_length:
+        offset = (len(line) - len(match)) // 2
+
+        left = left.split(' ')
+        num_left_words = len(left)
+
+        if num_left_words == 1:
+            left = left[0]
+            if len(left) > max_num_char_fragment:
+                left = ellipsis + left[-offset:]
+            left = [left]
+
+        right = right.split(' ')
+        num_right_words = len(right)
+
+        if num_right_words == 1:
+            right = right[0]
+            if len(right) > max_num_char_fragment:
+                right = right[:offset] + ellipsis
+            right = [right]
+
+        left = left[-4:]
+        right = right[:4]
+
+        if len(left) < num_left_words:
+            left = [ellipsis] + left
+
+        if len(right) < num_right_words:
+            right = right + [ellipsis]
+
+        left = ' '.join(left)
+        right = ' '.join(right)
+
+        if len(left) > max_num_char_fragment:
+            left = ellipsis + left[-30:]
+
+        if len(right) > max_num_char_fragment:
+            right = right[:30] + ellipsis
+
+    line_match_format = ('<span style="color:{0}">{{0}}'
+                         '<b>{{1}}</b>{{2}}</span>')
+    line_match_format = line_match_format.format(text_color)
+
+    left = html_escape(left)
+    right = html_escape(right)
+    match = html_escape(match)
+    trunc_line = line_match_format.format(left, match, right)
+    return trunc_line
+
+
 class SearchThread(QThread):
     """Find in files search thread."""
     sig_finished = Signal(bool)
@@ -136,9 +220,22 @@ def __init__(self, parent, search_text, text_color=None):
         self.results = {}
 
         self.num_files = 0
-        self.files = []
+        self.files = set()
         self.partial_results = []
 
+        self.use_ignore_files = True
+
+        # Search index
+        self.search_index = None
+        self.stale_files = set()
+
+        # Parallel search
+        self.num_processes = get_search_processes()
+        self.executor = None
+        self.futures = []
+        self.queued_files = []
+        self.num_files_searched = 0
+
     def initialize(self, path, is_file, exclude,
                    texts, text_re, case_sensitive):
         self.rootpath = path
@@ -164,6 +261,8 @@ def run(self):
             # (known QThread limitation/bug)
             traceback.print_exc()
             self.error_flag = _("Unexpected error: see internal console")
+        finally:
+            self._shutdown_executor()
         self.stop()
         self.sig_finished.emit(self.completed)
 
@@ -171,115 +270,169 @@ def stop(self):
         with QMutexLocker(self.mutex):
             self.stopped = True
 
+    def is_stopped(self):
+        with QMutexLocker(self.mutex):
+            return self.stopped
+
     def find_files_in_path(self, path):
         if self.pathlist is None:
             self.pathlist = []
         self.pathlist.append(path)
-        for path, dirs, files in os.walk(path):
-            with QMutexLocker(self.mutex):
-                if self.stopped:
+
+        # Use the index to only search files that can contain the text
+        index = self.search_index
+        candidates = None
+        indexed_files = set()
+        if index is not None:
+            if not index.loaded:
+                index.load()
+            required = get_query_trigrams(self.texts, self.text_re)
+            if required is not None:
+                candidates = index.query(required)
+
+        files = walk_files(path, exclude=self.exclude,
+                           use_ignore_files=self.use_ignore_files)
+        try:
+            for filename, stat in files:
+                if self.is_stopped():
                     return False
-            try:
-                for d in dirs[:]:
-                    with QMutexLocker(self.mutex):
-                        if self.stopped:
-                            return False
-                    dirname = os.path.join(path, d)
-                    if (self.exclude and
-                            re.search(self.exclude, dirname + os.sep)):
-                        dirs.remove(d)
-                    elif d == '.git' or d == '.hg':
-                        dirs.remove(d)
-                for f in files:
-                    with QMutexLocker(self.mutex):
-                        if self.stopped:
-                            return False
-                    filename = os.path.join(path, f)
-                    if self.exclude and re.search(self.exclude, filename):
+                if not is_text_file(filename, stat):
+                    continue
+                if index is not None:
+                    filename = osp.abspath(filename)
+                    indexed_files.add(filename)
+                    if not index.is_current(filename, stat):
+                        self.stale_files.add(filename)
+                    elif (candidates is not None
+                            and filename not in candidates):
                         continue
-                    if is_text_file(filename):
-                        self.find_string_in_file(filename)
-            except re.error:
-                self.error_flag = _("invalid regular expression")
-                return False
+                self._queue_file(filename)
+        except re.error:
+            self.error_flag = _("invalid regular expression")
+            return False
+
+        # Search files that are still queued and wait for the workers
+        self._flush_queue()
+        if not self._collect_results(wait=True):
+            return False
 
         # Process any pending results
         if self.partial_results:
             self.process_results()
 
+        if index is not None:
+            if osp.normpath(self.rootpath) == index.root:
+                index.prune(indexed_files)
+            index.save()
+
+        self.completed = True
         return True
 
     def find_string_in_file(self, fname):
         self.error_flag = False
         self.sig_current_file.emit(fname)
-        try:
-            for lineno, line in enumerate(open(fname, 'rb')):
-                for text, enc in self.texts:
-                    with QMutexLocker(self.mutex):
-                        if self.stopped:
-                            return False
-                    line_search = line
-                    if not self.case_sensitive:
-                        line_search = line_search.lower()
-                    if self.text_re:
-                        found = re.search(text, line_search)
-                        if found is not None:
-                            break
-                    else:
-                        found = line_search.find(text)
-                        if found > -1:
-                            break
-                try:
-                    line_dec = line.decode(enc)
-                except UnicodeDecodeError:
-                    line_dec = line
-
-                if not self.case_sensitive:
-                    line = line.lower()
-
-                if self.text_re:
-                    for match in re.finditer(text, line):
-                        with QMutexLocker(self.mutex):
-                            if self.stopped:
-                                return False
-                        self.total_matches += 1
-                        self.partial_results.append((osp.abspath(fname),
-                                                     lineno + 1,
-                                                     match.start(),
-                                                     match.end(),
-                                                     line_dec))
-                        if len(self.partial_results) > (2**self.power):
-                            self.process_results()
-                            if self.power < self.max_power:
-                                self.power += 1
-                else:
-                    found = line.find(text)
-                    while found > -1:
-                        with QMutexLocker(self.mutex):
-                            if self.stopped:
-                                return False
-                        self.total_matches += 1
-                        self.partial_results.append((osp.abspath(fname),
-                                                     lineno + 1,
-                                                     found,
-                                                     found + len(text),
-                                                     line_dec))
-                        if len(self.partial_results) > (2**self.power):
-                            self.process_results()
-                            if self.power < self.max_power:
-                                self.power += 1
-
-                        for text, enc in self.texts:
-                            found = line.find(text, found + 1)
-                            if found > -1:
-                                break
-
-        except IOError as xxx_todo_changeme:
-            (_errno, _strerror) = xxx_todo_changeme.args
-            self.error_flag = _("permission denied errors were encountered")
+        self._add_results(*search_files([fname], self.texts, self.text_re,
+                                        self.case_sensitive))
+
+        if self.partial_results:
+            self.process_results()
 
         self.completed = True
 
+    def _queue_file(self, filename):
+        """Queue a file to be searched."""
+        self.queued_files.append(filename)
+        if (self.num_files_searched < PARALLEL_THRESHOLD
+                or len(self.queued_files) >= CHUNK_SIZE):
+            self._flush_queue()
+
+    def _flush_queue(self):
+        """
+        Search queued files.
+
+        The first files are searched in this thread. After that, files are
+        sent in chunks to a pool of processes.
+        """
+        fnames = self.queued_files
+        if not fnames:
+            return
+
+        self.queued_files = []
+        self.num_files_searched += len(fnames)
+        index_fnames = self.stale_files.intersection(fnames)
+        search_args = (fnames, self.texts, self.text_re, self.case_sensitive,
+                       index_fnames)
+
+        if (self.num_files_searched <= PARALLEL_THRESHOLD
+                or self.num_processes < 2):
+            self._add_results(*search_files(*search_args))
+            return
+
+        if self.executor is None:
+            self.executor = create_search_executor(self.num_processes)
+        self.futures.append(self.executor.submit(search_files, *search_args))
+
+        # Stream results that are already available and keep a bounded
+        # number of chunks in flight.
+        self._collect_results(wait=False)
+        while (len(self.futures) > 2 * self.num_processes
+                and not self.is_stopped()):
+            self._collect_results(wait=True, first_only=True)
+
+    def _collect_results(self, wait=False, first_only=False):
+        """
+        Process the results of the chunks searched by worker processes.
+
+        Returns False if the search was stopped.
+        """
+        while self.futures:
+            if self.is_stopped():
+                return False
+
+            if wait:
+                done, __ = futures_wait(self.futures, timeout=0.1,
+                                        return_when=FIRST_COMPLETED)
+            else:
+                done = [future for future in self.futures if future.done()]
+                if not done:
+                    return True
+
+            for future in done:
+                self.futures.remove(future)
+                self._add_results(*future.result())
+
+            if first_only and done:
+                return True
+
+        return True
+
+    def _add_results(self, results, error=False, trigrams=None):
+        """Add results found by the search to the pending ones."""
+        if error:
+            self.error_flag = _("permission denied errors were encountered")
+
+        if trigrams and self.search_index is not None:
+            for fname, (size, mtime, file_trigrams) in trigrams.items():
+                self.search_index.add(fname, size, mtime, file_trigrams)
+                self.stale_files.discard(fname)
+
+        for result in results:
+            self.total_matches += 1
+            self.partial_results.append(result)
+            if len(self.partial_results) > (2**self.power):
+                self.process_results()
+                if self.power < self.max_power:
+                    self.power += 1
+
+    def _shutdown_executor(self):
+        """Cancel pending searches and stop worker processes."""
+        for future in self.futures:
+            future.cancel()
+        self.futures = []
+        if self.executor is not None:
+            self.executor.shutdown(wait=False)
+            self.executor = None
+
     def process_results(self):
         """
         Process all matches found inside a file.
@@ -287,25 +440,19 @@ def process_results(self):
         Creates the necessary files and emits signal for the creation of file
         item.
 
-        Creates the necessary data for lines found and emits signal for the
-        creation of line items in batch.
+        Emits signal for the creation of line items in batch. Their text is
+        only rendered by the results model when they are shown.
 
         Creates the title based on the last entry of the lines batch.
         """
-        items = []
         num_matches = self.total_matches
-        for result in self.partial_results:
-            filename, lineno, colno, match_end, line = result
-
+        items = self.partial_results
+        for filename, __, __, __, __ in items:
             if filename not in self.files:
-                self.files.append(filename)
+                self.files.add(filename)
                 self.sig_file_match.emit(filename)
                 self.num_files += 1
 
-            line = self.truncate_result(line, colno, match_end)
-            item = (filename, lineno, colno, line)
-            items.append(item)
-
         # Process title
         title = "'%s' - " % self.search_text
         nb_files = self.num_files
@@ -327,73 +474,7 @@ def truncate_result(self, line, start, end):
         """
         Shorten text on line to display the match within `max_line_length`.
         """
-        ellipsis = '...'
-        max_line_length = 80
-        max_num_char_fragment = 40
-
-        html_escape_table = {
-            "&": "&amp;",
-            '"': "&quot;",
-            "'": "&apos;",
-            ">": "&gt;",
-            "<": "&lt;",
-        }
-
-        def html_escape(text):
-            """Produce entities within text."""
-            return "".join(html_escape_table.get(c, c) for c in text)
-
-        line = str(line)
-        left, match, right = line[:start], line[start:end], line[end:]
-
-        if len(line) > max_line_length:
-            offset = (len(line) - len(match)) // 2
-
-            left = left.split(' ')
-            num_left_words = len(left)
-
-            if num_left_words == 1:
-                left = left[0]
-                if len(left) > max_num_char_fragment:
-                    left = ellipsis + left[-offset:]
-                left = [left]
-
-            right = right.split(' ')
-            num_right_words = len(right)
-
-            if num_right_words == 1:
-                right = right[0]
-                if len(right) > max_num_char_fragment:
-                    right = right[:offset] + ellipsis
-                right = [right]
-
-            left = left[-4:]
-            right = right[:4]
-
-            if len(left) < num_left_words:
-                left = [ellipsis] + left
-
-            if len(right) < num_right_words:
-                right = right + [ellipsis]
-
-            left = ' '.join(left)
-            right = ' '.join(right)
-
-            if len(left) > max_num_char_fragment:
-                left = ellipsis + left[-30:]
-
-            if len(right) > max_num_char_fragment:
-                right = right[:30] + ellipsis
-
-        line_match_format = ('<span style="color:{0}">{{0}}'
-                             '<b>{{1}}</b>{{2}}</span>')
-        line_match_format = line_match_format.format(self.text_color)
-
-        left = html_escape(left)
-        right = html_escape(right)
-        match = html_escape(match)
-        trunc_line = line_match_format.format(left, match, right)
-        return trunc_line
+        return truncate_result(line, start, end, self.text_color)
 
     def get_results(self):
         return self.results, self.pathlist, self.total_matches, self.error_flag
@@ -580,69 +661,212 @@ def eventFilter(self, widget, event):
         return QComboBox.eventFilter(self, widget, event)
 
 
-class LineMatchItem(QTreeWidgetItem):
+class FileResults:
+    """Matches of the search in a single file, stored in compact arrays."""
 
-    def __init__(self, parent, lineno, colno, match, font,
-                 text_color=None):
-        self.lineno = lineno
-        self.colno = colno
-        self.match = match
-        self.text_color = text_color
-        self.font = font
-        super().__init__(parent, [self.__repr__()], QTreeWidgetItem.Type)
+    __slots__ = ('row', 'filename', 'linenos', 'colnos', 'ends', 'lines')
 
-    def __repr__(self):
-        match = str(self.match).rstrip()
-        _str = ("<!-- LineMatchItem -->"
-                "<p style=\"color:'{4}';\"><b>{1}</b> ({2}): "
-                "<span style='font-family:{0};"
-                "font-size:75%;'>{3}</span></p>")
-        return _str.format(self.font.family(), self.lineno, self.colno, match,
-                           self.text_color)
+    def __init__(self, row, filename):
+        self.row = row
+        self.filename = filename
+        self.linenos = array('I')
+        self.colnos = array('I')
+        self.ends = array('I')
+        # Matches in the same line share the same string
+        self.lines = []
+
+    def __len__(self):
+        return len(self.linenos)
 
-    def __unicode__(self):
-        return self.__repr__()
 
-    def __str__(self):
-        return self.__repr__()
+class SearchResultsModel(QAbstractItemModel):
+    """
+    Two-level model with the files and line matches of a search.
 
-    def __lt__(self, x):
-        return self.lineno < x.lineno
+    Top level indexes correspond to files and don't have an internal
+    pointer. Match indexes have the `FileResults` of their file as internal
+    pointer. The HTML shown for each row is only rendered when the view
+    asks for it, i.e. for visible rows.
+    """
 
-    def __ge__(self, x):
-        return self.lineno >= x.lineno
+    def __init__(self, parent, text_color=None):
+        super().__init__(parent)
+        self.text_color = text_color
+        self.title = ''
+        self.font = get_font()
+        self.files = []
+        self.files_by_name = {}
+        self.num_matches = 0
 
+    # --- Qt API
+    # ------------------------------------------------------------------------
+    def index(self, row, column, parent=QModelIndex()):
+        if not self.hasIndex(row, column, parent):
+            return QModelIndex()
+        if not parent.isValid():
+            return self.createIndex(row, column)
+        return self.createIndex(row, column, self.files[parent.row()])
+
+    def parent(self, index):
+        if not index.isValid():
+            return QModelIndex()
+        file_results = index.internalPointer()
+        if file_results is None:
+            return QModelIndex()
+        return self.createIndex(file_results.row, 0)
+
+    def rowCount(self, parent=QModelIndex()):
+        if not parent.isValid():
+            return len(self.files)
+        if parent.internalPointer() is None:
+            return len(self.files[parent.row()])
+        return 0
+
+    def columnCount(self, parent=QModelIndex()):
+        return 1
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return to_qvariant()
+
+        file_results = index.internalPointer()
+        if file_results is None:
+            file_results = self.files[index.row()]
+            if role == Qt.DisplayRole:
+                return self._render_file(file_results.filename)
+            elif role == Qt.ToolTipRole:
+                return file_results.filename
+        elif role == Qt.DisplayRole:
+            return self._render_match(file_results, index.row())
+        return to_qvariant()
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self.title
+        return to_qvariant()
+
+    def sort(self, column, order=Qt.AscendingOrder):
+        """Sort files by name."""
+        self.layoutAboutToBeChanged.emit()
+        old_files = list(self.files)
+        self.files.sort(key=lambda f: osp.basename(f.filename),
+                        reverse=(order == Qt.DescendingOrder))
+        for row, file_results in enumerate(self.files):
+            file_results.row = row
+
+        # Update the persistent indexes (e.g. the expanded ones) of files
+        new_rows = [file_results.row for file_results in old_files]
+        for index in self.persistentIndexList():
+            if index.isValid() and index.internalPointer() is None:
+                self.changePersistentIndex(
+                    index,
+                    self.createIndex(new_rows[index.row()], 0))
+        self.layoutChanged.emit()
 
-class FileMatchItem(QTreeWidgetItem):
+    # --- Public API
+    # ------------------------------------------------------------------------
+    def clear(self):
+        """Remove all results."""
+        self.beginResetModel()
+        self.font = get_font()
+        self.files = []
+        self.files_by_name = {}
+        self.num_matches = 0
+        self.endResetModel()
+
+    def set_title(self, title):
+        """Set the header title."""
+        self.title = title
+        self.headerDataChanged.emit(Qt.Horizontal, 0, 0)
+
+    def add_file(self, filename):
+        """Add a file and return its index."""
+        file_results = self.files_by_name.get(filename)
+        if file_results is None:
+            row = len(self.files)
+            self.beginInsertRows(QModelIndex(), row, row)
+            file_results = FileResults(row, filename)
+            self.files.append(file_results)
+            self.files_by_name[filename] = file_results
+            self.endInsertRows()
+        return self.createIndex(file_results.row, 0)
+
+    def add_matches(self, items):
+        """
+        Add a batch of matches.
 
-    def __init__(self, parent, filename, sorting, text_color=None):
+        Parameters
+        ----------
+        items: list
+            List of (filename, lineno, colno, match_end, line) tuples.
+            Their files need to be added first with `add_file`.
+        """
+        groups = []
+        for item in items:
+            file_results = self.files_by_name.get(item[0])
+            if file_results is None:
+                continue
+            if groups and groups[-1][0] is file_results:
+                groups[-1][1].append(item)
+            else:
+                groups.append((file_results, [item]))
+
+        for file_results, file_items in groups:
+            parent = self.createIndex(file_results.row, 0)
+            first = len(file_results)
+            self.beginInsertRows(parent, first, first + len(file_items) - 1)
+            for __, lineno, colno, match_end, line in file_items:
+                file_results.linenos.append(lineno)
+                file_results.colnos.append(colno)
+                file_results.ends.append(match_end)
+                file_results.lines.append(line)
+            self.num_matches += len(file_items)
+            self.endInsertRows()
+
+    def get_location(self, index):
+        """Return the (filename, lineno, colno) of a match index."""
+        if not index.isValid():
+            return None
+        file_results = index.internalPointer()
+        if file_results is None:
+            return None
+        row = index.row()
+        return (file_results.filename, file_results.linenos[row],
+                file_results.colnos[row])
 
-        self.sorting = sorting
-        self.filename = osp.basename(filename)
+    def get_results(self):
+        """Return the (filename, lineno, colno) of all matches."""
+        results = []
+        for file_results in self.files:
+            filename = file_results.filename
+            results.extend(zip([filename] * len(file_results),
+                               file_results.linenos, file_results.colnos))
+        return results
 
+    # --- Private API
+    # ------------------------------------------------------------------------
+    def _render_file(self, filename):
         title_format = ('<!-- FileMatchItem -->'
                         '<b style="color:{2}">{0}</b>'
                         '&nbsp;&nbsp;&nbsp;'
                         '<small style="color:{2}"><em>{1}</em>'
                         '</small>')
-        title = (title_format.format(osp.basename(filename),
-                                     osp.dirname(filename),
-                                     text_color))
-        super().__init__(parent, [title], QTreeWidgetItem.Type)
-
-        self.setToolTip(0, filename)
-
-    def __lt__(self, x):
-        if self.sorting['status'] == ON:
-            return self.filename < x.filename
-        else:
-            return False
-
-    def __ge__(self, x):
-        if self.sorting['status'] == ON:
-            return self.filename >= x.filename
-        else:
-            return False
+        return title_format.format(osp.basename(filename),
+                                   osp.dirname(filename),
+                                   self.text_color)
+
+    def _render_match(self, file_results, row):
+        line = truncate_result(file_results.lines[row],
+                               file_results.colnos[row],
+                               file_results.ends[row],
+                               self.text_color)
+        _str = ("<!-- LineMatchItem -->"
+                "<p style=\"color:'{4}';\"><b>{1}</b> ({2}): "
+                "<span style='font-family:{0};"
+                "font-size:75%;'>{3}</span></p>")
+        return _str.format(self.font.family(), file_results.linenos[row],
+                           file_results.colnos[row], line.rstrip(),
+                           self.text_color)
 
 
 class ItemDelegate(QStyledItemDelegate):
@@ -689,48 +913,91 @@ def sizeHint(self, option, index):
         return size
 
 
-class ResultsBrowser(OneColumnTree):
+class ResultsBrowser(QTreeView, SpyderWidgetMixin):
     sig_edit_goto_requested = Signal(str, int, str)
     sig_max_results_reached = Signal()
 
     def __init__(self, parent, text_color=None, max_results=1000):
         super().__init__(parent)
         self.search_text = None
-        self.results = None
         self.max_results = max_results
-        self.total_matches = None
-        self.error_flag = None
-        self.completed = None
         self.sorting = {}
-        self.font = get_font()
-        self.data = None
-        self.files = None
-        self.root_items = None
         self.text_color = text_color
+        self.results_model = SearchResultsModel(self, text_color=text_color)
+
+        # Widgets
+        self.menu = self.create_menu("context_menu")
+        self.collapse_all_action = self.create_action(
+            OneColumnTreeActions.CollapseAllAction,
+            text=_("Collapse all"),
+            icon=self.create_icon("collapse"),
+            triggered=self.collapseAll,
+            register_shortcut=False,
+        )
+        self.expand_all_action = self.create_action(
+            OneColumnTreeActions.ExpandAllAction,
+            text=_("Expand all"),
+            icon=self.create_icon("expand"),
+            triggered=self.expandAll,
+            register_shortcut=False,
+        )
+        for item in [self.collapse_all_action, self.expand_all_action]:
+            self.add_item_to_menu(
+                item,
+                self.menu,
+                section=OneColumnTreeContextMenuSections.Global,
+            )
 
         # Setup
+        self.setModel(self.results_model)
+        self.setItemsExpandable(True)
         self.set_title('')
         self.set_sorting(OFF)
         self.setSortingEnabled(False)
         self.setItemDelegate(ItemDelegate(self))
         self.setUniformRowHeights(True)  # Needed for performance
-        self.sortByColumn(0, Qt.AscendingOrder)
-
-        # Only show the actions for collaps/expand all entries in the widget
-        # For further information see spyder-ide/spyder#13178
-        self.common_actions = self.common_actions[:2]
+        self.header().setSortIndicator(0, Qt.AscendingOrder)
 
         # Signals
         self.header().sectionClicked.connect(self.sort_section)
+        self.activated.connect(self.activated_index)
+        self.clicked.connect(self.activated_index)
+
+    # --- SpyderWidgetMixin API
+    # ------------------------------------------------------------------------
+    def setup(self, options={}):
+        pass
+
+    def on_option_update(self, option, value):
+        pass
+
+    def update_actions(self):
+        pass
+
+    # --- Qt methods
+    # ------------------------------------------------------------------------
+    def contextMenuEvent(self, event):
+        """Override Qt method"""
+        self.menu.popup(event.globalPos())
 
-    def activated(self, item):
-        """Double-click event."""
-        itemdata = self.data.get(id(self.currentItem()))
-        if itemdata is not None:
-            filename, lineno, colno = itemdata
+    # --- Public API
+    # ------------------------------------------------------------------------
+    @property
+    def num_results(self):
+        """Number of matches shown."""
+        return self.results_model.num_matches
+
+    def activated_index(self, index):
+        """Double-click or click event."""
+        location = self.results_model.get_location(index)
+        if location is not None:
+            filename, lineno, colno = location
             self.sig_edit_goto_requested.emit(filename, lineno,
                                               self.search_text)
 
+    def set_title(self, title):
+        self.results_model.set_title(title)
+
     def set_sorting(self, flag):
         """Enable result sorting after search is complete."""
         self.sorting['status'] = flag
@@ -738,57 +1005,44 @@ def set_sorting(self, flag):
 
     @Slot(int)
     def sort_section(self, idx):
-        self.setSortingEnabled(True)
-
-    def clicked(self, item):
-        """Click event."""
-        self.activated(item)
+        if self.sorting['status'] == ON:
+            self.setSortingEnabled(True)
 
     def clear_title(self, search_text):
-        self.font = get_font()
-        self.clear()
         self.setSortingEnabled(False)
-        self.num_files = 0
-        self.data = {}
-        self.files = {}
+        self.results_model.clear()
         self.set_sorting(OFF)
         self.search_text = search_text
         title = "'%s' - " % search_text
         text = _('String not found')
         self.set_title(title + text)
 
+    def get_results(self):
+        """Return the (filename, lineno, colno) of all matches."""
+        return self.results_model.get_results()
+
     @Slot(object)
     def append_file_result(self, filename):
         """Real-time update of file items."""
-        if len(self.data) < self.max_results:
-            self.files[filename] = FileMatchItem(
-                self, filename, self.sorting, self.text_color)
-            self.files[filename].setExpanded(True)
-            self.num_files += 1
+        if self.num_results < self.max_results:
+            index = self.results_model.add_file(filename)
+            self.expand(index)
 
     @Slot(object, object)
     def append_result(self, items, title):
         """Real-time update of line items."""
-        if len(self.data) >= self.max_results:
+        if self.num_results >= self.max_results:
             self.set_title(_('Maximum number of results reached! Try '
                              'narrowing the search.'))
             self.sig_max_results_reached.emit()
             return
 
-        available = self.max_results - len(self.data)
+        available = self.max_results - self.num_results
         if available < len(items):
             items = items[:available]
 
-        self.setUpdatesEnabled(False)
         self.set_title(title)
-        for item in items:
-            filename, lineno, colno, line = item
-            file_item = self.files.get(filename, None)
-            if file_item:
-                item = LineMatchItem(file_item, lineno, colno, line,
-                                     self.font, self.text_color)
-                self.data[id(item)] = (filename, lineno, colno)
-        self.setUpdatesEnabled(True)
+        self.results_model.add_matches(items)
 
     def set_max_results(self, value):
         """Set maximum amount of results to add."""
@@ -813,6 +1067,8 @@ class FindInFilesWidget(PluginMainWidget):
         'search_in_index': None,
         'search_text': '',
         'search_text_regexp': False,
+        'search_index': False,
+        'use_ignore_files': True,
         'supported_encodings': ("utf-8", "iso-8859-1", "cp1252"),
         'text_color': MAIN_TEXT_COLOR,
     }
@@ -855,6 +1111,7 @@ def __init__(self, name=None, plugin=None, parent=None,
         self.text_color = self.get_option('text_color')
         self.supported_encodings = self.get_option('supported_encodings')
         self.search_thread = None
+        self.search_index = None
         self.running = False
         self.more_options_action = None
         self.extras_toolbar = None
@@ -985,6 +1242,22 @@ def setup(self, options=DEFAULT_OPTIONS):
             tip=_('Set maximum number of results'),
             triggered=lambda x=None: self.set_max_results(),
         )
+        self.ignore_files_action = self.create_action(
+            FindInFilesWidgetActions.ToggleIgnoreFiles,
+            text=_('Skip files ignored by version control'),
+            tip=_('Skip the files and directories listed in .gitignore '
+                  'and .ignore files'),
+            toggled=lambda val: self.set_option('use_ignore_files', val),
+            initial=self.get_option('use_ignore_files'),
+        )
+        self.search_index_action = self.create_action(
+            FindInFilesWidgetActions.ToggleSearchIndex,
+            text=_('Index project files'),
+            tip=_('Keep an index of the project files to speed up '
+                  'searches in them'),
+            toggled=lambda val: self.set_option('search_index', val),
+            initial=self.get_option('search_index'),
+        )
 
         # Toolbar
         toolbar = self.get_main_toolbar()
@@ -1019,10 +1292,13 @@ def setup(self, options=DEFAULT_OPTIONS):
             )
 
         menu = self.get_options_menu()
-        self.add_item_to_menu(
-            self.set_max_results_action,
-            menu=menu,
-        )
+        for item in [self.set_max_results_action,
+                     self.ignore_files_action,
+                     self.search_index_action]:
+            self.add_item_to_menu(
+                item,
+                menu=menu,
+            )
 
     def update_actions(self):
         stop_text = _('Stop')
@@ -1073,6 +1349,9 @@ def on_option_update(self, option, value):
         elif option == 'max_results':
             self.result_browser.set_max_results(value)
 
+        elif option == 'search_index' and not value:
+            self.search_index = None
+
     # --- Private API
     # ------------------------------------------------------------------------
     def _update_size(self, size, old_size):
@@ -1166,6 +1445,25 @@ def _update_options(self):
         self.set_option(
             'search_in_index', self.path_selection_combo.currentIndex())
 
+    def _get_search_index(self, path):
+        """
+        Return the search index to use when searching in `path`.
+
+        Only the project directory is indexed.
+        """
+        project_path = self.project_path
+        if (not self.get_option('search_index') or project_path is None
+                or osp.normpath(path) != osp.normpath(project_path)):
+            return None
+
+        root = osp.normpath(project_path)
+        if self.search_index is None or self.search_index.root != root:
+            name = hashlib.md5(root.encode('utf-8')).hexdigest()
+            index_path = get_conf_path(
+                osp.join('find_in_files', 'index', name + '.pickle'))
+            self.search_index = TrigramIndex(root, index_path)
+        return self.search_index
+
     def _handle_search_complete(self, completed):
         """
         Current search thread has finished.
@@ -1317,7 +1615,12 @@ def start(self):
             self.result_browser.append_result
         )
         self.result_browser.clear_title(search_text)
-        self.search_thread.initialize(*self._get_options())
+        self.search_thread.initialize(*options)
+        self.search_thread.use_ignore_files = self.get_option(
+            'use_ignore_files')
+        if not options[1]:
+            self.search_thread.search_index = self._get_search_index(
+                options[0])
         self.search_thread.start()
         self.update_actions()
 
@@ -1349,7 +1652,7 @@ def set_max_results(self, value=None):
             dialog.setWindowTitle(self.get_name())
             dialog.setLabelText(_('Set maximum number of results: '))
             dialog.setInputMode(QInputDialog.IntInput)
-            dialog.setIntRange(1, 10000)
+            dialog.setIntRange(1, 1000000)
             dialog.setIntStep(1)
             dialog.setIntValue(self.get_option('max_results'))
 
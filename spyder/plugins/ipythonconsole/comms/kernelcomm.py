@@ -32,6 +32,7 @@ class KernelComm(CommBase, QObject):
     """
 
     _sig_got_reply = Signal()
+    _sig_got_progress = Signal()
     _sig_comm_port_changed = Signal()
     sig_exception_occurred = Signal(dict)
 
@@ -124,6 +125,9 @@ def on_incoming_call(self, call_dict):
         """A call was received"""
         if "comm_port" in call_dict:
             self._set_comm_port(call_dict["comm_port"])
+        # Calls from the kernel, like progress reports, show it is still
+        # working on a pending request
+        self._sig_got_progress.emit()
         return super(KernelComm, self).on_incoming_call(call_dict)
 
     def _get_call_return_value(self, call_dict, call_data, comm_id):
@@ -210,6 +214,10 @@ def _wait(self, condition, signal, timeout_msg, timeout):
         self.kernel_client.hb_channel.kernel_died.connect(wait_loop.quit)
         signal.connect(wait_loop.quit)
 
+        # Wait as long as the kernel reports progress, e.g. by sending parts
+        # of streamed messages
+        self._sig_got_progress.connect(wait_timeout.start)
+
         # Wait until the kernel returns the value
         wait_timeout.start(timeout * 1000)
         while not condition():
@@ -217,6 +225,7 @@ def _wait(self, condition, signal, timeout_msg, timeout):
                 signal.disconnect(wait_loop.quit)
                 self.kernel_client.hb_channel.kernel_died.disconnect(
                     wait_loop.quit)
+                self._sig_got_progress.disconnect(wait_timeout.start)
                 if condition():
                     return
                 if not self.kernel_client.is_alive():
@@ -228,6 +237,11 @@ def _wait(self, condition, signal, timeout_msg, timeout):
         signal.disconnect(wait_loop.quit)
         self.kernel_client.hb_channel.kernel_died.disconnect(
             wait_loop.quit)
+        self._sig_got_progress.disconnect(wait_timeout.start)
+
+    def on_incoming_chunk(self, chunk):
+        """A part of a streamed message was received"""
+        self._sig_got_progress.emit()
 
     def _handle_remote_call_reply(self, msg_dict, buffer):
         """
@@ -13,11 +13,13 @@
 import os
 
 # Test imports
+import numpy as np
 import pytest
 
 
 # Local imports
 from spyder_kernels.utils.test_utils import get_kernel
+from spyder_kernels.comms import commbase
 from spyder_kernels.comms.frontendcomm import FrontendComm
 from spyder.plugins.ipythonconsole.comms.kernelcomm import KernelComm
 
@@ -181,5 +183,65 @@ def handler(a, b):
     assert res == 'ab'
 
 
+@pytest.mark.skipif(os.name == 'nt', reason="Hangs on Windows")
+def test_streamed_message(comms, monkeypatch):
+    """Test that large messages are streamed in several parts."""
+    commsend, commrecv = comms
+    monkeypatch.setattr(commbase, 'CHUNK_SIZE', 1000)
+    for comm_id in commsend._comms:
+        commsend._comms[comm_id]['streaming'] = True
+
+    received_messages = []
+
+    def handler(msg_dict, buffer):
+        received_messages.append(buffer)
+
+    commrecv._register_message_handler('test_message', handler)
+
+    chunks = []
+    monkeypatch.setattr(commrecv, 'on_incoming_chunk', chunks.append)
+
+    data = {'a': np.arange(1000), 'b': np.zeros(0), 'c': 'c' * 5000}
+    commsend._send_message('test_message', data=data)
+    assert len(chunks) > 1
+    assert len(received_messages) == 1
+    assert (received_messages[0]['a'] == data['a']).all()
+    assert received_messages[0]['b'].size == 0
+    assert received_messages[0]['c'] == data['c']
+    assert not commrecv._streams
+
+
+@pytest.mark.skipif(os.name == 'nt', reason="Hangs on Windows")
+def test_incomplete_streams(comms, monkeypatch):
+    """Test that message streams that are not completed are dropped."""
+    commsend, commrecv = comms
+    monkeypatch.setattr(commbase, 'CHUNK_SIZE', 1000)
+    for comm_id in commsend._comms:
+        commsend._comms[comm_id]['streaming'] = True
+        comm = commsend._comms[comm_id]['comm']
+    commrecv._register_message_handler('test_message', lambda *args: None)
+
+    # Only send the first part of the messages
+    send = comm.send
+
+    def send_first_part(msg_dict, buffers=None):
+        if msg_dict['chunk']['index'] == 0:
+            send(msg_dict, buffers)
+
+    monkeypatch.setattr(comm, 'send', send_first_part)
+    commsend._send_message('test_message', data='a' * 5000)
+    commsend._send_message('test_message', data='b' * 5000)
+    assert len(commrecv._streams) == 2
+
+    # Stale streams are dropped when a new one starts
+    monkeypatch.setattr(commbase, 'STREAM_TIMEOUT', -1)
+    commsend._send_message('test_message', data='c' * 5000)
+    assert len(commrecv._streams) == 1
+
+    # Streams are dropped when their comm is closed
+    commsend.close()
+    assert not commrecv._streams
+
+
 if __name__ == "__main__":
     pytest.main()
@@ -49,6 +49,12 @@ class NamepaceBrowserWidget(RichJupyterWidget):
     # To save values and messages returned by the kernel
     _kernel_is_starting = True
 
+    # Namespace view and variable properties built from the diffs sent by
+    # the kernel, and the generation of the last diff applied to them
+    _namespace_view = None
+    _var_properties = None
+    _namespace_view_generation = None
+
     # --- Public API --------------------------------------------------
     def set_namespacebrowser(self, namespacebrowser):
         """Set namespace browser widget"""
@@ -61,12 +67,38 @@ def refresh_namespacebrowser(self, interrupt=True):
         if self.namespacebrowser:
             self.call_kernel(
                 interrupt=interrupt,
-                callback=self.set_namespace_view
-            ).get_namespace_view()
-            self.call_kernel(
-                interrupt=interrupt,
-                callback=self.set_var_properties
-            ).get_var_properties()
+                callback=self.set_namespace_view_diff
+            ).get_namespace_view_diff(self._namespace_view_generation)
+
+    def set_namespace_view_diff(self, diff):
+        """
+        Apply the changes in the namespace view and the properties of its
+        variables sent by the kernel.
+        """
+        if diff is None:
+            return
+
+        # New dicts are needed because the namespace browser compares them
+        # with the ones it already has
+        if diff['full'] or self._namespace_view is None:
+            view = {}
+            properties = {}
+        else:
+            view = self._namespace_view.copy()
+            properties = self._var_properties.copy()
+        for name in diff['removed']:
+            view.pop(name, None)
+            properties.pop(name, None)
+        for entries in (diff['added'], diff['changed']):
+            for name, entry in entries.items():
+                view[name] = entry['view']
+                properties[name] = entry['properties']
+
+        self._namespace_view = view
+        self._var_properties = properties
+        self._namespace_view_generation = diff['generation']
+        self.set_namespace_view(view)
+        self.set_var_properties(properties)
 
     def set_namespace_view(self, view):
         """Set the current namespace view."""
@@ -114,6 +146,23 @@ def get_value(self, name):
         except Exception:
             raise ValueError(msg % reason_other)
 
+    def open_data_view(self, name):
+        """
+        Ask kernel to open a view of a variable, so that its editor only
+        gets the parts of it that it shows.
+
+        Return the information about the view, or None if the kernel can't
+        open one for this variable.
+        """
+        try:
+            return self.call_kernel(
+                blocking=True,
+                display_error=True,
+                timeout=CALL_KERNEL_TIMEOUT).open_data_view(name)
+        except Exception:
+            # The value will be requested instead
+            return None
+
     def set_value(self, name, value):
         """Set value for a variable"""
         self.call_kernel(
@@ -181,6 +230,11 @@ def save_namespace(self, filename):
         except (UnpicklingError, RuntimeError, CommError):
             return None
 
+    def set_save_progress(self, saved, total):
+        """Show the progress of save_namespace."""
+        if self.namespacebrowser is not None:
+            self.namespacebrowser.set_save_progress(saved, total)
+
     # ---- Private API (overrode by us) ----------------------------
     def _handle_execute_reply(self, msg):
         """
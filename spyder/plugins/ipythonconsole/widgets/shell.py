@@ -111,6 +111,7 @@ def __init__(self, ipyclient, additional_options, interpreter_versions,
             'do_where': self.do_where,
             'pdb_input': self.pdb_input,
             'request_interrupt_eventloop': self.request_interrupt_eventloop,
+            'set_save_progress': self.set_save_progress,
         }
         for request_id in handlers:
             self.spyder_kernel_comm.register_call_handler(
@@ -275,6 +275,59 @@ def test_go_to_last_item(create_outlineexplorer, qtbot):
     assert outlineexplorer.treewidget.currentItem().text(0) == 'method1'
 
 
+def test_update_tree_incrementally(create_outlineexplorer, qtbot):
+    """
+    Test that updating the symbols only changes the items of the ones that
+    were added, removed or shifted.
+    """
+    outlineexplorer, expected_tree = create_outlineexplorer('text')
+    treewidget = outlineexplorer.treewidget
+    editor = treewidget.current_editor
+    editor_id = editor.get_id()
+    root = treewidget.editor_items[editor_id]
+    symbol_info = json.load(open(CASES['text']['data'], 'r'))
+
+    items = {}
+    for node in treewidget.editor_symbols[editor_id].values():
+        items[(node.name, node.position)] = node.node
+    first = root.children[0]
+    first.node.setExpanded(True)
+
+    # Add a function at the top of the file, shifting the others two lines
+    for symbol in symbol_info:
+        symbol_range = symbol['location']['range']
+        symbol_range['start']['line'] += 2
+        symbol_range['end']['line'] += 2
+    new_symbol = {
+        'name': 'new_function',
+        'kind': 12,
+        'location': {'range': {'start': {'line': 0, 'character': 0},
+                               'end': {'line': 1, 'character': 0}}}
+    }
+    treewidget.update_tree([new_symbol] + symbol_info, editor_id, 'python')
+
+    assert root.children[0].name == 'new_function'
+    assert root.children[1] is first
+    assert first.node.isExpanded()
+    for node in treewidget.editor_symbols[editor_id].values():
+        if node.name != 'new_function':
+            start, end = node.position
+            assert node.node is items[(node.name, (start - 2, end - 2))]
+            assert 'Line {}:'.format(start + 1) in node.node.toolTip(0)
+
+    # Remove it again
+    for symbol in symbol_info:
+        symbol_range = symbol['location']['range']
+        symbol_range['start']['line'] -= 2
+        symbol_range['end']['line'] -= 2
+    treewidget.update_tree(symbol_info, editor_id, 'python')
+    assert root.children[0] is first
+    assert first.node.isExpanded()
+    assert len(treewidget.editor_tree_cache[editor_id]) == len(
+        treewidget.editor_symbols[editor_id])
+    assert not treewidget.update_tree(symbol_info, editor_id, 'python')
+
+
 @pytest.mark.skip(reason='Cell support is disabled temporarily')
 def test_code_cell_grouping(create_outlineexplorer):
     """
@@ -7,12 +7,11 @@
 """Outline explorer widgets."""
 
 # Standard library imports
-import bisect
 import os.path as osp
 import uuid
 
 # Third party imports
-from intervaltree import IntervalTree
+from intervaltree import Interval, IntervalTree
 from qtpy.compat import from_qvariant
 from qtpy.QtCore import QSize, Qt, QTimer, Signal, Slot
 from qtpy.QtWidgets import (QHBoxLayout, QTreeWidgetItem, QWidget,
@@ -65,10 +64,6 @@
 ICON_CACHE = {}
 
 
-def line_span(position):
-    return position[1] - position[0] + 1
-
-
 class SymbolStatus:
     def __init__(self, name, kind, position, path, node=None):
         self.name = name
@@ -83,72 +78,54 @@ def __init__(self, name, kind, position, path, node=None):
         self.selected = False
         self.parent = None
 
-    def delete(self):
-        for child in self.children:
-            child.parent = None
-
-        self.children = []
-        self.node.takeChildren()
-
-        if self.parent is not None:
-            self.parent.remove_node(self)
-            self.parent = None
+    def set_position(self, position):
+        """Set the position of the symbol when its lines are shifted."""
+        if position[0] != self.position[0]:
+            self.node.set_line(self.name, self.kind, position[0] + 1)
+        self.position = position
 
-        if self.node.parent is not None:
-            self.node.parent.remove_children(self.node)
+    def set_children(self, children):
+        """
+        Set the children of this symbol.
 
-    def add_node(self, node):
-        if node.position == self.position:
-            # The nodes should be at the same level
-            self.parent.add_node(node)
+        Only the tree items of the children that were added or removed are
+        updated, unless the order of the others changed.
+        """
+        new_children = set(children)
+        for child in self.children:
+            if child not in new_children:
+                self.node.remove_children(child.node)
+                child.parent = None
+        old_children = set(self.children)
+        kept = [child for child in self.children if child in new_children]
+        if kept == [child for child in children if child in old_children]:
+            for index, child in enumerate(children):
+                if child not in old_children:
+                    self.node.append_children(index, child.node)
         else:
-            node.parent = self
-            node.path = self.path
-            this_node = self.node
-            children_ranges = [c.position[0] for c in self.children]
-            node_range = node.position[0]
-            new_index = bisect.bisect_left(children_ranges, node_range)
-            node.index = new_index
-            for child in self.children[new_index:]:
-                child.index += 1
-            this_node.append_children(new_index, node.node)
-            self.children.insert(new_index, node)
-            for idx, next_idx in zip(self.children, self.children[1:]):
-                assert idx.index < next_idx.index
-
-    def remove_node(self, node):
-        for child in self.children[node.index + 1:]:
-            child.index -= 1
-        self.children.pop(node.index)
-        for idx, next_idx in zip(self.children, self.children[1:]):
-            assert idx.index < next_idx.index
-
-    def clone_node(self, node):
-        self.id = node.id
-        self.index = node.index
-        self.path = node.path
-        self.children = node.children
-        self.status = node.status
-        self.selected = node.selected
-        self.node = node.node
-        self.parent = node.parent
-        self.node.update_info(self.name, self.kind, self.position[0] + 1,
-                              self.status, self.selected)
-        self.node.ref = self
+            # Some children were moved
+            self.node.takeChildren()
+            self.node.addChildren([child.node for child in children])
+            for child in children:
+                child.restore_expanded_state()
 
-        for child in self.children:
+        for index, child in enumerate(children):
             child.parent = self
-
-        if self.parent is not None:
-            self.parent.replace_node(self.index, self)
+            child.path = self.path
+            child.index = index
+            child.node.parent = self.node
+        self.children = children
+
+    def restore_expanded_state(self):
+        """Expand the tree items of this symbol and its children again."""
+        self.node.setExpanded(self.status)
+        for child in self.children:
+            child.restore_expanded_state()
 
     def refresh(self):
         self.node.update_info(self.name, self.kind, self.position[0] + 1,
                               self.status, self.selected)
 
-    def replace_node(self, index, node):
-        self.children[index] = node
-
     def create_node(self):
         self.node = SymbolItem(None, self, self.name, self.kind,
                                self.position[0] + 1, self.status,
@@ -204,15 +181,19 @@ def __init__(self, parent, ref, name, kind, position, status, selected):
 
     def update_info(self, name, kind, position, status, selected):
         self.setIcon(0, ima.icon(SYMBOL_KIND_ICON.get(kind, 'no_match')))
-        identifier = SYMBOL_NAME_MAP.get(kind, '')
-        identifier = identifier.replace('_', ' ').capitalize()
-        self.setToolTip(0, '{3} {2}: {0} {1}'.format(
-            identifier, name, position, _('Line')))
+        self.set_line(name, kind, position)
         set_item_user_text(self, name)
         self.setText(0, name)
         self.setExpanded(status)
         self.setSelected(selected)
 
+    def set_line(self, name, kind, position):
+        """Show the line of the symbol in the tooltip."""
+        identifier = SYMBOL_NAME_MAP.get(kind, '')
+        identifier = identifier.replace('_', ' ').capitalize()
+        self.setToolTip(0, '{3} {2}: {0} {1}'.format(
+            identifier, name, position, _('Line')))
+
 
 class TreeItem(QTreeWidgetItem):
     """Class browser item base class."""
@@ -290,6 +271,7 @@ def __init__(self, parent, show_fullpath=False, show_all_files=True,
         self.freeze = False  # Freezing widget to avoid any unwanted update
         self.editor_items = {}
         self.editor_tree_cache = {}
+        self.editor_symbols = {}
         self.editor_ids = {}
         self.update_timers = {}
         self.editors_to_update = {}
@@ -541,6 +523,7 @@ def register_editor(self, editor):
 
         editor_tree = IntervalTree()
         self.editor_tree_cache[editor_id] = editor_tree
+        self.editor_symbols[editor_id] = {}
 
         self.__sort_toplevel_items()
 
@@ -599,31 +582,21 @@ def update_editor(self, items, editor=None):
             self.restore_expanded_state()
             self.do_follow_cursor()
 
-    def merge_interval(self, parent, node):
-        """Add node into an existing tree structure."""
-        match = False
-        start, end = node.position
-        while parent.parent is not None and not match:
-            parent_start, parent_end = parent.position
-            if parent_end <= start:
-                parent = parent.parent
-            else:
-                match = True
-
-        if node.parent is not None:
-            node.parent.remove_node(node)
-            node.parent = None
-            if node.node.parent is not None:
-                node.node.parent.remove_children(node.node)
-
-        parent.add_node(node)
-        node.refresh()
-        return node
-
     def update_tree(self, items, editor_id, language):
+        """
+        Update the symbols of an editor in the tree.
+
+        Symbols are identified by their name, kind, occurrence and the ones
+        of their parents, so only the tree items of the symbols that were
+        added or removed are changed. The others keep their state and are
+        only updated if their lines changed.
+        """
         current_tree = self.editor_tree_cache[editor_id]
-        tree_info = []
-        for symbol in items:
+        current_symbols = self.editor_symbols[editor_id]
+        root = self.editor_items[editor_id]
+
+        symbols = []
+        for order, symbol in enumerate(items):
             symbol_name = symbol['name']
             symbol_kind = symbol['kind']
             if language.lower() == 'python':
@@ -639,72 +612,87 @@ def update_tree(self, items, editor_id, language):
             symbol_range = symbol['location']['range']
             symbol_start = symbol_range['start']['line']
             symbol_end = symbol_range['end']['line']
-            symbol_repr = SymbolStatus(symbol_name, symbol_kind,
-                                       (symbol_start, symbol_end), None)
-            tree_info.append((symbol_start, symbol_end + 1, symbol_repr))
-
-        tree = IntervalTree.from_tuples(tree_info)
-        changes = tree - current_tree
-        deleted = current_tree - tree
+            symbols.append(
+                (symbol_start, symbol_end, order, symbol_name, symbol_kind))
+        symbols.sort()
+
+        # Symbols are children of the previous ones that contain their
+        # first line, or siblings if they have the same position
+        positions = {}
+        parents = {}
+        children = {None: []}
+        occurrences = {}
+        stack = []
+        for symbol_start, symbol_end, __, symbol_name, symbol_kind in symbols:
+            position = (symbol_start, symbol_end)
+            while stack and positions[stack[-1]][1] <= symbol_start:
+                stack.pop()
+            parent_key = stack[-1] if stack else None
+            while parent_key is not None and positions[parent_key] == position:
+                parent_key = parents[parent_key]
+            occurrence_key = (parent_key, symbol_name, symbol_kind)
+            occurrence = occurrences.get(occurrence_key, 0)
+            occurrences[occurrence_key] = occurrence + 1
+            key = occurrence_key + (occurrence,)
+            positions[key] = position
+            parents[key] = parent_key
+            children[key] = []
+            children[parent_key].append(key)
+            stack.append(key)
+
+        # Find the symbols that were removed, added or shifted
+        removed_intervals = []
+        added_intervals = []
+        changed_parents = set()
+        for key in list(current_symbols):
+            if key not in positions:
+                node = current_symbols.pop(key)
+                start, end = node.position
+                removed_intervals.append(Interval(start, end + 1, node))
+                changed_parents.add(key[0])
+        for key, position in positions.items():
+            node = current_symbols.get(key)
+            if node is None:
+                node = SymbolStatus(key[1], key[2], position, root.path)
+                node.create_node()
+                current_symbols[key] = node
+            elif node.position != position:
+                start, end = node.position
+                removed_intervals.append(Interval(start, end + 1, node))
+                node.set_position(position)
+            else:
+                continue
+            added_intervals.append(
+                Interval(position[0], position[1] + 1, node))
+            changed_parents.add(parents[key])
 
-        if len(changes) == 0 and len(deleted) == 0:
+        if not removed_intervals and not added_intervals:
             self.sig_hide_spinner.emit()
             return False
 
-        adding_symbols = len(changes) > len(deleted)
-        deleted_iter = iter(sorted(deleted))
-        changes_iter = iter(sorted(changes))
-
-        deleted_entry = next(deleted_iter, None)
-        changed_entry = next(changes_iter, None)
-        non_merged = 0
-
-        while deleted_entry is not None and changed_entry is not None:
-            deleted_entry_i = deleted_entry.data
-            changed_entry_i = changed_entry.data
-
-            if deleted_entry_i.name == changed_entry_i.name:
-                deleted_span = line_span(deleted_entry_i.position)
-                changed_span = line_span(changed_entry_i.position)
-                # Copy symbol status
-                changed_entry_i.clone_node(deleted_entry_i)
-                deleted_entry = next(deleted_iter, None)
-                changed_entry = next(changes_iter, None)
+        self.setUpdatesEnabled(False)
+        for parent_key in changed_parents:
+            if parent_key is None:
+                parent = root
+            elif parent_key in current_symbols:
+                parent = current_symbols[parent_key]
             else:
-                if adding_symbols:
-                    # New symbol added
-                    changed_entry_i.create_node()
-                    non_merged += 1
-                    changed_entry = next(changes_iter, None)
-                else:
-                    # Symbol removed
-                    deleted_entry_i.delete()
-                    non_merged += 1
-                    deleted_entry = next(deleted_iter, None)
-
-        if deleted_entry is not None:
-            while deleted_entry is not None:
-                # Symbol removed
-                deleted_entry_i = deleted_entry.data
-                deleted_entry_i.delete()
-                non_merged += 1
-                deleted_entry = next(deleted_iter, None)
+                # The parent was removed too
+                continue
+            parent.set_children(
+                [current_symbols[key] for key in children[parent_key]])
+        self.setUpdatesEnabled(True)
+
+        if len(added_intervals) > len(current_symbols) // 2:
+            self.editor_tree_cache[editor_id] = IntervalTree(
+                Interval(node.position[0], node.position[1] + 1, node)
+                for node in current_symbols.values())
+        else:
+            for interval in removed_intervals:
+                current_tree.discard(interval)
+            for interval in added_intervals:
+                current_tree.add(interval)
 
-        root = self.editor_items[editor_id]
-        # tree_merge
-        if changed_entry is not None:
-            while changed_entry is not None:
-                # New symbol added
-                changed_entry_i = changed_entry.data
-                changed_entry_i.create_node()
-                non_merged += 1
-                changed_entry = next(changes_iter, None)
-
-        tree_copy = IntervalTree(tree)
-        tree_copy.merge_overlaps(
-            data_reducer=self.merge_interval, data_initializer=root)
-
-        self.editor_tree_cache[editor_id] = tree
         self.sig_tree_updated.emit()
         self.sig_hide_spinner.emit()
         return True
@@ -719,6 +707,7 @@ def remove_editor(self, editor):
             if editor_id not in list(self.editor_ids.values()):
                 root_item = self.editor_items.pop(editor_id)
                 self.editor_tree_cache.pop(editor_id)
+                self.editor_symbols.pop(editor_id)
                 try:
                     self.takeTopLevelItem(
                         self.indexOfTopLevelItem(root_item.node))
@@ -10,17 +10,21 @@
 
 
 # Standard library imports
+import cProfile
 try:
     from unittest.mock import Mock
 except ImportError:
     from mock import Mock  # Python 2
 
 # Third party imports
+from qtpy.QtCore import QModelIndex
 from qtpy.QtGui import QIcon
 import pytest
 import mock
 
 # Local imports
+from spyder.plugins.profiler.utils import (format_diff, format_measure,
+                                           ProfileData)
 from spyder.plugins.profiler.widgets.main_widget import ProfilerDataTree
 
 
@@ -40,10 +44,9 @@ def profiler_datatree_bot(qtbot):
 
 # --- Tests
 # -----------------------------------------------------------------------------
-def test_format_measure(profiler_datatree_bot):
-    """ Test ProfilerDataTree.format_measure()."""
-    tree = profiler_datatree_bot
-    fm = tree.format_measure
+def test_format_measure():
+    """Test format_measure."""
+    fm = format_measure
     assert fm(125) == '125'
     assert fm(1.25e-8) == '12.50 ns'
     assert fm(1.25e-5) == u'12.50 \u03BCs'
@@ -61,45 +64,112 @@ def test_format_measure(profiler_datatree_bot):
     assert fm(-12555.5) == '3h:29min'
 
 
-def test_color_string(profiler_datatree_bot):
-    """ Test ProfilerDataTree.color_string()."""
-    tree = profiler_datatree_bot
-    cs = tree.color_string
-
-    tree.compare_file = 'test'
-    assert cs([5.0]) == ['5.00 s', ['', 'black']]
-    assert cs([1.251e-5, 1.251e-5]) == [u'12.51 \u03BCs', ['', 'black']]
-    assert cs([5.0, 4.0]) == ['5.00 s', ['+1000.00 ms', 'red']]
-    assert cs([4.0, 5.0]) == ['4.00 s', ['-1000.00 ms', 'green']]
-
-    tree.compare_file = None
-    assert cs([4.0, 5.0]) == ['4.00 s', ['', 'black']]
-
-
-def test_format_output(profiler_datatree_bot):
-    """ Test ProfilerDataTree.format_output()."""
+def test_format_diff():
+    """Test format_diff."""
+    assert format_diff(0) == ('', 'black')
+    assert format_diff(0.) == ('', 'black')
+    assert format_diff(1) == ('+1', 'red')
+    assert format_diff(1.0) == ('+1000.00 ms', 'red')
+    assert format_diff(-1.0) == ('-1000.00 ms', 'green')
+
+
+def test_profile_data_compare():
+    """Test the formatted differences with the measures of a saved run."""
+    stats = {('a.py', 1, 'key1'): (1, 1000, 3.5, 1.5, {}),
+             ('a.py', 5, 'key2'): (1, 1200, 2.0, 2.0, {})}
+    saved_stats = {('a.py', 1, 'key1'): (1, 1000, 3.7, 1.3, {}),
+                   ('a.py', 5, 'key2'): (1, 1199, 2.4, 2.4, {})}
+    profile = ProfileData(stats)
+    profile.compare(saved_stats)
+
+    diffs = [profile.calls_diffs, profile.local_time_diffs,
+             profile.cumulative_time_diffs]
+    assert [format_diff(diff[0]) for diff in diffs] == [
+        ('', 'black'), ('-200.00 ms', 'green'), ('+200.00 ms', 'red')]
+    assert [format_diff(diff[1]) for diff in diffs] == [
+        ('+1', 'red'), ('-400.00 ms', 'green'), ('-400.00 ms', 'green')]
+
+
+def factorial(n):
+    """Recursive function to profile."""
+    return 1 if n < 2 else n * factorial(n - 1)
+
+
+def run_factorial(n):
+    """Function to profile that calls a recursive one."""
+    return factorial(n)
+
+
+def test_profile_data():
+    """Test the index of the stats of a profile and their differences."""
+    exec_key = ('~', 0, "<built-in method builtins.exec>")
+    stats = {
+        exec_key: (1, 1, 0.1, 5.0, {}),
+        ('a.py', 1, 'main'): (1, 1, 1.0, 4.0,
+                              {exec_key: (1, 1, 1.0, 4.0)}),
+        ('a.py', 5, 'spam'): (2, 2, 2.0, 2.0,
+                              {('a.py', 1, 'main'): (2, 2, 2.0, 2.0)}),
+        ('a.py', 9, 'eggs'): (1, 1, 1.0, 1.0,
+                              {('a.py', 1, 'main'): (1, 1, 1.0, 1.0),
+                               ('a.py', 5, 'spam'): (1, 1, 1.0, 1.0)}),
+    }
+    profile = ProfileData(stats)
+    assert len(profile) == 4
+    assert profile.find_root() == 1
+    assert profile.callees == [[1], [2, 3], [3], []]
+    assert profile.function_info(2) == ('a.py', 5, 'spam', 'a.py : 5',
+                                        'function')
+    assert profile.calls_diffs is None
+
+    # Functions missing from the saved run are compared with zeros
+    saved_stats = dict(stats)
+    saved_stats[('a.py', 5, 'spam')] = (1, 1, 1.5, 1.5, {})
+    del saved_stats[('a.py', 9, 'eggs')]
+    profile.compare(saved_stats)
+    assert profile.calls_diffs == [0, 0, 1, 1]
+    assert profile.local_time_diffs == [0, 0, 0.5, 1.0]
+    assert profile.cumulative_time_diffs == [0, 0, 0.5, 1.0]
+    profile.compare(None)
+    assert profile.cumulative_time_diffs is None
+
+
+def test_show_tree(profiler_datatree_bot, tmpdir):
+    """Test that the call tree is created lazily and compared."""
     tree = profiler_datatree_bot
-    fo = tree.format_output
-
-    # Mock Stats class to be able to use fixed data for input.
-    class Stats:
-        stats = {}
-
-    tree.stats1 = [Stats(), Stats()]
-    tree.stats1[0].stats = {('key1'): (1, 1000, 3.5, 1.5, {}),
-                            ('key2'): (1, 1200, 2.0, 2.0, {})
-                            }
-    tree.stats1[1].stats = {('key1'): (1, 1000, 3.7, 1.3, {}),
-                            ('key2'): (1, 1199, 2.4, 2.4, {})
-                            }
-
-    tree.compare_file = 'test'
-    assert list((fo('key1'))) == [['1000', ['', 'black']],
-                                  ['3.50 s', ['-200.00 ms', 'green']],
-                                  ['1.50 s', ['+200.00 ms', 'red']]]
-    assert list((fo('key2'))) == [['1200', ['+1', 'red']],
-                                  ['2.00 s', ['-400.00 ms', 'green']],
-                                  ['2.00 s', ['-400.00 ms', 'green']]]
+    model = tree.source_model
+    profile_file = str(tmpdir.join('profile.results'))
+    saved_file = str(tmpdir.join('saved.results'))
+    cProfile.runctx('run_factorial(5)', globals(), {}, profile_file)
+    cProfile.runctx('run_factorial(3)', globals(), {}, saved_file)
+
+    tree.compare(saved_file)
+    tree.load_data(profile_file)
+    tree.show_tree()
+
+    # Only the first level of callees is expanded
+    assert model.rowCount() == 1
+    root_index = model.index(0, 0)
+    assert model.data(root_index) == 'run_factorial'
+    assert model.data(model.index(0, 5)) == '1'
+    assert tree.isExpanded(root_index)
+    child_index = model.index(0, 0, root_index)
+    assert model.data(child_index) == 'factorial'
+    assert model.data(model.index(0, 5, root_index)) == '5'
+    assert model.data(model.index(0, 6, root_index)) == '+2'
+    assert model.canFetchMore(child_index)
+
+    # Children are created when expanded, and recursion is not expanded
+    tree.expand(child_index)
+    assert model.rowCount(child_index) == 1
+    recursive_index = model.index(0, 7, child_index)
+    assert model.data(recursive_index) == '(recursion)'
+    assert not model.hasChildren(model.index(0, 0, child_index))
+
+    tree.change_view(-1)
+    assert not tree.isExpanded(root_index)
+    tree.load_data(str(tmpdir.join('missing.results')))
+    tree.show_tree()
+    assert model.rowCount(QModelIndex()) == 0
 
 
 if __name__ == "__main__":
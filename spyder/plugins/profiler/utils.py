@@ -0,0 +1,172 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright © Spyder Project Contributors
+# Licensed under the terms of the MIT License
+# (see spyder/__init__.py for details)
+
+"""
+Utilities to index and format the data of Spyder's Profiler plugin.
+
+The stats of pstats map each function, i.e. a (filename, line number,
+function name) tuple, to its number of primitive calls, number of calls,
+local time, cumulative time and a dict of its callers.
+"""
+
+# Standard library imports
+import os.path as osp
+
+# Local imports
+from spyder.py3compat import to_text_string
+
+
+# Measures of functions missing from the stats being compared
+MISSING_STATS = (0, 0, 0, 0, {})
+
+
+def format_measure(measure):
+    """Get format and units for data coming from profiler task."""
+    # Convert to a positive value.
+    measure = abs(measure)
+
+    # For number of calls
+    if isinstance(measure, int):
+        return to_text_string(measure)
+
+    # For time measurements
+    if 1.e-9 < measure <= 1.e-6:
+        measure = u"{0:.2f} ns".format(measure / 1.e-9)
+    elif 1.e-6 < measure <= 1.e-3:
+        measure = u"{0:.2f} \u03BCs".format(measure / 1.e-6)
+    elif 1.e-3 < measure <= 1:
+        measure = u"{0:.2f} ms".format(measure / 1.e-3)
+    elif 1 < measure <= 60:
+        measure = u"{0:.2f} s".format(measure)
+    elif 60 < measure <= 3600:
+        m, s = divmod(measure, 3600)
+        if s > 60:
+            m, s = divmod(measure, 60)
+            s = to_text_string(s).split(".")[-1]
+        measure = u"{0:.0f}.{1:.2s} min".format(m, s)
+    else:
+        h, m = divmod(measure, 3600)
+        if m > 60:
+            m /= 60
+        measure = u"{0:.0f}h:{1:.0f}min".format(h, m)
+    return measure
+
+
+def format_diff(difference):
+    """
+    Return the formatted difference of two measures and its color, which
+    reflects whether the first measure is lower, greater or the same as the
+    second one.
+    """
+    if not difference:
+        return '', 'black'
+    color, sign = ('green', '-') if difference < 0 else ('red', '+')
+    return '{}{}'.format(sign, format_measure(difference)), color
+
+
+def function_info(function_key):
+    """Returns processed information about the function's name and file."""
+    node_type = 'function'
+    filename, line_number, function_name = function_key
+    if function_name == '<module>':
+        modulePath, moduleName = osp.split(filename)
+        node_type = 'module'
+        if moduleName == '__init__.py':
+            modulePath, moduleName = osp.split(modulePath)
+        function_name = '<' + moduleName + '>'
+    if not filename or filename == '~':
+        file_and_line = '(built-in)'
+        node_type = 'builtin'
+    else:
+        if function_name == '__init__':
+            node_type = 'constructor'
+        file_and_line = '%s : %d' % (filename, line_number)
+    return filename, line_number, function_name, file_and_line, node_type
+
+
+class ProfileData(object):
+    """
+    Index of the call graph of the stats of a profile.
+
+    Functions are numbered once, so their measures and callees are kept in
+    lists indexed by those numbers (ids), and the differences with the
+    measures of another profile are computed for all functions at once.
+    """
+
+    def __init__(self, stats):
+        """Index stats, a dict like the one of pstats.Stats."""
+        self.functions = list(stats)
+        self.ids = {function: function_id
+                    for function_id, function in enumerate(self.functions)}
+        values = list(stats.values())
+        self.calls = [value[1] for value in values]
+        self.local_times = [value[2] for value in values]
+        self.cumulative_times = [value[3] for value in values]
+
+        # Ids of the functions called by each function, in the same order
+        # as pstats.Stats.calc_callees
+        self.callees = [[] for __ in values]
+        ids = self.ids
+        for function_id, value in enumerate(values):
+            for caller in value[4]:
+                caller_id = ids.get(caller)
+                if caller_id is not None:
+                    self.callees[caller_id].append(function_id)
+
+        # Differences with the measures of the profile being compared
+        self.calls_diffs = None
+        self.local_time_diffs = None
+        self.cumulative_time_diffs = None
+
+        self._info = {}
+
+    def __len__(self):
+        return len(self.functions)
+
+    def compare(self, stats):
+        """
+        Compute the differences of the measures with the ones in stats, or
+        forget them if stats is None.
+        """
+        if stats is None:
+            self.calls_diffs = None
+            self.local_time_diffs = None
+            self.cumulative_time_diffs = None
+            return
+        others = [stats.get(function, MISSING_STATS)
+                  for function in self.functions]
+        self.calls_diffs = [
+            value - other[1] for value, other in zip(self.calls, others)]
+        self.local_time_diffs = [
+            value - other[2] for value, other in zip(self.local_times, others)]
+        self.cumulative_time_diffs = [
+            value - other[3]
+            for value, other in zip(self.cumulative_times, others)]
+
+    def find_root(self):
+        """
+        Return the id of the function with the largest cumulative time,
+        without counting the profiler itself, or None if there isn't one.
+        """
+        root = None
+        cumulative_times = self.cumulative_times
+        for function_id, function in enumerate(self.functions):
+            if (('~', 0) != function[0:2] and
+                    not function[2].startswith('<built-in method exec>')):
+                # This skips the profiler function at the top of the list
+                # it does only occur in Python 3
+                if (root is None or cumulative_times[function_id] >
+                        cumulative_times[root]):
+                    root = function_id
+        return root
+
+    def function_info(self, function_id):
+        """Return the cached function_info of a function."""
+        info = self._info.get(function_id)
+        if info is None:
+            info = function_info(self.functions[function_id])
+            self._info[function_id] = info
+        return info
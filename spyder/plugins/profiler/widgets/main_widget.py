@@ -21,25 +21,26 @@
 import sys
 import time
 from enum import Enum
-from itertools import islice
 
 # Third party imports
-from qtpy.compat import getopenfilename, getsavefilename
-from qtpy.QtCore import QByteArray, QProcess, QProcessEnvironment, Qt, Signal
+from qtpy.compat import getopenfilename, getsavefilename, to_qvariant
+from qtpy.QtCore import (QAbstractItemModel, QByteArray, QModelIndex,
+                         QProcess, QProcessEnvironment, Qt, Signal)
 from qtpy.QtGui import QColor
 from qtpy.QtWidgets import (QApplication, QHBoxLayout, QLabel, QMessageBox,
-                            QTreeWidget, QTreeWidgetItem, QVBoxLayout, QWidget)
+                            QTreeView, QVBoxLayout, QWidget)
 
 # Local imports
 from spyder.api.translations import get_translation
 from spyder.api.widgets import PluginMainWidget, SpyderWidgetMixin
 from spyder.config.base import get_conf_path
 from spyder.config.gui import is_dark_interface
+from spyder.plugins.profiler.utils import (format_diff, format_measure,
+                                          ProfileData)
 from spyder.plugins.variableexplorer.widgets.texteditor import TextEditor
 from spyder.py3compat import to_text_string
 from spyder.utils.misc import add_pathlist_to_PYTHONPATH, getcwd_or_home
 from spyder.utils.programs import shell_split
-from spyder.utils.qthelpers import get_item_user_text, set_item_user_text
 from spyder.widgets.comboboxes import PythonModulesComboBox
 
 # Localization
@@ -56,6 +57,29 @@
 else:
     MAIN_TEXT_COLOR = '#444444'
 
+# Columns of the profiler data tree
+(NAME, TOTAL_TIME, TOTAL_TIME_DIFF, LOCAL_TIME, LOCAL_TIME_DIFF, CALLS,
+ CALLS_DIFF, FILE_LINE) = range(8)
+DIFF_COLUMNS = (TOTAL_TIME_DIFF, LOCAL_TIME_DIFF, CALLS_DIFF)
+
+# ProfileData attributes with the values of each column
+COLUMN_VALUES = {
+    TOTAL_TIME: 'cumulative_times',
+    TOTAL_TIME_DIFF: 'cumulative_time_diffs',
+    LOCAL_TIME: 'local_times',
+    LOCAL_TIME_DIFF: 'local_time_diffs',
+    CALLS: 'calls',
+    CALLS_DIFF: 'calls_diffs',
+}
+
+COLUMN_TOOLTIPS = {
+    NAME: _('Function or module name'),
+    TOTAL_TIME: _('Time in function (including sub-functions)'),
+    LOCAL_TIME: _('Local time in function (not in sub-functions)'),
+    CALLS: _('Total number of calls (including recursion)'),
+    FILE_LINE: _('File:line where function is defined'),
+}
+
 
 class ProfilerWidgetActions:
     # Triggers
@@ -624,28 +648,233 @@ def show_data(self, justanalyzed=False):
         self.datelabel.setText(date_text)
 
 
-class TreeWidgetItem( QTreeWidgetItem ):
-    def __init__(self, parent=None):
-        QTreeWidgetItem.__init__(self, parent)
+class ProfilerTreeNode:
+    """Node of the call tree of a profile, with the id of its function."""
 
-    def __lt__(self, otherItem):
-        column = self.treeWidget().sortColumn()
-        try:
-            if column == 1 or column == 3:  # TODO: Hardcoded Column
-                t0 = gettime_s(self.text(column))
-                t1 = gettime_s(otherItem.text(column))
-                if t0 is not None and t1 is not None:
-                    return t0 > t1
+    __slots__ = ('parent', 'row', 'function', 'children', 'recursive')
+
+    def __init__(self, parent, row, function):
+        self.parent = parent
+        self.row = row
+        self.function = function
+        # Created when fetched by the view
+        self.children = None
+
+        # Functions that are descendants of themselves are not expanded
+        self.recursive = False
+        ancestor = parent
+        while ancestor is not None and ancestor.parent is not None:
+            if ancestor.function == function:
+                self.recursive = True
+                break
+            ancestor = ancestor.parent
+
+
+class ProfilerDataModel(QAbstractItemModel):
+    """
+    Lazy model of the call tree of a profile.
+
+    Indexes have their ProfilerTreeNode as internal pointer. The children of
+    a node are only created when the view fetches them, i.e. when it's
+    expanded, and the text of rows is only formatted when they are shown.
+    """
+
+    def __init__(self, parent, header_list, icon_list):
+        super().__init__(parent)
+        self.header_list = header_list
+        self.icon_list = icon_list
+        self.profile = None
+        self.root = ProfilerTreeNode(None, 0, None)
+        self.root.children = []
+        self.sort_column = None
+        self.sort_order = Qt.AscendingOrder
+
+    # --- Qt API
+    # ------------------------------------------------------------------------
+    def index(self, row, column, parent=QModelIndex()):
+        if not self.hasIndex(row, column, parent):
+            return QModelIndex()
+        return self.createIndex(row, column,
+                                self.get_node(parent).children[row])
+
+    def parent(self, index):
+        if not index.isValid():
+            return QModelIndex()
+        parent = index.internalPointer().parent
+        if parent is None or parent is self.root:
+            return QModelIndex()
+        return self.createIndex(parent.row, 0, parent)
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.column() > 0:
+            return 0
+        children = self.get_node(parent).children
+        return len(children) if children is not None else 0
+
+    def columnCount(self, parent=QModelIndex()):
+        return len(self.header_list)
+
+    def hasChildren(self, parent=QModelIndex()):
+        if parent.column() > 0:
+            return False
+        node = self.get_node(parent)
+        if node.children is not None:
+            return len(node.children) > 0
+        return not node.recursive and bool(
+            self.profile.callees[node.function])
+
+    def canFetchMore(self, parent):
+        if not parent.isValid():
+            return False
+        node = parent.internalPointer()
+        return (node.children is None and not node.recursive and
+                bool(self.profile.callees[node.function]))
+
+    def fetchMore(self, parent):
+        if not self.canFetchMore(parent):
+            return
+        node = parent.internalPointer()
+        children = self._create_children(
+            node, self.profile.callees[node.function])
+        self.beginInsertRows(parent, 0, len(children) - 1)
+        node.children = children
+        self.endInsertRows()
+
+    def flags(self, index):
+        if not index.isValid():
+            return Qt.NoItemFlags
+        if index.internalPointer().recursive:
+            return Qt.NoItemFlags
+        return Qt.ItemIsEnabled | Qt.ItemIsSelectable
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return to_qvariant()
+
+        node = index.internalPointer()
+        column = index.column()
+        profile = self.profile
+        function = node.function
+
+        if role == Qt.DisplayRole:
+            if column == NAME:
+                return profile.function_info(function)[2]
+            elif column == FILE_LINE:
+                if node.recursive:
+                    return '(%s)' % _('recursion')
+                return profile.function_info(function)[3]
+            elif column in DIFF_COLUMNS:
+                diffs = getattr(profile, COLUMN_VALUES[column])
+                if diffs is None:
+                    return ''
+                return format_diff(diffs[function])[0]
+            else:
+                values = getattr(profile, COLUMN_VALUES[column])
+                return format_measure(values[function])
+        elif role == Qt.DecorationRole and column == NAME:
+            return self.icon_list[profile.function_info(function)[4]]
+        elif role == Qt.ForegroundRole and column in DIFF_COLUMNS:
+            diffs = getattr(profile, COLUMN_VALUES[column])
+            if diffs is not None:
+                return QColor(format_diff(diffs[function])[1])
+        elif role == Qt.TextAlignmentRole:
+            if column in DIFF_COLUMNS:
+                return to_qvariant(int(Qt.AlignLeft | Qt.AlignVCenter))
+            elif column in (TOTAL_TIME, LOCAL_TIME, CALLS):
+                return to_qvariant(int(Qt.AlignRight | Qt.AlignVCenter))
+        elif role == Qt.ToolTipRole:
+            return COLUMN_TOOLTIPS.get(column, to_qvariant())
+        return to_qvariant()
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self.header_list[section]
+        return to_qvariant()
+
+    def sort(self, column, order=Qt.AscendingOrder):
+        """Sort the children of the nodes fetched so far."""
+        self.sort_column = column
+        self.sort_order = order
+        if self.profile is None:
+            return
+
+        self.layoutAboutToBeChanged.emit()
+        nodes = [self.root]
+        while nodes:
+            node = nodes.pop()
+            if node.children:
+                self._sort_children(node.children)
+                nodes.extend(node.children)
+
+        for index in self.persistentIndexList():
+            if index.isValid():
+                node = index.internalPointer()
+                self.changePersistentIndex(
+                    index, self.createIndex(node.row, index.column(), node))
+        self.layoutChanged.emit()
+
+    # --- Public API
+    # ------------------------------------------------------------------------
+    def get_node(self, index):
+        """Return the node of index, or the root one if it's invalid."""
+        if index.isValid():
+            return index.internalPointer()
+        return self.root
+
+    def set_profile(self, profile):
+        """Show the call tree of profile, a ProfileData instance."""
+        self.beginResetModel()
+        self.profile = profile
+        self.root = ProfilerTreeNode(None, 0, None)
+        self.root.children = []
+        if profile is not None:
+            root = profile.find_root()  # This root contains profiler overhead
+            if root is not None:
+                self.root.function = root
+                self.root.children = self._create_children(
+                    self.root, profile.callees[root])
+        self.endResetModel()
 
-            return float( self.text(column) ) > float( otherItem.text(column) )
-        except ValueError:
-            return self.text(column) > otherItem.text(column)
+    # --- Private API
+    # ------------------------------------------------------------------------
+    def _create_children(self, node, callees):
+        """Create the nodes of callees as children of node."""
+        children = [ProfilerTreeNode(node, row, function)
+                    for row, function in enumerate(callees)]
+        if self.sort_column is not None:
+            self._sort_children(children)
+        return children
+
+    def _sort_children(self, children):
+        """Sort nodes in place and update their rows."""
+        profile = self.profile
+        column = self.sort_column
+        if column in (NAME, FILE_LINE):
+            info_index = 2 if column == NAME else 3
+
+            def key(node):
+                return profile.function_info(node.function)[info_index]
+
+            reverse = self.sort_order == Qt.DescendingOrder
+        else:
+            values = getattr(profile, COLUMN_VALUES[column])
+            if values is None:
+                return
+
+            def key(node):
+                return values[node.function]
+
+            # Show the most expensive functions first in ascending order
+            reverse = self.sort_order == Qt.AscendingOrder
 
+        children.sort(key=key, reverse=reverse)
+        for row, child in enumerate(children):
+            child.row = row
 
-class ProfilerDataTree(QTreeWidget, SpyderWidgetMixin):
+
+class ProfilerDataTree(QTreeView, SpyderWidgetMixin):
     """
-    Convenience tree widget (with built-in model)
-    to store and view profiler data.
+    Tree view to store and view profiler data.
 
     The quantities calculated by the profiler are as follows
     (from profile.Profile):
@@ -660,8 +889,6 @@ class ProfilerDataTree(QTreeWidget, SpyderWidgetMixin):
     [4] = A dictionary indicating for each function name, the number of times
           it was called by us.
     """
-    SEP = r"<[=]>"  # separator between filename and linenumber
-    # (must be improbable as a filename to avoid splitting the filename itself)
 
     # Signals
     sig_edit_goto_requested = Signal(str, int, str)
@@ -679,32 +906,19 @@ def __init__(self, parent=None):
         }
         self.profdata = None   # To be filled by self.load_data()
         self.stats = None      # To be filled by self.load_data()
-        self.item_depth = None
-        self.item_list = None
-        self.items_to_be_shown = None
+        self.stats1 = []       # To be filled by self.load_data()
         self.current_view_depth = None
         self.compare_file = None
-        self.setColumnCount(len(self.header_list))
-        self.setHeaderLabels(self.header_list)
+        self.source_model = ProfilerDataModel(
+            self, self.header_list, self.icon_list)
+        self.setModel(self.source_model)
+        self.setUniformRowHeights(True)
         self.initialize_view()
-        self.itemActivated.connect(self.item_activated)
-        self.itemExpanded.connect(self.item_expanded)
-
-    def set_item_data(self, item, filename, line_number):
-        """Set tree item user data: filename (string) and line_number (int)"""
-        set_item_user_text(item, '%s%s%d' % (filename, self.SEP, line_number))
-
-    def get_item_data(self, item):
-        """Get tree item user data: (filename, line_number)"""
-        filename, line_number_str = get_item_user_text(item).split(self.SEP)
-        return filename, int(line_number_str)
+        self.activated.connect(self.item_activated)
 
     def initialize_view(self):
         """Clean the tree and view parameters"""
-        self.clear()
-        self.item_depth = 0   # To be use for collapsing/expanding one level
-        self.item_list = []  # To be use for collapsing/expanding one level
-        self.items_to_be_shown = {}
+        self.source_model.set_profile(None)
         self.current_view_depth = 0
 
     def load_data(self, profdatafile):
@@ -729,8 +943,6 @@ def load_data(self, profdatafile):
                       "The error was<br><br>"
                       "<tt>{0}</tt>").format(e))
                 self.compare_file = None
-        map(lambda x: x.calc_callees(), stats_indi)
-        self.profdata.calc_callees()
         self.stats1 = stats_indi
         self.stats = stats_indi[0].stats
 
@@ -739,240 +951,49 @@ def compare(self,filename):
         self.compare_file = filename
 
     def hide_diff_cols(self, hide):
-        for i in (2,4,6):
+        for i in DIFF_COLUMNS:
             self.setColumnHidden(i, hide)
 
     def save_data(self, filename):
         """Save profiler data."""
         self.stats1[0].dump_stats(filename)
 
-    def find_root(self):
-        """Find a function without a caller"""
-        # Fixes spyder-ide/spyder#8336.
-        if self.profdata is not None:
-            self.profdata.sort_stats("cumulative")
-        else:
-            return
-        for func in self.profdata.fcn_list:
-            if ('~', 0) != func[0:2] and not func[2].startswith(
-                    '<built-in method exec>'):
-                # This skips the profiler function at the top of the list
-                # it does only occur in Python 3
-                return func
-
-    def find_callees(self, parent):
-        """Find all functions called by (parent) function."""
-        # FIXME: This implementation is very inneficient, because it
-        #        traverses all the data to find children nodes (callees)
-        return self.profdata.all_callees[parent]
-
     def show_tree(self):
-        """Populate the tree with profiler data and display it."""
+        """Show the call tree of the profiler data."""
         self.initialize_view() # Clear before re-populating
-        self.setItemsExpandable(True)
-        self.setSortingEnabled(False)
-        rootkey = self.find_root()  # This root contains profiler overhead
-        if rootkey is not None:
-            self.populate_tree(self, self.find_callees(rootkey))
-            self.resizeColumnToContents(0)
-            self.setSortingEnabled(True)
-            self.sortItems(1, Qt.AscendingOrder) # FIXME: hardcoded index
-            self.change_view(1)
-
-    def function_info(self, functionKey):
-        """Returns processed information about the function's name and file."""
-        node_type = 'function'
-        filename, line_number, function_name = functionKey
-        if function_name == '<module>':
-            modulePath, moduleName = osp.split(filename)
-            node_type = 'module'
-            if moduleName == '__init__.py':
-                modulePath, moduleName = osp.split(modulePath)
-            function_name = '<' + moduleName + '>'
-        if not filename or filename == '~':
-            file_and_line = '(built-in)'
-            node_type = 'builtin'
-        else:
-            if function_name == '__init__':
-                node_type = 'constructor'
-            file_and_line = '%s : %d' % (filename, line_number)
-        return filename, line_number, function_name, file_and_line, node_type
-
-    @staticmethod
-    def format_measure(measure):
-        """Get format and units for data coming from profiler task."""
-        # Convert to a positive value.
-        measure = abs(measure)
-
-        # For number of calls
-        if isinstance(measure, int):
-            return to_text_string(measure)
-
-        # For time measurements
-        if 1.e-9 < measure <= 1.e-6:
-            measure = u"{0:.2f} ns".format(measure / 1.e-9)
-        elif 1.e-6 < measure <= 1.e-3:
-            measure = u"{0:.2f} \u03BCs".format(measure / 1.e-6)
-        elif 1.e-3 < measure <= 1:
-            measure = u"{0:.2f} ms".format(measure / 1.e-3)
-        elif 1 < measure <= 60:
-            measure = u"{0:.2f} s".format(measure)
-        elif 60 < measure <= 3600:
-            m, s = divmod(measure, 3600)
-            if s > 60:
-                m, s = divmod(measure, 60)
-                s = to_text_string(s).split(".")[-1]
-            measure = u"{0:.0f}.{1:.2s} min".format(m, s)
-        else:
-            h, m = divmod(measure, 3600)
-            if m > 60:
-                m /= 60
-            measure = u"{0:.0f}h:{1:.0f}min".format(h, m)
-        return measure
-
-    def color_string(self, x):
-        """Return a string formatted delta for the values in x.
-
-        Args:
-            x: 2-item list of integers (representing number of calls) or
-               2-item list of floats (representing seconds of runtime).
-
-        Returns:
-            A list with [formatted x[0], [color, formatted delta]], where
-            color reflects whether x[1] is lower, greater, or the same as
-            x[0].
-        """
-        diff_str = ""
-        color = "black"
-
-        if len(x) == 2 and self.compare_file is not None:
-            difference = x[0] - x[1]
-            if difference:
-                color, sign = ('green', '-') if difference < 0 else ('red', '+')
-                diff_str = '{}{}'.format(sign, self.format_measure(difference))
-        return [self.format_measure(x[0]), [diff_str, color]]
-
-    def format_output(self, child_key):
-        """ Formats the data.
-
-        self.stats1 contains a list of one or two pstat.Stats() instances, with
-        the first being the current run and the second, the saved run, if it
-        exists.  Each Stats instance is a dictionary mapping a function to
-        5 data points - cumulative calls, number of calls, total time,
-        cumulative time, and callers.
-
-        format_output() converts the number of calls, total time, and
-        cumulative time to a string format for the child_key parameter.
-        """
-        data = [x.stats.get(child_key, [0, 0, 0, 0, {}]) for x in self.stats1]
-        return (map(self.color_string, islice(zip(*data), 1, 4)))
-
-    def populate_tree(self, parentItem, children_list):
-        """Recursive method to create each item (and associated data) in the tree."""
-        for child_key in children_list:
-            self.item_depth += 1
-            (filename, line_number, function_name, file_and_line, node_type
-             ) = self.function_info(child_key)
-
-            ((total_calls, total_calls_dif), (loc_time, loc_time_dif), (cum_time,
-             cum_time_dif)) = self.format_output(child_key)
-
-            child_item = TreeWidgetItem(parentItem)
-            self.item_list.append(child_item)
-            self.set_item_data(child_item, filename, line_number)
-
-            # FIXME: indexes to data should be defined by a dictionary on init
-            child_item.setToolTip(0, _('Function or module name'))
-            child_item.setData(0, Qt.DisplayRole, function_name)
-            child_item.setIcon(0, self.icon_list[node_type])
-
-            child_item.setToolTip(1, _('Time in function '\
-                                       '(including sub-functions)'))
-            child_item.setData(1, Qt.DisplayRole, cum_time)
-            child_item.setTextAlignment(1, Qt.AlignRight)
-
-            child_item.setData(2, Qt.DisplayRole, cum_time_dif[0])
-            child_item.setForeground(2, QColor(cum_time_dif[1]))
-            child_item.setTextAlignment(2, Qt.AlignLeft)
-
-            child_item.setToolTip(3, _('Local time in function '\
-                                      '(not in sub-functions)'))
-
-            child_item.setData(3, Qt.DisplayRole, loc_time)
-            child_item.setTextAlignment(3, Qt.AlignRight)
-
-            child_item.setData(4, Qt.DisplayRole, loc_time_dif[0])
-            child_item.setForeground(4, QColor(loc_time_dif[1]))
-            child_item.setTextAlignment(4, Qt.AlignLeft)
-
-            child_item.setToolTip(5, _('Total number of calls '\
-                                       '(including recursion)'))
-
-            child_item.setData(5, Qt.DisplayRole, total_calls)
-            child_item.setTextAlignment(5, Qt.AlignRight)
-
-            child_item.setData(6, Qt.DisplayRole, total_calls_dif[0])
-            child_item.setForeground(6, QColor(total_calls_dif[1]))
-            child_item.setTextAlignment(6, Qt.AlignLeft)
-
-            child_item.setToolTip(7, _('File:line '\
-                                       'where function is defined'))
-            child_item.setData(7, Qt.DisplayRole, file_and_line)
-            #child_item.setExpanded(True)
-            if self.is_recursive(child_item):
-                child_item.setData(7, Qt.DisplayRole, '(%s)' % _('recursion'))
-                child_item.setDisabled(True)
-            else:
-                callees = self.find_callees(child_key)
-                if self.item_depth < 3:
-                    self.populate_tree(child_item, callees)
-                elif callees:
-                    child_item.setChildIndicatorPolicy(child_item.ShowIndicator)
-                    self.items_to_be_shown[id(child_item)] = callees
-            self.item_depth -= 1
-
-    def item_activated(self, item):
-        filename, line_number = self.get_item_data(item)
+        if self.profdata is None:
+            return
+        profile = ProfileData(self.stats)
+        if len(self.stats1) > 1:
+            profile.compare(self.stats1[1].stats)
+        self.source_model.set_profile(profile)
+        self.resizeColumnToContents(NAME)
+        self.setSortingEnabled(True)
+        self.sortByColumn(TOTAL_TIME, Qt.AscendingOrder)
+        self.change_view(1)
+
+    def item_activated(self, index):
+        node = self.source_model.get_node(index)
+        if node.function is None:
+            return
+        filename, line_number = self.source_model.profile.function_info(
+            node.function)[:2]
         self.sig_edit_goto_requested.emit(filename, line_number, '')
 
-    def item_expanded(self, item):
-        if item.childCount() == 0 and id(item) in self.items_to_be_shown:
-            callees = self.items_to_be_shown[id(item)]
-            self.populate_tree(item, callees)
-
-    def is_recursive(self, child_item):
-        """Returns True is a function is a descendant of itself."""
-        ancestor = child_item.parent()
-        # FIXME: indexes to data should be defined by a dictionary on init
-        while ancestor:
-            if (child_item.data(0, Qt.DisplayRole
-                                ) == ancestor.data(0, Qt.DisplayRole) and
-                child_item.data(7, Qt.DisplayRole
-                                ) == ancestor.data(7, Qt.DisplayRole)):
-                return True
-            else:
-                ancestor = ancestor.parent()
-        return False
-
-    def get_top_level_items(self):
-        """Iterate over top level items"""
-        return [self.topLevelItem(_i) for _i in range(self.topLevelItemCount())]
-
-    def get_items(self, maxlevel):
-        """Return all items with a level <= `maxlevel`"""
-        itemlist = []
-        def add_to_itemlist(item, maxlevel, level=1):
-            level += 1
-            for index in range(item.childCount()):
-                citem = item.child(index)
-                itemlist.append(citem)
-                if level <= maxlevel:
-                    add_to_itemlist(citem, maxlevel, level)
-        for tlitem in self.get_top_level_items():
-            itemlist.append(tlitem)
-            if maxlevel > 0:
-                add_to_itemlist(tlitem, maxlevel=maxlevel)
-        return itemlist
+    def fetch_items(self, maxlevel):
+        """Fetch the children of all items with a level <= `maxlevel`."""
+        model = self.source_model
+        indexes = [model.index(row, 0) for row in range(model.rowCount())]
+        for level in range(maxlevel + 1):
+            children = []
+            for index in indexes:
+                if model.canFetchMore(index):
+                    model.fetchMore(index)
+                if level < maxlevel:
+                    children.extend(
+                        model.index(row, 0, index)
+                        for row in range(model.rowCount(index)))
+            indexes = children
 
     def change_view(self, change_in_depth):
         """Change the view depth by expand or collapsing all same-level nodes"""
@@ -981,9 +1002,9 @@ def change_view(self, change_in_depth):
             self.current_view_depth = 0
         self.collapseAll()
         if self.current_view_depth > 0:
-            for item in self.get_items(maxlevel=self.current_view_depth-1):
-                item.setExpanded(True)
-
+            # Children must be fetched to be shown when expanding to a depth
+            self.fetch_items(maxlevel=self.current_view_depth-1)
+            self.expandToDepth(self.current_view_depth-1)
 
 # =============================================================================
 # Tests
@@ -24,7 +24,8 @@
 from spyder.config.manager import CONF
 from spyder.utils import icon_manager as ima
 from spyder.utils.qthelpers import create_toolbutton, get_std_icon
-from spyder.utils.stringmatching import get_search_regex, get_search_scores
+from spyder.utils.stringmatching import (FuzzySearchIndex, get_search_regex,
+                                         NOT_FOUND_SCORE)
 from spyder.widgets.helperwidgets import (VALID_FINDER_CHARS,
                                           CustomSortFilterProxy,
                                           FinderLineEdit, HelperToolButton,
@@ -501,6 +502,10 @@ def __init__(self, parent, text_color=None, text_color_highlight=None):
         self.normal_text = []
         self.context_rich_text = []
         self.letters = ''
+        # Indexes of the contexts and names of shortcuts to search them
+        self.search_shortcuts = None
+        self.context_index = None
+        self.name_index = None
         self.label = QLabel()
         self.widths = []
 
@@ -617,17 +622,38 @@ def setData(self, index, value, role=Qt.EditRole):
     def update_search_letters(self, text):
         """Update search letters with text input in search box."""
         self.letters = text
-        contexts = [shortcut.context for shortcut in self.shortcuts]
-        names = [shortcut.name for shortcut in self.shortcuts]
-        context_results = get_search_scores(
-            text, contexts, template='<b>{0}</b>')
-        results = get_search_scores(text, names, template='<b>{0}</b>')
-        __, self.context_rich_text, context_scores = (
-            zip(*context_results))
-        self.normal_text, self.rich_text, self.scores = zip(*results)
-        self.scores = [x + y for x, y in zip(self.scores, context_scores)]
+        if self.search_shortcuts is not self.shortcuts:
+            # Shortcuts were loaded or sorted since the last search
+            self.search_shortcuts = self.shortcuts
+            self.context_index = FuzzySearchIndex(
+                [shortcut.context for shortcut in self.shortcuts])
+            self.name_index = FuzzySearchIndex(
+                [shortcut.name for shortcut in self.shortcuts])
+
+        context_scores = dict(self.context_index.search(text))
+        name_scores = dict(self.name_index.search(text))
+        self.normal_text = self.name_index.choices
+        self.context_rich_text = self.get_rich_texts(
+            self.context_index, text, context_scores)
+        self.rich_text = self.get_rich_texts(
+            self.name_index, text, name_scores)
+        self.scores = [
+            context_scores.get(row, NOT_FOUND_SCORE) +
+            name_scores.get(row, NOT_FOUND_SCORE)
+            for row in range(len(self.shortcuts))]
         self.reset()
 
+    def get_rich_texts(self, index, text, scores):
+        """
+        Return the texts of index enriched with the search letters.
+
+        Only the texts that match are enriched, because the other rows are
+        filtered out.
+        """
+        return [index.get_enriched_text(text, row, '<b>{0}</b>')
+                if row in scores else choice
+                for row, choice in enumerate(index.choices)]
+
     def update_active_row(self):
         """Update active row to update color in selected text."""
         self.data(self.current_index())
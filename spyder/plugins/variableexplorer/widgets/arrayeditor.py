@@ -41,6 +41,7 @@
 from spyder.utils import icon_manager as ima
 from spyder.utils.qthelpers import add_actions, create_action, keybinding
 from spyder.plugins.variableexplorer.widgets.basedialog import BaseDialog
+from spyder.plugins.variableexplorer.widgets.dataview import RemoteDataView
 
 # Note: string and unicode data types will be formatted with '%s' (see below)
 SUPPORTED_FORMATS = {
@@ -152,15 +153,13 @@ def __init__(self, data, format="%.6g", xlabels=None, ylabels=None,
         self.total_cols = self._data.shape[1]
         size = self.total_rows * self.total_cols
 
-        try:
-            self.vmin = np.nanmin(self.color_func(data))
-            self.vmax = np.nanmax(self.color_func(data))
-            if self.vmax == self.vmin:
-                self.vmin -= 1
+        minmax = self.get_minmax()
+        if minmax is not None:
+            self.vmin, self.vmax = minmax
             self.hue0 = huerange[0]
             self.dhue = huerange[1]-huerange[0]
             self.bgcolor_enabled = True
-        except (AttributeError, TypeError, ValueError):
+        else:
             self.vmin = None
             self.vmax = None
             self.hue0 = None
@@ -169,9 +168,7 @@ def __init__(self, data, format="%.6g", xlabels=None, ylabels=None,
 
         # Array with infinite values cannot display background colors and
         # crashes. See: spyder-ide/spyder#8093
-        self.has_inf = False
-        if data.dtype.kind in ['f', 'c']:
-            self.has_inf = np.any(np.isinf(data))
+        self.has_inf = self.get_has_inf()
 
         # Deactivate coloring for object arrays or arrays with inf values
         if self._data.dtype.name == 'object' or self.has_inf:
@@ -192,6 +189,23 @@ def __init__(self, data, format="%.6g", xlabels=None, ylabels=None,
             else:
                 self.cols_loaded = self.total_cols
 
+    def get_minmax(self):
+        """Return the min and max used for background colors, or None."""
+        try:
+            vmin = np.nanmin(self.color_func(self._data))
+            vmax = np.nanmax(self.color_func(self._data))
+            if vmax == vmin:
+                vmin -= 1
+            return vmin, vmax
+        except (AttributeError, TypeError, ValueError):
+            return None
+
+    def get_has_inf(self):
+        """Return True if the array has infinite values."""
+        if self._data.dtype.kind in ['f', 'c']:
+            return np.any(np.isinf(self._data))
+        return False
+
     def get_format(self):
         """Return current format"""
         # Avoid accessing the private attribute _format from outside
@@ -201,6 +215,10 @@ def get_data(self):
         """Return data"""
         return self._data
 
+    def get_window(self, rows, columns):
+        """Return the rows (start, stop) and columns (start, stop)."""
+        return self._data[slice(*rows), slice(*columns)]
+
     def set_format(self, format):
         """Change display format"""
         self._format = format
@@ -382,6 +400,42 @@ def reset(self):
         self.endResetModel()
 
 
+class RemoteArrayModel(ArrayModel):
+    """
+    Array Editor Table Model for an array kept in the kernel.
+
+    Its cells are requested to the kernel through a RemoteDataView when
+    they are needed, and changes are sent to it as they are made.
+    """
+
+    def get_minmax(self):
+        """Return the min and max used for background colors, or None."""
+        return self._data.minmax
+
+    def get_has_inf(self):
+        """Return True if the array has infinite values."""
+        return self._data.has_inf
+
+    def get_window(self, rows, columns):
+        """Return the rows (start, stop) and columns (start, stop)."""
+        return self._data.get_window(rows, columns)
+
+    def get_value(self, index):
+        i = index.row()
+        j = index.column()
+        value = self._data.get_value(i, j)
+        return self.changes.get((i, j), value)
+
+    def setData(self, index, value, role=Qt.EditRole):
+        """Cell content change"""
+        if not ArrayModel.setData(self, index, value, role):
+            return False
+        i = index.row()
+        j = index.column()
+        self._data.set_value(i, j, self.changes[(i, j)])
+        return True
+
+
 class ArrayDelegate(QItemDelegate):
     """Array Editor Item Delegate"""
     def __init__(self, dtype, parent=None):
@@ -555,14 +609,15 @@ def _sel_to_text(self, cell_range):
         if row_min == 0 and row_max == (self.model().rows_loaded-1):
             row_max = self.model().total_rows-1
 
-        _data = self.model().get_data()
         if PY3:
             output = io.BytesIO()
         else:
             output = io.StringIO()
         try:
-            np.savetxt(output, _data[row_min:row_max+1, col_min:col_max+1],
-                       delimiter='\t', fmt=self.model().get_format())
+            _data = self.model().get_window((row_min, row_max+1),
+                                            (col_min, col_max+1))
+            np.savetxt(output, _data, delimiter='\t',
+                       fmt=self.model().get_format())
         except:
             QMessageBox.warning(self, _("Warning"),
                                 _("It was not possible to copy values for "
@@ -595,8 +650,13 @@ def __init__(self, parent, data, readonly=False,
             self.data.shape = (1, 1)
 
         format = SUPPORTED_FORMATS.get(data.dtype.name, '%s')
-        self.model = ArrayModel(self.data, format=format, xlabels=xlabels,
-                                ylabels=ylabels, readonly=readonly, parent=self)
+        if isinstance(data, RemoteDataView):
+            model_class = RemoteArrayModel
+        else:
+            model_class = ArrayModel
+        self.model = model_class(self.data, format=format, xlabels=xlabels,
+                                 ylabels=ylabels, readonly=readonly,
+                                 parent=self)
         self.view = ArrayView(self, self.model, data.dtype, data.shape)
 
         btn_layout = QHBoxLayout()
@@ -622,6 +682,9 @@ def __init__(self, parent, data, readonly=False,
 
     def accept_changes(self):
         """Accept changes"""
+        if isinstance(self.data, RemoteDataView):
+            # Changes were already sent to the kernel
+            return
         for (i, j), value in list(self.model.changes.items()):
             self.data[i, j] = value
         if self.old_data_shape is not None:
@@ -676,7 +739,10 @@ def setup_and_check(self, data, title='', readonly=False,
         return False if data is not supported, True otherwise
         """
         self.data = data
-        readonly = readonly or not self.data.flags.writeable
+        if isinstance(data, RemoteDataView):
+            readonly = readonly or not data.writeable
+        else:
+            readonly = readonly or not self.data.flags.writeable
         is_record_array = data.dtype.names is not None
         is_masked_array = isinstance(data, np.ma.MaskedArray)
 
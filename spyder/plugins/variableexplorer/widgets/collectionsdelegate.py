@@ -62,6 +62,13 @@ def set_value(self, index, value):
         if index.isValid():
             index.model().set_value(index, value)
 
+    def get_data_view(self, index):
+        """
+        Return a view that gets the data of the value at index as it is
+        shown, or None to get the whole value instead.
+        """
+        return None
+
     def show_warning(self, index):
         """
         Decide if showing a warning when the user is trying to view
@@ -101,6 +108,10 @@ def createEditor(self, parent, option, index, object_explorer=False):
         self.sig_open_editor.emit()
         if index.column() < 3:
             return None
+        if not object_explorer:
+            data_view = self.get_data_view(index)
+            if data_view is not None:
+                return self.create_data_view_editor(parent, index, data_view)
         if self.show_warning(index):
             answer = QMessageBox.warning(
                 self.parent(), _("Warning"),
@@ -276,6 +287,28 @@ def createEditor(self, parent, option, index, object_explorer=False):
                                             key=key, readonly=readonly))
             return None
 
+    def create_data_view_editor(self, parent, index, data_view):
+        """Create an editor for a DataFrame, Series or array view."""
+        key = index.model().get_key(index)
+        readonly = self.parent().readonly
+        if data_view.kind == 'array':
+            editor = ArrayEditor(parent=parent)
+            if not editor.setup_and_check(data_view, title=key,
+                                          readonly=readonly):
+                data_view.close()
+                return None
+        else:
+            editor = DataFrameEditor(parent=parent)
+            if not editor.setup_and_check(data_view, title=key):
+                data_view.close()
+                return None
+            editor.dataModel.set_format(index.model().dataframe_format)
+            editor.sig_option_changed.connect(self.change_option)
+        self.create_dialog(editor, dict(model=index.model(), editor=editor,
+                                        key=key, readonly=readonly,
+                                        data_view=data_view))
+        return None
+
     def create_dialog(self, editor, data):
         self._editors[id(editor)] = data
         editor.accepted.connect(
@@ -303,11 +336,18 @@ def change_option(self, option_name, new_value):
 
     def editor_accepted(self, editor_id):
         data = self._editors[editor_id]
+        data_view = data.get('data_view')
         if not data['readonly']:
-            index = data['model'].get_index_from_key(data['key'])
-            value = data['editor'].get_value()
-            conv_func = data.get('conv', lambda v: v)
-            self.set_value(index, conv_func(value))
+            if data_view is not None:
+                # Changes are kept in the kernel
+                data_view.commit()
+            else:
+                index = data['model'].get_index_from_key(data['key'])
+                value = data['editor'].get_value()
+                conv_func = data.get('conv', lambda v: v)
+                self.set_value(index, conv_func(value))
+        if data_view is not None:
+            data_view.close()
         # This is needed to avoid the problem reported on
         # spyder-ide/spyder#8557.
         try:
@@ -320,9 +360,12 @@ def editor_rejected(self, editor_id):
         # This is needed to avoid the problem reported on
         # spyder-ide/spyder#8557.
         try:
-            self._editors.pop(editor_id)
+            data = self._editors.pop(editor_id)
         except KeyError:
             pass
+        else:
+            if data.get('data_view') is not None:
+                data['data_view'].close()
         self.free_memory()
 
     def free_memory(self):
@@ -33,6 +33,8 @@
 """
 
 # Standard library imports
+from collections import OrderedDict
+import threading
 
 # Third party imports
 from qtpy.compat import from_qvariant, to_qvariant
@@ -44,7 +46,7 @@
                             QMessageBox, QPushButton, QTableView,
                             QScrollBar, QTableWidget, QFrame,
                             QItemDelegate)
-from pandas import DataFrame, Index, Series, isna
+from pandas import DataFrame, Index, Series
 try:
     from pandas._libs.tslib import OutOfBoundsDatetime
 except ImportError:  # For pandas version < 0.20
@@ -63,6 +65,7 @@
                                     keybinding, qapplication)
 from spyder.plugins.variableexplorer.widgets.arrayeditor import get_idx_rect
 from spyder.plugins.variableexplorer.widgets.basedialog import BaseDialog
+from spyder.plugins.variableexplorer.widgets.dataview import RemoteDataView
 
 # Supported Numbers and complex numbers
 REAL_NUMBER_TYPES = (float, int, np.int64, np.int32)
@@ -80,6 +83,23 @@
 ROWS_TO_LOAD = 500
 COLS_TO_LOAD = 40
 
+# Size of the tiles of cells that are formatted and colored together, and
+# number of tiles kept in memory. The sizes must divide those of the blocks
+# of RemoteDataView, so that a tile is always inside a single block.
+TILE_ROWS = 100
+TILE_COLUMNS = 10
+TILE_CACHE_SIZE = 64
+
+# Columns whose max and min are computed together in a thread, instead of
+# blocking the interface, when they have more values than this
+MAX_MIN_THREAD_SIZE = 1e6
+
+# Value of the columns of max_min_col not computed yet
+MAX_MIN_NOT_LOADED = False
+
+# Dataframes with more values than this are sorted in a thread
+SORT_THREAD_SIZE = 5e5
+
 # Background colours
 BACKGROUND_NUMBER_MINHUE = 0.66 # hue for largest number
 BACKGROUND_NUMBER_HUERANGE = 0.33 # (hue for smallest) minus (hue for largest)
@@ -110,6 +130,41 @@ def global_max(col_vals, index):
     return max(max_col), min(min_col)
 
 
+def column_max_min(col):
+    """
+    Return the maximum and minimum of a column (ignoring NaN) and if it's
+    complex, or None if it's not numeric.
+
+    If the column is complex, the maximum and minimum of its absolute
+    values are returned.
+    """
+    if col.dtype in REAL_NUMBER_TYPES:
+        return col.max(skipna=True), col.min(skipna=True), False
+    elif col.dtype in COMPLEX_NUMBER_TYPES:
+        col = col.abs()
+        return col.max(skipna=True), col.min(skipna=True), True
+    return None
+
+
+def sort_dataframe(df, column, ascending):
+    """
+    Return a copy of df sorted by the column in position column, or by its
+    index if column is -1.
+
+    Sorting by a column is stable, so sorting by several columns one after
+    the other works as expected.
+    """
+    if column >= 0:
+        try:
+            return df.sort_values(by=df.columns[column], ascending=ascending,
+                                  kind='mergesort')
+        except AttributeError:
+            # for pandas version < 0.17
+            return df.sort(columns=df.columns[column], ascending=ascending,
+                           kind='mergesort')
+    return df.sort_index(ascending=ascending)
+
+
 class DataFrameModel(QAbstractTableModel):
     """ DataFrame Table Model.
 
@@ -118,7 +173,19 @@ class DataFrameModel(QAbstractTableModel):
 
     For more information please see:
     https://github.com/wavexx/gtabview/blob/master/gtabview/models.py
+
+    Signals
+    -------
+    sig_max_min_col_ready(columns, version, stats): Emitted from a thread
+        when the max and min of columns are computed.
+    sig_sort_ready(version, df, error): Emitted from a thread when the
+        dataframe is sorted.
+    sig_sorted(bool): Emitted when a sort done in the background finishes,
+        with False if it failed.
     """
+    sig_max_min_col_ready = Signal(object, object, object)
+    sig_sort_ready = Signal(object, object, object)
+    sig_sorted = Signal(bool)
 
     def __init__(self, dataFrame, format=DEFAULT_FORMAT, parent=None):
         QAbstractTableModel.__init__(self)
@@ -129,14 +196,29 @@ def __init__(self, dataFrame, format=DEFAULT_FORMAT, parent=None):
         self._format = format
         self.complex_intran = None
         self.display_error_idxs = []
+        self._tiles = OrderedDict()
+        self._font = None
 
-        self.total_rows = self.df.shape[0]
-        self.total_cols = self.df.shape[1]
+        # Max and min of the columns, and columns being computed in a
+        # thread. The version is increased when the columns change, to
+        # discard results computed before.
+        self.max_min_col = None
+        self._column_stats = {}
+        self._pending_stats = set()
+        self._stats_version = 0
+        self.sig_max_min_col_ready.connect(self.max_min_col_ready)
+
+        # Version of the last sort, to discard the result of the previous
+        # ones if they are done in the background
+        self.sorting = False
+        self._sort_version = 0
+        self.sig_sort_ready.connect(self.sort_ready)
+
+        self.total_rows = self.shape[0]
+        self.total_cols = self.shape[1]
         size = self.total_rows * self.total_cols
 
-        self.max_min_col = None
         if size < LARGE_SIZE:
-            self.max_min_col_update()
             self.colum_avg_enabled = True
             self.bgcolor_enabled = True
             self.colum_avg(1)
@@ -160,6 +242,12 @@ def __init__(self, dataFrame, format=DEFAULT_FORMAT, parent=None):
             else:
                 self.cols_loaded = self.total_cols
 
+        # The max and min of the columns shown first are computed now, and
+        # those of the rest when they are shown
+        self.max_min_col_update()
+        if size < LARGE_SIZE:
+            self.load_max_min_col(range(self.cols_loaded))
+
     def _axis(self, axis):
         """
         Return the corresponding labels taking into account the axis.
@@ -231,35 +319,148 @@ def name(self, axis, level):
 
     def max_min_col_update(self):
         """
-        Determines the maximum and minimum number in each column.
+        Forget the maximum and minimum number of all columns.
 
-        The result is a list whose k-th entry is [vmax, vmin], where vmax and
-        vmin denote the maximum and minimum of the k-th column (ignoring NaN).
-        This list is stored in self.max_min_col.
+        They are stored in self.max_min_col, a list whose k-th entry is
+        [vmax, vmin], where vmax and vmin denote the maximum and minimum of
+        the k-th column (ignoring NaN), or MAX_MIN_NOT_LOADED until they are
+        computed by load_max_min_col.
 
         If the k-th column has a non-numerical dtype, then the k-th entry
         is set to None. If the dtype is complex, then compute the maximum and
         minimum of the absolute values. If vmax equals vmin, then vmin is
         decreased by one.
         """
-        if self.df.shape[0] == 0: # If no rows to compute max/min then return
+        self._column_stats = {}
+        self._stats_version += 1
+        if self.shape[0] == 0: # If no rows to compute max/min then return
+            self.max_min_col = None
             return
-        self.max_min_col = []
-        for dummy, col in self.df.iteritems():
-            if col.dtype in REAL_NUMBER_TYPES + COMPLEX_NUMBER_TYPES:
-                if col.dtype in REAL_NUMBER_TYPES:
-                    vmax = col.max(skipna=True)
-                    vmin = col.min(skipna=True)
-                else:
-                    vmax = col.abs().max(skipna=True)
-                    vmin = col.abs().min(skipna=True)
-                if vmax != vmin:
-                    max_min = [vmax, vmin]
-                else:
-                    max_min = [vmax, vmin - 1]
+        self.max_min_col = [MAX_MIN_NOT_LOADED] * self.shape[1]
+
+    def load_max_min_col(self, columns):
+        """
+        Compute the maximum and minimum needed to color columns, if they
+        haven't been computed yet.
+
+        If there are many values, they are computed in a thread and the
+        columns are colored when they are ready.
+        """
+        if self.max_min_col is None:
+            return
+        if not self.colum_avg_enabled:
+            # The global maximum and minimum need those of all columns
+            columns = range(self.shape[1])
+        missing = [column for column in columns
+                   if self.max_min_col[column] is MAX_MIN_NOT_LOADED
+                   and column not in self._pending_stats]
+        if not missing:
+            return
+        if len(missing) * self.shape[0] < MAX_MIN_THREAD_SIZE:
+            self.set_max_min_col(missing, self.compute_max_min_col(missing))
+        else:
+            self._pending_stats.update(missing)
+            self.start_max_min_col(missing, self._stats_version)
+
+    def compute_max_min_col(self, columns):
+        """Return the maximum and minimum of columns."""
+        return [column_max_min(self.df.iloc[:, column])
+                for column in columns]
+
+    def start_max_min_col(self, columns, version):
+        """
+        Start computing the maximum and minimum of columns in a thread.
+
+        max_min_col_ready is called with the result.
+        """
+        cols = [self.df.iloc[:, column] for column in columns]
+
+        def compute():
+            try:
+                stats = [column_max_min(col) for col in cols]
+            except Exception:
+                stats = [None] * len(cols)
+            try:
+                self.sig_max_min_col_ready.emit(columns, version, stats)
+            except RuntimeError:
+                # The model was deleted while computing
+                pass
+
+        thread = threading.Thread(target=compute)
+        thread.daemon = True
+        thread.start()
+
+    def max_min_col_ready(self, columns, version, stats):
+        """Set the maximum and minimum of columns and color them."""
+        self._pending_stats.difference_update(columns)
+        if version == self._stats_version and self.max_min_col is not None:
+            self.set_max_min_col(columns, stats)
+        # Otherwise the columns changed while they were computed, so they
+        # are computed again when they are shown
+        for tile in self._tiles.values():
+            tile['colors'] = [None] * len(tile['colors'])
+        self.dataChanged.emit(
+            self.createIndex(0, 0),
+            self.createIndex(self.rowCount() - 1, self.columnCount() - 1))
+
+    def set_max_min_col(self, columns, stats):
+        """
+        Set the maximum and minimum of columns from their stats, which are
+        (vmax, vmin, is_complex) or None for non-numerical columns.
+        """
+        for column, column_stats in zip(columns, stats):
+            if column_stats is None:
+                self._column_stats.pop(column, None)
+                self.max_min_col[column] = None
+                continue
+            self._column_stats[column] = column_stats
+            vmax, vmin = column_stats[:2]
+            if vmax != vmin:
+                self.max_min_col[column] = [vmax, vmin]
             else:
-                max_min = None
-            self.max_min_col.append(max_min)
+                self.max_min_col[column] = [vmax, vmin - 1]
+
+    def forget_max_min_col(self, column):
+        """
+        Forget the maximum and minimum of column, so that they are computed
+        again when needed.
+        """
+        self._column_stats.pop(column, None)
+        if self.max_min_col is not None:
+            self.max_min_col[column] = MAX_MIN_NOT_LOADED
+        if column in self._pending_stats:
+            self._stats_version += 1
+
+    def update_max_min_col(self, column, old_value, new_value):
+        """
+        Update the maximum and minimum of column after one of its values
+        changed from old_value to new_value.
+
+        They are computed again when needed if it is not possible to know
+        them from the previous ones.
+        """
+        stats = self._column_stats.get(column)
+        if stats is None:
+            # Not numerical or not computed yet
+            self.forget_max_min_col(column)
+            return
+        vmax, vmin, is_complex = stats
+        color_func = abs if is_complex else float
+        try:
+            old_value = color_func(old_value)
+            new_value = color_func(new_value)
+        except (TypeError, ValueError):
+            self.forget_max_min_col(column)
+            return
+        if (vmax != vmax or (old_value == vmax and not new_value >= vmax) or
+                (old_value == vmin and not new_value <= vmin)):
+            # The old value could be the only one equal to the max or min
+            self.forget_max_min_col(column)
+            return
+        if new_value == new_value:
+            vmax = max(vmax, new_value)
+            vmin = min(vmin, new_value)
+        self.set_max_min_col([column], [(vmax, vmin, is_complex)])
 
     def get_format(self):
         """Return current format"""
@@ -287,35 +488,151 @@ def colum_avg(self, state):
 
     def get_bgcolor(self, index):
         """Background color depending on value."""
-        column = index.column()
         if not self.bgcolor_enabled:
             return
-        value = self.get_value(index.row(), column)
-        if self.max_min_col[column] is None or isna(value):
-            color = QColor(BACKGROUND_NONNUMBER_COLOR)
-            if is_text_string(value):
-                color.setAlphaF(BACKGROUND_STRING_ALPHA)
-            else:
-                color.setAlphaF(BACKGROUND_MISC_ALPHA)
+        row = index.row()
+        column = index.column()
+        first = column - column % TILE_COLUMNS
+        self.load_max_min_col(
+            range(first, min(first + TILE_COLUMNS, self.total_cols)))
+        if (column in self._pending_stats or
+                self._pending_stats and not self.colum_avg_enabled):
+            # The max and min needed are being computed
+            return
+        tile, first_row, first_column = self.get_tile(row, column)
+        if tile is None:
+            return self._get_colors(column, [self.get_value(row, column)])[0]
+        j = column - first_column
+        colors = tile['colors'][j]
+        if colors is None:
+            colors = self._get_colors(column, tile['window'].iloc[:, j])
+            tile['colors'][j] = colors
+        return colors[row - first_row]
+
+    def _get_colors(self, column, values):
+        """Return the background colors of values of column."""
+        if self.max_min_col[column] is None:
+            string_color = QColor(BACKGROUND_NONNUMBER_COLOR)
+            string_color.setAlphaF(BACKGROUND_STRING_ALPHA)
+            misc_color = QColor(BACKGROUND_NONNUMBER_COLOR)
+            misc_color.setAlphaF(BACKGROUND_MISC_ALPHA)
+            return [string_color if is_text_string(value) else misc_color
+                    for value in values]
+
+        values = np.asarray(values)
+        if values.dtype in COMPLEX_NUMBER_TYPES:
+            values = np.abs(values)
+        values = values.astype(float)
+        vmax, vmin = self.return_max(self.max_min_col, column)
+        if vmax - vmin == 0:
+            vmax_vmin_diff = 1.0
         else:
-            if isinstance(value, COMPLEX_NUMBER_TYPES):
-                color_func = abs
-            else:
-                color_func = float
-            vmax, vmin = self.return_max(self.max_min_col, column)
-            if vmax - vmin == 0:
-                vmax_vmin_diff = 1.0
-            else:
-                vmax_vmin_diff = vmax - vmin
-            hue = (BACKGROUND_NUMBER_MINHUE + BACKGROUND_NUMBER_HUERANGE *
-                   (vmax - color_func(value)) / (vmax_vmin_diff))
-            hue = float(abs(hue))
-            if hue > 1:
-                hue = 1
-            color = QColor.fromHsvF(hue, BACKGROUND_NUMBER_SATURATION,
-                                    BACKGROUND_NUMBER_VALUE,
-                                    BACKGROUND_NUMBER_ALPHA)
-        return color
+            vmax_vmin_diff = vmax - vmin
+        hues = (BACKGROUND_NUMBER_MINHUE + BACKGROUND_NUMBER_HUERANGE *
+                (vmax - values) / vmax_vmin_diff)
+        hues = np.minimum(np.abs(hues), 1)
+
+        nan_color = QColor(BACKGROUND_NONNUMBER_COLOR)
+        nan_color.setAlphaF(BACKGROUND_MISC_ALPHA)
+        return [nan_color if hue != hue else
+                QColor.fromHsvF(hue, BACKGROUND_NUMBER_SATURATION,
+                                BACKGROUND_NUMBER_VALUE,
+                                BACKGROUND_NUMBER_ALPHA)
+                for hue in hues.tolist()]
+
+    def get_tile(self, row, column):
+        """
+        Return the tile of cells that contains row and column, and its
+        first row and column.
+
+        Tiles are formatted at once when they are first shown and the last
+        used ones are kept in memory, so that repainting and scrolling back
+        to them is fast. The tile is None if its data can't be retrieved.
+        """
+        key = (row // TILE_ROWS, column // TILE_COLUMNS)
+        first_row = key[0] * TILE_ROWS
+        first_column = key[1] * TILE_COLUMNS
+        tile = self._tiles.pop(key, None)
+        if tile is None:
+            rows = (first_row, min(first_row + TILE_ROWS, self.total_rows))
+            columns = (first_column,
+                       min(first_column + TILE_COLUMNS, self.total_cols))
+            window = self.get_tile_window(rows, columns)
+            if window is None:
+                return None, first_row, first_column
+            tile = {
+                'window': window,
+                'text': [self._format_column(window.iloc[:, j], first_row,
+                                             first_column + j)
+                         for j in range(window.shape[1])],
+                'colors': [None] * window.shape[1],
+            }
+        self._tiles[key] = tile
+        if len(self._tiles) > TILE_CACHE_SIZE:
+            self._tiles.popitem(last=False)
+        return tile, first_row, first_column
+
+    def get_tile_window(self, rows, columns):
+        """Return the window of rows and columns (start, stop) of a tile."""
+        return self.get_window(rows, columns)
+
+    def clear_tiles(self, column=None):
+        """
+        Forget the tiles that contain column, or all of them if column
+        is None.
+        """
+        if column is None:
+            self._tiles.clear()
+            return
+        for key in list(self._tiles):
+            if key[1] == column // TILE_COLUMNS:
+                del self._tiles[key]
+
+    def _format_column(self, values, first_row, column):
+        """
+        Return the text of the values of a column, with None for those that
+        can't be displayed.
+        """
+        if values.dtype == np.float64:
+            # Fast path for the most common case
+            fmt = self._format
+            values = values.to_numpy().tolist()
+            try:
+                return [fmt % value for value in values]
+            except (ValueError, TypeError):
+                pass
+        elif values.dtype.kind in 'biu':
+            return [to_text_string(value)
+                    for value in values.to_numpy().tolist()]
+        elif values.dtype == object:
+            values = values.to_numpy()
+        else:
+            # Use the same values as get_value for other dtypes (e.g.
+            # dates), because their conversion to NumPy is different
+            values = [self.get_value(first_row + i, column)
+                      for i in range(len(values))]
+        return [self._format_value(value) for value in values]
+
+    def _format_value(self, value):
+        """Return the text of value, or None if it can't be displayed."""
+        if isinstance(value, float):
+            try:
+                return self._format % value
+            except (ValueError, TypeError):
+                # may happen if format = '%d' and value = NaN;
+                # see spyder-ide/spyder#4139.
+                return DEFAULT_FORMAT % value
+        elif is_type_text_string(value):
+            # Don't perform any conversion on strings
+            # because it leads to differences between
+            # the data present in the dataframe and
+            # what is shown by Spyder
+            return value
+        else:
+            try:
+                return to_text_string(value)
+            except Exception:
+                return None
 
     def get_value(self, row, column):
         """Return the value of the DataFrame."""
@@ -336,30 +653,21 @@ def data(self, index, role=Qt.DisplayRole):
         if role == Qt.DisplayRole or role == Qt.EditRole:
             column = index.column()
             row = index.row()
-            value = self.get_value(row, column)
-            if isinstance(value, float):
-                try:
-                    return to_qvariant(self._format % value)
-                except (ValueError, TypeError):
-                    # may happen if format = '%d' and value = NaN;
-                    # see spyder-ide/spyder#4139.
-                    return to_qvariant(DEFAULT_FORMAT % value)
-            elif is_type_text_string(value):
-                # Don't perform any conversion on strings
-                # because it leads to differences between
-                # the data present in the dataframe and
-                # what is shown by Spyder
-                return value
+            tile, first_row, first_column = self.get_tile(row, column)
+            if tile is None:
+                text = self._format_value(self.get_value(row, column))
             else:
-                try:
-                    return to_qvariant(to_text_string(value))
-                except Exception:
-                    self.display_error_idxs.append(index)
-                    return u'Display Error!'
+                text = tile['text'][column - first_column][row - first_row]
+            if text is None:
+                self.display_error_idxs.append(index)
+                return u'Display Error!'
+            return to_qvariant(text)
         elif role == Qt.BackgroundColorRole:
             return to_qvariant(self.get_bgcolor(index))
         elif role == Qt.FontRole:
-            return to_qvariant(get_font(font_size_delta=DEFAULT_SMALL_DELTA))
+            if self._font is None:
+                self._font = get_font(font_size_delta=DEFAULT_SMALL_DELTA)
+            return to_qvariant(self._font)
         elif role == Qt.ToolTipRole:
             if index in self.display_error_idxs:
                 return _("It is not possible to display this value because\n"
@@ -371,59 +679,98 @@ def recalculate_index(self):
         self.df_index_list = self.df.index.tolist()
 
     def sort(self, column, order=Qt.AscendingOrder):
-        """Overriding sort method"""
+        """
+        Overriding sort method
+
+        The dataframe is replaced by a sorted copy, so the original one is
+        not modified. Large dataframes are sorted in a thread, in which case
+        this returns True right away and sig_sorted is emitted when done.
+        Starting another sort discards the result of the previous one.
+        """
         if self.complex_intran is not None:
             if self.complex_intran.any(axis=0).iloc[column]:
                 QMessageBox.critical(self.dialog, "Error",
                                      "TypeError error: no ordering "
                                      "relation is defined for complex numbers")
                 return False
+        ascending = order == Qt.AscendingOrder
+        self._sort_version += 1
+        if self.total_rows * self.total_cols >= SORT_THREAD_SIZE:
+            self.sorting = True
+            self.start_sort(column, ascending, self._sort_version)
+            return True
+
+        self.sorting = False
         try:
-            ascending = order == Qt.AscendingOrder
-            if column >= 0:
-                try:
-                    self.df.sort_values(by=self.df.columns[column],
-                                        ascending=ascending, inplace=True,
-                                        kind='mergesort')
-                except AttributeError:
-                    # for pandas version < 0.17
-                    self.df.sort(columns=self.df.columns[column],
-                                 ascending=ascending, inplace=True,
-                                 kind='mergesort')
-                except ValueError as e:
-                    # Not possible to sort on duplicate columns
-                    # See spyder-ide/spyder#5225.
-                    QMessageBox.critical(self.dialog, "Error",
-                                         "ValueError: %s" % to_text_string(e))
-                except SystemError as e:
-                    # Not possible to sort on category dtypes
-                    # See spyder-ide/spyder#5361.
-                    QMessageBox.critical(self.dialog, "Error",
-                                         "SystemError: %s" % to_text_string(e))
-            else:
-                # Update index list
-                self.recalculate_index()
-                # To sort by index
-                self.df.sort_index(inplace=True, ascending=ascending)
-        except TypeError as e:
+            df = sort_dataframe(self.df, column, ascending)
+        except (TypeError, ValueError, SystemError) as e:
+            # Not possible to sort on duplicate columns or category dtypes
+            # See spyder-ide/spyder#5225 and spyder-ide/spyder#5361.
             QMessageBox.critical(self.dialog, "Error",
-                                 "TypeError error: %s" % str(e))
+                                 "%s: %s" % (type(e).__name__,
+                                             to_text_string(e)))
             return False
+        self.set_sorted_data(df)
+        return True
 
+    def start_sort(self, column, ascending, version):
+        """
+        Start sorting the dataframe in a thread.
+
+        sort_ready is called with the result.
+        """
+        df = self.df
+
+        def sort():
+            try:
+                sorted_df = sort_dataframe(df, column, ascending)
+                error = None
+            except Exception as e:
+                sorted_df = None
+                error = "%s: %s" % (type(e).__name__, to_text_string(e))
+            try:
+                self.sig_sort_ready.emit(version, sorted_df, error)
+            except RuntimeError:
+                # The model was deleted while sorting
+                pass
+
+        thread = threading.Thread(target=sort)
+        thread.daemon = True
+        thread.start()
+
+    def sort_ready(self, version, df, error):
+        """Show the data sorted in the background, unless it's outdated."""
+        if version != self._sort_version:
+            # Another sort was started after this one
+            return
+        self.sorting = False
+        if error:
+            QMessageBox.critical(self.dialog, "Error", error)
+            self.sig_sorted.emit(False)
+            return
+        self.set_sorted_data(df)
+        self.sig_sorted.emit(True)
+
+    def set_sorted_data(self, df):
+        """Show the sorted dataframe."""
+        self.df = df
+        self.recalculate_index()
         self.reset()
-        return True
 
     def flags(self, index):
         """Set flags"""
-        return Qt.ItemFlags(int(QAbstractTableModel.flags(self, index) |
-                                Qt.ItemIsEditable))
+        flags = QAbstractTableModel.flags(self, index)
+        if not self.sorting:
+            # Cells can't be edited while they are sorted in the background
+            flags |= Qt.ItemIsEditable
+        return Qt.ItemFlags(int(flags))
 
     def setData(self, index, value, role=Qt.EditRole, change_type=None):
         """Cell content change"""
         column = index.column()
         row = index.row()
 
-        if index in self.display_error_idxs:
+        if index in self.display_error_idxs or self.sorting:
             return False
         if change_type is not None:
             try:
@@ -431,9 +778,10 @@ def setData(self, index, value, role=Qt.EditRole, change_type=None):
                 val = from_qvariant(value, str)
                 if change_type is bool:
                     val = bool_false_check(val)
-                self.df.iloc[row, column] = change_type(val)
+                self.set_value(row, column, change_type(val))
             except ValueError:
-                self.df.iloc[row, column] = change_type('0')
+                self.set_value(row, column, change_type('0'))
+            self.forget_max_min_col(column)
         else:
             val = from_qvariant(value, str)
             current_value = self.get_value(row, column)
@@ -443,7 +791,8 @@ def setData(self, index, value, role=Qt.EditRole, change_type=None):
             if (isinstance(current_value, supported_types) or
                     is_text_string(current_value)):
                 try:
-                    self.df.iloc[row, column] = current_value.__class__(val)
+                    new_value = current_value.__class__(val)
+                    self.set_value(row, column, new_value)
                 except (ValueError, OverflowError) as e:
                     QMessageBox.critical(self.dialog, "Error",
                                          str(type(e).__name__) + ": " + str(e))
@@ -453,14 +802,23 @@ def setData(self, index, value, role=Qt.EditRole, change_type=None):
                                      "Editing dtype {0!s} not yet supported."
                                      .format(type(current_value).__name__))
                 return False
-        self.max_min_col_update()
+            self.update_max_min_col(column, current_value, new_value)
+        self.clear_tiles(column if self.colum_avg_enabled else None)
         self.dataChanged.emit(index, index)
         return True
 
+    def set_value(self, row, column, value):
+        """Set the value of a cell of the DataFrame."""
+        self.df.iloc[row, column] = value
+
     def get_data(self):
         """Return data"""
         return self.df
 
+    def get_window(self, rows, columns):
+        """Return the rows (start, stop) and columns (start, stop)."""
+        return self.df.iloc[slice(*rows), slice(*columns)]
+
     def rowCount(self, index=QModelIndex()):
         """DataFrame row number"""
         # Avoid a "Qt exception in virtual methods" generated in our
@@ -498,7 +856,7 @@ def columnCount(self, index=QModelIndex()):
         # See spyder-ide/spyder#8910.
         try:
             # This is done to implement series
-            if len(self.df.shape) == 1:
+            if len(self.shape) == 1:
                 return 2
             elif self.total_cols <= self.cols_loaded:
                 return self.total_cols
@@ -508,10 +866,129 @@ def columnCount(self, index=QModelIndex()):
             return 0
 
     def reset(self):
+        self.clear_tiles()
         self.beginResetModel()
         self.endResetModel()
 
 
+class RemoteDataFrameModel(DataFrameModel):
+    """
+    DataFrame Table Model for a DataFrame or Series kept in the kernel.
+
+    Its cells, labels, sort order and column min/max are requested to the
+    kernel through a RemoteDataView when they are needed.
+    """
+
+    def __init__(self, data_view, format=DEFAULT_FORMAT, parent=None):
+        self.data_view = data_view
+        DataFrameModel.__init__(self, None, format=format, parent=parent)
+
+    @property
+    def shape(self):
+        """Return the shape of the dataframe."""
+        return self.data_view.shape
+
+    @property
+    def header_shape(self):
+        """Return the levels for the columns and rows of the dataframe."""
+        return self.data_view.header_shape
+
+    def header(self, axis, x, level=0):
+        """
+        Return the values of the labels for the header of columns or rows.
+        """
+        return self.data_view.get_label(axis, x, level)
+
+    def name(self, axis, level):
+        """Return the labels of the levels if any."""
+        names = self.data_view.names[axis]
+        if self.header_shape[axis] > 1:
+            return names[level]
+        if names[0]:
+            return names[0]
+
+    def compute_max_min_col(self, columns):
+        """Return the maximum and minimum of columns."""
+        try:
+            return self.data_view.get_minmax(columns)
+        except Exception:
+            return [None] * len(columns)
+
+    def start_max_min_col(self, columns, version):
+        """
+        Ask the kernel for the maximum and minimum of columns without
+        waiting for them.
+
+        max_min_col_ready is called with the result.
+        """
+        self.data_view.get_minmax(
+            columns,
+            callback=lambda stats: self.max_min_col_ready(
+                columns, version, stats))
+
+    def update_max_min_col(self, column, old_value, new_value):
+        """
+        Forget the maximum and minimum of column after one of its values
+        changed, because they are updated by the kernel.
+        """
+        self.forget_max_min_col(column)
+
+    def get_value(self, row, column):
+        """Return the value of the DataFrame."""
+        return self.data_view.get_value(row, column)
+
+    def recalculate_index(self):
+        """Nothing to do, because labels are requested with the cells."""
+        pass
+
+    def sort(self, column, order=Qt.AscendingOrder):
+        """
+        Overriding sort method
+
+        The view is sorted by the kernel without waiting for it, and
+        sig_sorted is emitted when done. The kernel applies all the sorts
+        requested, but only the last one updates the model.
+        """
+        ascending = order == Qt.AscendingOrder
+        self._sort_version += 1
+        version = self._sort_version
+        self.sorting = True
+        try:
+            self.data_view.sort(
+                column, ascending,
+                callback=lambda error: self.sort_ready(version, None, error))
+        except Exception as e:
+            self.sorting = False
+            QMessageBox.critical(self.dialog, "Error", to_text_string(e))
+            return False
+        return True
+
+    def set_sorted_data(self, df):
+        """Show the sorted view."""
+        self.reset()
+
+    def set_value(self, row, column, value):
+        """Set the value of a cell of the DataFrame."""
+        self.data_view.set_value(row, column, value)
+
+    def get_data(self):
+        """Return data"""
+        return self.data_view
+
+    def get_window(self, rows, columns):
+        """Return the rows (start, stop) and columns (start, stop)."""
+        return self.data_view.get_window(rows, columns)
+
+    def get_tile_window(self, rows, columns):
+        """Return the window of rows and columns (start, stop) of a tile."""
+        block, first_row, first_column = self.data_view.get_block(rows[0],
+                                                                  columns[0])
+        if block is None:
+            return None
+        return block.iloc[rows[0] - first_row:rows[1] - first_row,
+                          columns[0] - first_column:columns[1] - first_column]
+
+
 class DataFrameView(QTableView):
     """
     Data Frame view class.
@@ -530,12 +1007,14 @@ def __init__(self, parent, model, header, hscroll, vscroll):
         """Constructor."""
         QTableView.__init__(self, parent)
         self.setModel(model)
+        model.sig_sorted.connect(self.sort_finished)
         self.setHorizontalScrollBar(hscroll)
         self.setVerticalScrollBar(vscroll)
         self.setHorizontalScrollMode(1)
         self.setVerticalScrollMode(1)
 
         self.sort_old = [None]
+        self.sort_previous = [None]
         self.header_class = header
         self.header_class.sectionClicked.connect(self.sortByColumn)
         self.menu = self.setup_menu()
@@ -586,16 +1065,29 @@ def sortByColumn(self, index):
         if self.sort_old == [None]:
             self.header_class.setSortIndicatorShown(True)
         sort_order = self.header_class.sortIndicatorOrder()
+        self.sort_previous = self.sort_old
+        self.sort_old = [index, sort_order]
         if not self.model().sort(index, sort_order):
-            if len(self.sort_old) != 2:
-                self.header_class.setSortIndicatorShown(False)
-            else:
-                self.header_class.setSortIndicator(self.sort_old[0],
-                                                   self.sort_old[1])
+            self.restore_sort_indicator()
             return
-        self.sort_old = [index, self.header_class.sortIndicatorOrder()]
         self.sig_sort_by_column.emit()
 
+    def restore_sort_indicator(self):
+        """Show the sort indicator of the last sort that succeeded."""
+        self.sort_old = self.sort_previous
+        if len(self.sort_old) != 2:
+            self.header_class.setSortIndicatorShown(False)
+        else:
+            self.header_class.setSortIndicator(self.sort_old[0],
+                                               self.sort_old[1])
+
+    def sort_finished(self, success):
+        """Update the view after the model is sorted in the background."""
+        if success:
+            self.sig_sort_by_column.emit()
+        else:
+            self.restore_sort_indicator()
+
     def contextMenuEvent(self, event):
         """Reimplement Qt method."""
         self.menu.popup(event.globalPos())
@@ -638,9 +1130,8 @@ def copy(self):
         # Copy index and header too (equal True).
         # See spyder-ide/spyder#11096
         index = header = True
-        df = self.model().df
-        obj = df.iloc[slice(row_min, row_max + 1),
-                      slice(col_min, col_max + 1)]
+        obj = self.model().get_window((row_min, row_max + 1),
+                                      (col_min, col_max + 1))
         output = io.StringIO()
         try:
             obj.to_csv(output, sep='\t', index=index, header=header)
@@ -748,8 +1239,7 @@ def fetch_more(self, rows=False, columns=False):
 
     def sort(self, column, order=Qt.AscendingOrder):
         """Overriding sort method."""
-        ascending = order == Qt.AscendingOrder
-        self.model.sort(self.COLUMN_INDEX, order=ascending)
+        self.model.sort(self.COLUMN_INDEX, order=order)
         return True
 
     def headerData(self, section, orientation, role):
@@ -924,11 +1414,17 @@ def setup_and_check(self, data, title=''):
         self.layout.setContentsMargins(0, 0, 0, 0)
         self.setLayout(self.layout)
         self.setWindowIcon(ima.icon('arredit'))
+        if isinstance(data, RemoteDataView):
+            type_name = data.type_name
+        else:
+            type_name = data.__class__.__name__
         if title:
-            title = to_text_string(title) + " - %s" % data.__class__.__name__
+            title = to_text_string(title) + " - %s" % type_name
         else:
-            title = _("%s editor") % data.__class__.__name__
-        if isinstance(data, Series):
+            title = _("%s editor") % type_name
+        if isinstance(data, RemoteDataView):
+            self.is_series = data.is_series
+        elif isinstance(data, Series):
             self.is_series = True
             data = data.to_frame()
         elif isinstance(data, Index):
@@ -949,7 +1445,10 @@ def setup_and_check(self, data, title=''):
         self.create_table_index()
 
         # Create the model and view of the data
-        self.dataModel = DataFrameModel(data, parent=self)
+        if isinstance(data, RemoteDataView):
+            self.dataModel = RemoteDataFrameModel(data, parent=self)
+        else:
+            self.dataModel = DataFrameModel(data, parent=self)
         self.dataModel.dataChanged.connect(self.save_and_close_enable)
         self.create_data_table()
 
@@ -982,7 +1481,8 @@ def setup_and_check(self, data, title=''):
 
         bgcolor = QCheckBox(_('Background color'))
         bgcolor.setChecked(self.dataModel.bgcolor_enabled)
-        bgcolor.setEnabled(self.dataModel.bgcolor_enabled)
+        # The min and max of columns are computed when they are shown, and
+        # in a thread if they are large, so coloring can always be enabled
         bgcolor.stateChanged.connect(self.change_bgcolor_enable)
         btn_layout.addWidget(bgcolor)
 
@@ -1318,7 +1818,9 @@ def get_value(self):
         # It is import to avoid accessing Qt C++ object as it has probably
         # already been destroyed, due to the Qt.WA_DeleteOnClose attribute
         df = self.dataModel.get_data()
-        if self.is_series:
+        if isinstance(df, RemoteDataView):
+            return df
+        elif self.is_series:
             return df.iloc[:, 0]
         else:
             return df
@@ -0,0 +1,184 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright © Spyder Project Contributors
+# Licensed under the terms of the MIT License
+# (see spyder/__init__.py for details)
+
+"""
+Remote data views
+
+Client of the data views opened in the kernel, which let the DataFrame and
+Array editors get only the parts of a variable they show.
+"""
+
+# Standard library imports
+from collections import OrderedDict
+import logging
+
+
+logger = logging.getLogger(__name__)
+
+# Max time before giving up when making a blocking call to the kernel
+CALL_KERNEL_TIMEOUT = 30
+
+# Size of the blocks of cells requested to the kernel
+BLOCK_ROWS = 200
+BLOCK_COLUMNS = 20
+
+# Number of blocks kept in memory
+BLOCK_CACHE_SIZE = 32
+
+
+class RemoteDataView(object):
+    """
+    View of a DataFrame, Series or array kept in the kernel.
+
+    Cells are requested in blocks as they are needed and the last used
+    blocks are kept in memory.
+    """
+
+    def __init__(self, shellwidget, info):
+        self.shellwidget = shellwidget
+        self.id = info['id']
+        self.kind = info['kind']
+        self.type_name = info['type']
+        self.shape = tuple(info['shape'])
+        self.ndim = 2
+        self.header_shape = info.get('header_shape')
+        self.names = info.get('names')
+        self.dtype = info.get('dtype')
+        self.writeable = info.get('writeable', True)
+        self.minmax = info.get('minmax')
+        self.has_inf = info.get('has_inf', False)
+        self._blocks = OrderedDict()
+
+    @property
+    def is_series(self):
+        """Return True if the view is of a Series."""
+        return self.kind == 'series'
+
+    def _call_kernel(self, blocking=True):
+        """Return an object to call the data view methods of the kernel."""
+        return self.shellwidget.call_kernel(
+            blocking=blocking,
+            display_error=True,
+            timeout=CALL_KERNEL_TIMEOUT if blocking else None)
+
+    def get_block(self, row, column):
+        """
+        Return the block of cells that contains row and column, and its
+        first row and column.
+        """
+        key = (row // BLOCK_ROWS, column // BLOCK_COLUMNS)
+        first_row = key[0] * BLOCK_ROWS
+        first_column = key[1] * BLOCK_COLUMNS
+        block = self._blocks.pop(key, None)
+        if block is None:
+            try:
+                block = self._call_kernel().get_data_view_block(
+                    self.id,
+                    (first_row, first_row + BLOCK_ROWS),
+                    (first_column, first_column + BLOCK_COLUMNS))
+            except Exception as error:
+                logger.debug("Error getting a data view block: %s", error)
+                return None, first_row, first_column
+        self._blocks[key] = block
+        if len(self._blocks) > BLOCK_CACHE_SIZE:
+            self._blocks.popitem(last=False)
+        return block, first_row, first_column
+
+    def get_window(self, rows, columns):
+        """
+        Return the cells of rows (start, stop) and columns (start, stop)
+        in a single block.
+        """
+        return self._call_kernel().get_data_view_block(self.id, rows, columns)
+
+    def get_value(self, row, column):
+        """Return the value of a cell, or None if it can't be retrieved."""
+        block, first_row, first_column = self.get_block(row, column)
+        if block is None:
+            return None
+        row -= first_row
+        column -= first_column
+        if self.kind == 'array':
+            return block[row, column]
+        # To increase the performance iat is used but that requires error
+        # handling, so fallback uses iloc
+        try:
+            return block.iat[row, column]
+        except Exception:
+            return block.iloc[:, column].astype(str).iat[row]
+
+    def get_label(self, axis, x, level=0):
+        """
+        Return the label of column (axis 0) or row (axis 1) x in level.
+        """
+        if axis == 0:
+            block, _, first = self.get_block(0, x)
+            labels = None if block is None else block.columns
+        else:
+            block, first, _ = self.get_block(x, 0)
+            labels = None if block is None else block.index
+        if labels is None:
+            return ''
+        if not hasattr(labels, 'levels'):
+            return labels[x - first]
+        return labels.values[x - first][level]
+
+    def get_minmax(self, columns, callback=None):
+        """
+        Return the max and min of a list of columns.
+
+        If callback is given, the call doesn't wait for the kernel and the
+        result is passed to it instead.
+        """
+        if callback is None:
+            return self._call_kernel().get_data_view_minmax(self.id, columns)
+        self.shellwidget.call_kernel(
+            blocking=False,
+            callback=callback,
+            display_error=True).get_data_view_minmax(self.id, columns)
+
+    def sort(self, column, ascending, callback=None):
+        """
+        Sort the view by column, or by its index if column is -1.
+
+        Return an error message if it's not possible. If callback is given,
+        the call doesn't wait for the kernel and the error message, or None,
+        is passed to it instead.
+        """
+        if callback is None:
+            error = self._call_kernel().sort_data_view(
+                self.id, column, ascending)
+            self._blocks.clear()
+            return error
+
+        def sorted_callback(error):
+            self._blocks.clear()
+            callback(error)
+
+        self.shellwidget.call_kernel(
+            blocking=False,
+            callback=sorted_callback,
+            display_error=True).sort_data_view(self.id, column, ascending)
+
+    def set_value(self, row, column, value):
+        """Change the value of a cell."""
+        self._call_kernel(blocking=False).set_data_view_value(
+            self.id, row, column, value)
+        self._blocks.pop((row // BLOCK_ROWS, column // BLOCK_COLUMNS), None)
+
+    def commit(self):
+        """Set the variable of the view to its edited value."""
+        self._call_kernel().commit_data_view(self.id)
+        self.shellwidget.refresh_namespacebrowser()
+
+    def close(self):
+        """Close the view in the kernel."""
+        self._blocks.clear()
+        try:
+            self._call_kernel(blocking=False).close_data_view(self.id)
+        except Exception:
+            # The kernel may be dead
+            pass
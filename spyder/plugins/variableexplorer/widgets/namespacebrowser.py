@@ -19,7 +19,7 @@
 from qtpy.QtCore import Qt, Signal, Slot
 from qtpy.QtGui import QCursor
 from qtpy.QtWidgets import (QApplication, QHBoxLayout, QInputDialog, QMenu,
-                            QMessageBox, QLabel, QWidget)
+                            QMessageBox, QLabel, QProgressDialog, QWidget)
 
 from spyder_kernels.utils.iofuncs import iofunctions
 from spyder_kernels.utils.misc import fix_reference_name
@@ -89,6 +89,7 @@ def __init__(self, parent, options_button=None, plugin_actions=[]):
         self.plugin_actions = plugin_actions
 
         self.filename = None
+        self.save_progress_dialog = None
 
     def setup(self, check_all=None, exclude_private=None,
               exclude_uppercase=None, exclude_capitalized=None,
@@ -507,8 +508,18 @@ def save_data(self, filename=None):
         QApplication.setOverrideCursor(QCursor(Qt.WaitCursor))
         QApplication.processEvents()
 
+        # Only shown if saving takes long enough, as reported by the kernel
+        self.save_progress_dialog = QProgressDialog(
+            _("Saving data..."), "", 0, 0, self)
+        self.save_progress_dialog.setWindowTitle(_("Save data"))
+        self.save_progress_dialog.setCancelButton(None)
+        self.save_progress_dialog.setWindowModality(Qt.WindowModal)
+        self.save_progress_dialog.setMinimumDuration(1000)
+
         error_message = self.shellwidget.save_namespace(self.filename)
 
+        self.save_progress_dialog.close()
+        self.save_progress_dialog = None
         QApplication.restoreOverrideCursor()
         QApplication.processEvents()
         if error_message is not None:
@@ -525,6 +536,12 @@ def save_data(self, filename=None):
             QMessageBox.critical(self, _("Save data"), save_data_message)
         self.save_button.setEnabled(self.filename is not None)
 
+    def set_save_progress(self, saved, total):
+        """Show the number of variables saved by save_data."""
+        if self.save_progress_dialog is not None:
+            self.save_progress_dialog.setMaximum(total)
+            self.save_progress_dialog.setValue(saved)
+
 
 class NamespacesBrowserFinder(FinderLineEdit):
     """Textbox for filtering listed variables in the table."""
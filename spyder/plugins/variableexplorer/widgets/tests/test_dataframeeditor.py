@@ -35,7 +35,9 @@
 from spyder.utils.test import close_message_box
 from spyder.plugins.variableexplorer.widgets import dataframeeditor
 from spyder.plugins.variableexplorer.widgets.dataframeeditor import (
-    DataFrameEditor, DataFrameModel)
+    DataFrameEditor, DataFrameModel, RemoteDataFrameModel)
+from spyder.plugins.variableexplorer.widgets.dataview import RemoteDataView
+from spyder_kernels.utils.dataview import DataView
 
 
 # =============================================================================
@@ -259,6 +261,100 @@ def test_dataframemodel_sort_is_stable():   # cf. spyder-ide/spyder#3010.
     assert col2 == [str(x) for x in [1, 3, 4, 6, 11, 12, 15, 17,
                                      2, 5, 7, 8, 9, 10, 13, 14, 16]]
 
+def test_dataframemodel_tiles():
+    """Validate that cells are formatted by tiles and updated after edits."""
+    df = DataFrame(numpy.arange(300.).reshape(150, 2))
+    dfm = DataFrameModel(df)
+    assert data(dfm, 120, 1) == '241'
+    assert len(dfm._tiles) == 1
+    assert data(dfm, 0, 0) == '0'
+    assert len(dfm._tiles) == 2
+    assert dfm.setData(dfm.createIndex(120, 1), '5')
+    assert data(dfm, 120, 1) == '5'
+    dfm.set_format('%.2f')
+    assert data(dfm, 0, 0) == '0.00'
+
+
+def remote_data_view(view):
+    """Return a RemoteDataView of a kernel DataView, called synchronously."""
+    def call_kernel(blocking=True, callback=None, **kwargs):
+        """Call the methods of view, passing their result to callback."""
+        def method(function):
+            def call(view_id, *args):
+                result = function(*args)
+                if callback is not None:
+                    callback(result)
+                return result
+            return call
+
+        kernel = Mock()
+        kernel.get_data_view_block.side_effect = method(view.get_block)
+        kernel.get_data_view_minmax.side_effect = method(view.get_minmax)
+        kernel.sort_data_view.side_effect = method(view.sort)
+        return kernel
+
+    shellwidget = Mock()
+    shellwidget.call_kernel.side_effect = call_kernel
+    info = view.get_info()
+    info['id'] = 1
+    return RemoteDataView(shellwidget, info)
+
+
+def test_remote_dataframemodel(qtbot):
+    """Validate a model whose data is kept in a kernel data view."""
+    df = DataFrame({'colA': [1, 3, 2], 'colB': ['c', 'a', 'b']})
+    dfm = RemoteDataFrameModel(remote_data_view(DataView(df)))
+    assert dfm.rowCount() == 3
+    assert dfm.columnCount() == 2
+    assert data(dfm, 1, 0) == '3'
+    assert data(dfm, 1, 1) == 'a'
+    assert dfm.header(0, 1) == 'colB'
+    assert dfm.max_min_col == [[3, 1], None]
+    assert bgcolor(dfm, 0, 0) is not None
+    with qtbot.waitSignal(dfm.sig_sorted) as blocker:
+        assert dfm.sort(1)
+    assert blocker.args == [True]
+    assert [data(dfm, i, 0) for i in range(3)] == ['3', '2', '1']
+    assert df['colA'].tolist() == [1, 3, 2]
+
+
+@pytest.mark.parametrize('series', [False, True])
+def test_dataframeeditor_remote(qtbot, series):
+    """Validate that editors of kernel data views show all their data."""
+    df = DataFrame({'colA': numpy.arange(5), 'colB': numpy.ones(5)})
+    value = df['colA'] if series else df
+    editor = DataFrameEditor(None)
+    assert editor.setup_and_check(remote_data_view(DataView(value)))
+    qtbot.addWidget(editor)
+    assert editor.dataModel.rowCount() == 5
+    assert editor.dataModel.columnCount() == (1 if series else 2)
+    assert editor.dataTable.model().index(4, 0).data() == '4'
+
+
+def test_dataframemodel_sort_thread(qtbot, monkeypatch):
+    """Validate that large dataframes are sorted in a thread."""
+    monkeypatch.setattr(dataframeeditor, 'SORT_THREAD_SIZE', 1)
+    df = DataFrame({'colA': [1, 3, 2], 'colB': ['c', 'a', 'b']})
+    dfm = DataFrameModel(df)
+    with qtbot.waitSignal(dfm.sig_sorted, timeout=5000) as blocker:
+        assert dfm.sort(1)
+        assert dfm.sorting
+        assert not dfm.setData(dfm.createIndex(0, 0), '5')
+    assert blocker.args == [True]
+    assert not dfm.sorting
+    assert [data(dfm, i, 0) for i in range(3)] == ['3', '2', '1']
+    assert dfm.header(1, 0) == 1
+    assert df['colA'].tolist() == [1, 3, 2]
+
+    # Only the result of the last sort is shown
+    with qtbot.waitSignal(dfm.sig_sorted, timeout=5000) as blocker:
+        assert dfm.sort(0)
+        assert dfm.sort(0, order=Qt.DescendingOrder)
+    assert blocker.args == [True]
+    qtbot.wait(100)
+    assert [data(dfm, i, 0) for i in range(3)] == ['3', '2', '1']
+
+
 def test_dataframemodel_max_min_col_update():
     df = DataFrame([[1, 2.0], [2, 2.5], [3, 9.0]])
     dfm = DataFrameModel(df)
@@ -270,6 +366,46 @@ def test_dataframemodel_max_min_col_update_constant():
     assert dfm.max_min_col == [[1, 0], [2.0, 1.0]]
 
 
+def test_dataframemodel_max_min_col_lazy():
+    """Validate that max and min are only computed for shown columns."""
+    df = DataFrame(numpy.arange(300).reshape(3, 100))
+    dfm = DataFrameModel(df)
+    not_loaded = dataframeeditor.MAX_MIN_NOT_LOADED
+    assert dfm.max_min_col[39] == [239, 39]
+    assert dfm.max_min_col[40] is not_loaded
+    bgcolor(dfm, 0, 95)
+    assert dfm.max_min_col[89] is not_loaded
+    assert dfm.max_min_col[90:] == [[200 + i, i] for i in range(90, 100)]
+
+
+def test_dataframemodel_max_min_col_edit():
+    """Validate that max and min are updated after editing cells."""
+    df = DataFrame([[1.0, 'a'], [2.0, 'b'], [3.0, 'c']])
+    dfm = DataFrameModel(df)
+    assert dfm.setData(dfm.createIndex(1, 0), '5')
+    assert dfm.max_min_col == [[5.0, 1.0], None]
+    assert dfm.setData(dfm.createIndex(0, 0), '4')
+    assert dfm.max_min_col[0] is dataframeeditor.MAX_MIN_NOT_LOADED
+    bgcolor(dfm, 0, 0)
+    assert dfm.max_min_col[0] == [5.0, 3.0]
+
+
+def test_dataframemodel_max_min_col_thread(qtbot, monkeypatch):
+    """Validate that max and min of large columns are computed in a thread."""
+    monkeypatch.setattr(dataframeeditor, 'MAX_MIN_THREAD_SIZE', 1)
+    df = DataFrame([[0, 10], [1, 20], [2, 40]])
+    dfm = DataFrameModel(df)
+    with qtbot.waitSignal(dfm.dataChanged, timeout=5000):
+        assert bgcolor(dfm, 0, 1) is None
+    h0 = dataframeeditor.BACKGROUND_NUMBER_MINHUE
+    dh = dataframeeditor.BACKGROUND_NUMBER_HUERANGE
+    s = dataframeeditor.BACKGROUND_NUMBER_SATURATION
+    v = dataframeeditor.BACKGROUND_NUMBER_VALUE
+    a = dataframeeditor.BACKGROUND_NUMBER_ALPHA
+    assert dfm.max_min_col == [[2, 0], [40, 10]]
+    assert colorclose(bgcolor(dfm, 1, 1), (h0 + 2 / 3 * dh, s, v, a))
+
+
 def test_dataframemodel_with_timezone_aware_timestamps():
     # cf. spyder-ide/spyder#2940.
     df = DataFrame([x] for x in date_range('20150101', periods=5, tz='UTC'))
@@ -18,6 +18,7 @@
 import re
 import os
 import os.path as osp
+from stat import S_ISREG
 import sys
 import time
 import errno
@@ -317,11 +318,68 @@ def readlines(filename, encoding='utf-8'):
     return text.split(os.linesep), encoding
 
 
-def is_text_file(filename):
+# Extensions of files that are classified as binary without reading them
+BINARY_FILE_EXTENSIONS = frozenset([
+    '.pyc', '.pyo', '.pyd', '.so', '.dll', '.dylib', '.exe', '.o', '.a',
+    '.lib', '.obj', '.class', '.jar', '.whl', '.egg', '.zip', '.gz', '.bz2',
+    '.xz', '.7z', '.tar', '.rar', '.iso', '.pdf', '.png', '.jpg', '.jpeg',
+    '.gif', '.bmp', '.ico', '.icns', '.tif', '.tiff', '.svgz', '.mp3',
+    '.mp4', '.avi', '.mov', '.wav', '.ogg', '.ttf', '.otf', '.woff',
+    '.woff2', '.npy', '.npz', '.h5', '.hdf5', '.mat', '.pkl', '.pickle',
+    '.spydata', '.db', '.sqlite', '.xls', '.xlsx', '.doc', '.docx',
+])
+
+# Maximum number of files whose classification is kept in memory
+TEXT_FILE_CACHE_SIZE = 200000
+
+# Path -> (size, mtime, is_text)
+_text_file_cache = {}
+
+
+def clear_text_file_cache():
+    """Forget the cached results of `is_text_file`."""
+    _text_file_cache.clear()
+
+
+def is_text_file(filename, stat=None):
     """
     Test if the given path is a text-like file.
+
+    Files with a known binary extension are classified without reading
+    them. The result for other files is cached by path, size and
+    modification time, so that they are only read again after they change.
+
+    Parameters
+    ----------
+    filename: str
+        Path to the file.
+    stat: os.stat_result, optional
+        Result of `os.stat` for the file, if the caller already has it.
     """
     try:
-        return not is_binary(filename)
+        if stat is None:
+            stat = os.stat(filename)
+    except (OSError, IOError):
+        return False
+
+    if not S_ISREG(stat.st_mode):
+        return False
+
+    ext = osp.splitext(filename)[1].lower()
+    if ext in BINARY_FILE_EXTENSIONS:
+        return False
+
+    cached = _text_file_cache.get(filename)
+    if (cached is not None and cached[0] == stat.st_size
+            and cached[1] == stat.st_mtime):
+        return cached[2]
+
+    try:
+        is_text = not is_binary(filename)
     except (OSError, IOError):
         return False
+
+    if len(_text_file_cache) >= TEXT_FILE_CACHE_SIZE:
+        _text_file_cache.clear()
+    _text_file_cache[filename] = (stat.st_size, stat.st_mtime, is_text)
+    return is_text
@@ -6,6 +6,8 @@
 
 """QString compatibility."""
 
+from itertools import accumulate
+
 from spyder.py3compat import PY2
 
 
@@ -23,3 +25,20 @@ def qstring_length(text):
     if utf16_text[:2] in [b'\xff\xfe', b'\xff\xff', b'\xfe\xff']:
         length -= 1
     return length
+
+
+def qstring_offsets(text):
+    """
+    Return a table to convert indexes of `text` to QString (utf16) indexes.
+
+    The table has one more element than `text` so that the index of its end
+    can be converted too. When all characters of `text` take a single utf16
+    code unit, a range is returned to avoid building the table.
+    """
+    if PY2:
+        return range(len(text) + 1)
+    length = len(text)
+    if len(text.encode('utf-16-le')) == 2 * length:
+        return range(length + 1)
+    return list(accumulate(
+        [0] + [2 if ord(char) > 0xFFFF else 1 for char in text]))
@@ -0,0 +1,351 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright © Spyder Project Contributors
+# Licensed under the terms of the MIT License
+# (see spyder/__init__.py for details)
+
+"""
+On-disk trigram index used by Find in Files to narrow the files that need to
+be searched.
+
+The index maps every (lower case) sequence of three bytes present in a file
+to the files that contain it. A file can only match a literal text if it
+contains all the trigrams of that text, so only those files need to be read
+and searched.
+"""
+
+# Standard library imports
+from array import array
+from itertools import repeat
+import logging
+import os
+import os.path as osp
+import pickle
+import re
+import tempfile
+import zlib
+
+try:
+    from re import _parser as sre_parse
+    from re import _constants as sre_constants
+except ImportError:
+    import sre_parse
+    import sre_constants
+
+
+logger = logging.getLogger(__name__)
+
+# Bump this when the format of the index changes
+INDEX_VERSION = 2
+
+# Rebuild posting lists when this fraction of file ids is no longer in use
+COMPACT_RATIO = 0.25
+
+# Files larger than this are not indexed, so they are always searched
+INDEX_MAX_FILE_SIZE = 4 * 1024**2
+
+# Overlapping sequences of three bytes
+TRIGRAM_RE = re.compile(b'(?=(...))', re.DOTALL)
+
+# Data is split in chunks of this size to find its trigrams, so that the
+# bytes objects created for them at once are bounded
+TRIGRAM_CHUNK_SIZE = 64 * 1024
+
+# Runs of non zero bytes, and positions of the bits set in each byte
+NONZERO_RE = re.compile(b'[^\\x00]+')
+BYTE_BITS = [[bit for bit in range(8) if value & (1 << bit)]
+             for value in range(256)]
+
+
+def get_trigrams(data):
+    """
+    Return the sorted trigrams of `data` as an array of integers.
+
+    Parameters
+    ----------
+    data: bytes
+        Contents of a file or text to search.
+    """
+    if len(data) <= TRIGRAM_CHUNK_SIZE:
+        # Sorting the trigrams as bytes gives the same order as their big
+        # endian integer values, and both steps run in C.
+        trigrams = sorted(set(TRIGRAM_RE.findall(data.lower())))
+        return array('I', map(int.from_bytes, trigrams, repeat('big')))
+
+    # Set the bits of the trigrams of each chunk in a bitmap of all of them.
+    # Chunks overlap by two bytes to not miss the trigrams between them.
+    bitmap = bytearray(1 << 21)
+    for start in range(0, len(data) - 2, TRIGRAM_CHUNK_SIZE):
+        chunk = data[start:start + TRIGRAM_CHUNK_SIZE + 2].lower()
+        trigrams = set(TRIGRAM_RE.findall(chunk))
+        for trigram in map(int.from_bytes, trigrams, repeat('big')):
+            bitmap[trigram >> 3] |= 1 << (trigram & 7)
+
+    trigrams = array('I')
+    for match in NONZERO_RE.finditer(bitmap):
+        for position in range(match.start(), match.end()):
+            offset = position << 3
+            trigrams.extend([offset + bit
+                             for bit in BYTE_BITS[bitmap[position]]])
+    return trigrams
+
+
+def _get_regex_literals(pattern):
+    """
+    Return the runs of literal bytes that any match of `pattern` must
+    contain.
+
+    Only literals at the top level of the pattern are taken into account,
+    so patterns with alternations, optional parts or repetitions simply
+    yield shorter runs.
+    """
+    try:
+        parsed = sre_parse.parse(pattern.pattern, pattern.flags)
+    except Exception:
+        return []
+
+    literals = []
+    current = bytearray()
+    for op, value in parsed:
+        if op == sre_constants.LITERAL:
+            current.append(value)
+        else:
+            if current:
+                literals.append(bytes(current))
+            current = bytearray()
+    if current:
+        literals.append(bytes(current))
+    return literals
+
+
+def get_query_trigrams(texts, text_re):
+    """
+    Return the trigrams that a file must contain to match a search.
+
+    Parameters
+    ----------
+    texts: list
+        List of (text, encoding) tuples, as used by
+        `spyder.utils.textsearch.search_files`.
+    text_re: bool
+        Whether `texts` are compiled regular expressions.
+
+    Returns
+    -------
+    list or None
+        A list with one set of required trigrams per text (the file needs to
+        contain all the trigrams of any of them) or None if the index can't
+        be used to narrow this search.
+    """
+    alternatives = []
+    for text, enc in texts:
+        if text_re:
+            literals = _get_regex_literals(text)
+        else:
+            literals = [text]
+
+        required = set()
+        for literal in literals:
+            if len(literal) >= 3:
+                required.update(get_trigrams(literal))
+
+        if not required:
+            return None
+        alternatives.append(required)
+    return alternatives or None
+
+
+class TrigramIndex(object):
+    """
+    Persistent trigram index of the text files under a directory.
+
+    Files are kept up to date by comparing their size and modification time
+    with the values stored when they were indexed.
+    """
+
+    def __init__(self, root, path=None):
+        """
+        Parameters
+        ----------
+        root: str
+            Directory whose files are indexed.
+        path: str, optional
+            File where the index is saved. If None, the index is only kept
+            in memory.
+        """
+        self.root = osp.normpath(root)
+        self.path = path
+        self.loaded = False
+        self.modified = False
+        self._clear()
+
+    def _clear(self):
+        # fname -> (file id, size, mtime, checksum of its trigrams)
+        self.files = {}
+        # trigram -> array of file ids
+        self.postings = {}
+        self.next_id = 0
+        self.num_dead = 0
+
+    # ---- Persistence
+    def load(self):
+        """Load the index from disk, if it exists and is compatible."""
+        self.loaded = True
+        if self.path is None or not osp.isfile(self.path):
+            return False
+
+        try:
+            with open(self.path, 'rb') as f:
+                state = pickle.load(f)
+            if (state['version'] != INDEX_VERSION
+                    or state['root'] != self.root):
+                return False
+        except Exception:
+            logger.debug('Could not load search index %s', self.path,
+                         exc_info=True)
+            return False
+
+        self.files = state['files']
+        self.postings = state['postings']
+        self.next_id = state['next_id']
+        self.num_dead = state['num_dead']
+        self.modified = False
+        return True
+
+    def save(self):
+        """Save the index to disk if it was modified."""
+        if self.path is None or not self.modified:
+            return
+
+        if self.num_dead > COMPACT_RATIO * max(self.next_id, 1):
+            self.compact()
+
+        state = {
+            'version': INDEX_VERSION,
+            'root': self.root,
+            'files': self.files,
+            'postings': self.postings,
+            'next_id': self.next_id,
+            'num_dead': self.num_dead,
+        }
+        dirname = osp.dirname(self.path)
+        if not osp.isdir(dirname):
+            os.makedirs(dirname)
+
+        # Write to a temporary file first to not leave a corrupt index
+        # behind if Spyder is closed while saving.
+        fd, tmp_path = tempfile.mkstemp(dir=dirname)
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, self.path)
+        except Exception:
+            logger.debug('Could not save search index %s', self.path,
+                         exc_info=True)
+            if osp.exists(tmp_path):
+                os.remove(tmp_path)
+            return
+        self.modified = False
+
+    # ---- Updates
+    def is_current(self, fname, stat):
+        """Return True if `fname` is indexed and hasn't changed since."""
+        entry = self.files.get(fname)
+        return (entry is not None and entry[1] == stat.st_size
+                and entry[2] == stat.st_mtime)
+
+    def add(self, fname, size, mtime, trigrams):
+        """
+        Add or replace a file in the index.
+
+        If the trigrams of an indexed file didn't change, only its size and
+        modification time are updated and the index is not flagged as
+        modified, so it's not saved again just because files were touched.
+
+        Parameters
+        ----------
+        fname: str
+            Path to the file.
+        size: int
+            Size of the file when it was indexed.
+        mtime: float
+            Modification time of the file when it was indexed.
+        trigrams: array
+            Trigrams of the file, as returned by `get_trigrams`.
+        """
+        checksum = zlib.crc32(trigrams)
+        entry = self.files.get(fname)
+        if entry is not None and entry[3] == checksum:
+            self.files[fname] = (entry[0], size, mtime, checksum)
+            return
+
+        self.remove(fname)
+        file_id = self.next_id
+        self.next_id += 1
+        self.files[fname] = (file_id, size, mtime, checksum)
+        for trigram in trigrams:
+            posting = self.postings.get(trigram)
+            if posting is None:
+                self.postings[trigram] = array('I', [file_id])
+            else:
+                posting.append(file_id)
+        self.modified = True
+
+    def remove(self, fname):
+        """
+        Remove a file from the index.
+
+        Its id is just forgotten. Posting lists are cleaned up by `compact`.
+        """
+        if self.files.pop(fname, None) is not None:
+            self.num_dead += 1
+            self.modified = True
+
+    def prune(self, seen):
+        """Remove files that are not in `seen` and don't exist anymore."""
+        for fname in list(self.files):
+            if fname not in seen and not osp.isfile(fname):
+                self.remove(fname)
+
+    def compact(self):
+        """Remove the ids of files that are no longer indexed."""
+        live = {entry[0] for entry in self.files.values()}
+        postings = {}
+        for trigram, posting in self.postings.items():
+            posting = array('I', [i for i in posting if i in live])
+            if posting:
+                postings[trigram] = posting
+        self.postings = postings
+        self.num_dead = 0
+        self.modified = True
+
+    # ---- Queries
+    def query(self, required):
+        """
+        Return the indexed files that contain all the required trigrams.
+
+        Parameters
+        ----------
+        required: list
+            Sets of trigrams, as returned by `get_query_trigrams`.
+
+        Returns
+        -------
+        set
+            Paths of the candidate files.
+        """
+        ids = set()
+        for trigrams in required:
+            postings = [self.postings.get(t, ()) for t in trigrams]
+            postings.sort(key=len)
+            if not postings or not postings[0]:
+                continue
+            candidates = set(postings[0])
+            for posting in postings[1:]:
+                candidates.intersection_update(posting)
+                if not candidates:
+                    break
+            ids.update(candidates)
+
+        return {fname for fname, entry in self.files.items()
+                if entry[0] in ids}
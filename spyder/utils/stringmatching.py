@@ -8,6 +8,7 @@
 String search and match utilities usefull when filtering a list of texts.
 """
 
+import heapq
 import re
 
 from spyder.py3compat import to_text_string
@@ -15,6 +16,9 @@
 NOT_FOUND_SCORE = -1
 NO_SCORE = 0
 
+# Characters of a query that are not searched literally by its regex
+REGEX_SPECIAL_CHARS = set('.^$*+?{}[]\\|()')
+
 
 def get_search_regex(query, ignore_case=True):
     """Returns a compiled regex pattern to search for query letters in order.
@@ -235,6 +239,106 @@ def get_search_scores(query, choices, ignore_case=True, template='{}',
     return results
 
 
+class FuzzySearchIndex(object):
+    """
+    Index of choices to search for queries repeatedly, e.g. as they are typed.
+
+    Scores and enriched texts are the same as the ones of get_search_scores,
+    but the characters of each choice are indexed to discard the choices
+    that can't match a query before searching them with its regex, and the
+    matches of the last query are the only candidates when the next one
+    extends it. Enriched texts are only computed when requested, so they
+    can be limited to the visible rows of a list.
+    """
+
+    def __init__(self, choices, ignore_case=True):
+        self.choices = [to_text_string(choice, encoding='utf-8')
+                        for choice in choices]
+        self.ignore_case = ignore_case
+        self._last_query = None
+        self._last_matches = None
+
+        # Positions of the choices containing each character
+        self._positions = {}
+        for position, choice in enumerate(self.choices):
+            if ignore_case:
+                # Upper case characters can have more than one lower case
+                # version, e.g. 's' and the long s, which match each other
+                chars = set(choice.lower()).union(choice.upper().lower())
+            else:
+                chars = set(choice)
+            for char in chars:
+                self._positions.setdefault(char, set()).add(position)
+
+    def _get_candidates(self, query):
+        """Return the positions of the choices that could match query."""
+        if REGEX_SPECIAL_CHARS.intersection(query):
+            # Characters of the query may be optional in its regex
+            return range(len(self.choices))
+
+        if (self._last_query is not None and
+                query.startswith(self._last_query)):
+            return self._last_matches
+
+        if self.ignore_case:
+            query = query.lower()
+        # Only ASCII characters are checked because the regex could match
+        # other characters when ignoring case
+        positions = [self._positions.get(char, set()) for char in set(query)
+                     if ord(char) < 128]
+        if not positions:
+            return range(len(self.choices))
+        positions.sort(key=len)
+        candidates = positions[0].intersection(*positions[1:])
+        return sorted(candidates)
+
+    def search(self, query, limit=None):
+        """
+        Return a list of tuples with the position and score of each choice
+        matching query.
+
+        Results are sorted by score, i.e. best matches first. If limit is
+        given, only that number of best results is returned.
+        """
+        query = to_text_string(query, encoding='utf-8').replace(' ', '')
+        if not query:
+            results = [(NO_SCORE, position)
+                       for position in range(len(self.choices))]
+        else:
+            pattern = get_search_regex(query, self.ignore_case)
+            choices = self.choices
+            matches = [position for position in self._get_candidates(query)
+                       if pattern.search(choices[position])]
+            if not REGEX_SPECIAL_CHARS.intersection(query):
+                self._last_query = query
+                self._last_matches = matches
+            results = []
+            for position in matches:
+                __, __, score = get_search_score(
+                    query, choices[position], ignore_case=self.ignore_case,
+                    apply_regex=False)
+                results.append((score, position))
+
+        if limit is None:
+            results.sort()
+        else:
+            results = heapq.nsmallest(limit, results)
+        return [(position, score) for score, position in results]
+
+    def get_enriched_text(self, query, position, template='{}'):
+        """
+        Return the choice at position with the letters of query surrounded
+        by template, or the choice itself if it doesn't match query.
+        """
+        choice = self.choices[position]
+        query = to_text_string(query, encoding='utf-8').replace(' ', '')
+        if query and get_search_regex(query, self.ignore_case).search(choice):
+            __, choice, __ = get_search_score(
+                query, choice, ignore_case=self.ignore_case,
+                apply_regex=False, template=template)
+        return choice
+
+
 def test():
     template = '<b>{0}</b>'
     names = ['close pane', 'debug continue', 'debug exit', 'debug step into',
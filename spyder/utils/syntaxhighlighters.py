@@ -11,16 +11,19 @@
 
 # Standard library imports
 from __future__ import print_function
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import deque, OrderedDict
 import keyword
 import os
 import re
 import weakref
 
 # Third party imports
-from pygments.lexer import RegexLexer, bygroups
+from pygments.lexer import ExtendedRegexLexer, RegexLexer, bygroups
 from pygments.lexers import get_lexer_by_name
 from pygments.token import (Text, Other, Keyword, Name, String, Number,
-                            Comment, Generic, Token)
+                            Comment, Generic, Token, Error)
 from qtpy.QtCore import Qt, QTimer, Signal
 from qtpy.QtGui import (QColor, QCursor, QFont, QSyntaxHighlighter,
                         QTextCharFormat, QTextOption)
@@ -36,7 +39,7 @@
 from spyder.plugins.editor.utils.editor import BlockUserData
 from spyder.utils.workers import WorkerManager
 from spyder.plugins.outlineexplorer.api import OutlineExplorerData
-from spyder.utils.qstringhelpers import qstring_length
+from spyder.utils.qstringhelpers import qstring_length, qstring_offsets
 
 
 
@@ -123,11 +126,19 @@
 #==============================================================================
 # Auxiliary functions
 #==============================================================================
-def get_span(match, key=None):
+def get_span(match, key=None, offsets=None):
+    """
+    Return the QString span of a match.
+
+    `offsets` is the table returned by `qstring_offsets` for the matched
+    string. Passing it avoids measuring the string prefixes for every match.
+    """
     if key is not None:
         start, end = match.span(key)
     else:
         start, end = match.span()
+    if offsets is not None:
+        return offsets[start], offsets[end]
     start = qstring_length(match.string[:start])
     end = qstring_length(match.string[:end])
     return start, end
@@ -331,10 +342,11 @@ def highlight_block(self, text):
     def highlight_patterns(self, text, offset=0):
         """Highlight URI and mailto: patterns."""
         match = self.patterns.search(text, offset)
+        offsets = qstring_offsets(text) if match else None
         while match:
             for __, value in list(match.groupdict().items()):
                 if value:
-                    start, end = get_span(match)
+                    start, end = get_span(match, offsets=offsets)
                     start = max([0, start + offset])
                     end = max([0, end + offset])
                     font = self.format(start)
@@ -353,13 +365,15 @@ def highlight_spaces(self, text, offset=0):
         if show_blanks:
             format_leading = self.formats.get("leading", None)
             format_trailing = self.formats.get("trailing", None)
+            offsets = qstring_offsets(text)
+            text_length = offsets[-1]
             match = self.BLANKPROG.search(text, offset)
             while match:
-                start, end = get_span(match)
+                start, end = get_span(match, offsets=offsets)
                 start = max([0, start+offset])
                 end = max([0, end+offset])
                 # Format trailing spaces at the end of the line.
-                if end == qstring_length(text) and format_trailing is not None:
+                if end == text_length and format_trailing is not None:
                     self.setFormat(start, end - start, format_trailing)
                 # Format leading spaces, e.g. indentation.
                 if start == 0 and format_leading is not None:
@@ -525,7 +539,14 @@ class PythonSH(BaseSH):
     # Comments suitable for Outline Explorer
     OECOMMENT = re.compile(r'^(# ?--[-]+|##[#]+ )[ -]*[^- ]+')
 
+    # Maximum number of highlighted blocks whose formats are cached
+    # (0 disables the cache)
+    BLOCK_CACHE_SIZE = 20000
+
     def __init__(self, parent, font=None, color_scheme='Spyder'):
+        self._block_cache = OrderedDict()
+        self._recorded_formats = None
+        self._offsets = None
         BaseSH.__init__(self, parent, font, color_scheme)
         self.cell_separators = CELL_LANGUAGES['Python']
         # Avoid updating the outline explorer with every single letter typed
@@ -535,7 +556,7 @@ def __init__(self, parent, font=None, color_scheme='Spyder'):
     def highlight_match(self, text, match, key, value, offset,
                         state, import_stmt, oedata):
         """Highlight a single match."""
-        start, end = get_span(match, key)
+        start, end = get_span(match, key, self._offsets)
         start = max([0, start+offset])
         end = max([0, end+offset])
         length = end - start
@@ -583,7 +604,7 @@ def highlight_match(self, text, match, key, value, offset,
                 if value in ("def", "class"):
                     match1 = self.IDPROG.match(text, end)
                     if match1:
-                        start1, end1 = get_span(match1, 1)
+                        start1, end1 = get_span(match1, 1, self._offsets)
                         self.setFormat(start1, end1-start1,
                                        self.formats["definition"])
                         oedata = OutlineExplorerData(self.currentBlock())
@@ -615,7 +636,7 @@ def highlight_match(self, text, match, key, value, offset,
                         match1 = self.ASPROG.match(text, end, endpos)
                         if not match1:
                             break
-                        start, end = get_span(match1, 1)
+                        start, end = get_span(match1, 1, self._offsets)
                         self.setFormat(start, length, self.formats["keyword"])
 
         return state, import_stmt, oedata
@@ -624,6 +645,50 @@ def highlight_block(self, text):
         """Implement specific highlight for Python."""
         text = to_text_string(text)
         prev_state = tbh.get_state(self.currentBlock().previous())
+        if prev_state not in (self.INSIDE_DQ3STRING, self.INSIDE_SQ3STRING,
+                              self.INSIDE_DQSTRING, self.INSIDE_SQSTRING):
+            prev_state = self.NORMAL
+
+        # The formats of a block only depend on its text, the state left by
+        # the previous block and whether blank spaces are shown, so blocks
+        # that are highlighted again with the same inputs (e.g. after an
+        # edit in a previous line) replay their cached formats.
+        flags_text = self.document().defaultTextOption().flags()
+        show_blanks = bool(flags_text & QTextOption.ShowTabsAndSpaces)
+        key = (text, prev_state, show_blanks)
+        cached = self._block_cache.get(key) if self.BLOCK_CACHE_SIZE else None
+
+        if cached is None:
+            self._recorded_formats = []
+            try:
+                state, import_stmt, oedata = self.highlight_python_block(
+                    text, prev_state)
+                formats = self._recorded_formats
+            finally:
+                self._recorded_formats = None
+
+            if self.BLOCK_CACHE_SIZE:
+                if len(self._block_cache) >= self.BLOCK_CACHE_SIZE:
+                    self._block_cache.popitem(last=False)
+                self._block_cache[key] = (formats, state, import_stmt,
+                                          self._get_oedata_values(oedata))
+        else:
+            self._block_cache.move_to_end(key)
+            formats, state, import_stmt, oedata_values = cached
+            for start, count, fmt in formats:
+                QSyntaxHighlighter.setFormat(self, start, count, fmt)
+            oedata = self._create_oedata(oedata_values)
+
+        tbh.set_state(self.currentBlock(), state)
+        self.update_block_data(oedata, import_stmt)
+
+    def highlight_python_block(self, text, prev_state):
+        """
+        Highlight a block of text.
+
+        Returns the state at the end of the block, its import statement and
+        its outline explorer data.
+        """
         if prev_state == self.INSIDE_DQ3STRING:
             offset = -4
             text = r'""" '+text
@@ -638,12 +703,12 @@ def highlight_block(self, text):
             text = r"' "+text
         else:
             offset = 0
-            prev_state = self.NORMAL
 
         oedata = None
         import_stmt = None
 
-        self.setFormat(0, qstring_length(text), self.formats["normal"])
+        self._offsets = qstring_offsets(text)
+        self.setFormat(0, self._offsets[-1], self.formats["normal"])
 
         state = self.NORMAL
         match = self.PROG.search(text)
@@ -656,8 +721,6 @@ def highlight_block(self, text):
 
             match = self.PROG.search(text, match.end())
 
-        tbh.set_state(self.currentBlock(), state)
-
         # Use normal format for indentation and trailing spaces
         # Unless we are in a string
         states_multiline_string = [
@@ -673,6 +736,10 @@ def highlight_block(self, text):
             self.formats['trailing'] = self.formats['string']
         self.highlight_extras(text, offset)
 
+        return state, import_stmt, oedata
+
+    def update_block_data(self, oedata, import_stmt):
+        """Update the outline explorer data and import of the block."""
         block = self.currentBlock()
         data = block.userData()
 
@@ -695,6 +762,47 @@ def highlight_block(self, text):
 
         block.setUserData(data)
 
+    def _get_oedata_values(self, oedata):
+        """Get the values needed to recreate `oedata` in another block."""
+        if oedata is None:
+            return None
+        return (oedata.text, oedata.fold_level, oedata.def_type,
+                oedata._def_name, oedata.color,
+                getattr(oedata, 'cell_level', None))
+
+    def _create_oedata(self, values):
+        """Create the outline explorer data of the current block."""
+        if values is None:
+            return None
+        text, fold_level, def_type, def_name, color, cell_level = values
+        oedata = OutlineExplorerData(self.currentBlock(), text=text,
+                                     fold_level=fold_level,
+                                     def_type=def_type, def_name=def_name,
+                                     color=color)
+        if def_type == OutlineExplorerData.CELL:
+            oedata.cell_level = cell_level
+            # Let the editor know a new cell was added in the document
+            self.sig_new_cell.emit(oedata)
+        return oedata
+
+    def setFormat(self, start, count, fmt):
+        """Set a format, recording it while a block is being highlighted."""
+        if self._recorded_formats is not None:
+            self._recorded_formats.append((start, count, fmt))
+        QSyntaxHighlighter.setFormat(self, start, count, fmt)
+
+    def setup_formats(self, font=None):
+        BaseSH.setup_formats(self, font)
+        self.clear_block_cache()
+
+    def update_patterns(self, patterns):
+        BaseSH.update_patterns(self, patterns)
+        self.clear_block_cache()
+
+    def clear_block_cache(self):
+        """Forget the formats of all highlighted blocks."""
+        self._block_cache = OrderedDict()
+
     def get_import_statements(self):
         """Get import statment list."""
         block = self.document().firstBlock()
@@ -1262,6 +1370,86 @@ def setup_formats(self, font=None):
 # highlighter based on PygmentsSH would be 2 to 3 times slower than the
 # current native PythonSH syntax highlighter.
 
+def _is_incremental_lexer(lexer):
+    """
+    Return True if `_lex_regex` can report the states of `lexer`.
+
+    That's the case of lexers that run the state machine of RegexLexer
+    without customizing it.
+    """
+    return (isinstance(lexer, RegexLexer)
+            and not isinstance(lexer, ExtendedRegexLexer)
+            and (type(lexer).get_tokens_unprocessed
+                 is RegexLexer.get_tokens_unprocessed))
+
+
+def _lex_regex(lexer, text):
+    """
+    Lex `text` with a RegexLexer.
+
+    This follows RegexLexer.get_tokens_unprocessed, but it also yields a
+    (position, None, states) checkpoint every time the lexer reaches the
+    start of a line between two tokens. Rules that don't consume text can
+    yield several checkpoints at the same position.
+
+    Lexing can't be restarted from a checkpoint because the tokens before it
+    may depend on the text after it (e.g. a quote is only lexed as the start
+    of a string if the string is closed later). However, the tokens after a
+    checkpoint only depend on its states and the text after it.
+    """
+    pos = 0
+    tokendefs = lexer._tokens
+    statestack = ['root']
+    statetokens = tokendefs[statestack[-1]]
+    while True:
+        for rexmatch, action, new_state in statetokens:
+            m = rexmatch(text, pos)
+            if m:
+                if action is not None:
+                    if callable(action):
+                        for item in action(lexer, m):
+                            yield item
+                    else:
+                        yield pos, action, m.group()
+                pos = m.end()
+                if new_state is not None:
+                    # State transition
+                    if isinstance(new_state, tuple):
+                        for state in new_state:
+                            if state == '#pop':
+                                if len(statestack) > 1:
+                                    statestack.pop()
+                            elif state == '#push':
+                                statestack.append(statestack[-1])
+                            else:
+                                statestack.append(state)
+                    elif isinstance(new_state, int):
+                        # Pop, but keep at least one state on the stack
+                        if abs(new_state) >= len(statestack):
+                            del statestack[1:]
+                        else:
+                            del statestack[new_state:]
+                    elif new_state == '#push':
+                        statestack.append(statestack[-1])
+                    statetokens = tokendefs[statestack[-1]]
+                break
+        else:
+            # No rule matched
+            if pos >= len(text):
+                break
+            if text[pos] == '\n':
+                # At EOL, reset state to "root"
+                statestack = ['root']
+                statetokens = tokendefs['root']
+                yield pos, Text, '\n'
+            else:
+                yield pos, Error, text[pos]
+            pos += 1
+
+        if pos and text[pos - 1] == '\n':
+            yield pos, None, tuple(statestack)
+
+
 class PygmentsSH(BaseSH):
     """Generic Pygments syntax highlighter."""
     # Store the language name and a ref to the lexer
@@ -1270,6 +1458,16 @@ class PygmentsSH(BaseSH):
 
     # Syntax highlighting states (from one text block to another):
     NORMAL = 0
+
+    # Spyder formats that Pygments tokens are mapped to. Spans store the
+    # index of their format in this tuple.
+    FORMAT_NAMES = ('normal', 'keyword', 'builtin', 'comment', 'string',
+                    'number')
+
+    # Number of blocks highlighted at once when applying new formats to the
+    # blocks that are not visible
+    HIGHLIGHT_CHUNK_SIZE = 500
+
     def __init__(self, parent, font=None, color_scheme=None):
         # Map Pygments tokens to Spyder tokens
         self._tokmap = {Text: "normal",
@@ -1282,6 +1480,8 @@ def __init__(self, parent, font=None, color_scheme=None):
                         Comment: "comment",
                         String: "string",
                         Number: "number"}
+        # Cache of the format index of every Pygments token type
+        self._fmt_ids = {}
         # Load Pygments' Lexer
         if self._lang_name is not None:
             self._lexer = get_lexer_by_name(self._lang_name)
@@ -1292,83 +1492,262 @@ def __init__(self, parent, font=None, color_scheme=None):
         # parsing
         self._worker_manager = WorkerManager()
 
-        # Store the format for all the tokens after Pygments parsing
-        self._charlist = []
+        # Last lexed text, its QString length and the formats of its tokens
+        # as run-length spans: the QString position where each span starts
+        # and the index of its format in FORMAT_NAMES.
+        self._lexed = None
 
-        # Flag variable to avoid unnecessary highlights if the worker has not
-        # yet finished processing
-        self._allow_highlight = True
+        # Numbers of the blocks whose formats still need to be updated
+        self._pending_blocks = deque()
+        self._pending_timer = QTimer(self)
+        self._pending_timer.setSingleShot(True)
+        self._pending_timer.setInterval(0)
+        self._pending_timer.timeout.connect(self._highlight_pending_blocks)
 
     def make_charlist(self):
-        """Parses the complete text and stores format for each character."""
+        """
+        Lex the document in a thread and update the formats of its blocks.
+
+        Lexing stops after the changes made since the last time the document
+        was lexed as soon as the lexer gets back in sync with the previous
+        results, and only the blocks whose formats changed are updated.
+        """
 
         def worker_output(worker, output, error):
             """Worker finished callback."""
-            self._charlist = output
             if error is None and output:
-                self._allow_highlight = True
-                self.rehighlight()
-            self._allow_highlight = False
+                self._lexed, changed = output
+                if changed is not None:
+                    self._rehighlight_range(*changed)
 
         text = to_text_string(self.document().toPlainText())
-        tokens = self._lexer.get_tokens(text)
 
         # Before starting a new worker process make sure to end previous
         # incarnations
         self._worker_manager.terminate_all()
 
         worker = self._worker_manager.create_python_worker(
-            self._make_charlist,
-            tokens,
-            self._tokmap,
-            self.formats,
+            self._make_spans,
+            text,
+            self._lexed,
         )
         worker.sig_finished.connect(worker_output)
         worker.start()
 
-    def _make_charlist(self, tokens, tokmap, formats):
+    def _get_fmt_id(self, typ):
+        """Get the index of the Spyder format for a Pygments token type."""
+        fmt_id = self._fmt_ids.get(typ)
+        if fmt_id is None:
+            # Exact matches first
+            fmt = self._tokmap.get(typ)
+            if fmt is None:
+                # Partial (parent-> child) matches
+                for key, val in self._tokmap.items():
+                    if typ in key:  # Checks if typ is a subtype of key.
+                        fmt = val
+                        break
+                else:
+                    fmt = 'normal'
+            fmt_id = self.FORMAT_NAMES.index(fmt)
+            self._fmt_ids[typ] = fmt_id
+        return fmt_id
+
+    def _make_spans(self, text, lexed=None):
         """
-        Parses the complete text and stores format for each character.
-
-        Uses the attached lexer to parse into a list of tokens and Pygments
-        token types.  Then breaks tokens into individual letters, each with a
-        Spyder token type attached.  Stores this list as self._charlist.
-
-        It's attached to the contentsChange signal of the parent QTextDocument
-        so that the charlist is updated whenever the document changes.
+        Lex `text` and store the format of its tokens as run-length spans.
+
+        Parameters
+        ----------
+        text: str
+            Text to lex.
+        lexed: tuple, optional
+            Result of lexing a previous version of `text`, as stored in
+            `self._lexed`. If given and the lexer supports it, lexing stops
+            as soon as the lexer reaches a line after the changes at a
+            checkpoint with the same states as before, and the old results
+            are reused from there.
+
+        Returns
+        -------
+        tuple
+            The new value of `self._lexed` and the (start, end) QString
+            positions of the part of `text` whose formats need to be
+            updated, or None if nothing changed.
         """
-
-        def _get_fmt(typ):
-            """Get the Spyder format code for the given Pygments token type."""
-            # Exact matches first
-            if typ in tokmap:
-                return tokmap[typ]
-            # Partial (parent-> child) matches
-            for key, val in tokmap.items():
-                if typ in key: # Checks if typ is a subtype of key.
-                    return val
-
-            return 'normal'
-
-        charlist = []
-        for typ, token in tokens:
-            fmt = formats[_get_fmt(typ)]
-            for letter in token:
-                charlist.append((fmt, letter))
-
-        return charlist
+        if lexed is not None and lexed[0] == text:
+            return lexed, None
+
+        offsets = qstring_offsets(text)
+        length = offsets[-1]
+        incremental = _is_incremental_lexer(self._lexer)
+
+        if lexed is None:
+            lexed = ('', 0, array('l'), array('B'), array('l'), [])
+        (old_text, old_length, old_starts, old_fmts,
+         old_checkpoints, old_states) = lexed
+
+        # Length of the common prefix and suffix of the old and new text
+        prefix = 0
+        max_prefix = min(len(text), len(old_text))
+        step = 4096
+        while prefix < max_prefix:
+            end = min(prefix + step, max_prefix)
+            if text[prefix:end] == old_text[prefix:end]:
+                prefix = end
+            else:
+                while text[prefix] == old_text[prefix]:
+                    prefix += 1
+                break
+        suffix = 0
+        max_suffix = max_prefix - prefix
+        while (suffix < max_suffix and
+                text[-suffix - 1] == old_text[-suffix - 1]):
+            suffix += 1
+        suffix_start = len(text) - suffix
+        delta = length - old_length
+        text_delta = len(text) - len(old_text)
+
+        checkpoints = array('l')
+        states = []
+        interned_states = {}
+        starts, fmts = array('l'), array('B')
+
+        lex_text = text
+        if not lex_text.endswith('\n'):
+            lex_text += '\n'
+        if incremental:
+            tokens = _lex_regex(self._lexer, lex_text)
+        else:
+            tokens = self._lexer.get_tokens_unprocessed(lex_text)
+
+        # The position of tokens is computed from the length of the previous
+        # ones because some lexers report wrong positions for tokens lexed
+        # by other lexers (e.g. code blocks in Markdown).
+        pos = 0
+        num_old_spans = len(old_starts)
+        for index, typ, value in tokens:
+            if typ is None:
+                pos = index
+                if pos >= len(text):
+                    break
+                # Reuse the old results once the lexer is back at a
+                # checkpoint with the same states as before on a line after
+                # the changes
+                if pos > suffix_start:
+                    old_pos = pos - text_delta
+                    i = bisect_left(old_checkpoints, old_pos)
+                    while (i < len(old_checkpoints)
+                            and old_checkpoints[i] == old_pos
+                            and old_states[i] != value):
+                        i += 1
+                    if (i < len(old_checkpoints)
+                            and old_checkpoints[i] == old_pos):
+                        qpos = offsets[pos]
+                        j = bisect_right(old_starts, qpos - delta) - 1
+                        if not fmts or old_fmts[j] != fmts[-1]:
+                            starts.append(qpos)
+                            fmts.append(old_fmts[j])
+                        starts.extend(s + delta for s in old_starts[j + 1:])
+                        fmts.extend(old_fmts[j + 1:])
+                        checkpoints.extend(
+                            p + text_delta for p in old_checkpoints[i:])
+                        states.extend(old_states[i:])
+                        break
+                checkpoints.append(pos)
+                states.append(interned_states.setdefault(value, value))
+                continue
+
+            if pos >= len(text):
+                break
+            if not value:
+                continue
+            fmt_id = self._get_fmt_id(typ)
+            if not fmts or fmts[-1] != fmt_id:
+                starts.append(offsets[pos])
+                fmts.append(fmt_id)
+            pos += len(value)
+
+        # Only update the blocks whose formats or text changed
+        first = 0
+        while (first < len(starts) and first < num_old_spans
+                and starts[first] == old_starts[first]
+                and fmts[first] == old_fmts[first]):
+            first += 1
+        last = 0
+        while (last < len(starts) - first and last < num_old_spans - first
+                and starts[-last - 1] == old_starts[-last - 1] + delta
+                and fmts[-last - 1] == old_fmts[-last - 1]):
+            last += 1
+
+        changed_start = length
+        if first < len(starts):
+            changed_start = starts[first]
+        if first < num_old_spans:
+            changed_start = min(changed_start, old_starts[first])
+        changed_end = starts[len(starts) - last] if last else length
+        changed_start = min(changed_start, offsets[prefix])
+        changed_end = max(changed_end, offsets[suffix_start])
+
+        lexed = (text, length, starts, fmts, checkpoints, states)
+        return lexed, (changed_start, changed_end)
+
+    def _rehighlight_range(self, start, end):
+        """
+        Update the formats of the blocks between the QString positions
+        `start` and `end`, starting with the visible ones.
+        """
+        document = self.document()
+        first = document.findBlock(start)
+        last = document.findBlock(max(start, end - 1))
+        if not first.isValid():
+            return
+        if not last.isValid():
+            last = document.lastBlock()
+        numbers = range(first.blockNumber(), last.blockNumber() + 1)
+
+        visible = []
+        if self.editor is not None:
+            first_visible, last_visible = (
+                self.editor.get_visible_block_numbers())
+            visible = range(max(first_visible, numbers.start),
+                            min(last_visible, numbers.stop - 1) + 1)
+        for number in visible:
+            self.rehighlightBlock(document.findBlockByNumber(number))
+
+        self._pending_blocks.extend(
+            number for number in numbers if number not in visible)
+        if self._pending_blocks:
+            self._pending_timer.start()
+
+    def _highlight_pending_blocks(self):
+        """Update the formats of a chunk of the pending blocks."""
+        document = self.document()
+        for __ in range(min(self.HIGHLIGHT_CHUNK_SIZE,
+                            len(self._pending_blocks))):
+            block = document.findBlockByNumber(self._pending_blocks.popleft())
+            if block.isValid():
+                self.rehighlightBlock(block)
+        if self._pending_blocks:
+            self._pending_timer.start()
 
     def highlightBlock(self, text):
         """ Actually highlight the block"""
-        # Note that an undefined blockstate is equal to -1, so the first block
-        # will have the correct behaviour of starting at 0.
-        if self._allow_highlight:
-            start = self.previousBlockState() + 1
+        lexed = self._lexed
+        if lexed is not None:
+            __, length, starts, fmts, __, __ = lexed
+            start = self.currentBlock().position()
             end = start + qstring_length(text)
-            for i, (fmt, letter) in enumerate(self._charlist[start:end]):
-                self.setFormat(i, 1, fmt)
-            self.setCurrentBlockState(end)
-            self.highlight_extras(text)
+            i = max(bisect_right(starts, start) - 1, 0)
+            while i < len(starts) and starts[i] < end:
+                span_start = max(starts[i], start)
+                span_end = starts[i + 1] if i + 1 < len(starts) else length
+                span_end = min(span_end, end)
+                if span_end > span_start:
+                    fmt = self.formats[self.FORMAT_NAMES[fmts[i]]]
+                    self.setFormat(span_start - start, span_end - span_start,
+                                   fmt)
+                i += 1
+        self.highlight_extras(text)
 
 
 class PythonLoggingLexer(RegexLexer):
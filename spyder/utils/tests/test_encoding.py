@@ -11,7 +11,9 @@
 from flaky import flaky
 import pytest
 
-from spyder.utils.encoding import is_text_file, get_coding, write
+from spyder.utils import encoding
+from spyder.utils.encoding import (clear_text_file_cache, is_text_file,
+                                   get_coding, write)
 from spyder.py3compat import to_text_string, PY2
 
 if PY2:
@@ -97,6 +99,36 @@ def test_is_text_file(tmpdir):
     assert is_text_file(str(p)) == True
 
 
+def test_is_text_file_cache(tmpdir, mocker):
+    """Test that files are only sniffed again after they change."""
+    clear_text_file_cache()
+    p = tmpdir.join("data.unknown")
+    p.write_binary(b"Some random text")
+    is_binary = mocker.spy(encoding, 'is_binary')
+
+    assert is_text_file(str(p))
+    assert is_text_file(str(p))
+    assert is_binary.call_count == 1
+
+    p.write_binary(bytes(range(256)) * 4)
+    assert not is_text_file(str(p))
+    assert is_binary.call_count == 2
+
+    # Files with text extensions are still sniffed
+    p = tmpdir.join("data.py")
+    p.write_binary(b"\x00\x01\x02" * 100)
+    assert not is_text_file(str(p))
+    assert is_binary.call_count == 3
+
+    # Known binary extensions don't need to be read
+    p = tmpdir.join("image.png")
+    p.write_binary(b"Some random text")
+    assert not is_text_file(str(p))
+    assert not is_text_file(str(tmpdir.join("missing.py")))
+    assert not is_text_file(str(tmpdir))
+    assert is_binary.call_count == 3
+
+
 @pytest.mark.parametrize(
     'expected_encoding, text_file',
     [('utf-8', 'utf-8.txt'),
@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright © Spyder Project Contributors
+# Licensed under the terms of the MIT License
+#
+
+"""
+Tests for searchindex.py
+"""
+
+# Standard library imports
+import os
+import re
+
+# Local imports
+from spyder.utils import searchindex
+from spyder.utils.searchindex import (get_query_trigrams, get_trigrams,
+                                      TrigramIndex)
+
+
+def add_file(index, path, text):
+    path.write_binary(text)
+    stat = os.stat(str(path))
+    index.add(str(path), stat.st_size, stat.st_mtime, get_trigrams(text))
+
+
+def test_trigrams_chunks(monkeypatch):
+    """Test that the trigrams of data split in chunks are all found."""
+    data = b'Spam and eggs\n' * 10 + bytes(range(256))
+    trigrams = get_trigrams(data)
+    assert list(trigrams) == sorted(set(trigrams))
+    assert int.from_bytes(b'egg', 'big') in trigrams
+    for chunk_size in [1, 4, 100]:
+        monkeypatch.setattr(searchindex, 'TRIGRAM_CHUNK_SIZE', chunk_size)
+        assert get_trigrams(data) == trigrams
+
+
+def test_query_trigrams():
+    """Test the trigrams required by literal and regex searches."""
+    assert get_query_trigrams([(b'ab', 'utf-8')], False) is None
+    assert get_query_trigrams([(b'abcd', 'utf-8')], False) == [
+        set(get_trigrams(b'abcd'))]
+
+    texts = [(re.compile(b'spam\\d+eggs'), 'utf-8')]
+    assert get_query_trigrams(texts, True) == [
+        set(get_trigrams(b'spam')) | set(get_trigrams(b'eggs'))]
+
+    texts = [(re.compile(b'sp|am'), 'utf-8')]
+    assert get_query_trigrams(texts, True) is None
+
+
+def test_index_query(tmpdir):
+    """Test that the index returns the files that contain a text."""
+    index = TrigramIndex(str(tmpdir))
+    add_file(index, tmpdir.join('spam.txt'), b'Spam and eggs')
+    add_file(index, tmpdir.join('ham.txt'), b'ham and eggs')
+
+    required = get_query_trigrams([(b'spam', 'utf-8')], False)
+    assert index.query(required) == {str(tmpdir.join('spam.txt'))}
+
+    required = get_query_trigrams([(b'eggs', 'utf-8')], False)
+    assert len(index.query(required)) == 2
+
+    # Replacing a file forgets its previous contents
+    add_file(index, tmpdir.join('spam.txt'), b'bacon')
+    required = get_query_trigrams([(b'spam', 'utf-8')], False)
+    assert index.query(required) == set()
+
+
+def test_index_persistence(tmpdir):
+    """Test that the index is saved to and loaded from disk."""
+    index_path = str(tmpdir.join('index', 'test.pickle'))
+    index = TrigramIndex(str(tmpdir), index_path)
+    spam = tmpdir.join('spam.txt')
+    add_file(index, spam, b'spam')
+    add_file(index, spam, b'more spam')
+    index.save()
+
+    loaded = TrigramIndex(str(tmpdir), index_path)
+    assert loaded.load()
+    assert loaded.is_current(str(spam), os.stat(str(spam)))
+    required = get_query_trigrams([(b'more', 'utf-8')], False)
+    assert loaded.query(required) == {str(spam)}
+
+    # Indexes of other directories are not loaded
+    other = TrigramIndex(str(tmpdir.join('index')), index_path)
+    assert not other.load()
+
+    # Removed files are pruned
+    spam.remove()
+    loaded.prune(set())
+    assert loaded.files == {}
+
+
+def test_index_modified(tmpdir):
+    """Test that the index is only flagged as modified when entries change."""
+    index = TrigramIndex(str(tmpdir))
+    spam = tmpdir.join('spam.txt')
+    add_file(index, spam, b'spam')
+    index.modified = False
+
+    # Touching a file only updates its stats
+    add_file(index, spam, b'spam')
+    assert not index.modified
+    assert index.is_current(str(spam), os.stat(str(spam)))
+    assert index.num_dead == 0
+
+    add_file(index, spam, b'eggs')
+    assert index.modified
+    assert index.num_dead == 1
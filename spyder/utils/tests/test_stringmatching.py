@@ -15,7 +15,8 @@
 import pytest
 
 # Local imports
-from spyder.utils.stringmatching import get_search_scores
+from spyder.utils.stringmatching import (FuzzySearchIndex,
+                                         get_search_scores)
 
 TEST_FILE = os.path.join(os.path.dirname(__file__), 'data/example.py')
 
@@ -216,5 +217,31 @@ def test_stringmatching_order_filter():
                                      'use previous <b>lay</b>out', 400113)]
 
 
+def test_fuzzy_search_index():
+    """Test that the index gives the same results as get_search_scores."""
+    template = '<b>{0}</b>'
+    names = ['layout preferences', 'save current layout', 'use next layout',
+             'close pane', 'lock unlock panes', 'run analysis', '']
+    index = FuzzySearchIndex(names)
+
+    for query in ['l', 'la', 'lay', 'lay o', 'layx', 'p', 'pan', 'PANE']:
+        expected = get_search_scores(query, names, template=template,
+                                     valid_only=True, sort=True)
+        results = index.search(query)
+        assert [(names[position], score) for position, score in results] == (
+            [(name, score) for name, __, score in expected])
+        for position, __ in results:
+            rich_text = index.get_enriched_text(query, position,
+                                                template=template)
+            assert (names[position], rich_text) in [
+                (name, rich) for name, rich, __ in expected]
+
+    # Top results and choices that don't match
+    assert index.search('lay', limit=2) == [(0, 400100), (2, 400109)]
+    assert index.get_enriched_text('lay', 3, template=template) == (
+        'close pane')
+    assert index.search('') == [(position, 0) for position in range(7)]
+
+
 if __name__ == "__main__":
     pytest.main()
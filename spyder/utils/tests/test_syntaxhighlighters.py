@@ -5,11 +5,15 @@
 
 """Tests for syntaxhighlighters.py"""
 
+import random
+
 import pytest
 from qtpy.QtWidgets import QApplication
 from qtpy.QtGui import QTextDocument
 
-from spyder.utils.syntaxhighlighters import HtmlSH, PythonSH, MarkdownSH
+from spyder.utils.qstringhelpers import qstring_length, qstring_offsets
+from spyder.utils.syntaxhighlighters import (HtmlSH, PythonSH, MarkdownSH,
+                                            guess_pygments_highlighter)
 from spyder.py3compat import PY3
 
 def compare_formats(actualFormats, expectedFormats, sh):
@@ -107,5 +111,98 @@ def test_python_not_an_outline_explorer_comment(line):
     assert not PythonSH.OECOMMENT.match(line)
 
 
+def test_qstring_offsets():
+    text = u'a\U0001F600b c'
+    offsets = qstring_offsets(text)
+    assert len(offsets) == len(text) + 1
+    for i in range(len(text) + 1):
+        assert offsets[i] == qstring_length(text[:i])
+
+
+def test_python_block_cache(qtbot, mocker):
+    txt = "def foo():\n    '''Doc\n    string'''\n    return 1  # Note\n"
+    doc = QTextDocument(txt)
+    sh = PythonSH(doc, color_scheme='Spyder')
+    sh.rehighlight()
+
+    blocks = []
+    block = doc.firstBlock()
+    while block.isValid():
+        blocks.append(block)
+        block = block.next()
+
+    def get_formats():
+        return [[(f.start, f.length, f.format.foreground().color().name())
+                 for f in block.layout().additionalFormats()]
+                for block in blocks]
+
+    expected = get_formats()
+    states = [block.userState() for block in blocks]
+    assert blocks[0].userData().oedata.def_name == 'foo'
+
+    # Highlighting the same blocks again replays the cached formats
+    spy = mocker.spy(sh, 'highlight_python_block')
+    sh.rehighlight()
+    assert spy.call_count == 0
+    assert get_formats() == expected
+    assert [block.userState() for block in blocks] == states
+    assert blocks[0].userData().oedata.def_name == 'foo'
+
+    # Changing the formats invalidates the cache
+    sh.setup_formats()
+    sh.rehighlight()
+    assert spy.call_count == len(blocks)
+    assert get_formats() == expected
+
+
+def test_pygments_incremental_spans():
+    txt = "# Title\n\nSome *text*\n\n```python\nx = 1\n```\n\nMore `code`\n"
+    doc = QTextDocument(txt)
+    sh = guess_pygments_highlighter('test.md')(doc, color_scheme='Spyder')
+
+    lexed, changed = sh._make_spans(txt)
+    assert changed == (0, qstring_length(txt))
+
+    # Lexing the same text again doesn't change anything
+    assert sh._make_spans(txt, lexed) == (lexed, None)
+
+    # Incremental results are the same as lexing the whole text again
+    for old, new in [('Some', 'Any'), ('```\n\n', '\n\n'), ('x = 1', '"a"'),
+                     ('More', u'\U0001F600 More')]:
+        pos = txt.index(old)
+        txt = txt.replace(old, new)
+        lexed, changed = sh._make_spans(txt, lexed)
+        full, __ = sh._make_spans(txt)
+        assert lexed[2:] == full[2:]
+        assert changed[0] <= qstring_length(txt[:pos])
+
+
+@pytest.mark.parametrize('seed', range(10))
+def test_pygments_incremental_spans_random(seed):
+    """
+    Test that incremental results are the same as lexing the whole text
+    again after random edits to a JavaScript file.
+    """
+    txt = ('function f(){\n  var s = "a /b/ c";\n  // comment\n'
+           '  /* multi\n  line */\n  return /re+/g.test(s) ? 1 : 2;\n}\n'
+           '<!-- x\n')
+    pieces = ['"', "'", '`', '/', '*', '/*', '*/', '//', '<!--', '{', '}',
+              '\n', ' ', 'x']
+    doc = QTextDocument(txt)
+    sh = guess_pygments_highlighter('test.js')(doc, color_scheme='Spyder')
+    rng = random.Random(seed)
+
+    lexed, __ = sh._make_spans(txt)
+    for __ in range(200):
+        pos = rng.randint(0, len(txt))
+        if txt and rng.random() < 0.3:
+            txt = txt[:pos] + txt[pos + rng.randint(1, 4):]
+        else:
+            txt = txt[:pos] + rng.choice(pieces) + txt[pos:]
+        lexed, __ = sh._make_spans(txt, lexed)
+        full, __ = sh._make_spans(txt)
+        assert lexed[2:] == full[2:]
+
+
 if __name__ == '__main__':
     pytest.main()
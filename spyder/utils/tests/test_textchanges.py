@@ -0,0 +1,150 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright © Spyder Project Contributors
+# Licensed under the terms of the MIT License
+#
+
+"""
+Tests for textchanges.py
+"""
+
+# Standard library imports
+import random
+
+# Test library imports
+import pytest
+
+# Third party imports
+from qtpy.QtGui import QTextCursor, QTextDocument
+from qtpy.QtWidgets import QPlainTextDocumentLayout
+
+# Local imports
+from spyder.utils.textchanges import (apply_text_changes,
+                                      common_prefix_length,
+                                      common_suffix_length,
+                                      TextChangesTracker)
+
+
+TEXT = u"""def foo(x):
+    return x + 1
+
+print(foo(2))
+"""
+
+
+def change(start, end, text):
+    """Return a content change replacing start to end with text."""
+    return {
+        'range': {
+            'start': {'line': start[0], 'character': start[1]},
+            'end': {'line': end[0], 'character': end[1]},
+        },
+        'text': text,
+    }
+
+
+@pytest.fixture
+def document(qtbot):
+    """Return a QTextDocument with TEXT and a tracker of its changes."""
+    document = QTextDocument()
+    # Like in QPlainTextEdit, which is needed to emit contentsChange
+    document.setDocumentLayout(QPlainTextDocumentLayout(document))
+    document.setPlainText(TEXT)
+    return document, TextChangesTracker(document)
+
+
+def edit(document, start, end, text):
+    """Replace the text of document between positions start and end."""
+    cursor = QTextCursor(document)
+    cursor.setPosition(start)
+    cursor.setPosition(end, QTextCursor.KeepAnchor)
+    cursor.insertText(text)
+
+
+def test_common_affix_length():
+    """Test the length of common prefixes and suffixes."""
+    assert common_prefix_length('spam', 'spa') == 3
+    assert common_prefix_length('spam', 'eggs') == 0
+    assert common_suffix_length('spam', 'ham') == 2
+    assert common_suffix_length('', 'ham') == 0
+
+
+def test_apply_text_changes():
+    """Test applying changes with and without a range."""
+    changes = [
+        change((0, 4), (0, 7), 'bar'),
+        change((1, 16), (3, 0), '\n'),
+    ]
+    assert apply_text_changes(TEXT, changes) == (
+        u"def bar(x):\n    return x + 1\nprint(foo(2))\n")
+    assert apply_text_changes(TEXT, [{'text': 'spam'}]) == 'spam'
+    assert apply_text_changes(
+        TEXT, [{'text': 'spam'}, change((0, 4), (0, 4), 'eggs')]) == (
+            'spameggs')
+
+
+def test_tracker_merges_typing(document):
+    """Test that typing and deleting what was typed is a single change."""
+    document, tracker = document
+    for i, char in enumerate('bar'):
+        edit(document, 7 + i, 7 + i, char)
+    edit(document, 9, 10, '')
+    assert tracker.take_changes() == [{
+        'range': {'start': {'line': 0, 'character': 7},
+                  'end': {'line': 0, 'character': 7}},
+        'rangeLength': 0,
+        'text': 'ba',
+    }]
+    assert tracker.take_changes() == []
+
+
+def test_tracker_sends_only_changed_text(document):
+    """Test that the common parts of replaced and new text are removed."""
+    document, tracker = document
+    edit(document, 0, 11, 'def fob(x):')
+    changes = tracker.take_changes()
+    assert changes == [dict(change((0, 6), (0, 7), 'b'), rangeLength=1)]
+
+    # Changing only the format of the text is not a change
+    cursor = QTextCursor(document)
+    cursor.setPosition(0)
+    cursor.setPosition(5, QTextCursor.KeepAnchor)
+    cursor.mergeCharFormat(cursor.charFormat())
+    assert tracker.take_changes() == []
+
+
+def test_tracker_with_non_bmp_characters(document):
+    """Test that changes are sent whole when utf16 offsets don't match."""
+    document, tracker = document
+    edit(document, 0, 0, u'# \U0001F600\n')
+    assert tracker.take_changes() == [{'text': document.toPlainText()}]
+    edit(document, 20, 20, 'spam')
+    assert len(tracker.take_changes()[0]['range']) == 2
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_tracker_random_edits(document, seed):
+    """Test that applying the tracked changes gives the document text."""
+    document, tracker = document
+    rand = random.Random(seed)
+    text = document.toPlainText()
+    for __ in range(10):
+        for __ in range(rand.randint(1, 5)):
+            length = document.characterCount() - 1
+            start = rand.randint(0, length)
+            end = rand.randint(start, min(length, start + 10))
+            new_text = ''.join(rand.choice('ab \n') for __ in
+                               range(rand.randint(0, 5)))
+            edit(document, start, end, new_text)
+        text = apply_text_changes(text, tracker.take_changes())
+        assert text == document.toPlainText()
+
+    document.setPlainText(TEXT)
+    assert apply_text_changes(text, tracker.take_changes()) == TEXT
+    document.undo()
+    assert apply_text_changes(TEXT, tracker.take_changes()) == (
+        document.toPlainText())
+
+
+if __name__ == "__main__":
+    pytest.main()
@@ -0,0 +1,88 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright © Spyder Project Contributors
+# Licensed under the terms of the MIT License
+#
+
+"""
+Tests for textsearch.py
+"""
+
+# Standard library imports
+import re
+
+# Test library imports
+import pytest
+
+# Local imports
+from spyder.utils import textsearch
+from spyder.utils.textsearch import search_files, search_in_file
+
+
+TEXT = u"""spam and eggs
+no match here
+SPAM spam
+ñandú spam
+"""
+
+
+@pytest.fixture
+def text_file(tmpdir):
+    fname = tmpdir.join('text.txt')
+    fname.write_binary(TEXT.encode('utf-8'))
+    return str(fname)
+
+
+def test_search_literal(text_file):
+    """Test searching a literal string in a file."""
+    results = search_in_file(text_file, [(b'spam', 'utf-8')], False, True)
+    assert [r[1:4] for r in results] == [(1, 0, 4), (3, 5, 9), (4, 8, 12)]
+    assert results[0][4] == u'spam and eggs\n'
+    assert results[2][4] == u'ñandú spam\n'
+
+
+def test_search_case_insensitive(text_file):
+    """Test that case insensitive searches match upper case text."""
+    results = search_in_file(text_file, [(b'spam', 'utf-8')], False, False)
+    assert [r[1:3] for r in results] == [(1, 0), (3, 0), (3, 5), (4, 8)]
+
+
+def test_search_regex(text_file):
+    """Test searching a regular expression in a file."""
+    texts = [(re.compile(b'^sp[a-z]+'), 'utf-8')]
+    results = search_in_file(text_file, texts, True, True)
+    assert [r[1:4] for r in results] == [(1, 0, 4)]
+
+    texts = [(re.compile(b'\\Aspam'), 'utf-8')]
+    results = search_in_file(text_file, texts, True, False)
+    assert [r[1:4] for r in results] == [(1, 0, 4), (3, 0, 4)]
+
+
+def test_search_files_errors(text_file, tmpdir):
+    """Test that unreadable files are reported."""
+    missing = str(tmpdir.join('missing.txt'))
+    results, error, trigrams = search_files(
+        [text_file, missing], [(b'eggs', 'utf-8')], False, True)
+    assert error
+    assert [r[1:3] for r in results] == [(1, 9)]
+    assert trigrams == {}
+
+
+def test_search_files_trigrams(text_file):
+    """Test that trigrams are computed for the files that are indexed."""
+    results, error, trigrams = search_files(
+        [text_file], [(b'eggs', 'utf-8')], False, True,
+        index_fnames={text_file})
+    size, mtime, file_trigrams = trigrams[text_file]
+    assert size == len(TEXT.encode('utf-8'))
+    assert int.from_bytes(b'egg', 'big') in file_trigrams
+
+
+def test_search_files_trigrams_large(text_file, monkeypatch):
+    """Test that large files are searched but not indexed."""
+    monkeypatch.setattr(textsearch, 'INDEX_MAX_FILE_SIZE', 10)
+    results, error, trigrams = search_files(
+        [text_file], [(b'eggs', 'utf-8')], False, True,
+        index_fnames={text_file})
+    assert [r[1:3] for r in results] == [(1, 9)]
+    assert trigrams == {}
@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright © Spyder Project Contributors
+# Licensed under the terms of the MIT License
+#
+
+"""
+Tests for walker.py
+"""
+
+# Standard library imports
+import os.path as osp
+import re
+
+# Test library imports
+import pytest
+
+# Local imports
+from spyder.utils.walker import IgnoreRules, walk_files
+
+
+def walked(root, **kwargs):
+    return sorted(osp.relpath(path, root).replace('\\', '/')
+                  for path, stat in walk_files(root, **kwargs))
+
+
+@pytest.mark.parametrize(
+    'pattern, path, is_dir, expected',
+    [('*.pyc', 'a/b/c.pyc', False, True),
+     ('*.pyc', 'a/b/c.py', False, None),
+     ('build/', 'src/build', True, True),
+     ('build/', 'src/build', False, None),
+     ('/build', 'src/build', True, None),
+     ('/build', 'build', True, True),
+     ('doc/*.txt', 'doc/a.txt', False, True),
+     ('doc/*.txt', 'doc/sub/a.txt', False, None),
+     ('**/logs', 'a/b/logs', True, True),
+     ('a/**/z', 'a/b/c/z', False, True),
+     ('file[0-9].txt', 'file1.txt', False, True),
+     ('\\#notes', '#notes', False, True)])
+def test_ignore_rules(pattern, path, is_dir, expected):
+    """Test the gitignore patterns semantics."""
+    rules = IgnoreRules('', ['# comment', '', pattern])
+    assert rules.match(path, is_dir) is expected
+
+
+def test_walk_files(tmpdir):
+    """Test walking a tree with ignore files."""
+    tmpdir.join('.gitignore').write('*.log\nbuild/\n!keep.log\n')
+    tmpdir.join('main.py').write('')
+    tmpdir.join('debug.log').write('')
+    tmpdir.join('keep.log').write('')
+    tmpdir.mkdir('build').join('out.py').write('')
+    tmpdir.mkdir('.git').join('config').write('')
+    src = tmpdir.mkdir('src')
+    src.join('module.py').write('')
+    src.join('generated.py').write('')
+    src.join('.ignore').write('generated.py\n')
+    root = str(tmpdir)
+
+    assert walked(root) == ['.gitignore', 'keep.log', 'main.py',
+                            'src/.ignore', 'src/module.py']
+    assert walked(root, use_ignore_files=False) == [
+        '.gitignore', 'build/out.py', 'debug.log', 'keep.log', 'main.py',
+        'src/.ignore', 'src/generated.py', 'src/module.py']
+    assert walked(root, exclude=re.compile(r'src[\\/]$|\.gitignore')) == [
+        'keep.log', 'main.py']
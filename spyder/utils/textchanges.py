@@ -0,0 +1,233 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright © Spyder Project Contributors
+# Licensed under the terms of the MIT License
+# (see spyder/__init__.py for details)
+
+"""
+Incremental text changes.
+
+Changes are described as the content change events of the Language Server
+Protocol, i.e. dictionaries with the text inserted and the range it
+replaces, or only the new text when the whole document changed.
+"""
+
+# Third party imports
+from qtpy.QtGui import QTextCursor
+
+# Local imports
+from spyder.utils.qstringhelpers import qstring_length
+
+
+def get_end_position(line, character, text):
+    """Return the line and character where text ends if inserted there."""
+    newlines = text.count('\n')
+    if newlines == 0:
+        return line, character + len(text)
+    return line + newlines, len(text) - text.rfind('\n') - 1
+
+
+def common_prefix_length(text1, text2):
+    """Return the length of the common prefix of two strings."""
+    # Binary search, comparing slices is much faster than characters
+    low, high = 0, min(len(text1), len(text2))
+    while low < high:
+        middle = (low + high + 1) // 2
+        if text1[low:middle] == text2[low:middle]:
+            low = middle
+        else:
+            high = middle - 1
+    return low
+
+
+def common_suffix_length(text1, text2):
+    """Return the length of the common suffix of two strings."""
+    length1, length2 = len(text1), len(text2)
+    low, high = 0, min(length1, length2)
+    while low < high:
+        middle = (low + high + 1) // 2
+        if (text1[length1 - middle:length1 - low] ==
+                text2[length2 - middle:length2 - low]):
+            low = middle
+        else:
+            high = middle - 1
+    return low
+
+
+def apply_text_changes(text, changes):
+    """Return text after applying a list of content changes to it."""
+    lines = None
+    for change in changes:
+        change_range = change.get('range')
+        if change_range is None:
+            # The whole text changed
+            text = change['text']
+            lines = None
+            continue
+
+        if lines is None:
+            lines = text.split('\n')
+        start = change_range['start']
+        end = change_range['end']
+        start_line = min(start['line'], len(lines) - 1)
+        end_line = min(end['line'], len(lines) - 1)
+        head = lines[start_line][:start['character']]
+        tail = lines[end_line][end['character']:]
+        lines[start_line:end_line + 1] = (
+            head + change['text'] + tail).split('\n')
+
+    if lines is not None:
+        text = '\n'.join(lines)
+    return text
+
+
+class TextChangesTracker(object):
+    """
+    Keep the changes made to a QTextDocument until they are taken.
+
+    QTextDocument only reports the position and length of a change, so a
+    copy of the lines of the document is kept to know the text replaced by
+    each change. Consecutive changes that extend the previous one, e.g.
+    typing or deleting what was just typed, are merged into a single one.
+    """
+
+    def __init__(self, document):
+        self.document = document
+        self.lines = []
+        self.changes = []
+        self.needs_full_change = False
+        self.reset()
+        document.contentsChange.connect(self.on_contents_change)
+
+    def reset(self, text=None):
+        """Start tracking changes from the current text of the document."""
+        if text is None:
+            text = self.document.toPlainText()
+        self.lines = text.split('\n')
+        self.changes = []
+        self.needs_full_change = False
+
+    def take_changes(self):
+        """
+        Return the changes made since the last call and forget them.
+
+        When they can't be tracked, a single change with the whole text is
+        returned instead.
+        """
+        if self.needs_full_change:
+            text = self.document.toPlainText()
+            self.reset(text)
+            return [{'text': text}]
+        changes = self.changes
+        self.changes = []
+        return changes
+
+    def on_contents_change(self, position, chars_removed, chars_added):
+        """Save the change reported by the contentsChange signal."""
+        if self.needs_full_change:
+            return
+        document = self.document
+        block = document.findBlock(position)
+        if not block.isValid():
+            self.needs_full_change = True
+            return
+        line = block.blockNumber()
+        character = position - block.position()
+
+        old_text = self._get_old_text(line, character, chars_removed)
+
+        # Qt counts a paragraph separator at the end of the document which
+        # is not part of its text
+        end = min(position + chars_added, document.characterCount() - 1)
+        cursor = QTextCursor(document)
+        cursor.setPosition(position)
+        cursor.setPosition(end, QTextCursor.KeepAnchor)
+        new_text = cursor.selectedText()
+
+        if (old_text is None or u'\u2028' in new_text or
+                qstring_length(new_text) != len(new_text)):
+            # Positions of Qt and Python would not match, or lines would
+            # not correspond to blocks
+            self.needs_full_change = True
+            return
+        new_text = new_text.replace(u'\u2029', '\n').replace(u'\xa0', ' ')
+        if old_text == new_text:
+            # Only the format of the text changed
+            return
+
+        # Send only the text that changed
+        prefix = common_prefix_length(old_text, new_text)
+        suffix = common_suffix_length(old_text[prefix:], new_text[prefix:])
+        start_line, start_character = get_end_position(
+            line, character, old_text[:prefix])
+        removed = old_text[prefix:len(old_text) - suffix]
+        inserted = new_text[prefix:len(new_text) - suffix]
+        end_line, end_character = get_end_position(
+            start_line, start_character, removed)
+
+        head = self.lines[start_line][:start_character]
+        tail = self.lines[end_line][end_character:]
+        self.lines[start_line:end_line + 1] = (
+            head + inserted + tail).split('\n')
+
+        if not self._merge_change(start_line, start_character, removed,
+                                  inserted):
+            self.changes.append({
+                'range': {
+                    'start': {'line': start_line,
+                              'character': start_character},
+                    'end': {'line': end_line,
+                            'character': end_character},
+                },
+                'rangeLength': len(removed),
+                'text': inserted,
+            })
+
+    def _get_old_text(self, line, character, length):
+        """
+        Return the text of length characters from line and character before
+        the change, or None if they can't be found.
+        """
+        lines = self.lines
+        if line >= len(lines) or character > len(lines[line]):
+            return None
+        parts = []
+        while True:
+            text = lines[line]
+            if qstring_length(text) != len(text):
+                return None
+            available = len(text) - character
+            if length <= available:
+                parts.append(text[character:character + length])
+                break
+            parts.append(text[character:])
+            length -= available + 1
+            if line + 1 == len(lines):
+                # Paragraph separator at the end of the document
+                break
+            parts.append('\n')
+            line += 1
+            character = 0
+        return ''.join(parts)
+
+    def _merge_change(self, line, character, removed, inserted):
+        """
+        Merge a change into the last one if it continues inserting or
+        deletes the end of its text.
+
+        Return True if the change was merged.
+        """
+        if not self.changes:
+            return False
+        last = self.changes[-1]
+        start = last['range']['start']
+        end = get_end_position(start['line'], start['character'],
+                               last['text'])
+        if not removed and end == (line, character):
+            last['text'] += inserted
+            return True
+        if (not inserted and removed and last['text'].endswith(removed) and
+                get_end_position(line, character, removed) == end):
+            last['text'] = last['text'][:len(last['text']) - len(removed)]
+            return True
+        return False
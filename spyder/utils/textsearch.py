@@ -0,0 +1,225 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright © Spyder Project Contributors
+# Licensed under the terms of the MIT License
+# (see spyder/__init__.py for details)
+
+"""
+Text search utilities used by Find in Files.
+
+Everything in this module is Qt free so that it can be imported by the
+worker processes of the parallel search backend.
+"""
+
+# Standard library imports
+from concurrent.futures import ProcessPoolExecutor
+import io
+import multiprocessing
+import os
+import os.path as osp
+import re
+
+# Local imports
+from spyder.utils.searchindex import get_trigrams, INDEX_MAX_FILE_SIZE
+
+
+# Number of files that are scanned in the search thread before handing the
+# rest of the search to a pool of processes. Small searches are faster
+# without the pool start-up cost.
+PARALLEL_THRESHOLD = 256
+
+# Number of files sent to a worker process at once
+CHUNK_SIZE = 64
+
+# Patterns that can't be used to discard a whole file before searching it
+# line by line, because their meaning changes when the pattern is applied
+# to the full file contents.
+_UNSAFE_PREFILTER_REGEX = re.compile(br'\\A|\\Z|\(\?<')
+
+
+def get_search_processes():
+    """Return the number of worker processes used to search files."""
+    return max(1, os.cpu_count() or 1)
+
+
+def create_search_executor(max_workers=None):
+    """
+    Create a process pool to search files in parallel.
+
+    The `spawn` start method is used because forking a multi-threaded Qt
+    application is not safe.
+    """
+    if max_workers is None:
+        max_workers = get_search_processes()
+    context = multiprocessing.get_context('spawn')
+    try:
+        return ProcessPoolExecutor(max_workers=max_workers,
+                                   mp_context=context)
+    except TypeError:
+        # Python 3.6 doesn't support the mp_context argument
+        return ProcessPoolExecutor(max_workers=max_workers)
+
+
+def _decode_line(line, enc):
+    try:
+        return line.decode(enc)
+    except UnicodeDecodeError:
+        return line
+
+
+def _find_literal(fname, data, data_search, texts):
+    """Find all occurrences of any of `texts` in the bytes `data_search`."""
+    positions = {}
+    for text, enc in texts:
+        if not text:
+            continue
+        found = data_search.find(text)
+        while found > -1:
+            if found not in positions:
+                positions[found] = (found + len(text), enc)
+            found = data_search.find(text, found + 1)
+
+    if not positions:
+        return []
+
+    results = []
+    lineno = 0
+    line_start = 0
+    next_line_start = 0
+    line_dec = None
+    for start in sorted(positions):
+        end, enc = positions[start]
+        if start >= next_line_start:
+            lineno += data.count(b'\n', line_start, start)
+            line_start = data.rfind(b'\n', 0, start) + 1
+            line_end = data.find(b'\n', start)
+            if line_end == -1:
+                next_line_start = len(data)
+            else:
+                next_line_start = line_end + 1
+            line_dec = _decode_line(data[line_start:next_line_start], enc)
+        results.append((fname, lineno + 1, start - line_start,
+                        end - line_start, line_dec))
+    return results
+
+
+def _find_regex(fname, data, data_search, texts):
+    """Find all matches of any of the compiled patterns in `texts`."""
+    # Discard files without matches using a single pass of the regex over
+    # the whole buffer before falling back to a search line by line.
+    candidates = []
+    for text, enc in texts:
+        if _UNSAFE_PREFILTER_REGEX.search(text.pattern):
+            candidates.append((text, enc))
+            continue
+        multiline = re.compile(text.pattern, text.flags | re.MULTILINE)
+        if multiline.search(data_search) is not None:
+            candidates.append((text, enc))
+
+    if not candidates:
+        return []
+
+    results = []
+    lines = io.BytesIO(data)
+    lines_search = io.BytesIO(data_search)
+    for lineno, (line, line_search) in enumerate(zip(lines, lines_search)):
+        for text, enc in candidates:
+            if text.search(line_search) is not None:
+                break
+        else:
+            continue
+
+        line_dec = _decode_line(line, enc)
+        for match in text.finditer(line_search):
+            results.append((fname, lineno + 1, match.start(), match.end(),
+                            line_dec))
+    return results
+
+
+def search_in_data(fname, data, texts, text_re, case_sensitive):
+    """
+    Search `texts` in the contents of a file.
+
+    The whole file is scanned as bytes, instead of iterating over its lines
+    in Python.
+
+    Parameters
+    ----------
+    fname: str
+        Absolute path to the file.
+    data: bytes
+        Contents of the file.
+    texts: list
+        List of (text, encoding) tuples. Texts are bytes or compiled bytes
+        regular expressions if `text_re` is True. They must already be lower
+        case for case insensitive searches.
+    text_re: bool
+        Whether `texts` are regular expressions.
+    case_sensitive: bool
+        Whether the search is case sensitive.
+
+    Returns
+    -------
+    list
+        List of (filename, lineno, colno, match_end, line) tuples, where
+        `line` is the decoded line text.
+    """
+    data_search = data if case_sensitive else data.lower()
+    if text_re:
+        return _find_regex(fname, data, data_search, texts)
+    else:
+        return _find_literal(fname, data, data_search, texts)
+
+
+def search_in_file(fname, texts, text_re, case_sensitive):
+    """
+    Search `texts` in a file.
+
+    See `search_in_data` for the meaning of the parameters.
+    """
+    fname = osp.abspath(fname)
+    with open(fname, 'rb') as f:
+        data = f.read()
+    return search_in_data(fname, data, texts, text_re, case_sensitive)
+
+
+def search_files(fnames, texts, text_re, case_sensitive, index_fnames=None):
+    """
+    Search `texts` in a list of files.
+
+    This is the function run by the worker processes of the parallel
+    search. See `search_in_data` for the meaning of the parameters.
+
+    Parameters
+    ----------
+    index_fnames: set, optional
+        Files whose trigrams need to be computed for the search index while
+        they are read. Files larger than `INDEX_MAX_FILE_SIZE` are skipped.
+
+    Returns
+    -------
+    tuple
+        List of results of all files, a boolean that is True if some of
+        them couldn't be read and a dictionary that maps the files in
+        `index_fnames` to their (size, mtime, trigrams).
+    """
+    results = []
+    error = False
+    trigrams = {}
+    for fname in fnames:
+        try:
+            fname = osp.abspath(fname)
+            with open(fname, 'rb') as f:
+                stat = os.fstat(f.fileno())
+                data = f.read()
+        except (IOError, OSError):
+            error = True
+            continue
+
+        results.extend(search_in_data(fname, data, texts, text_re,
+                                      case_sensitive))
+        if (index_fnames and fname in index_fnames
+                and len(data) <= INDEX_MAX_FILE_SIZE):
+            trigrams[fname] = (stat.st_size, stat.st_mtime,
+                               get_trigrams(data))
+    return results, error, trigrams
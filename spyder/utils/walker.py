@@ -0,0 +1,231 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright © Spyder Project Contributors
+# Licensed under the terms of the MIT License
+# (see spyder/__init__.py for details)
+
+"""
+Directory walking that honours .gitignore and .ignore files.
+"""
+
+# Standard library imports
+import os
+import os.path as osp
+import re
+
+
+# Files with ignore rules read in every directory
+IGNORE_FILES = ('.gitignore', '.ignore')
+
+# Directories that are never walked
+SKIP_DIRS = ('.git', '.hg', '.svn')
+
+
+def _translate_pattern(pattern):
+    """Translate a gitignore glob pattern to a regular expression."""
+    i = 0
+    n = len(pattern)
+    regex = []
+    while i < n:
+        c = pattern[i]
+        if c == '*':
+            if pattern[i:i + 3] == '**/':
+                regex.append('(?:.*/)?')
+                i += 3
+                continue
+            elif pattern[i:i + 2] == '**':
+                regex.append('.*')
+                i += 2
+                continue
+            regex.append('[^/]*')
+        elif c == '?':
+            regex.append('[^/]')
+        elif c == '[':
+            j = pattern.find(']', i + 2)
+            if j == -1:
+                regex.append(re.escape(c))
+            else:
+                chars = pattern[i + 1:j].replace('\\', '\\\\')
+                if chars[0] == '!':
+                    chars = '^' + chars[1:]
+                regex.append('[' + chars + ']')
+                i = j
+        elif c == '\\' and i + 1 < n:
+            i += 1
+            regex.append(re.escape(pattern[i]))
+        else:
+            regex.append(re.escape(c))
+        i += 1
+    return ''.join(regex)
+
+
+class IgnoreRules(object):
+    """Rules of a single ignore file, relative to its directory."""
+
+    def __init__(self, base, lines):
+        """
+        Parameters
+        ----------
+        base: str
+            Directory of the ignore file.
+        lines: iterable
+            Lines of the ignore file.
+        """
+        self.base = base
+        self.rules = []
+        for line in lines:
+            rule = self._parse_line(line)
+            if rule is not None:
+                self.rules.append(rule)
+
+    @classmethod
+    def from_file(cls, fname):
+        """Read the rules of an ignore file, or return None."""
+        try:
+            with open(fname, 'r', encoding='utf-8', errors='replace') as f:
+                lines = f.read().splitlines()
+        except (IOError, OSError):
+            return None
+        rules = cls(osp.dirname(fname), lines)
+        return rules if rules.rules else None
+
+    @staticmethod
+    def _parse_line(line):
+        # Trailing spaces are ignored unless they are escaped
+        if not line.endswith('\\ '):
+            line = line.rstrip()
+        if not line or line.startswith('#'):
+            return None
+
+        negate = line.startswith('!')
+        if negate:
+            line = line[1:]
+        elif line.startswith(('\\!', '\\#')):
+            line = line[1:]
+
+        dir_only = line.endswith('/')
+        line = line.rstrip('/')
+        if not line:
+            return None
+
+        # Patterns with a slash are relative to the ignore file directory,
+        # the rest match at any depth.
+        if '/' in line:
+            regex = _translate_pattern(line.lstrip('/'))
+        else:
+            regex = '(?:.*/)?' + _translate_pattern(line)
+        return (re.compile(regex + '$', re.DOTALL), negate, dir_only)
+
+    def match(self, relpath, is_dir):
+        """
+        Match a path relative to `base` against the rules.
+
+        Returns
+        -------
+        bool or None
+            True if the path is ignored, False if it's explicitly included
+            by a negated rule and None if no rule applies to it.
+        """
+        for regex, negate, dir_only in reversed(self.rules):
+            if dir_only and not is_dir:
+                continue
+            if regex.match(relpath):
+                return not negate
+        return None
+
+
+def is_ignored(path, is_dir, rules_stack):
+    """
+    Return True if `path` is ignored by any of the rules in `rules_stack`.
+
+    Rules of the deepest ignore files take precedence.
+    """
+    for rules in reversed(rules_stack):
+        relpath = path[len(rules.base):].lstrip(os.sep)
+        if os.sep != '/':
+            relpath = relpath.replace(os.sep, '/')
+        ignored = rules.match(relpath, is_dir)
+        if ignored is not None:
+            return ignored
+    return False
+
+
+def walk_files(root, exclude=None, use_ignore_files=True,
+               ignore_files=IGNORE_FILES, skip_dirs=SKIP_DIRS):
+    """
+    Walk the files under `root`, pruning ignored directories early.
+
+    Parameters
+    ----------
+    root: str
+        Directory to walk.
+    exclude: re.Pattern, optional
+        Regular expression of paths to skip. Directory paths are matched
+        with a trailing separator.
+    use_ignore_files: bool, optional
+        Whether to honour the rules of `ignore_files` found while walking.
+    ignore_files: tuple, optional
+        Names of the files with ignore rules.
+    skip_dirs: tuple, optional
+        Names of directories that are never walked.
+
+    Yields
+    ------
+    tuple
+        Path and `os.stat_result` of every file that is not ignored.
+    """
+    root = osp.normpath(root)
+    root_rules = []
+    if use_ignore_files:
+        info_exclude = IgnoreRules.from_file(
+            osp.join(root, '.git', 'info', 'exclude'))
+        if info_exclude is not None:
+            info_exclude.base = root
+            root_rules.append(info_exclude)
+
+    stack = [(root, root_rules)]
+    while stack:
+        dirpath, rules_stack = stack.pop()
+        try:
+            entries = list(os.scandir(dirpath))
+        except OSError:
+            continue
+
+        if use_ignore_files:
+            names = {entry.name for entry in entries}
+            dir_rules = [IgnoreRules.from_file(osp.join(dirpath, name))
+                         for name in ignore_files if name in names]
+            dir_rules = [rules for rules in dir_rules if rules is not None]
+            if dir_rules:
+                rules_stack = rules_stack + dir_rules
+
+        subdirs = []
+        for entry in entries:
+            path = entry.path
+            try:
+                is_dir = entry.is_dir()
+            except OSError:
+                continue
+
+            if is_dir:
+                if entry.name in skip_dirs or entry.is_symlink():
+                    continue
+                if exclude is not None and exclude.search(path + os.sep):
+                    continue
+                if rules_stack and is_ignored(path, True, rules_stack):
+                    continue
+                subdirs.append(path)
+            else:
+                if exclude is not None and exclude.search(path):
+                    continue
+                if rules_stack and is_ignored(path, False, rules_stack):
+                    continue
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    continue
+                yield path, stat
+
+        # Walk directories in alphabetical order
+        for path in sorted(subdirs, reverse=True):
+            stack.append((path, rules_stack))
@@ -23,6 +23,7 @@
 import datetime
 import re
 import sys
+import threading
 import warnings
 
 # Third party imports
@@ -39,7 +40,7 @@
 from spyder_kernels.utils.nsview import (
     DataFrame, display_to_value, FakeObject,
     get_color_name, get_human_readable_type, get_size, Image,
-    MaskedArray, ndarray, np_savetxt, Series, sort_against,
+    MaskedArray, ndarray, np_savetxt, Series,
     try_to_eval, unsorted_unique, value_to_display, get_object_attrs,
     get_type_string, NUMERIC_NUMPY_TYPES)
 
@@ -56,6 +57,7 @@
 from spyder.utils.stringmatching import get_search_scores, get_search_regex
 from spyder.plugins.variableexplorer.widgets.collectionsdelegate import (
     CollectionsDelegate)
+from spyder.plugins.variableexplorer.widgets.dataview import RemoteDataView
 from spyder.plugins.variableexplorer.widgets.importwizard import ImportWizard
 from spyder.widgets.helperwidgets import CustomSortFilterProxy
 from spyder.plugins.variableexplorer.widgets.basedialog import BaseDialog
@@ -66,6 +68,9 @@
 LARGE_NROWS = 100
 ROWS_TO_LOAD = 50
 
+# Collections with more rows than this are sorted in a thread
+SORT_THREAD_NROWS = 5e4
+
 
 def natsort(s):
     """
@@ -78,6 +83,23 @@ def natsort(s):
     return x
 
 
+def get_sort_order(values, reverse=False, sort_key=None):
+    """
+    Return the permutation that sorts values, or None if they can't be
+    compared.
+
+    The sort is stable, also when reverse is True.
+    """
+    if sort_key is None:
+        key = values.__getitem__
+    else:
+        key = lambda index: sort_key(values[index])
+    try:
+        return sorted(range(len(values)), key=key, reverse=reverse)
+    except Exception:
+        return None
+
+
 class ProxyObject(object):
     """Dictionary proxy to an unknown object."""
 
@@ -124,6 +146,7 @@ class ReadOnlyCollectionsModel(QAbstractTableModel):
     """CollectionsEditor Read-Only Table Model"""
 
     sig_setting_data = Signal()
+    sig_sort_ready = Signal(object, object)
 
     def __init__(self, parent, data, title="", names=False,
                  minmax=False, dataframe_format=None,
@@ -151,6 +174,8 @@ def __init__(self, parent, data, title="", names=False,
             self.title = self.title + ' - '
         self.sizes = []
         self.types = []
+        self._sort_version = 0
+        self.sig_sort_ready.connect(self.set_sort_order)
         self.set_data(data)
 
     def get_data(self):
@@ -162,6 +187,9 @@ def set_data(self, data, coll_filter=None):
         self._data = data
         data_type = get_type_string(data)
 
+        # Discard the result of sorts still running for the previous data
+        self._sort_version += 1
+
         if (coll_filter is not None and not self.remote and
                 isinstance(data, (tuple, list, dict, set))):
             data = coll_filter(data)
@@ -256,48 +284,72 @@ def load_all(self):
         self.fetchMore(number_to_fetch=self.total_rows)
 
     def sort(self, column, order=Qt.AscendingOrder):
-        """Overriding sort method"""
+        """
+        Overriding sort method
+
+        The permutation that sorts the rows is computed first and then
+        applied to keys, sizes and types. For long collections it's computed
+        in a thread, and starting another sort discards the previous one.
+        """
 
         def all_string(listlike):
             return all([isinstance(x, str) for x in listlike])
 
         reverse = (order == Qt.DescendingOrder)
-        sort_key = natsort if all_string(self.keys) else None
+        sort_key = None
 
         if column == 0:
-            self.sizes = sort_against(self.sizes, self.keys,
-                                      reverse=reverse,
-                                      sort_key=natsort)
-            self.types = sort_against(self.types, self.keys,
-                                      reverse=reverse,
-                                      sort_key=natsort)
-            try:
-                self.keys.sort(reverse=reverse, key=sort_key)
-            except:
-                pass
+            values = self.keys
+            if all_string(self.keys):
+                sort_key = natsort
         elif column == 1:
-            self.keys[:self.rows_loaded] = sort_against(self.keys,
-                                                        self.types,
-                                                        reverse=reverse)
-            self.sizes = sort_against(self.sizes, self.types, reverse=reverse)
-            try:
-                self.types.sort(reverse=reverse)
-            except:
-                pass
+            # Only loaded rows have a type and size
+            values = self.types
         elif column == 2:
-            self.keys[:self.rows_loaded] = sort_against(self.keys,
-                                                        self.sizes,
-                                                        reverse=reverse)
-            self.types = sort_against(self.types, self.sizes, reverse=reverse)
-            try:
-                self.sizes.sort(reverse=reverse)
-            except:
-                pass
+            values = self.sizes
         elif column in [3, 4]:
             values = [self._data[key] for key in self.keys]
-            self.keys = sort_against(self.keys, values, reverse=reverse)
-            self.sizes = sort_against(self.sizes, values, reverse=reverse)
-            self.types = sort_against(self.types, values, reverse=reverse)
+        else:
+            return
+
+        self._sort_version += 1
+        version = self._sort_version
+        if len(values) < SORT_THREAD_NROWS:
+            self.set_sort_order(get_sort_order(values, reverse, sort_key),
+                                version)
+            return
+
+        # Copy values because keys are sorted in place
+        values = list(values)
+
+        def sort():
+            try:
+                self.sig_sort_ready.emit(
+                    get_sort_order(values, reverse, sort_key), version)
+            except RuntimeError:
+                # The model was deleted while sorting
+                pass
+
+        thread = threading.Thread(target=sort)
+        thread.daemon = True
+        thread.start()
+
+    def set_sort_order(self, order, version):
+        """
+        Arrange the first rows in order, a permutation of their positions,
+        unless another sort was started or the data changed since it was
+        computed.
+        """
+        if order is None or version != self._sort_version:
+            return
+        size = len(order)
+        self.keys[:size] = [self.keys[index] for index in order]
+        if size <= len(self.sizes):
+            self.sizes[:size] = [self.sizes[index] for index in order]
+            self.types[:size] = [self.types[index] for index in order]
+        else:
+            # The loaded rows are not the same after sorting all of them
+            self.set_size_and_type()
         self.beginResetModel()
         self.endResetModel()
 
@@ -1428,6 +1480,12 @@ def get_value(self, index):
             name = source_index.model().keys[source_index.row()]
             return self.parent().get_value(name)
 
+    def get_data_view(self, index):
+        if index.isValid():
+            source_index = index.model().mapToSource(index)
+            name = source_index.model().keys[source_index.row()]
+            return self.parent().get_data_view(name)
+
     def set_value(self, index, value):
         if index.isValid():
             source_index = index.model().mapToSource(index)
@@ -1487,6 +1545,25 @@ def get_value(self, name):
         value = self.shellwidget.get_value(name)
         return value
 
+    def get_data_view(self, name):
+        """
+        Get a view of a DataFrame, Series or array that is kept in the
+        kernel, or None if the value of the variable must be used instead.
+        """
+        properties = self.var_properties.get(name, {})
+        if properties.get('is_data_frame') or properties.get('is_series'):
+            supported = DataFrame is not FakeObject
+        elif properties.get('is_array'):
+            supported = ndarray is not FakeObject
+        else:
+            supported = False
+        if not supported:
+            return None
+        info = self.shellwidget.open_data_view(name)
+        if info is None:
+            return None
+        return RemoteDataView(self.shellwidget, info)
+
     def new_value(self, name, value):
         """Create new value in data"""
         try:
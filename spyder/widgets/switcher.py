@@ -13,8 +13,8 @@
 import sys
 
 # Third party imports
-from qtpy.QtCore import (QEvent, QObject, QSize, QSortFilterProxyModel, Qt,
-                         Signal, Slot, QModelIndex)
+from qtpy.QtCore import (QEvent, QObject, QPoint, QSize,
+                         QSortFilterProxyModel, Qt, Signal, Slot, QModelIndex)
 from qtpy.QtGui import QStandardItem, QStandardItemModel, QTextDocument
 from qtpy.QtWidgets import (QAbstractItemView, QApplication, QDialog,
                             QLineEdit, QListView, QListWidgetItem, QStyle,
@@ -26,7 +26,7 @@
 from spyder.config.utils import is_ubuntu
 from spyder.py3compat import TEXT_TYPES, to_text_string
 from spyder.utils import icon_manager as ima
-from spyder.utils.stringmatching import get_search_scores
+from spyder.utils.stringmatching import FuzzySearchIndex, NOT_FOUND_SCORE
 from spyder.widgets.helperwidgets import HTMLDelegate
 
 # Style dict constants
@@ -154,8 +154,8 @@ def get_score(self):
 
     def set_score(self, value):
         """Set the search text fuzzy match score."""
+        # The score is not rendered, and items are scored on every keystroke
         self._score = value
-        self._set_rendered_text()
 
     def is_action_item(self):
         """Return whether the item is of action type."""
@@ -458,8 +458,9 @@ def get_section(self):
 
     def set_section_visible(self, value):
         """Set visibility of the item section."""
-        self._section_visible = value
-        self._set_rendered_text()
+        if value != self._section_visible:
+            self._section_visible = value
+            self._set_rendered_text()
 
     def set_action_item(self, value):
         """Enable/disable the action type for the item."""
@@ -557,6 +558,12 @@ def __init__(self, parent, help_text=None, item_styles=ITEM_STYLES,
         self._item_styles = item_styles
         self._item_separator_styles = item_separator_styles
 
+        # Index of the item titles, and search text and source rows of the
+        # items whose titles were enriched with it
+        self._search_index = None
+        self._enriched_search_text = None
+        self._enriched_rows = set()
+
         # Widgets
         self.edit = QLineEdit(self)
         self.list = QListView(self)
@@ -597,6 +604,8 @@ def __init__(self, parent, help_text=None, item_styles=ITEM_STYLES,
         self.list.clicked.connect(self.edit.setFocus)
         self.list.selectionModel().currentChanged.connect(
             self.current_item_changed)
+        self.list.verticalScrollBar().valueChanged.connect(
+            self._enrich_visible_items)
         self.edit.setFocus()
 
     # --- Helper methods
@@ -604,6 +613,7 @@ def _add_item(self, item, last_item=True):
         """Perform common actions when adding items."""
         item.set_width(self._ITEM_WIDTH)
         self.model.appendRow(item)
+        self._search_index = None
         if last_item:
             # Only set the current row to the first item when the added item is
             # the last one in order to prevent performance issues when
@@ -612,6 +622,53 @@ def _add_item(self, item, last_item=True):
             self.set_height()
         self.setup_sections()
 
+    def _get_search_index(self):
+        """Return the index of the item titles, built on first use."""
+        if self._search_index is None:
+            titles = []
+            for row in range(self.model.rowCount()):
+                item = self.model.item(row)
+                if isinstance(item, SwitcherItem):
+                    title = item.get_title()
+                else:
+                    title = ''
+                titles.append(title)
+            self._search_index = FuzzySearchIndex(titles)
+        return self._search_index
+
+    def _enrich_visible_items(self, value=None):
+        """
+        Highlight the search text letters in the titles of the visible items.
+
+        Titles are only enriched when shown, because rendering them all on
+        every keystroke is too slow with many items.
+        """
+        if self._enriched_search_text is None:
+            return
+        search_index = self._get_search_index()
+        viewport = self.list.viewport()
+        first_row = self.list.indexAt(QPoint(0, 0)).row()
+        last_row = self.list.indexAt(QPoint(0, viewport.height() - 1)).row()
+        if first_row == -1:
+            first_row = 0
+        if last_row == -1:
+            last_row = min(first_row + self._MAX_NUM_ITEMS, self.count()) - 1
+
+        for row in range(first_row, last_row + 1):
+            model_index = self.proxy.mapToSource(self.proxy.index(row, 0))
+            source_row = model_index.row()
+            if source_row in self._enriched_rows:
+                continue
+            self._enriched_rows.add(source_row)
+            item = self.model.item(source_row)
+            if (item is None or self._is_separator(item) or
+                    item.is_action_item()):
+                continue
+            rich_title = search_index.get_enriched_text(
+                self._enriched_search_text, source_row,
+                template=u"<b>{0}</b>")
+            item.set_rich_title(rich_title.replace(" ", "&nbsp;"))
+
     # --- API
     def clear(self):
         """Remove all items from the list and clear the search text."""
@@ -619,6 +676,8 @@ def clear(self):
         self.model.beginResetModel()
         self.model.clear()
         self.model.endResetModel()
+        self._search_index = None
+        self._enriched_search_text = None
         self.setMinimumHeight(self._MIN_HEIGHT)
 
     def set_placeholder_text(self, text):
@@ -695,25 +754,13 @@ def setup(self):
                 return
 
         # Filter by text
-        titles = []
+        search_text = to_text_string(clean_string(search_text))
+        scores = dict(self._get_search_index().search(search_text))
         for row in range(self.model.rowCount()):
             item = self.model.item(row)
-            if isinstance(item, SwitcherItem):
-                title = item.get_title()
-            else:
-                title = ''
-            titles.append(title)
-
-        search_text = clean_string(search_text)
-        scores = get_search_scores(to_text_string(search_text),
-                                   titles, template=u"<b>{0}</b>")
-
-        for idx, (title, rich_title, score_value) in enumerate(scores):
-            item = self.model.item(idx)
-            if not self._is_separator(item) and not item.is_action_item():
-                rich_title = rich_title.replace(" ", "&nbsp;")
-                item.set_rich_title(rich_title)
-            item.set_score(score_value)
+            item.set_score(scores.get(row, NOT_FOUND_SCORE))
+        self._enriched_search_text = search_text
+        self._enriched_rows = set()
         self.proxy.set_filter_by_score(True)
 
         self.setup_sections()
@@ -722,6 +769,7 @@ def setup(self):
         else:
             self.set_current_row(-1)
         self.set_height()
+        self._enrich_visible_items()
 
     def setup_sections(self):
         """Set-up which sections appear on the item list."""
@@ -820,6 +868,7 @@ def reject(self):
     def resizeEvent(self, event):
         """Override Qt method."""
         super(Switcher, self).resizeEvent(event)
+        self._enrich_visible_items()
 
     # --- Helper methods: Lineedit widget
     def search_text(self):
@@ -30,6 +30,7 @@
 from qtpy.QtWidgets import QWidget, QDateEdit
 
 # Local imports
+from spyder.widgets import collectionseditor
 from spyder.widgets.collectionseditor import (
     RemoteCollectionsEditorTableView, CollectionsEditorTableView,
     CollectionsModel, CollectionsEditor, LARGE_NROWS, ROWS_TO_LOAD, natsort)
@@ -422,11 +423,12 @@ def test_sort_collectionsmodel():
          '[0, 1, 2]',
          '[3, 4, 5, 6]']]
 
+    # Sizes of different types can't be compared, so rows are not moved
     cm.sort(2)  # sort by size
     assert data_table(cm, 7, 4) == [
         [3, 4, 5, 6, 0, 1, 2],
         ['DataFrame', 'DataFrame', 'Series', 'Series', 'int', 'list', 'list'],
-        ['(2, 3)', '(3,)', '(3, 3)', '(4,)', 1, 3, 4],
+        ['(3, 3)', '(2, 3)', '(3,)', '(4,)', 1, 3, 4],
         ['Column names: 0, 1, 2',
          'Column names: 0, 1, 2',
          'Series object of pandas.core.series module',
@@ -461,6 +463,25 @@ def test_sort_and_fetch_collectionsmodel_with_many_rows():
     assert cm.rowCount() == len(coll)
 
 
+def test_sort_collectionsmodel_in_thread(qtbot, monkeypatch):
+    """Test that long collections are sorted in a thread."""
+    monkeypatch.setattr(collectionseditor, 'SORT_THREAD_NROWS', 1)
+    coll = [3, 1, 2] * LARGE_NROWS
+    cm = CollectionsModel(MockParent(), coll)
+    with qtbot.waitSignal(cm.modelReset, timeout=5000):
+        cm.sort(3)  # sort by value
+    assert [data(cm, row, 0) for row in range(3)] == [1, 4, 7]
+    assert [data(cm, row, 3) for row in range(3)] == ['1', '1', '1']
+    assert coll[:3] == [3, 1, 2]
+
+    # Only the result of the last sort is applied
+    with qtbot.waitSignal(cm.modelReset, timeout=5000):
+        cm.sort(3)
+        cm.sort(0, order=Qt.DescendingOrder)
+    qtbot.wait(100)
+    assert [data(cm, row, 0) for row in range(3)] == [299, 298, 297]
+    assert [data(cm, row, 3) for row in range(3)] == ['2', '1', '3']
+
 def test_rename_and_duplicate_item_in_collection_editor():
     collections = {'list': ([1, 2, 3], False, True),
                    'tuple': ((1, 2, 3), False, False),
@@ -116,3 +116,29 @@ def test_switcher_filter_unicode(dlg_switcher, qtbot):
     edit.setText('试')
     qtbot.wait(1000)
     assert dlg_switcher.count() == 2
+
+
+def test_switcher_enrich_visible_items(dlg_switcher, qtbot):
+    """Test that only the titles of visible items are highlighted."""
+    dlg_switcher.clear()
+    for i in range(100):
+        dlg_switcher.add_item(title='item {}'.format(i), last_item=False)
+    dlg_switcher.show()
+
+    dlg_switcher.edit.setText("item 9")
+    qtbot.wait(100)
+    assert dlg_switcher.count() == 19
+    assert dlg_switcher.current_item().get_title() == 'item 9'
+    assert dlg_switcher.current_item().get_rich_title().endswith(
+        '&nbsp;<b>9</b>')
+
+    rich_titles = [dlg_switcher.model.item(row).get_rich_title()
+                   for row in range(dlg_switcher.model.rowCount())]
+    assert 0 < len([title for title in rich_titles if title]) < 19
+
+    # Scrolling to the last item highlights its title
+    dlg_switcher.set_current_row(18)
+    qtbot.wait(100)
+    assert dlg_switcher.current_item().get_title() == 'item 89'
+    assert dlg_switcher.current_item().get_rich_title().endswith(
+        '&nbsp;8<b>9</b>')